@@ -0,0 +1,91 @@
+"""Compare the statsmodels and NumPy forecasting engines.
+
+Generates short, mostly-zero daily demand series similar to per-SKU sales,
+holds out the last ``--horizon`` days and reports throughput (series per
+second) and hold-out mean absolute error for both engines::
+
+    python benchmarks/bench_forecast_engines.py --series 5000 --days 120
+
+statsmodels is slow, so it only fits a random sample of ``--sample`` series;
+accuracy is compared on that same sample.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from inventory import forecast_demand, holt_winters_forecast
+
+
+def make_series(n_series: int, n_days: int, seed: int = 0) -> np.ndarray:
+    """Intermittent demand: Poisson counts with a small, skewed rate per SKU."""
+    rng = np.random.default_rng(seed)
+    rates = rng.gamma(0.5, 0.6, size=(n_series, 1))
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * np.arange(n_days) / 7)
+    return rng.poisson(rates * weekly).astype(float)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--seasonal-periods", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    values = make_series(args.series, args.days + args.horizon, args.seed)
+    history, actual = values[:, : args.days], values[:, args.days :]
+    sample = np.random.default_rng(args.seed).choice(
+        args.series, size=min(args.sample, args.series), replace=False
+    )
+
+    start = time.perf_counter()
+    numpy_fc = holt_winters_forecast(
+        history, args.horizon, seasonal_periods=args.seasonal_periods
+    )
+    numpy_seconds = time.perf_counter() - start
+
+    index = pd.date_range("2016-01-01", periods=args.days, freq="D")
+    sm_fc = np.full((len(sample), args.horizon), np.nan)
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row, i in enumerate(sample):
+            try:
+                sm_fc[row] = forecast_demand(
+                    pd.Series(history[i], index=index),
+                    args.horizon,
+                    seasonal_periods=args.seasonal_periods,
+                ).to_numpy()
+            except Exception:  # noqa: BLE001 - counted as a failed fit
+                pass
+    sm_seconds = time.perf_counter() - start
+
+    def mae(forecast: np.ndarray, rows: np.ndarray) -> float:
+        return float(np.nanmean(np.abs(forecast - actual[rows])))
+
+    print(f"series={args.series} days={args.days} horizon={args.horizon}")
+    print(f"{'engine':<12}{'series/s':>14}{'sample MAE':>14}{'all MAE':>12}")
+    print(
+        f"{'numpy':<12}{args.series / numpy_seconds:>14.1f}"
+        f"{mae(numpy_fc[sample], sample):>14.4f}{mae(numpy_fc, np.arange(args.series)):>12.4f}"
+    )
+    print(
+        f"{'statsmodels':<12}{len(sample) / sm_seconds:>14.1f}"
+        f"{mae(sm_fc, sample):>14.4f}{'-':>12}"
+    )
+    print(f"speed-up: {(args.series / numpy_seconds) / (len(sample) / sm_seconds):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
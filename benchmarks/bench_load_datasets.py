@@ -0,0 +1,71 @@
+"""Wall-clock scaling of :func:`inventory.load_datasets` with ``max_workers``.
+
+Loads every member of an archive with an increasing number of threads and
+reports the best time of ``--repeat`` runs::
+
+    python benchmarks/bench_load_datasets.py Sample.zip --scale 50
+
+``--scale N`` first writes a temporary copy of the archive in which every
+member is repeated ``N`` times, so the six-file sample becomes large enough
+for decompression and parsing to dominate.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from inventory import load_datasets
+
+
+def scale_archive(source: Path, target: Path, factor: int) -> Path:
+    """Copy ``source`` to ``target`` repeating the data rows of each member."""
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(
+        target, "w", compression=zipfile.ZIP_DEFLATED
+    ) as dst:
+        for info in src.infolist():
+            header, _, body = src.read(info).partition(b"\n")
+            with dst.open(info.filename, "w", force_zip64=True) as fp:
+                fp.write(header + b"\n")
+                for _ in range(factor):
+                    fp.write(body if body.endswith(b"\n") else body + b"\n")
+    return target
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archive", nargs="?", default="Sample.zip")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 3, 6])
+    parser.add_argument("--typed", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = Path(args.archive)
+        if args.scale > 1:
+            archive = scale_archive(archive, Path(tmp) / archive.name, args.scale)
+        with zipfile.ZipFile(archive) as zf:
+            members = len(zf.namelist())
+            size = sum(info.file_size for info in zf.infolist())
+        print(f"{archive.name}: {members} members, {size / 1e6:.1f} MB uncompressed")
+        print(f"{'workers':>8}{'seconds':>10}{'speed-up':>10}")
+        baseline = None
+        for workers in args.workers:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                load_datasets(archive, max_workers=workers, typed=args.typed)
+                best = min(best, time.perf_counter() - start)
+            baseline = baseline or best
+            print(f"{workers:>8}{best:>10.3f}{baseline / best:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare two result files written by ``benchmarks/run.py``.
+
+Prints the time and peak memory ratio of every case present in both files
+and exits with status 1 if any case became slower (or used more memory)
+than ``--threshold`` allows::
+
+    python benchmarks/compare.py before.json after.json --threshold 0.2
+
+Cases faster than ``--min-seconds`` in the baseline are reported but never
+counted as regressions, since their timings are dominated by noise.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def load(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Results of a run keyed by case name."""
+    report = json.loads(Path(path).read_text())
+    return {result["name"]: result for result in report["results"]}
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]],
+    current: dict[str, dict[str, Any]],
+    *,
+    threshold: float = 0.1,
+    min_seconds: float = 0.001,
+) -> list[dict[str, Any]]:
+    """Per-case ratios of ``current`` to ``baseline``.
+
+    Each row holds the case ``name``, ``time_ratio``, ``memory_ratio`` and
+    ``regression``, true when either ratio exceeds ``1 + threshold`` or the
+    case started failing.
+    """
+    rows = []
+    for name in baseline.keys() & current.keys():
+        before, after = baseline[name], current[name]
+        if "error" in before:
+            continue
+        if "error" in after:
+            rows.append(
+                {"name": name, "time_ratio": None, "memory_ratio": None, "regression": True}
+            )
+            continue
+        time_ratio = after["seconds"] / before["seconds"] if before["seconds"] else None
+        memory_ratio = (
+            after["peak_memory_bytes"] / before["peak_memory_bytes"]
+            if before["peak_memory_bytes"]
+            else None
+        )
+        regression = before["seconds"] >= min_seconds and any(
+            ratio is not None and ratio > 1 + threshold for ratio in (time_ratio, memory_ratio)
+        )
+        rows.append(
+            {
+                "name": name,
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": regression,
+            }
+        )
+    return sorted(rows, key=lambda row: row["name"])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--min-seconds", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        load(args.baseline),
+        load(args.current),
+        threshold=args.threshold,
+        min_seconds=args.min_seconds,
+    )
+
+    def fmt(ratio: float | None) -> str:
+        return "-" if ratio is None else f"{ratio:.2f}x"
+
+    print(f"{'case':<40}{'time':>10}{'memory':>10}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        if row["time_ratio"] is None and row["regression"]:
+            flag = "  FAILED"
+        print(f"{row['name']:<40}{fmt(row['time_ratio']):>10}{fmt(row['memory_ratio']):>10}{flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
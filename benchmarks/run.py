@@ -0,0 +1,1023 @@
+"""Time and memory-profile every public function of :mod:`inventory`.
+
+Each entry of :data:`CASES` prepares its inputs from a synthetic archive
+(see :mod:`synthetic`) and returns a callable that is timed ``--repeat``
+times; a further call runs under :mod:`tracemalloc` to record the peak
+memory allocated by the call.  Results are written as JSON together with
+the commit and library versions, so runs can be compared across commits
+with ``benchmarks/compare.py``::
+
+    python benchmarks/run.py --rows 100000 --output before.json
+    python benchmarks/run.py --rows 100000 --only forecast --output after.json
+
+``--archive`` benchmarks an existing archive (e.g. ``Sample.zip``) instead of
+generating one.  Every name in ``inventory.__all__`` must either have a case
+or be listed in :data:`NOT_BENCHMARKED`.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+
+import inventory
+from synthetic import MEMBERS, generate_archive
+
+#: Public names that are not functions worth timing.
+NOT_BENCHMARKED = {
+    "EOQError": "flag enum",
+    "ReorderPointError": "flag enum",
+    "DatasetSchema": "schema description, exercised by the typed loads",
+}
+
+#: Member holding the per-SKU policy inputs used by the EOQ and reorder
+#: point ``*_from_zip`` cases.
+PARAMS_MEMBER = "policy_inputs.csv"
+
+#: Sales member name expected by :func:`inventory.top_selling_sample`.
+SAMPLE_SALES_MEMBER = "SalesFINAL12312016_sample.csv"
+
+#: Number of SKU series used by the per-series forecasting cases.  Fitting
+#: with statsmodels is far slower, so that variant uses a tenth of them.
+FORECAST_SERIES = 200
+
+
+class Context:
+    """Inputs shared by the benchmark cases, built lazily from ``archive``."""
+
+    def __init__(self, archive: Path, workdir: Path) -> None:
+        self.archive = archive
+        self.workdir = workdir
+
+    @cached_property
+    def datasets(self) -> dict[str, pd.DataFrame]:
+        return dict(inventory.load_datasets(self.archive, typed=True))
+
+    def dataset(self, name: str) -> pd.DataFrame:
+        for key, df in self.datasets.items():
+            schema = inventory.schema_for(key)
+            if schema is not None and schema.name == name:
+                return df
+        raise KeyError(f"no {name!r} dataset in {self.archive}")
+
+    def member(self, name: str) -> str:
+        """File name of the dataset ``name`` inside the archive."""
+        with zipfile.ZipFile(self.archive) as zf:
+            for filename in zf.namelist():
+                schema = inventory.schema_for(filename)
+                if schema is not None and schema.name == name:
+                    return Path(filename).name
+        raise KeyError(f"no {name!r} member in {self.archive}")
+
+    @cached_property
+    def policy(self) -> pd.DataFrame:
+        """The :class:`inventory.InventoryPolicyEngine` table."""
+        return inventory.InventoryPolicyEngine(self.datasets).run()
+
+    @cached_property
+    def policy_inputs(self) -> pd.DataFrame:
+        """Per-SKU demand, cost and lead time columns."""
+        policy = self.policy
+        policy = policy[(policy["annual_demand"] > 0) & (policy["holding_cost"] > 0)]
+        policy = policy[policy["lead_time_days"].notna()]
+        return pd.DataFrame(
+            {
+                "InventoryId": policy["InventoryId"].to_numpy(),
+                "annual_demand": policy["annual_demand"].to_numpy(),
+                "order_cost": 50.0,
+                "holding_cost": policy["holding_cost"].to_numpy(),
+                "daily_demand": policy["daily_demand"].to_numpy(),
+                "daily_demand_std": policy["daily_demand_std"].to_numpy(),
+                "lead_time_days": policy["lead_time_days"].to_numpy(),
+                "safety_stock": policy["safety_stock"].to_numpy(),
+                "annual_value": policy["annual_value"].to_numpy(),
+            }
+        )
+
+    @cached_property
+    def params_archive(self) -> Path:
+        path = self.workdir / "policy_inputs.zip"
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(PARAMS_MEMBER, self.policy_inputs.to_csv(index=False))
+        return path
+
+    @cached_property
+    def sample_archive(self) -> Path:
+        """The sales member stored under the name used by ``Sample.zip``."""
+        path = self.workdir / "sample_names.zip"
+        member = self.member("sales")
+        with zipfile.ZipFile(self.archive) as src, zipfile.ZipFile(
+            path, "w", compression=zipfile.ZIP_DEFLATED
+        ) as dst, src.open(member) as fp, dst.open(
+            SAMPLE_SALES_MEMBER, "w", force_zip64=True
+        ) as out:
+            shutil.copyfileobj(fp, out)
+        return path
+
+    @cached_property
+    def store(self) -> dict[str, Any]:
+        """Tables of a memory-mapped store built from the archive."""
+        directory = inventory.build_store(self.archive, self.workdir / "store")
+        return dict(inventory.open_store(directory))
+
+    def table(self, name: str) -> Any:
+        for key, table in self.store.items():
+            schema = inventory.schema_for(key)
+            if schema is not None and schema.name == name:
+                return table
+        raise KeyError(f"no {name!r} table in the store")
+
+    @cached_property
+    def top_skus(self) -> pd.DataFrame:
+        """Sales rows of the :data:`FORECAST_SERIES` best-selling SKUs."""
+        sales = self.dataset("sales")
+        top = inventory.top_selling_products(
+            sales, "InventoryId", "SalesQuantity", top_n=FORECAST_SERIES
+        )["InventoryId"]
+        rows = sales[sales["InventoryId"].isin(top)]
+        return rows.assign(InventoryId=rows["InventoryId"].astype(str))
+
+    @cached_property
+    def daily_totals(self) -> pd.Series:
+        sales = self.dataset("sales")
+        return sales.groupby("SalesDate")["SalesQuantity"].sum().asfreq("D", fill_value=0)
+
+    @cached_property
+    def series_matrix(self) -> np.ndarray:
+        daily = (
+            self.top_skus.groupby(["InventoryId", "SalesDate"])["SalesQuantity"]
+            .sum()
+            .unstack(fill_value=0)
+        )
+        return daily.to_numpy(dtype=float)
+
+
+CASES: dict[str, Callable[[Context], Callable[[], Any]]] = {}
+
+
+def case(name: str):
+    """Register a builder returning the callable to benchmark as ``name``.
+
+    Variants of one function are named ``"function[variant]"``.
+    """
+
+    def register(builder):
+        CASES[name] = builder
+        return builder
+
+    return register
+
+
+# -- datasets -----------------------------------------------------------------
+
+
+@case("load_datasets")
+def _(ctx):
+    return lambda: inventory.load_datasets(ctx.archive, max_workers=1)
+
+
+@case("load_datasets[typed]")
+def _(ctx):
+    return lambda: inventory.load_datasets(ctx.archive, typed=True, max_workers=1)
+
+
+@case("load_datasets[threads]")
+def _(ctx):
+    return lambda: inventory.load_datasets(ctx.archive, typed=True)
+
+
+@case("load_datasets[cached]")
+def _(ctx):
+    cache = ctx.workdir / "cache"
+    inventory.load_datasets(ctx.archive, typed=True, cache_dir=cache)
+    return lambda: inventory.load_datasets(ctx.archive, typed=True, cache_dir=cache)
+
+
+@case("load_datasets[pyarrow]")
+def _(ctx):
+    return lambda: inventory.load_datasets(ctx.archive, typed=True, backend="pyarrow")
+
+
+@case("load_datasets[polars]")
+def _(ctx):
+    return lambda: inventory.load_datasets(ctx.archive, typed=True, backend="polars")
+
+
+@case("load_sample_datasets")
+def _(ctx):
+    return lambda: inventory.load_sample_datasets(ctx.archive)
+
+
+@case("iter_dataset")
+def _(ctx):
+    member = ctx.member("sales")
+
+    def run():
+        for _ in inventory.iter_dataset(ctx.archive, member, typed=True):
+            pass
+
+    return run
+
+
+@case("schema_for")
+def _(ctx):
+    names = [*MEMBERS.values(), "unknown.csv"] * 1000
+    return lambda: [inventory.schema_for(name) for name in names]
+
+
+# -- sales ----------------------------------------------------------------------
+
+
+@case("top_selling_products")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    return lambda: inventory.top_selling_products(sales, "InventoryId", "SalesQuantity")
+
+
+@case("top_selling_products[pyarrow]")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    return lambda: inventory.top_selling_products(
+        sales, "InventoryId", "SalesQuantity", backend="pyarrow"
+    )
+
+
+@case("top_selling_products[polars]")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    return lambda: inventory.top_selling_products(
+        sales, "InventoryId", "SalesQuantity", backend="polars"
+    )
+
+
+@case("top_selling_from_chunks")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    chunks = [sales.iloc[i : i + 100_000] for i in range(0, len(sales), 100_000)]
+    return lambda: inventory.top_selling_from_chunks(chunks, "InventoryId", "SalesQuantity")
+
+
+@case("top_selling_from_zip")
+def _(ctx):
+    member = ctx.member("sales")
+    return lambda: inventory.top_selling_from_zip(
+        ctx.archive, sales_file=member, product_col="InventoryId", quantity_col="SalesQuantity"
+    )
+
+
+@case("top_selling_from_zip[streaming]")
+def _(ctx):
+    member = ctx.member("sales")
+    return lambda: inventory.top_selling_from_zip(
+        ctx.archive,
+        sales_file=member,
+        product_col="InventoryId",
+        quantity_col="SalesQuantity",
+        chunksize=100_000,
+    )
+
+
+@case("top_selling_sample")
+def _(ctx):
+    if ctx.member("sales") == SAMPLE_SALES_MEMBER:
+        return lambda: inventory.top_selling_sample(ctx.archive)
+    return lambda: inventory.top_selling_sample(ctx.sample_archive)
+
+
+@case("top_selling_by_group")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    return lambda: inventory.top_selling_by_group(
+        sales, "Description", ["Store", "SalesDate"], rank_by="SalesDollars", freq="M"
+    )
+
+
+@case("top_selling_by_group_from_zip")
+def _(ctx):
+    member = ctx.member("sales")
+    return lambda: inventory.top_selling_by_group_from_zip(
+        ctx.archive,
+        sales_file=member,
+        product_col="Description",
+        by="VendorName",
+        chunksize=100_000,
+    )
+
+
+@case("SalesCube[build]")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    return lambda: inventory.SalesCube.from_frame(sales)
+
+
+@case("SalesCube[query]")
+def _(ctx):
+    cube = inventory.SalesCube.from_frame(ctx.dataset("sales"))
+    stores = list(cube.dictionaries["Store"][:5])
+    return lambda: cube.query(by="Brand", grain="M", where={"Store": stores})
+
+
+@case("top_selling_products[cube]")
+def _(ctx):
+    cube = inventory.SalesCube.from_frame(ctx.dataset("sales"))
+    return lambda: inventory.top_selling_products(cube, "Brand", "SalesQuantity")
+
+
+@case("build_store")
+def _(ctx):
+    member = ctx.member("sales")
+    return lambda: inventory.build_store(ctx.archive, ctx.workdir / "sales_store", files=[member])
+
+
+@case("open_store")
+def _(ctx):
+    directory = ctx.table("sales").directory.parent
+    return lambda: inventory.open_store(directory)
+
+
+@case("MappedTable[to_pandas]")
+def _(ctx):
+    sales = ctx.table("sales")
+    return lambda: sales.to_pandas(["InventoryId", "SalesQuantity", "SalesDate"])
+
+
+@case("top_selling_products[store]")
+def _(ctx):
+    sales = ctx.table("sales")
+    return lambda: inventory.top_selling_products(sales, "InventoryId", "SalesQuantity")
+
+
+# -- forecasting ----------------------------------------------------------------
+
+
+@case("forecast_demand[statsmodels]")
+def _(ctx):
+    return lambda: inventory.forecast_demand(ctx.daily_totals, 30, seasonal_periods=7)
+
+
+@case("forecast_demand[numpy]")
+def _(ctx):
+    return lambda: inventory.forecast_demand(
+        ctx.daily_totals, 30, seasonal_periods=7, engine="numpy"
+    )
+
+
+@case("forecast_demand_many[statsmodels]")
+def _(ctx):
+    sales = ctx.top_skus
+    keep = sales["InventoryId"].drop_duplicates().iloc[: FORECAST_SERIES // 10]
+    sales = sales[sales["InventoryId"].isin(keep)]
+    return lambda: inventory.forecast_demand_many(
+        sales, "InventoryId", "SalesDate", "SalesQuantity", 30, max_workers=1
+    )
+
+
+@case("forecast_demand_many[numpy]")
+def _(ctx):
+    sales = ctx.top_skus
+    return lambda: inventory.forecast_demand_many(
+        sales, "InventoryId", "SalesDate", "SalesQuantity", 30, max_workers=1, engine="numpy"
+    )
+
+
+@case("forecast_demand[auto]")
+def _(ctx):
+    return lambda: inventory.forecast_demand(
+        ctx.daily_totals, 30, seasonal_periods=7, engine="auto"
+    )
+
+
+@case("select_forecast_models")
+def _(ctx):
+    sales = ctx.top_skus
+    return lambda: inventory.select_forecast_models(
+        sales, "InventoryId", "SalesDate", "SalesQuantity", 30, seasonal_periods=7, max_workers=1
+    )
+
+
+@case("select_forecast_models[cached]")
+def _(ctx):
+    sales = ctx.top_skus
+    cache: dict = {}
+    kwargs = dict(seasonal_periods=7, max_workers=1, cache=cache)
+    args = (sales, "InventoryId", "SalesDate", "SalesQuantity", 30)
+    inventory.select_forecast_models(*args, **kwargs)
+    return lambda: inventory.select_forecast_models(*args, **kwargs)
+
+
+@case("holt_winters_forecast")
+def _(ctx):
+    values = ctx.series_matrix
+    return lambda: inventory.holt_winters_forecast(values, 30, seasonal_periods=7)
+
+
+@case("daily_demand_from_chunks")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    chunks = [sales.iloc[i : i + 100_000] for i in range(0, len(sales), 100_000)]
+    return lambda: inventory.daily_demand_from_chunks(chunks, "SalesDate", "SalesQuantity")
+
+
+@case("forecast_from_zip")
+def _(ctx):
+    member = ctx.member("sales")
+    return lambda: inventory.forecast_from_zip(
+        ctx.archive, member, "SalesDate", "SalesQuantity", 30, seasonal_periods=7
+    )
+
+
+@case("forecast_from_zip[store]")
+def _(ctx):
+    member = ctx.member("sales")
+    directory = ctx.table("sales").directory.parent
+    return lambda: inventory.forecast_from_zip(
+        directory, member, "SalesDate", "SalesQuantity", 30, seasonal_periods=7
+    )
+
+
+# -- ABC ------------------------------------------------------------------------
+
+
+@case("classify_inventory")
+def _(ctx):
+    values = ctx.policy_inputs[["InventoryId", "annual_value"]]
+    return lambda: inventory.classify_inventory(values, "annual_value")
+
+
+@case("classify_inventory[pyarrow]")
+def _(ctx):
+    values = ctx.policy_inputs[["InventoryId", "annual_value"]]
+    return lambda: inventory.classify_inventory(values, "annual_value", backend="pyarrow")
+
+
+@case("classify_inventory[polars]")
+def _(ctx):
+    values = ctx.policy_inputs[["InventoryId", "annual_value"]]
+    return lambda: inventory.classify_inventory(values, "annual_value", backend="polars")
+
+
+@case("classify_inventory_from_zip")
+def _(ctx):
+    return lambda: inventory.classify_inventory_from_zip(
+        ctx.params_archive, PARAMS_MEMBER, "annual_value"
+    )
+
+
+@case("ABCClassifier")
+def _(ctx):
+    values = ctx.policy_inputs
+    classifier = inventory.ABCClassifier().fit(values["InventoryId"], values["annual_value"])
+    changed = values.sample(frac=0.01, random_state=0)
+    return lambda: classifier.update(changed["InventoryId"], changed["annual_value"] * 1.5)
+
+
+# -- EOQ and reorder points -----------------------------------------------------
+
+
+@case("calculate_eoq")
+def _(ctx):
+    rows = ctx.policy_inputs[["annual_demand", "order_cost", "holding_cost"]].to_numpy()
+    return lambda: [inventory.calculate_eoq(*row) for row in rows]
+
+
+@case("calculate_eoqs")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_eoqs(
+        df["annual_demand"], df["order_cost"], df["holding_cost"]
+    )
+
+
+@case("calculate_eoq_from_df")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_eoq_from_df(
+        df, "annual_demand", "order_cost", "holding_cost"
+    )
+
+
+@case("calculate_eoq_from_zip")
+def _(ctx):
+    return lambda: inventory.calculate_eoq_from_zip(
+        ctx.params_archive, PARAMS_MEMBER, "annual_demand", "order_cost", "holding_cost"
+    )
+
+
+@case("calculate_discount_eoqs")
+def _(ctx):
+    policy = ctx.policy
+    policy = policy[(policy["annual_demand"] > 0) & (policy["unit_cost"] > 0)]
+    breaks = np.array([0.0, 50.0, 200.0])
+    prices = policy["unit_cost"].to_numpy()[:, None] * np.array([1.0, 0.97, 0.94])
+    return lambda: inventory.calculate_discount_eoqs(
+        policy["annual_demand"], 50.0, 0.25, breaks, prices
+    )
+
+
+@case("calculate_discount_eoq_from_df")
+def _(ctx):
+    df = ctx.policy.assign(order_cost=50.0)
+    df = df[df["annual_demand"] > 0]
+    brands = df["Brand"].drop_duplicates()
+    tiers = pd.DataFrame(
+        {
+            "Brand": np.repeat(brands.to_numpy(), 3),
+            "min_quantity": np.tile([0.0, 50.0, 200.0], len(brands)),
+            "unit_price": np.tile([10.0, 9.7, 9.4], len(brands)),
+        }
+    )
+    return lambda: inventory.calculate_discount_eoq_from_df(
+        df, tiers, "Brand", "annual_demand", "order_cost"
+    )
+
+
+@case("vendor_order_costs")
+def _(ctx):
+    invoices = ctx.dataset("invoice_purchases")
+    return lambda: inventory.vendor_order_costs(invoices, fixed_cost=20.0)
+
+
+@case("joint_replenishment")
+def _(ctx):
+    policy = ctx.policy
+    major = inventory.vendor_order_costs(ctx.dataset("invoice_purchases"), fixed_cost=20.0)
+    return lambda: inventory.joint_replenishment(policy, major, minor_cost=5.0)
+
+
+@case("joint_replenishment_from_zip")
+def _(ctx):
+    return lambda: inventory.joint_replenishment_from_zip(
+        ctx.archive, minor_cost=5.0, fixed_cost=20.0
+    )
+
+
+@case("calculate_reorder_point")
+def _(ctx):
+    rows = ctx.policy_inputs[["daily_demand", "lead_time_days"]].to_numpy()
+    return lambda: [inventory.calculate_reorder_point(*row) for row in rows]
+
+
+@case("calculate_reorder_points")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_reorder_points(
+        df["daily_demand"], df["lead_time_days"], safety_stock=df["safety_stock"]
+    )
+
+
+@case("calculate_reorder_points_from_df")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_reorder_points_from_df(
+        df, "daily_demand", "lead_time_days", safety_stock_col="safety_stock"
+    )
+
+
+@case("calculate_reorder_points_from_zip")
+def _(ctx):
+    return lambda: inventory.calculate_reorder_points_from_zip(
+        ctx.params_archive,
+        PARAMS_MEMBER,
+        "daily_demand",
+        "lead_time_days",
+        safety_stock_col="safety_stock",
+    )
+
+
+@case("calculate_safety_stock")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_safety_stock(
+        df["daily_demand_std"], df["lead_time_days"], daily_demand=df["daily_demand"]
+    )
+
+
+@case("calculate_reorder_points_from_df[service_level]")
+def _(ctx):
+    df = ctx.policy_inputs
+    return lambda: inventory.calculate_reorder_points_from_df(
+        df, "daily_demand", "lead_time_days", daily_demand_std_col="daily_demand_std"
+    )
+
+
+@case("optimize_service_levels")
+def _(ctx):
+    policy = ctx.policy
+    return lambda: inventory.optimize_service_levels(policy, fill_rate=0.98)
+
+
+@case("optimize_service_levels[budget]")
+def _(ctx):
+    policy = ctx.policy
+    budget = float((policy["unit_cost"] * policy["daily_demand"]).sum()) * 7
+    return lambda: inventory.optimize_service_levels(policy, budget=budget)
+
+
+@case("InventoryPolicyEngine")
+def _(ctx):
+    datasets = ctx.datasets
+    return lambda: inventory.InventoryPolicyEngine(datasets).run()
+
+
+@case("InventoryPolicyEngine[from_zip]")
+def _(ctx):
+    return lambda: inventory.InventoryPolicyEngine.from_zip(ctx.archive).run()
+
+
+# -- lead times -----------------------------------------------------------------
+
+
+@case("compute_lead_times")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    return lambda: inventory.compute_lead_times(
+        purchases, "PODate", "ReceivingDate", group_col="VendorNumber"
+    )
+
+
+@case("compute_lead_times[pyarrow]")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    return lambda: inventory.compute_lead_times(
+        purchases, "PODate", "ReceivingDate", group_col="VendorNumber", backend="pyarrow"
+    )
+
+
+@case("compute_lead_times[polars]")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    return lambda: inventory.compute_lead_times(
+        purchases, "PODate", "ReceivingDate", group_col="VendorNumber", backend="polars"
+    )
+
+
+@case("compute_lead_times[store]")
+def _(ctx):
+    purchases = ctx.table("purchases")
+    return lambda: inventory.compute_lead_times(
+        purchases, "PODate", "ReceivingDate", group_col="VendorNumber"
+    )
+
+
+@case("compute_lead_times_from_chunks")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    chunks = [purchases.iloc[i : i + 100_000] for i in range(0, len(purchases), 100_000)]
+    return lambda: inventory.compute_lead_times_from_chunks(
+        chunks, "PODate", "ReceivingDate", group_col="VendorNumber"
+    )
+
+
+@case("compute_lead_times_from_zip")
+def _(ctx):
+    member = ctx.member("purchases")
+    return lambda: inventory.compute_lead_times_from_zip(
+        ctx.archive, member, "PODate", "ReceivingDate", group_col="VendorNumber"
+    )
+
+
+@case("lead_time_profile")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    return lambda: inventory.lead_time_profile(
+        purchases, "PODate", "ReceivingDate", by=["VendorNumber", "Store"]
+    )
+
+
+@case("lead_time_profile[exact]")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    return lambda: inventory.lead_time_profile(
+        purchases, "PODate", "ReceivingDate", by=["VendorNumber", "Store"], exact=True
+    )
+
+
+@case("lead_time_profile_from_zip")
+def _(ctx):
+    member = ctx.member("purchases")
+    return lambda: inventory.lead_time_profile_from_zip(
+        ctx.archive, member, "PODate", "ReceivingDate", chunksize=100_000
+    )
+
+
+@case("LeadTimeProfiler")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    halves = np.array_split(np.arange(len(purchases)), 2)
+
+    def run():
+        first, second = (
+            inventory.LeadTimeProfiler("PODate", "ReceivingDate").update(purchases.iloc[rows])
+            for rows in halves
+        )
+        return first.merge(second).result()
+
+    return run
+
+
+# -- simulation -----------------------------------------------------------------
+
+
+@case("simulate_inventory")
+def _(ctx):
+    demand = ctx.series_matrix
+    mean, std = demand.mean(axis=1), demand.std(axis=1)
+    reorder_point = 7 * mean + 2 * np.sqrt(7) * std
+    order_quantity = np.maximum(30 * mean, 1)
+    lead_times = [np.arange(3, 12)]
+    pool = np.zeros(len(demand), dtype=np.int64)
+    return lambda: inventory.simulate_inventory(
+        reorder_point,
+        order_quantity,
+        demand,
+        lead_times,
+        lead_time_pool=pool,
+        replications=100,
+        max_workers=1,
+    )
+
+
+@case("simulate_policy")
+def _(ctx):
+    datasets = ctx.datasets
+    return lambda: inventory.simulate_policy(datasets, replications=50, max_workers=1)
+
+
+@case("simulate_policy_from_zip")
+def _(ctx):
+    return lambda: inventory.simulate_policy_from_zip(
+        ctx.archive, replications=20, max_workers=1
+    )
+
+
+# -- reconciliation -------------------------------------------------------------
+
+
+@case("reconcile_inventory")
+def _(ctx):
+    datasets = ctx.datasets
+    return lambda: inventory.reconcile_inventory(datasets)
+
+
+@case("reconcile_inventory[store]")
+def _(ctx):
+    datasets = ctx.store
+    return lambda: inventory.reconcile_inventory(datasets)
+
+
+@case("reconcile_inventory_from_zip")
+def _(ctx):
+    return lambda: inventory.reconcile_inventory_from_zip(ctx.archive, max_workers=1)
+
+
+@case("InventoryReconciler")
+def _(ctx):
+    sales = ctx.dataset("sales")
+    chunks = [sales.iloc[i : i + 100_000] for i in range(0, len(sales), 100_000)]
+
+    def run():
+        reconciler = inventory.InventoryReconciler()
+        for chunk in chunks:
+            reconciler.update("sales", chunk)
+        return reconciler.result()
+
+    return run
+
+
+@case("reconstruct_on_hand")
+def _(ctx):
+    datasets = ctx.datasets
+    return lambda: inventory.reconstruct_on_hand(datasets)
+
+
+@case("reconstruct_on_hand[store]")
+def _(ctx):
+    datasets = ctx.store
+    return lambda: inventory.reconstruct_on_hand(datasets)
+
+
+@case("reconstruct_on_hand_from_zip")
+def _(ctx):
+    return lambda: inventory.reconstruct_on_hand_from_zip(ctx.archive)
+
+
+@case("OnHandHistory")
+def _(ctx):
+    history = inventory.reconstruct_on_hand(ctx.datasets)
+    return history.metrics
+
+
+# -- vendor scorecard -----------------------------------------------------------
+
+
+@case("vendor_scorecard")
+def _(ctx):
+    datasets = ctx.datasets
+    return lambda: inventory.vendor_scorecard(datasets)
+
+
+@case("vendor_scorecard[store]")
+def _(ctx):
+    datasets = ctx.store
+    return lambda: inventory.vendor_scorecard(datasets)
+
+
+@case("vendor_scorecard_from_zip")
+def _(ctx):
+    return lambda: inventory.vendor_scorecard_from_zip(ctx.archive)
+
+
+@case("VendorScorecard")
+def _(ctx):
+    purchases = ctx.dataset("purchases")
+    chunks = [purchases.iloc[i : i + 100_000] for i in range(0, len(purchases), 100_000)]
+
+    def run():
+        scorecard = inventory.VendorScorecard()
+        for chunk in chunks:
+            scorecard.update("purchases", chunk)
+        return scorecard.result()
+
+    return run
+
+
+# -- partitioned collections ----------------------------------------------------
+
+
+def _partition_dir(ctx, partitions=3):
+    """Directory holding ``partitions`` copies of the archive."""
+    directory = ctx.workdir / "partitions"
+    if not directory.exists():
+        directory.mkdir()
+        for month in range(1, partitions + 1):
+            shutil.copyfile(ctx.archive, directory / f"2016-{month:02d}.zip")
+    return directory
+
+
+@case("DatasetCollection[top_selling]")
+def _(ctx):
+    collection = inventory.DatasetCollection(_partition_dir(ctx))
+    return collection.top_selling
+
+
+@case("DatasetCollection[lead_time_profile]")
+def _(ctx):
+    collection = inventory.DatasetCollection(_partition_dir(ctx))
+    return collection.lead_time_profile
+
+
+@case("DatasetCollection[daily_demand]")
+def _(ctx):
+    collection = inventory.DatasetCollection(_partition_dir(ctx))
+    return collection.daily_demand
+
+
+@case("DatasetCollection[cached]")
+def _(ctx):
+    collection = inventory.DatasetCollection(
+        _partition_dir(ctx), cache_dir=ctx.workdir / "collection_cache"
+    )
+    collection.abc_classes()
+    return collection.abc_classes
+
+
+# -- runner ---------------------------------------------------------------------
+
+
+def function_name(case_name: str) -> str:
+    """Public function benchmarked by ``case_name``."""
+    return case_name.split("[", 1)[0]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Wall-clock timings of ``repeat`` calls and the peak traced memory."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "repeat": repeat,
+        "peak_memory_bytes": peak,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    archive: Path,
+    *,
+    only: Iterable[str] | None = None,
+    repeat: int = 3,
+    workdir: Path,
+    log: io.TextIOBase | None = None,
+) -> list[dict[str, Any]]:
+    """Run the selected cases against ``archive`` and return their results.
+
+    ``only`` selects cases whose name contains any of the given substrings.
+    A case that raises is reported with its error instead of timings.
+    """
+    ctx = Context(archive, workdir)
+    only = list(only) if only else None
+    results = []
+    for name, builder in CASES.items():
+        if only and not any(part in name for part in only):
+            continue
+        result: dict[str, Any] = {"name": name, "function": function_name(name)}
+        try:
+            result.update(measure(builder(ctx), repeat))
+        except Exception as exc:  # keep going, the failure is in the report
+            result["error"] = f"{type(exc).__name__}: {exc}"
+        results.append(result)
+        if log is not None:
+            if "error" in result:
+                print(f"{name:<40} ERROR {result['error']}", file=log)
+            else:
+                print(
+                    f"{name:<40} {result['seconds']:>10.4f} s "
+                    f"{result['peak_memory_bytes'] / 2**20:>10.1f} MiB",
+                    file=log,
+                )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic sales rows")
+    parser.add_argument("--archive", type=Path, help="benchmark this archive instead")
+    parser.add_argument("--only", nargs="+", help="run cases whose name contains these")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        archive = args.archive
+        if archive is None:
+            archive = generate_archive(workdir / "synthetic.zip", args.rows, seed=args.seed)
+        with zipfile.ZipFile(archive) as zf:
+            members = sorted(Path(name).name for name in zf.namelist())
+        results = run(
+            archive, only=args.only, repeat=args.repeat, workdir=workdir, log=sys.stdout
+        )
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "archive": str(args.archive) if args.archive else None,
+            "rows": None if args.archive else args.rows,
+            "seed": args.seed,
+            "members": members,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "versions": {"numpy": np.__version__, "pandas": pd.__version__},
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
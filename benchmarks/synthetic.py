@@ -0,0 +1,293 @@
+"""Synthetic archives with the same layout as ``Sample.zip``.
+
+:func:`generate_archive` writes the six dataset files (Sales, Purchases,
+InvoicePurchases, BegInv, EndInv and PurchasePrices) with the column names,
+value formats and key relationships of the real data.  The row count of the
+sales file is the scale parameter; the other files grow proportionally.
+Rows are generated and compressed in chunks, so archives with 10^8 sales
+rows can be written without holding them in memory::
+
+    python benchmarks/synthetic.py synthetic.zip --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MEMBERS = {
+    "sales": "SalesFINAL12312016.csv",
+    "purchases": "PurchasesFINAL12312016.csv",
+    "invoice_purchases": "InvoicePurchases12312016.csv",
+    "beginning_inventory": "BegInvFINAL12312016.csv",
+    "ending_inventory": "EndInvFINAL12312016.csv",
+    "purchase_prices": "2017PurchasePricesDec.csv",
+}
+
+_CITIES = np.array(
+    ["ABERDEEN", "EANVERNESS", "HILLFAR", "LARNWICK", "MOUNTMEND", "PITMERDEN", "WANBORNE"]
+)
+_SIZES = np.array(["750mL", "1.75L", "1.5L", "375mL", "3L", "50mL", "1L"])
+_VOLUMES = np.array([750, 1750, 1500, 375, 3000, 50, 1000])
+_WORDS = np.array(
+    ["Red", "Chard", "Vodka", "Reserve", "Malbec", "Bourbon", "Pnt Nr", "Gin", "Rum", "Cab"]
+)
+_STORES = 80
+_YEAR_DAYS = pd.date_range("2016-01-01", "2016-12-31", freq="D")
+
+
+class _Catalog:
+    """Brands, vendors and SKUs shared by every generated file."""
+
+    def __init__(self, rows: int, rng: np.random.Generator) -> None:
+        self.n_brands = int(np.clip(rows // 100, 50, 20_000))
+        n_vendors = int(np.clip(self.n_brands // 50, 10, 130))
+        self.brand_ids = np.sort(rng.choice(90_000, self.n_brands, replace=False)) + 58
+        self.vendor_numbers = np.sort(rng.choice(200_000, n_vendors, replace=False)) + 2
+        self.vendor_names = np.array(
+            [f"VENDOR {i:03d} INC".ljust(27) for i in range(n_vendors)]
+        )
+        self.brand_vendor = rng.integers(0, n_vendors, self.n_brands)
+        self.brand_size = rng.integers(0, len(_SIZES), self.n_brands)
+        self.brand_class = rng.integers(1, 3, self.n_brands)
+        self.descriptions = np.array(
+            [
+                " ".join(rng.choice(_WORDS, 2)) + f" {i}"
+                for i in range(self.n_brands)
+            ]
+        )
+        self.purchase_price = np.round(rng.gamma(2.0, 6.0, self.n_brands) + 0.3, 2)
+        self.price = np.round(self.purchase_price * 1.5, 2) + 0.49
+
+        n_skus = int(np.clip(rows // 10, 100, self.n_brands * _STORES))
+        pairs = rng.choice(self.n_brands * _STORES, n_skus, replace=False)
+        self.sku_store = pairs // self.n_brands + 1
+        self.sku_brand = pairs % self.n_brands
+        self.sku_city = _CITIES[self.sku_store % len(_CITIES)]
+        self.sku_ids = np.char.add(
+            np.char.add(self.sku_store.astype(str), "_"),
+            np.char.add(
+                np.char.add(self.sku_city.astype(str), "_"),
+                self.brand_ids[self.sku_brand].astype(str),
+            ),
+        )
+        # Skewed popularity: a few SKUs account for most of the sales.
+        weights = rng.pareto(1.2, n_skus) + 1e-3
+        self.popularity = weights / weights.sum()
+
+    def skus(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.choice(len(self.sku_ids), size, p=self.popularity)
+
+
+def _sales(catalog: _Catalog, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    sku = catalog.skus(rows, rng)
+    brand = catalog.sku_brand[sku]
+    quantity = rng.poisson(0.8, rows) + 1
+    price = catalog.price[brand]
+    dates = _YEAR_DAYS[rng.integers(0, len(_YEAR_DAYS), rows)]
+    vendor = catalog.brand_vendor[brand]
+    return pd.DataFrame(
+        {
+            "InventoryId": catalog.sku_ids[sku],
+            "Store": catalog.sku_store[sku],
+            "Brand": catalog.brand_ids[brand],
+            "Description": catalog.descriptions[brand],
+            "Size": _SIZES[catalog.brand_size[brand]],
+            "SalesQuantity": quantity,
+            "SalesDollars": np.round(quantity * price, 2),
+            "SalesPrice": price,
+            "SalesDate": [f"{d.month}/{d.day}/{d.year}" for d in dates],
+            "Volume": _VOLUMES[catalog.brand_size[brand]],
+            "Classification": catalog.brand_class[brand],
+            "ExciseTax": np.round(quantity * 0.11, 2),
+            "VendorNo": catalog.vendor_numbers[vendor],
+            "VendorName": catalog.vendor_names[vendor],
+        }
+    )
+
+
+def _purchases(
+    catalog: _Catalog, rows: int, first_po: int, rng: np.random.Generator
+) -> pd.DataFrame:
+    sku = catalog.skus(rows, rng)
+    brand = catalog.sku_brand[sku]
+    vendor = catalog.brand_vendor[brand]
+    # Roughly ten purchase lines per purchase order.
+    po = first_po + np.sort(rng.integers(0, max(rows // 10, 1), rows))
+    po_date = _YEAR_DAYS[rng.integers(0, len(_YEAR_DAYS) - 60, rows)]
+    received = po_date + pd.to_timedelta(rng.integers(3, 15, rows), unit="D")
+    invoiced = received + pd.to_timedelta(rng.integers(2, 20, rows), unit="D")
+    paid = invoiced + pd.to_timedelta(rng.integers(20, 45, rows), unit="D")
+    quantity = rng.integers(1, 30, rows)
+    price = catalog.purchase_price[brand]
+    return pd.DataFrame(
+        {
+            "InventoryId": catalog.sku_ids[sku],
+            "Store": catalog.sku_store[sku],
+            "Brand": catalog.brand_ids[brand],
+            "Description": catalog.descriptions[brand],
+            "Size": _SIZES[catalog.brand_size[brand]],
+            "VendorNumber": catalog.vendor_numbers[vendor],
+            "VendorName": catalog.vendor_names[vendor],
+            "PONumber": po,
+            "PODate": po_date.strftime("%Y-%m-%d"),
+            "ReceivingDate": received.strftime("%Y-%m-%d"),
+            "InvoiceDate": invoiced.strftime("%Y-%m-%d"),
+            "PayDate": paid.strftime("%Y-%m-%d"),
+            "PurchasePrice": price,
+            "Quantity": quantity,
+            "Dollars": np.round(quantity * price, 2),
+            "Classification": catalog.brand_class[brand],
+        }
+    )
+
+
+def _invoices(purchases: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    invoices = purchases.groupby("PONumber", sort=True).agg(
+        VendorNumber=("VendorNumber", "first"),
+        VendorName=("VendorName", "first"),
+        InvoiceDate=("InvoiceDate", "max"),
+        PODate=("PODate", "min"),
+        PayDate=("PayDate", "max"),
+        Quantity=("Quantity", "sum"),
+        Dollars=("Dollars", "sum"),
+    )
+    invoices["Freight"] = np.round(invoices["Dollars"] * rng.uniform(0.003, 0.008, len(invoices)), 2)
+    invoices["Approval"] = np.where(rng.random(len(invoices)) < 0.1, "Frank Delahunt", "")
+    invoices = invoices.reset_index()
+    return invoices[
+        [
+            "VendorNumber",
+            "VendorName",
+            "InvoiceDate",
+            "PONumber",
+            "PODate",
+            "PayDate",
+            "Quantity",
+            "Dollars",
+            "Freight",
+            "Approval",
+        ]
+    ]
+
+
+def _inventory(catalog: _Catalog, date_col: str, date: str, rng: np.random.Generator) -> pd.DataFrame:
+    brand = catalog.sku_brand
+    return pd.DataFrame(
+        {
+            "InventoryId": catalog.sku_ids,
+            "Store": catalog.sku_store,
+            "City": catalog.sku_city,
+            "Brand": catalog.brand_ids[brand],
+            "Description": catalog.descriptions[brand],
+            "Size": _SIZES[catalog.brand_size[brand]],
+            "onHand": rng.poisson(12, len(brand)),
+            "Price": catalog.price[brand],
+            date_col: date,
+        }
+    )
+
+
+def _prices(catalog: _Catalog) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Brand": catalog.brand_ids,
+            "Description": catalog.descriptions,
+            "Price": catalog.price,
+            "Size": _SIZES[catalog.brand_size],
+            "Volume": _VOLUMES[catalog.brand_size],
+            "Classification": catalog.brand_class,
+            "PurchasePrice": catalog.purchase_price,
+            "VendorNumber": catalog.vendor_numbers[catalog.brand_vendor],
+            "VendorName": catalog.vendor_names[catalog.brand_vendor],
+        }
+    )
+
+
+def _write_chunks(zf: zipfile.ZipFile, name: str, chunks) -> None:
+    with zf.open(name, "w", force_zip64=True) as raw:
+        header = True
+        for chunk in chunks:
+            raw.write(chunk.to_csv(index=False, header=header).encode())
+            header = False
+
+
+def generate_archive(
+    path: str | Path,
+    rows: int,
+    *,
+    seed: int = 0,
+    chunk_rows: int = 1_000_000,
+) -> Path:
+    """Write a synthetic dataset archive to ``path``.
+
+    Parameters
+    ----------
+    path:
+        Destination zip file.
+    rows:
+        Number of sales rows.  Purchases get a quarter of that, inventory
+        snapshots one row per SKU (about a tenth) and the price list one row
+        per brand.
+    seed:
+        Seed for the random generator; equal seeds give identical archives.
+    chunk_rows:
+        Rows generated and compressed at a time, bounding memory use.
+
+    Returns
+    -------
+    pathlib.Path
+        ``path``.
+    """
+    if rows <= 0:
+        raise ValueError("rows must be positive")
+    rng = np.random.default_rng(seed)
+    catalog = _Catalog(rows, rng)
+    path = Path(path)
+
+    def split(total: int):
+        for start in range(0, total, chunk_rows):
+            yield min(chunk_rows, total - start), start
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        _write_chunks(
+            zf, MEMBERS["sales"], (_sales(catalog, n, rng) for n, _ in split(rows))
+        )
+        invoice_parts = []
+
+        def purchase_chunks():
+            for n, start in split(max(rows // 4, 1)):
+                chunk = _purchases(catalog, n, 8_000 + start, rng)
+                invoice_parts.append(_invoices(chunk, rng))
+                yield chunk
+
+        _write_chunks(zf, MEMBERS["purchases"], purchase_chunks())
+        _write_chunks(zf, MEMBERS["invoice_purchases"], invoice_parts)
+        _write_chunks(
+            zf,
+            MEMBERS["beginning_inventory"],
+            [_inventory(catalog, "startDate", "2016-01-01", rng)],
+        )
+        _write_chunks(
+            zf,
+            MEMBERS["ending_inventory"],
+            [_inventory(catalog, "endDate", "2016-12-31", rng)],
+        )
+        _write_chunks(zf, MEMBERS["purchase_prices"], [_prices(catalog)])
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset archive.")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_archive(args.path, args.rows, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
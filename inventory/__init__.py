@@ -3,40 +3,156 @@
 Provides tools for common inventory management analyses such as
 forecasting, ABC classification, EOQ, reorder point and lead time
 calculations.
+
+Submodules are imported on first access of one of their names, so
+``import inventory`` loads neither pandas nor statsmodels, and using
+:func:`calculate_eoq` only pays for the modules it needs.
 """
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .demand_forecasting import (
+        daily_demand_from_chunks,
+        forecast_demand,
+        forecast_demand_many,
+        forecast_from_zip,
+        holt_winters_forecast,
+    )
+    from .model_selection import select_forecast_models
+    from .abc_analysis import ABCClassifier, classify_inventory, classify_inventory_from_zip
+    from .eoq import (
+        EOQError,
+        calculate_discount_eoq_from_df,
+        calculate_discount_eoqs,
+        calculate_eoq,
+        calculate_eoq_from_df,
+        calculate_eoq_from_zip,
+        calculate_eoqs,
+    )
+    from .reorder_point import (
+        ReorderPointError,
+        calculate_reorder_point,
+        calculate_reorder_points,
+        calculate_reorder_points_from_df,
+        calculate_reorder_points_from_zip,
+        calculate_safety_stock,
+        optimize_service_levels,
+    )
+    from .lead_time import (
+        LeadTimeProfiler,
+        compute_lead_times,
+        compute_lead_times_from_chunks,
+        compute_lead_times_from_zip,
+        lead_time_profile,
+        lead_time_profile_from_zip,
+    )
+    from .collection import DatasetCollection
+    from .cube import SalesCube
+    from .datasets import iter_dataset, load_datasets, load_sample_datasets
+    from .policy import InventoryPolicyEngine
+    from .on_hand import OnHandHistory, reconstruct_on_hand, reconstruct_on_hand_from_zip
+    from .reconciliation import (
+        InventoryReconciler,
+        reconcile_inventory,
+        reconcile_inventory_from_zip,
+    )
+    from .replenishment import (
+        joint_replenishment,
+        joint_replenishment_from_zip,
+        vendor_order_costs,
+    )
+    from .scorecard import VendorScorecard, vendor_scorecard, vendor_scorecard_from_zip
+    from .simulation import simulate_inventory, simulate_policy, simulate_policy_from_zip
+    from .store import MappedTable, build_store, open_store
+    from .schemas import DatasetSchema, schema_for
+    from .sales_analysis import (
+        top_selling_by_group,
+        top_selling_by_group_from_zip,
+        top_selling_from_chunks,
+        top_selling_from_zip,
+        top_selling_products,
+        top_selling_sample,
+    )
+
+#: Public name to the submodule defining it.
+_EXPORTS = {
+    "daily_demand_from_chunks": "demand_forecasting",
+    "forecast_demand": "demand_forecasting",
+    "forecast_demand_many": "demand_forecasting",
+    "forecast_from_zip": "demand_forecasting",
+    "holt_winters_forecast": "demand_forecasting",
+    "select_forecast_models": "model_selection",
+    "ABCClassifier": "abc_analysis",
+    "classify_inventory": "abc_analysis",
+    "classify_inventory_from_zip": "abc_analysis",
+    "EOQError": "eoq",
+    "calculate_discount_eoq_from_df": "eoq",
+    "calculate_discount_eoqs": "eoq",
+    "calculate_eoq": "eoq",
+    "calculate_eoq_from_df": "eoq",
+    "calculate_eoq_from_zip": "eoq",
+    "calculate_eoqs": "eoq",
+    "ReorderPointError": "reorder_point",
+    "calculate_reorder_point": "reorder_point",
+    "calculate_reorder_points": "reorder_point",
+    "calculate_reorder_points_from_df": "reorder_point",
+    "calculate_reorder_points_from_zip": "reorder_point",
+    "calculate_safety_stock": "reorder_point",
+    "optimize_service_levels": "reorder_point",
+    "LeadTimeProfiler": "lead_time",
+    "compute_lead_times": "lead_time",
+    "compute_lead_times_from_chunks": "lead_time",
+    "compute_lead_times_from_zip": "lead_time",
+    "lead_time_profile": "lead_time",
+    "lead_time_profile_from_zip": "lead_time",
+    "DatasetCollection": "collection",
+    "SalesCube": "cube",
+    "simulate_inventory": "simulation",
+    "simulate_policy": "simulation",
+    "simulate_policy_from_zip": "simulation",
+    "MappedTable": "store",
+    "build_store": "store",
+    "open_store": "store",
+    "iter_dataset": "datasets",
+    "load_datasets": "datasets",
+    "load_sample_datasets": "datasets",
+    "InventoryPolicyEngine": "policy",
+    "OnHandHistory": "on_hand",
+    "reconstruct_on_hand": "on_hand",
+    "reconstruct_on_hand_from_zip": "on_hand",
+    "InventoryReconciler": "reconciliation",
+    "reconcile_inventory": "reconciliation",
+    "reconcile_inventory_from_zip": "reconciliation",
+    "joint_replenishment": "replenishment",
+    "joint_replenishment_from_zip": "replenishment",
+    "vendor_order_costs": "replenishment",
+    "VendorScorecard": "scorecard",
+    "vendor_scorecard": "scorecard",
+    "vendor_scorecard_from_zip": "scorecard",
+    "DatasetSchema": "schemas",
+    "schema_for": "schemas",
+    "top_selling_by_group": "sales_analysis",
+    "top_selling_by_group_from_zip": "sales_analysis",
+    "top_selling_from_chunks": "sales_analysis",
+    "top_selling_from_zip": "sales_analysis",
+    "top_selling_products": "sales_analysis",
+    "top_selling_sample": "sales_analysis",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-from .demand_forecasting import forecast_demand, forecast_from_zip
-from .abc_analysis import classify_inventory, classify_inventory_from_zip
-from .eoq import calculate_eoq, calculate_eoq_from_df, calculate_eoq_from_zip
-from .reorder_point import (
-    calculate_reorder_point,
-    calculate_reorder_points_from_df,
-    calculate_reorder_points_from_zip,
-)
-from .lead_time import compute_lead_times, compute_lead_times_from_zip
-from .datasets import load_datasets, load_sample_datasets
-from .sales_analysis import (
-    top_selling_from_zip,
-    top_selling_products,
-    top_selling_sample,
-)
-
-__all__ = [
-    "forecast_demand",
-    "forecast_from_zip",
-    "classify_inventory",
-    "classify_inventory_from_zip",
-    "calculate_eoq",
-    "calculate_eoq_from_df",
-    "calculate_eoq_from_zip",
-    "calculate_reorder_point",
-    "calculate_reorder_points_from_df",
-    "calculate_reorder_points_from_zip",
-    "compute_lead_times",
-    "compute_lead_times_from_zip",
-    "load_datasets",
-    "load_sample_datasets",
-    "top_selling_products",
-    "top_selling_from_zip",
-    "top_selling_sample",
-]
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -1,11 +1,36 @@
 """ABC analysis for inventory classification."""
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Any, Hashable, Iterable
 
+from .backends import check_backend, column_names, to_arrow, to_pandas, to_polars
 from .datasets import load_datasets
 
+_CATEGORIES = np.array(["A", "B", "C"])
+
+
+def _categorise(cumulative_pct: np.ndarray, a_threshold: float, b_threshold: float) -> np.ndarray:
+    """Category codes (0=A, 1=B, 2=C) for cumulative value shares."""
+    return np.searchsorted([a_threshold, b_threshold], cumulative_pct, side="left")
+
+
+def _value_order(df: Any, value_col: str, backend: str) -> np.ndarray:
+    """Row positions by descending value, missing values last."""
+    if backend == "pyarrow":
+        import pyarrow.compute as pc
+
+        values = to_arrow(df, [value_col]).column(0)
+        return pc.sort_indices(values, sort_keys=[("", "descending")]).to_numpy()
+    import polars as pl
+
+    order = to_polars(df, [value_col]).select(
+        pl.col(value_col).arg_sort(descending=True, nulls_last=True)
+    )
+    return order.collect().to_series().to_numpy()
+
 
 def classify_inventory(
     df: pd.DataFrame,
@@ -13,6 +38,7 @@ def classify_inventory(
     *,
     a_threshold: float = 0.8,
     b_threshold: float = 0.95,
+    backend: str = "pandas",
 ) -> pd.DataFrame:
     """Classify inventory items into A/B/C categories.
 
@@ -28,31 +54,177 @@ def classify_inventory(
         Column representing the value of each item (e.g. annual usage value).
     a_threshold, b_threshold:
         Cumulative percentage cut-offs for class ``A`` and ``B``.
+    backend:
+        ``"pandas"`` (default), ``"pyarrow"`` or ``"polars"`` to sort the
+        values with that library, see :mod:`~inventory.backends`.  ``df``
+        may also be a :class:`pyarrow.Table` or a Polars frame.
 
     Returns
     -------
     pandas.DataFrame
         Original data with an additional ``category`` column.
     """
-    if value_col not in df.columns:
+    check_backend(backend)
+    if value_col not in column_names(df):
         raise KeyError(f"{value_col!r} not in DataFrame")
 
-    working = df.copy()
-    working = working.sort_values(value_col, ascending=False)
+    if backend == "pandas":
+        working = to_pandas(df).sort_values(value_col, ascending=False)
+    else:
+        order = _value_order(df, value_col, backend)
+        working = to_pandas(df).take(order)
     total = working[value_col].sum()
     if total <= 0:
         raise ValueError("total inventory value must be positive")
-    working["cumulative_pct"] = working[value_col].cumsum() / total
+    cumulative_pct = working[value_col].cumsum().to_numpy() / total
+    working["category"] = _CATEGORIES[_categorise(cumulative_pct, a_threshold, b_threshold)]
+    return working
+
+
+class ABCClassifier:
+    """Stateful ABC classification supporting incremental value updates.
+
+    The classifier keeps item values in a sorted index together with their
+    cumulative shares.  :meth:`update` replaces the values of a few items by
+    removing and re-inserting them at their sorted positions (binary search
+    instead of re-sorting everything) and reports only the items whose class
+    changed.  Items with equal values keep their insertion order.
+
+    Parameters
+    ----------
+    a_threshold, b_threshold:
+        Cumulative percentage cut-offs for class ``A`` and ``B``.
+    """
+
+    def __init__(self, *, a_threshold: float = 0.8, b_threshold: float = 0.95) -> None:
+        self.a_threshold = a_threshold
+        self.b_threshold = b_threshold
+        self._slots: dict[Hashable, int] = {}
+        self._items = np.empty(0, dtype=object)
+        self._values = np.empty(0)
+        self._codes = np.empty(0, dtype=np.int64)
+        # Slots ordered by descending value and the matching sorted values.
+        self._order = np.empty(0, dtype=np.int64)
+        self._sorted = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def fit(self, items: Iterable[Hashable], values: Iterable[float]) -> "ABCClassifier":
+        """Classify ``items`` from scratch, replacing any previous state."""
+        items = np.asarray(list(items), dtype=object)
+        values = np.asarray(list(values), dtype=float)
+        if len(items) != len(values):
+            raise ValueError("items and values must have the same length")
+        if not pd.Index(items).is_unique:
+            raise ValueError("items must be unique")
+        order = np.argsort(-values, kind="stable")
+        codes = self._classify(values[order])
+
+        self._slots = {item: slot for slot, item in enumerate(items)}
+        self._items = items
+        self._values = values
+        self._order = order
+        self._sorted = values[order]
+        self._codes = np.empty(len(items), dtype=np.int64)
+        self._codes[order] = codes
+        return self
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        item_col: str,
+        value_col: str,
+        **kwargs: float,
+    ) -> "ABCClassifier":
+        """Build a classifier from ``item_col``/``value_col`` of ``df``."""
+        for col in (item_col, value_col):
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        return cls(**kwargs).fit(df[item_col], df[value_col])
+
+    def _classify(self, sorted_values: np.ndarray) -> np.ndarray:
+        total = sorted_values.sum()
+        if total <= 0:
+            raise ValueError("total inventory value must be positive")
+        cumulative_pct = np.cumsum(sorted_values) / total
+        return _categorise(cumulative_pct, self.a_threshold, self.b_threshold)
+
+    def update(self, items: Iterable[Hashable], values: Iterable[float]) -> pd.DataFrame:
+        """Set new values for ``items`` and return the items that changed class.
+
+        Unknown items are added.  If an item is given several times its last
+        value wins.
+
+        Returns
+        -------
+        pandas.DataFrame
+            ``item``, ``previous_category`` (``None`` for new items) and
+            ``category`` for every item whose class changed.
+        """
+        items = list(items)
+        values = np.asarray(list(values), dtype=float)
+        if len(items) != len(values):
+            raise ValueError("items and values must have the same length")
+        latest = dict(zip(items, values))
+
+        new_items = [item for item in latest if item not in self._slots]
+        new_slots = {item: len(self._items) + i for i, item in enumerate(new_items)}
+        n_slots = len(self._items) + len(new_items)
+        slots = np.fromiter(
+            (self._slots.get(item, new_slots.get(item)) for item in latest),
+            dtype=np.int64,
+            count=len(latest),
+        )
+        new_values = np.fromiter(latest.values(), dtype=float, count=len(latest))
+
+        # Drop the updated slots from the sorted index and insert the new
+        # values at their binary-searched positions (values are descending).
+        moved = np.zeros(n_slots, dtype=bool)
+        moved[slots] = True
+        keep = ~moved[self._order]
+        order = self._order[keep]
+        sorted_values = self._sorted[keep]
+        insert_order = np.argsort(-new_values, kind="stable")
+        positions = np.searchsorted(-sorted_values, -new_values[insert_order], side="right")
+        order = np.insert(order, positions, slots[insert_order])
+        sorted_values = np.insert(sorted_values, positions, new_values[insert_order])
+        codes_sorted = self._classify(sorted_values)
+
+        previous = np.full(n_slots, -1, dtype=np.int64)
+        previous[: len(self._codes)] = self._codes
+        codes = np.empty(n_slots, dtype=np.int64)
+        codes[order] = codes_sorted
+        values_by_slot = np.concatenate([self._values, np.zeros(len(new_items))])
+        values_by_slot[slots] = new_values
+
+        self._slots.update(new_slots)
+        self._items = np.concatenate([self._items, np.asarray(new_items, dtype=object)])
+        self._values = values_by_slot
+        self._order = order
+        self._sorted = sorted_values
+        self._codes = codes
 
-    def _assign(pct: float) -> str:
-        if pct <= a_threshold:
-            return "A"
-        if pct <= b_threshold:
-            return "B"
-        return "C"
+        changed = np.flatnonzero(previous != codes)
+        before = previous[changed]
+        return pd.DataFrame(
+            {
+                "item": self._items[changed],
+                "previous_category": np.where(
+                    before >= 0, _CATEGORIES[np.maximum(before, 0)], None
+                ),
+                "category": _CATEGORIES[codes[changed]],
+            }
+        )
 
-    working["category"] = working["cumulative_pct"].apply(_assign)
-    return working.drop(columns=["cumulative_pct"])
+    def categories(self) -> pd.Series:
+        """Current category of every item, ordered by descending value."""
+        return pd.Series(
+            _CATEGORIES[self._codes[self._order]],
+            index=pd.Index(self._items[self._order], name="item"),
+            name="category",
+        )
 
 
 def classify_inventory_from_zip(
@@ -82,7 +254,7 @@ def classify_inventory_from_zip(
         Classified inventory data.
     """
 
-    datasets = load_datasets(zip_path, files=[inventory_file])
+    datasets = load_datasets(zip_path, files=[inventory_file], typed=True, materialize=True)
     key = Path(inventory_file).stem
     if key not in datasets:
         raise FileNotFoundError(f"{inventory_file!r} not found in {zip_path!r}")
@@ -0,0 +1,171 @@
+"""Optional Arrow and Polars backends.
+
+The analysis functions are written against pandas, which remains the
+default.  :func:`~inventory.datasets.load_datasets`,
+:func:`~inventory.sales_analysis.top_selling_products`,
+:func:`~inventory.abc_analysis.classify_inventory` and
+:func:`~inventory.lead_time.compute_lead_times` also take
+``backend="pyarrow"`` or ``backend="polars"`` to parse CSV members and run
+their group-bys and sorts with the multi-threaded kernels of those
+libraries.  Inputs may be pandas frames, :class:`pyarrow.Table` or Polars
+(lazy) frames, and results are always pandas objects, so the public API is
+unchanged.
+
+Both libraries are optional and only imported when a backend or an input of
+their type is used.
+"""
+from __future__ import annotations
+
+import csv
+import importlib
+from types import ModuleType
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+#: Names accepted by the ``backend`` argument.
+BACKENDS = ("pandas", "pyarrow", "polars")
+
+
+def check_backend(backend: str) -> str:
+    """Return ``backend`` or raise :class:`ValueError` if it is unknown."""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    return backend
+
+
+def import_backend(backend: str) -> ModuleType:
+    """Import the library behind ``backend``."""
+    try:
+        return importlib.import_module(backend)
+    except ImportError as exc:
+        raise ImportError(f"backend={backend!r} requires the {backend} package") from exc
+
+
+def frame_kind(df: Any) -> str:
+    """Library of ``df``: ``"pyarrow"``, ``"polars"`` or ``"pandas"``.
+
+    Decided on the type's module, so neither optional library is imported.
+    """
+    module = type(df).__module__.split(".", 1)[0]
+    return module if module in ("pyarrow", "polars") else "pandas"
+
+
+def column_names(df: Any) -> list[str]:
+    """Column names of a pandas, Arrow or Polars frame."""
+    kind = frame_kind(df)
+    if kind == "pyarrow":
+        return list(df.column_names)
+    if kind == "polars" and hasattr(df, "collect_schema"):
+        return list(df.collect_schema().names())
+    return list(df.columns)
+
+
+def to_pandas(df: Any, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """``df`` as a pandas frame; pandas input is returned as is."""
+    kind = frame_kind(df)
+    if kind == "pandas":
+        return df
+    if columns is not None:
+        df = df.select(list(columns))
+    if kind == "polars" and hasattr(df, "collect"):
+        df = df.collect()
+    return df.to_pandas()
+
+
+def to_arrow(df: Any, columns: Sequence[str]) -> Any:
+    """``columns`` of ``df`` as a :class:`pyarrow.Table`."""
+    pa = import_backend("pyarrow")
+    kind = frame_kind(df)
+    if kind == "pyarrow":
+        return df.select(list(columns))
+    if kind == "polars":
+        df = df.select(list(columns))
+        return (df.collect() if hasattr(df, "collect") else df).to_arrow()
+    return pa.Table.from_pandas(df[list(columns)], preserve_index=False)
+
+
+def to_polars(df: Any, columns: Sequence[str]) -> Any:
+    """``columns`` of ``df`` as a Polars ``LazyFrame``."""
+    pl = import_backend("polars")
+    kind = frame_kind(df)
+    if kind == "polars":
+        return df.lazy().select(list(columns))
+    if kind == "pyarrow":
+        return pl.from_arrow(df.select(list(columns))).lazy()
+    return pl.from_pandas(df[list(columns)]).lazy()
+
+
+def _like_pandas(df: pd.DataFrame, dtype: dict[str, str]) -> pd.DataFrame:
+    """Give a converted frame the conventions of :func:`pandas.read_csv`."""
+    # Integer columns with nulls come back as floats; restore the requested
+    # (nullable) dtype.
+    numbers = {col: value for col, value in dtype.items() if value != "category"}
+    if numbers:
+        df = df.astype(numbers)
+    for col in df.columns:
+        column = df[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # pandas sorts the categories it parses; Arrow and Polars keep
+            # the order of appearance.  Only the distinct values are sorted.
+            df[col] = column.cat.reorder_categories(column.cat.categories.sort_values())
+        elif column.dtype == object and column.hasnans:
+            # Missing strings come back as None rather than NaN.
+            df[col] = column.fillna(np.nan)
+    return df
+
+
+def read_csv(
+    data: bytes,
+    *,
+    backend: str,
+    usecols: Callable[[str], bool] | None = None,
+    dtype: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """Parse CSV ``data`` with the ``"pyarrow"`` or ``"polars"`` backend.
+
+    ``usecols`` and ``dtype`` have the meaning of the
+    :func:`~inventory.schemas.read_csv_options` keyword arguments, so the
+    pandas frame returned matches :func:`pandas.read_csv` given the same
+    options.  Untyped columns are inferred, except that date-like text stays
+    text as it does in pandas.
+    """
+    first_line = data.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+    header = next(csv.reader([first_line]), [])
+    columns = [col for col in header if usecols is None or usecols(col)]
+    dtype = {col: value for col, value in (dtype or {}).items() if col in columns}
+    if not columns:
+        return pd.DataFrame(index=pd.RangeIndex(0), columns=pd.Index([], dtype=object))
+
+    if backend == "polars":
+        pl = import_backend("polars")
+        types = {
+            col: pl.Categorical if value == "category" else getattr(pl, value.capitalize())
+            for col, value in dtype.items()
+        }
+        df = pl.read_csv(data, columns=columns, schema_overrides=types, try_parse_dates=False)
+        return _like_pandas(df.to_pandas(), dtype)
+
+    pa = import_backend("pyarrow")
+    from pyarrow import csv as pa_csv
+
+    types = {
+        col: (
+            pa.dictionary(pa.int32(), pa.string())
+            if value == "category"
+            else pa.from_numpy_dtype(np.dtype(value.lower()))
+        )
+        for col, value in dtype.items()
+    }
+    buffer = pa.py_buffer(data)
+    # Arrow infers ISO dates; keep them as text unless a type was asked for.
+    inferred = pa_csv.open_csv(buffer).schema
+    for field in inferred:
+        if field.name in columns and field.name not in types and pa.types.is_temporal(field.type):
+            types[field.name] = pa.string()
+    options = pa_csv.ConvertOptions(
+        include_columns=columns, column_types=types, strings_can_be_null=True
+    )
+    table = pa_csv.read_csv(buffer, convert_options=options)
+    return _like_pandas(table.to_pandas(), dtype)
@@ -0,0 +1,385 @@
+"""Datasets partitioned over many archives and files.
+
+Production data arrives as one archive per month or region.  A
+:class:`DatasetCollection` takes a directory, a glob pattern or a list of
+paths and treats every ZIP archive, CSV file and Parquet file it matches as
+one partition.  Members and files are recognised by name with
+:func:`~inventory.schemas.schema_for` (``SalesFINAL_2016_01.parquet`` holds
+sales rows) and read with the typed schemas, ``chunksize`` rows at a time.
+
+Each analysis is a map-reduce: a partition is reduced to a small partial
+result (per-product totals, a :class:`~inventory.lead_time.LeadTimeProfiler`,
+per-day totals) on a process pool, and the partials are combined.  With a
+``cache_dir`` the partial of every partition is stored, keyed on the file's
+size and modification time, so a later run only reads the partitions added
+or changed since.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import pickle
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .abc_analysis import classify_inventory
+from .datasets import iter_dataset
+from .lead_time import DEFAULT_QUANTILES, LeadTimeProfiler
+from .schemas import read_csv_options, schema_for
+from .utils import digest, rank_totals
+
+#: File suffixes read as partitions.
+PARTITION_SUFFIXES = (".zip", ".csv", ".parquet")
+
+
+def _partition_files(source: str | Path | Iterable[str | Path]) -> list[Path]:
+    """Sorted partition files of a directory, glob pattern or list of paths."""
+    if isinstance(source, (str, Path)):
+        text = str(source)
+        if Path(text).is_dir():
+            candidates = [path for path in Path(text).rglob("*") if path.is_file()]
+        elif glob.has_magic(text):
+            candidates = [Path(path) for path in glob.glob(text, recursive=True)]
+        else:
+            candidates = [Path(text)]
+    else:
+        candidates = [path for item in source for path in _partition_files(item)]
+    paths = {path.resolve() for path in candidates if path.suffix.lower() in PARTITION_SUFFIXES}
+    for path in paths:
+        if not path.is_file():
+            raise FileNotFoundError(f"{str(path)!r} does not exist")
+    if not paths:
+        raise FileNotFoundError(f"no partitions found in {source!r}")
+    return sorted(paths)
+
+
+def _read_partition(
+    path: Path,
+    dataset: str,
+    usecols: Sequence[str],
+    chunksize: int,
+) -> Iterator[pd.DataFrame]:
+    """Chunks of the ``dataset`` rows stored in one partition file."""
+    suffix = path.suffix.lower()
+    if suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            members = [
+                name
+                for name in zf.namelist()
+                if (schema := schema_for(name)) is not None and schema.name == dataset
+            ]
+        for member in members:
+            yield from iter_dataset(
+                path, member, chunksize=chunksize, usecols=usecols, typed=True
+            )
+        return
+
+    schema = schema_for(path.name)
+    if schema is None or schema.name != dataset:
+        return
+    if suffix == ".csv":
+        kwargs, finalize = read_csv_options(path.name, typed=True, usecols=usecols)
+        for chunk in pd.read_csv(path, chunksize=chunksize, **kwargs):
+            yield finalize(chunk)
+        return
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=list(usecols)):
+        yield schema.finalize(batch.to_pandas())
+
+
+def _sum_by(chunks: Iterable[pd.DataFrame], keys: list[str], value_col: str) -> pd.Series:
+    """Total of ``value_col`` per ``keys`` over all ``chunks``."""
+    parts = []
+    for chunk in chunks:
+        for col in (*keys, value_col):
+            if col not in chunk.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        sums = chunk.groupby(keys, observed=True)[value_col].sum()
+        # pandas keeps int32 sums in int32; totals over many partitions need 64 bits.
+        parts.append(sums.astype(np.int64) if sums.dtype.kind in "iu" else sums)
+        if len(parts) > 1:
+            parts = [_combine_sums(parts)]
+    if not parts:
+        if len(keys) > 1:
+            index = pd.MultiIndex.from_arrays([[]] * len(keys), names=keys)
+        else:
+            index = pd.Index([], name=keys[0])
+        return pd.Series(dtype=float, index=index)
+    return parts[0]
+
+
+def _combine_sums(parts: Sequence[pd.Series]) -> pd.Series:
+    parts = [part for part in parts if len(part)] or list(parts[:1])
+    if len(parts) == 1:
+        return parts[0]
+    levels = list(range(parts[0].index.nlevels))
+    return pd.concat(parts).groupby(level=levels, observed=True).sum()
+
+
+def _totals_map(
+    path: Path,
+    *,
+    dataset: str,
+    keys: list[str],
+    value_col: str,
+    chunksize: int,
+) -> pd.Series:
+    chunks = _read_partition(path, dataset, [*keys, value_col], chunksize)
+    return _sum_by(chunks, keys, value_col)
+
+
+def _daily_map(
+    path: Path,
+    *,
+    date_col: str,
+    quantity_col: str,
+    by: str | None,
+    chunksize: int,
+) -> pd.Series:
+    usecols = [*([by] if by else []), date_col, quantity_col]
+    chunks = (
+        chunk.assign(**{date_col: pd.to_datetime(chunk[date_col]).dt.normalize()})
+        for chunk in _read_partition(path, "sales", usecols, chunksize)
+    )
+    return _sum_by(chunks, usecols[:-1], quantity_col)
+
+
+def _lead_time_map(
+    path: Path,
+    *,
+    order_date_col: str,
+    receipt_date_col: str,
+    by: list[str],
+    exact: bool,
+    relative_accuracy: float,
+    chunksize: int,
+) -> LeadTimeProfiler:
+    profiler = LeadTimeProfiler(
+        order_date_col,
+        receipt_date_col,
+        by=by,
+        exact=exact,
+        relative_accuracy=relative_accuracy,
+    )
+    usecols = [*by, order_date_col, receipt_date_col]
+    for chunk in _read_partition(path, "purchases", usecols, chunksize):
+        profiler.update(chunk)
+    return profiler
+
+
+class DatasetCollection:
+    """Analyses over a set of partition files.
+
+    Parameters
+    ----------
+    source:
+        Directory (searched recursively), glob pattern (``**`` allowed) or
+        iterable of paths.  ZIP, CSV and Parquet files are partitions;
+        Parquet needs :mod:`pyarrow`.
+    cache_dir:
+        Directory storing the partial result of each partition and
+        analysis.  A partition whose size and modification time are
+        unchanged is not read again.  ``None`` disables the cache.
+    max_workers:
+        Processes mapping partitions in parallel.  ``None`` uses
+        :func:`os.cpu_count`, ``1`` maps them in the calling process.
+    chunksize:
+        Rows read at a time from a partition.
+
+    Attributes
+    ----------
+    partitions:
+        The partition files, sorted.
+    skipped:
+        Partitions whose partial result came from the cache in the last
+        analysis.
+    """
+
+    def __init__(
+        self,
+        source: str | Path | Iterable[str | Path],
+        *,
+        cache_dir: str | Path | None = None,
+        max_workers: int | None = None,
+        chunksize: int = 500_000,
+    ) -> None:
+        if chunksize <= 0:
+            raise ValueError("chunksize must be positive")
+        self.partitions = _partition_files(source)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.skipped: list[Path] = []
+
+    def __len__(self) -> int:
+        return len(self.partitions)
+
+    def _entry(self, path: Path, task: str, params: dict[str, Any]) -> Path:
+        """Cache file for ``task`` on the current version of ``path``."""
+        stat = path.stat()
+        folder = digest({"path": str(path), "task": task, "params": params})
+        version = digest({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        return self.cache_dir / folder / f"{version}.pkl"
+
+    @staticmethod
+    def _store(entry: Path, value: Any) -> None:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            pd.to_pickle(value, tmp)
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        # Results for older versions of the partition are never read again.
+        for sibling in entry.parent.glob("*.pkl"):
+            if sibling != entry:
+                sibling.unlink(missing_ok=True)
+
+    def map(self, task: str, mapper: Callable[..., Any], **params: Any) -> list[Any]:
+        """Partial results of ``mapper`` for every partition.
+
+        ``mapper(path, chunksize=..., **params)`` must be a module-level
+        function so it can run on the process pool.  ``task`` and ``params``
+        identify the cached partials; cached partitions are listed in
+        :attr:`skipped`.
+        """
+        results: dict[Path, Any] = {}
+        entries: dict[Path, Path] = {}
+        for path in self.partitions:
+            if self.cache_dir is None:
+                continue
+            entries[path] = entry = self._entry(path, task, params)
+            if entry.exists():
+                try:
+                    results[path] = pd.read_pickle(entry)
+                except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                    pass
+        self.skipped = list(results)
+        pending = [path for path in self.partitions if path not in results]
+
+        run = partial(mapper, chunksize=self.chunksize, **params)
+        workers = self.max_workers or os.cpu_count() or 1
+        if workers == 1 or len(pending) <= 1:
+            computed = [run(path) for path in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                computed = list(pool.map(run, pending))
+        for path, value in zip(pending, computed):
+            results[path] = value
+            if path in entries:
+                self._store(entries[path], value)
+        return [results[path] for path in self.partitions]
+
+    def top_selling(
+        self,
+        product_col: str = "InventoryId",
+        quantity_col: str = "SalesQuantity",
+        *,
+        top_n: int = 10,
+    ) -> pd.DataFrame:
+        """Top products by quantity sold over all partitions.
+
+        Same result as :func:`~inventory.sales_analysis.top_selling_products`
+        on the concatenated sales rows.
+        """
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+        parts = self.map(
+            "totals", _totals_map, dataset="sales", keys=[product_col], value_col=quantity_col
+        )
+        return rank_totals(_combine_sums(parts), top_n)
+
+    def lead_time_profile(
+        self,
+        order_date_col: str = "PODate",
+        receipt_date_col: str = "ReceivingDate",
+        *,
+        by: str | Sequence[str] = "VendorNumber",
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        exact: bool = False,
+        relative_accuracy: float = 0.01,
+    ) -> pd.DataFrame:
+        """Lead time statistics per group of the purchase rows.
+
+        The partitions' :class:`~inventory.lead_time.LeadTimeProfiler`
+        objects are merged; see :meth:`LeadTimeProfiler.result` for the
+        columns.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        parts = self.map(
+            "lead_times",
+            _lead_time_map,
+            order_date_col=order_date_col,
+            receipt_date_col=receipt_date_col,
+            by=by,
+            exact=exact,
+            relative_accuracy=relative_accuracy,
+        )
+        profiler = parts[0]
+        for part in parts[1:]:
+            profiler.merge(part)
+        return profiler.result(quantiles)
+
+    def abc_classes(
+        self,
+        item_col: str = "InventoryId",
+        value_col: str = "SalesDollars",
+        *,
+        dataset: str = "sales",
+        a_threshold: float = 0.8,
+        b_threshold: float = 0.95,
+    ) -> pd.DataFrame:
+        """ABC classes of the items' total ``value_col`` over all partitions.
+
+        Returns
+        -------
+        pandas.DataFrame
+            ``item_col``, the total ``value_col`` and ``category`` per item,
+            sorted by decreasing value, see
+            :func:`~inventory.abc_analysis.classify_inventory`.
+        """
+        parts = self.map(
+            "totals", _totals_map, dataset=dataset, keys=[item_col], value_col=value_col
+        )
+        totals = _combine_sums(parts).reset_index()
+        return classify_inventory(
+            totals, value_col, a_threshold=a_threshold, b_threshold=b_threshold
+        ).reset_index(drop=True)
+
+    def daily_demand(
+        self,
+        date_col: str = "SalesDate",
+        quantity_col: str = "SalesQuantity",
+        *,
+        by: str | None = None,
+    ) -> pd.Series:
+        """Daily demand over all partitions.
+
+        Returns
+        -------
+        pandas.Series
+            Without ``by``, the total ``quantity_col`` per day with missing
+            days filled with zero, like
+            :func:`~inventory.demand_forecasting.daily_demand_from_chunks`.
+            With ``by`` (e.g. ``"InventoryId"``), the total per ``by`` value
+            and day, indexed by both and holding only days with sales.
+        """
+        parts = self.map(
+            "daily_demand", _daily_map, date_col=date_col, quantity_col=quantity_col, by=by
+        )
+        totals = _combine_sums(parts).sort_index()
+        if by:
+            return totals
+        if totals.empty:
+            raise ValueError("sales data contains no rows")
+        return totals.asfreq("D", fill_value=0)
@@ -0,0 +1,471 @@
+"""Materialised sales aggregates for fast slicing.
+
+A :class:`SalesCube` pre-aggregates sales rows into *rollups*: sums of the
+sales measures per combination of some dimensions (e.g. ``Store`` and
+``Brand``) and per day, ISO week, month or over the whole period.  Every
+rollup is derived from the finest one (all dimensions per day), so the raw
+rows are scanned once.  Dimension values are dictionary-encoded as small
+integer codes and periods as integer ordinals, and the cube is saved as a
+single uncompressed ``.npz`` file holding one array per rollup column.
+
+:meth:`SalesCube.query` answers a request from the coarsest (smallest)
+rollup that contains the requested and filtered dimensions at a compatible
+grain, e.g. a monthly total per store is read from the monthly per-store
+rollup rather than re-aggregating daily rows.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .datasets import iter_dataset, load_datasets
+from .utils import rank_totals
+
+#: Time grains of the rollups, from finest to coarsest.  ``None`` rolls up
+#: the whole period.
+GRAINS = ("D", "W", "M", None)
+
+DEFAULT_DIMENSIONS = ("Store", "Brand", "Classification")
+DEFAULT_MEASURES = ("SalesQuantity", "SalesDollars")
+
+_FORMAT_VERSION = 1
+
+
+def _convert(ordinals: np.ndarray, source: str, target: str) -> np.ndarray:
+    """Convert period ordinals from grain ``source`` to grain ``target``."""
+    if source == target:
+        return ordinals
+    return pd.PeriodIndex.from_ordinals(ordinals, freq=source).asfreq(target).asi8
+
+
+def _code_dtype(size: int) -> np.dtype:
+    return np.dtype(np.int16) if size < np.iinfo(np.int16).max else np.dtype(np.int32)
+
+
+class SalesCube:
+    """Sales measures pre-aggregated over dimensions and time grains.
+
+    Build a cube with :meth:`from_frame` or :meth:`from_zip`, store it with
+    :meth:`save` and reopen it with :meth:`load`.
+
+    Parameters
+    ----------
+    dictionaries:
+        Distinct values of every dimension; rollups store positions into
+        these arrays.
+    rollups:
+        Mapping of ``(grain, dimensions)`` to a mapping of column name to
+        array.  Columns are the dimension codes, ``"period"`` (ordinals of
+        the grain, absent for ``grain=None``) and the measures.
+    date_col:
+        Name of the sales date column, used for the period column of query
+        results.
+    measures:
+        Names of the summed measures.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Mapping[str, np.ndarray],
+        rollups: Mapping[tuple[str | None, tuple[str, ...]], Mapping[str, np.ndarray]],
+        *,
+        date_col: str = "SalesDate",
+        measures: Sequence[str] = DEFAULT_MEASURES,
+    ) -> None:
+        self.dictionaries = dict(dictionaries)
+        self.rollups = {key: dict(columns) for key, columns in rollups.items()}
+        self.date_col = date_col
+        self.measures = tuple(measures)
+        self.dimensions = tuple(self.dictionaries)
+
+    # -- building -----------------------------------------------------------------
+
+    @staticmethod
+    def _daily(
+        df: pd.DataFrame, dimensions: Sequence[str], measures: Sequence[str], date_col: str
+    ) -> pd.DataFrame:
+        """Measures of ``df`` summed per dimension values and day.
+
+        Rows with a missing dimension value are kept as their own group, so
+        rollups over the other dimensions still count them.
+        """
+        for col in (*dimensions, *measures, date_col):
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        days = pd.to_datetime(df[date_col]).dt.to_period("D").array.asi8
+        keys = [df[col] for col in dimensions] + [pd.Series(days, index=df.index, name="day")]
+        return df[list(measures)].groupby(keys, observed=True, dropna=False).sum()
+
+    @classmethod
+    def _from_daily(
+        cls,
+        daily: pd.DataFrame,
+        dimensions: Sequence[str],
+        measures: Sequence[str],
+        date_col: str,
+        rollups: Iterable[Sequence[str]] | None,
+    ) -> "SalesCube":
+        base = daily.reset_index()
+        dictionaries: dict[str, np.ndarray] = {}
+        codes: dict[str, np.ndarray] = {}
+        for dim in dimensions:
+            values = base[dim]
+            if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+                values = values.astype(str).where(values.notna())
+            # Missing values get code -1 and no dictionary entry.
+            dim_codes, uniques = pd.factorize(values, sort=True)
+            uniques = np.asarray(uniques)
+            dictionaries[dim] = uniques
+            codes[dim] = dim_codes.astype(_code_dtype(len(uniques)))
+        days = base["day"].to_numpy(dtype=np.int64)
+
+        if rollups is None:
+            rollups = [
+                tuple(dimensions),
+                *((dim,) for dim in dimensions),
+                (),
+            ]
+        dim_sets = list(dict.fromkeys(tuple(dims) for dims in rollups))
+        for dims in dim_sets:
+            unknown = set(dims) - set(dimensions)
+            if unknown:
+                raise KeyError(f"rollup dimensions {sorted(unknown)} not in {list(dimensions)}")
+
+        built = {}
+        for grain in GRAINS:
+            periods = None if grain is None else _convert(days, "D", grain)
+            for dims in dim_sets:
+                keys = [codes[dim] for dim in dims]
+                if periods is not None:
+                    keys.append(periods)
+                frame = pd.DataFrame({m: base[m].to_numpy() for m in measures})
+                if keys:
+                    frame = frame.groupby(keys).sum()
+                    index = frame.index
+                    if not isinstance(index, pd.MultiIndex):
+                        index = pd.MultiIndex.from_arrays([index])
+                else:
+                    frame = frame.sum().to_frame().T
+                    index = None
+                columns: dict[str, np.ndarray] = {}
+                for level, dim in enumerate(dims):
+                    level_values = index.get_level_values(level).to_numpy()
+                    columns[dim] = level_values.astype(codes[dim].dtype)
+                if periods is not None:
+                    level_values = index.get_level_values(len(dims)).to_numpy()
+                    columns["period"] = level_values.astype(np.int32)
+                for measure in measures:
+                    columns[measure] = frame[measure].to_numpy()
+                built[(grain, dims)] = columns
+        return cls(dictionaries, built, date_col=date_col, measures=measures)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        *,
+        dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+        measures: Sequence[str] = DEFAULT_MEASURES,
+        date_col: str = "SalesDate",
+        rollups: Iterable[Sequence[str]] | None = None,
+    ) -> "SalesCube":
+        """Build a cube from sales rows.
+
+        Parameters
+        ----------
+        df:
+            Sales data with the dimension, measure and date columns.
+        dimensions:
+            Columns the measures can be sliced by.
+        measures:
+            Columns summed in every rollup.
+        date_col:
+            Sale date column.
+        rollups:
+            Dimension combinations to materialise at every grain.  Defaults
+            to all dimensions together, each dimension alone and the grand
+            total.  Queries over other combinations are answered from the
+            smallest rollup containing them.
+        """
+        dimensions, measures = list(dimensions), list(measures)
+        daily = cls._daily(df, dimensions, measures, date_col)
+        return cls._from_daily(daily, dimensions, measures, date_col, rollups)
+
+    @classmethod
+    def from_zip(
+        cls,
+        zip_path: str | Path,
+        sales_file: str,
+        *,
+        dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+        measures: Sequence[str] = DEFAULT_MEASURES,
+        date_col: str = "SalesDate",
+        rollups: Iterable[Sequence[str]] | None = None,
+        chunksize: int | None = None,
+    ) -> "SalesCube":
+        """Build a cube from the sales file of ``zip_path``.
+
+        With ``chunksize`` the file is streamed and only the daily
+        aggregates are kept in memory.  Other arguments are as for
+        :meth:`from_frame`.
+        """
+        dimensions, measures = list(dimensions), list(measures)
+        usecols = [*dimensions, *measures, date_col]
+        if chunksize is None:
+            datasets = load_datasets(
+                zip_path, files=[sales_file], typed=True, usecols=usecols, materialize=True
+            )
+            key = Path(sales_file).stem
+            if key not in datasets:
+                raise FileNotFoundError(f"{sales_file!r} not found in {zip_path!r}")
+            return cls.from_frame(
+                datasets[key],
+                dimensions=dimensions,
+                measures=measures,
+                date_col=date_col,
+                rollups=rollups,
+            )
+
+        daily: pd.DataFrame | None = None
+        levels = list(range(len(dimensions) + 1))
+        for chunk in iter_dataset(
+            zip_path, sales_file, chunksize=chunksize, usecols=usecols, typed=True
+        ):
+            partial = cls._daily(chunk, dimensions, measures, date_col)
+            if daily is not None:
+                partial = (
+                    pd.concat([daily, partial])
+                    .groupby(level=levels, observed=True, dropna=False)
+                    .sum()
+                )
+            daily = partial
+        if daily is None:
+            raise ValueError("sales data contains no rows")
+        return cls._from_daily(daily, dimensions, measures, date_col, rollups)
+
+    # -- storage ------------------------------------------------------------------
+
+    def save(self, path: str | Path) -> Path:
+        """Write the cube to ``path`` as an uncompressed ``.npz`` file."""
+        path = Path(path)
+        arrays: dict[str, np.ndarray] = {}
+        names = []
+        for i, ((grain, dims), columns) in enumerate(self.rollups.items()):
+            names.append({"grain": grain, "dimensions": list(dims), "columns": list(columns)})
+            for j, values in enumerate(columns.values()):
+                arrays[f"r{i}_{j}"] = values
+        for i, values in enumerate(self.dictionaries.values()):
+            arrays[f"d{i}"] = values
+        meta = {
+            "version": _FORMAT_VERSION,
+            "date_col": self.date_col,
+            "measures": list(self.measures),
+            "dimensions": list(self.dictionaries),
+            "rollups": names,
+        }
+        arrays["meta"] = np.array(json.dumps(meta))
+        with open(path, "wb") as fp:
+            np.savez(fp, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SalesCube":
+        """Read a cube written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != _FORMAT_VERSION:
+                raise ValueError(f"unsupported cube format in {str(path)!r}")
+            dictionaries = {
+                dim: data[f"d{i}"] for i, dim in enumerate(meta["dimensions"])
+            }
+            rollups = {}
+            for i, entry in enumerate(meta["rollups"]):
+                rollups[(entry["grain"], tuple(entry["dimensions"]))] = {
+                    col: data[f"r{i}_{j}"] for j, col in enumerate(entry["columns"])
+                }
+        return cls(
+            dictionaries, rollups, date_col=meta["date_col"], measures=meta["measures"]
+        )
+
+    # -- queries ------------------------------------------------------------------
+
+    @staticmethod
+    def _covers(grain: str | None, target: str | None) -> bool:
+        """Whether rollups at ``grain`` can be re-aggregated to ``target``."""
+        if target is None:
+            return True
+        return grain == target or grain == "D"
+
+    def plan(
+        self,
+        *,
+        by: Sequence[str] = (),
+        grain: str | None = None,
+        where: Mapping[str, Any] | None = None,
+        start: Any = None,
+        end: Any = None,
+    ) -> tuple[str | None, tuple[str, ...]]:
+        """Return the key of the rollup :meth:`query` would read.
+
+        The candidates hold every dimension in ``by`` and ``where`` at a
+        grain that can be re-aggregated to ``grain`` and that represents
+        the ``start``/``end`` bounds exactly; the one with the fewest rows
+        (then the fewest dimensions) wins.
+        """
+        if grain not in GRAINS:
+            raise ValueError(f"grain must be one of {GRAINS}, got {grain!r}")
+        needed = set(by) | set(where or {})
+        unknown = needed - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"{sorted(unknown)} not in cube dimensions {list(self.dimensions)}")
+
+        def bounded(rollup_grain: str | None) -> bool:
+            if start is None and end is None:
+                return True
+            if rollup_grain is None:
+                return False
+            if start is not None:
+                first = pd.Period(start, freq=rollup_grain).start_time
+                if first != pd.Timestamp(start).normalize():
+                    return False
+            if end is not None:
+                last = pd.Period(end, freq=rollup_grain).end_time.normalize()
+                if last != pd.Timestamp(end).normalize():
+                    return False
+            return True
+
+        candidates = [
+            (len(next(iter(columns.values()))), len(key[1]), key)
+            for key, columns in self.rollups.items()
+            if needed <= set(key[1]) and self._covers(key[0], grain) and bounded(key[0])
+        ]
+        if not candidates:
+            raise ValueError("no rollup can answer this query")
+        return min(candidates, key=lambda item: item[:2])[2]
+
+    def query(
+        self,
+        measures: str | Sequence[str] | None = None,
+        *,
+        by: str | Sequence[str] = (),
+        grain: str | None = None,
+        where: Mapping[str, Any] | None = None,
+        start: Any = None,
+        end: Any = None,
+    ) -> pd.DataFrame:
+        """Sum measures by dimensions and period.
+
+        Parameters
+        ----------
+        measures:
+            Measure or measures to return; defaults to all.
+        by:
+            Dimensions to group by.
+        grain:
+            ``"D"``, ``"W"`` or ``"M"`` to group by period as well, ``None``
+            to sum over the whole period.
+        where:
+            Mapping of dimension to a value or list of values to keep.
+        start, end:
+            Inclusive date bounds.  They must fall on boundaries of a
+            materialised grain (e.g. month starts and ends for a monthly
+            rollup), else a finer rollup is used.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The ``by`` columns, a period column named after the date column
+            when ``grain`` is set, and the summed measures, ordered by the
+            group keys.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if measures is None:
+            measures = list(self.measures)
+        elif isinstance(measures, str):
+            measures = [measures]
+        for measure in measures:
+            if measure not in self.measures:
+                raise KeyError(f"{measure!r} not in cube measures {list(self.measures)}")
+        where = dict(where or {})
+        rollup_grain, _ = key = self.plan(by=by, grain=grain, where=where, start=start, end=end)
+        columns = self.rollups[key]
+
+        size = len(next(iter(columns.values())))
+        mask = np.ones(size, dtype=bool)
+        for dim, values in where.items():
+            values = values if isinstance(values, (list, tuple, set, np.ndarray)) else [values]
+            positions = pd.Index(self.dictionaries[dim]).get_indexer(list(values))
+            mask &= np.isin(columns[dim], positions[positions >= 0])
+        if start is not None:
+            mask &= columns["period"] >= pd.Period(start, freq=rollup_grain).ordinal
+        if end is not None:
+            mask &= columns["period"] <= pd.Period(end, freq=rollup_grain).ordinal
+        # Rows with a missing value of a grouped dimension have no group.
+        for dim in by:
+            mask &= columns[dim] >= 0
+
+        keys = [columns[dim][mask] for dim in by]
+        if grain is not None:
+            keys.append(_convert(columns["period"][mask], rollup_grain, grain))
+        frame = pd.DataFrame({m: columns[m][mask] for m in measures})
+        if not keys:
+            return frame.sum().to_frame().T.astype(frame.dtypes.to_dict())
+        frame = frame.groupby(keys).sum()
+        index = frame.index
+        if not isinstance(index, pd.MultiIndex):
+            index = pd.MultiIndex.from_arrays([index])
+        result = {
+            dim: self.dictionaries[dim][index.get_level_values(i).to_numpy()]
+            for i, dim in enumerate(by)
+        }
+        if grain is not None:
+            ordinals = index.get_level_values(len(by)).to_numpy()
+            result[self.date_col] = pd.PeriodIndex.from_ordinals(ordinals, freq=grain)
+        for measure in measures:
+            result[measure] = frame[measure].to_numpy()
+        return pd.DataFrame(result)
+
+    def top_selling(
+        self,
+        product_col: str,
+        quantity_col: str = "SalesQuantity",
+        *,
+        top_n: int = 10,
+        where: Mapping[str, Any] | None = None,
+        start: Any = None,
+        end: Any = None,
+    ) -> pd.DataFrame:
+        """Top ``top_n`` values of dimension ``product_col`` by ``quantity_col``.
+
+        Returns the same frame as
+        :func:`~inventory.sales_analysis.top_selling_products`.
+        """
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+        totals = self.query(quantity_col, by=product_col, where=where, start=start, end=end)
+        return rank_totals(totals.set_index(product_col)[quantity_col], top_n)
+
+    def daily_series(
+        self,
+        measure: str = "SalesQuantity",
+        *,
+        where: Mapping[str, Any] | None = None,
+    ) -> pd.Series:
+        """Daily totals of ``measure`` with missing days filled with zero.
+
+        Matches :func:`~inventory.demand_forecasting.daily_demand_from_chunks`
+        on the raw rows.
+        """
+        daily = self.query(measure, grain="D", where=where)
+        series = pd.Series(
+            daily[measure].to_numpy(),
+            index=daily[self.date_col].dt.to_timestamp().rename(self.date_col),
+            name=measure,
+        )
+        if series.empty:
+            raise ValueError("sales data contains no rows")
+        return series.asfreq("D", fill_value=0)
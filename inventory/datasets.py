@@ -7,30 +7,211 @@ zip archive into :class:`pandas.DataFrame` objects.  The function is
 lightweight and does not make assumptions about the structure of the CSV
 files, making it suitable for loading the sample datasets included with the
 project as well as synthetic datasets used in tests.
+
+Parsed members can optionally be cached on disk (see ``cache_dir``) as one
+``.npy`` file per column plus a JSON manifest.  Later loads memory-map those
+arrays instead of decompressing and parsing the CSV again.  A directory
+written by :func:`~inventory.store.build_store` can be passed instead of an
+archive, in which case lightweight memory-mapped tables are returned.
 """
 
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import zipfile
-from typing import Iterable, Mapping
+from typing import Any, Iterable, Iterator, Mapping
 
+import numpy as np
 import pandas as pd
 
+from .backends import check_backend, read_csv
+from .schemas import read_csv_options, schema_for
+from .utils import digest
+
+#: Environment variable providing the default ``cache_dir`` of
+#: :func:`load_datasets`.
+CACHE_ENV_VAR = "INVENTORY_CACHE_DIR"
+
+_CACHE_VERSION = 1
+_MANIFEST = "manifest.json"
+
+
+def _write_column(directory: Path, position: int, name: str, column: pd.Series) -> dict:
+    """Store ``column`` in ``directory`` and return its manifest entry."""
+    entry: dict[str, Any] = {"name": name, "file": f"c{position}.npy"}
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes, categories = column.cat.codes.to_numpy(), column.cat.categories
+            entry.update(kind="category", ordered=bool(dtype.ordered))
+        else:
+            codes, categories = pd.factorize(column)
+            entry["kind"] = "codes"
+        if all(isinstance(value, str) for value in categories):
+            np.save(directory / entry["file"], codes.astype(np.int32))
+            np.save(directory / f"c{position}.categories.npy", np.asarray(categories, dtype=str))
+            return entry
+    elif dtype.kind in "biufcmM" and not getattr(dtype, "tz", None):
+        np.save(directory / entry["file"], column.to_numpy())
+        entry["kind"] = "array"
+        return entry
+
+    entry.update(kind="pickle", file=f"c{position}.pkl")
+    column.to_pickle(directory / entry["file"])
+    return entry
+
+
+def _read_column(directory: Path, entry: Mapping[str, Any]) -> Any:
+    kind = entry["kind"]
+    if kind == "pickle":
+        return pd.read_pickle(directory / entry["file"])
+    # Copy-on-write mapping: pages are read lazily and edits stay private.
+    values = np.load(directory / entry["file"], mmap_mode="c")
+    if kind == "array":
+        return values.view(np.ndarray)
+    stem = entry["file"][: -len(".npy")]
+    categories = np.load(directory / f"{stem}.categories.npy").astype(object)
+    if kind == "category":
+        return pd.Categorical.from_codes(values, categories, ordered=entry["ordered"])
+    decoded = categories.take(values, mode="clip")
+    decoded[np.asarray(values) < 0] = np.nan
+    return decoded
+
+
+def _write_cache(directory: Path, df: pd.DataFrame, source: Mapping[str, Any]) -> None:
+    """Atomically store ``df`` below ``directory``.
+
+    Entries for the same member built from an older version of the archive
+    are removed, so the cache does not grow with every modification.
+    """
+    parent = directory.parent
+    parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=parent, prefix=".tmp-"))
+    try:
+        columns = [
+            _write_column(tmp, i, str(name), df[name]) for i, name in enumerate(df.columns)
+        ]
+        manifest = {
+            "version": _CACHE_VERSION,
+            "source": dict(source),
+            "rows": len(df),
+            "columns": columns,
+        }
+        (tmp / _MANIFEST).write_text(json.dumps(manifest, indent=2))
+        try:
+            tmp.rename(directory)
+        except OSError:  # another process cached the member first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    for sibling in parent.iterdir():
+        if sibling == directory or sibling.name.startswith(".tmp-"):
+            continue
+        try:
+            stale = json.loads((sibling / _MANIFEST).read_text())["source"] != dict(source)
+        except (OSError, ValueError, KeyError):
+            stale = True
+        if stale:
+            shutil.rmtree(sibling, ignore_errors=True)
+
+
+def _read_cache(directory: Path) -> pd.DataFrame | None:
+    """Return the cached frame in ``directory`` or ``None`` if unusable."""
+    try:
+        manifest = json.loads((directory / _MANIFEST).read_text())
+        if manifest.get("version") != _CACHE_VERSION:
+            return None
+        columns = manifest["columns"]
+        data = {entry["name"]: _read_column(directory, entry) for entry in columns}
+    except (OSError, ValueError, KeyError):
+        return None
+    # copy=False keeps the mapped arrays as the frame's blocks.
+    return pd.DataFrame(data, index=pd.RangeIndex(manifest["rows"]), copy=False)
+
+
+def _cache_location(
+    cache_dir: Path,
+    archive: Path,
+    stat: os.stat_result,
+    info: zipfile.ZipInfo,
+    options: Mapping[str, Any],
+) -> tuple[Path, dict[str, Any]]:
+    """Return the cache entry directory for ``info`` and its source record.
+
+    Entries live in one folder per archive member and are keyed on the
+    archive's size and modification time, the member's CRC from the zip
+    central directory and the options used to parse it.
+    """
+    source = {
+        "archive": str(archive),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "member": info.filename,
+        "crc": info.CRC,
+        "file_size": info.file_size,
+    }
+    member_dir = digest({"archive": str(archive), "member": info.filename})
+    key = digest({**source, "options": dict(options)})
+    return cache_dir / member_dir / key, source
+
 
 def load_datasets(
     zip_path: str | Path,
     *,
     files: Iterable[str] | None = None,
+    cache_dir: str | Path | None = None,
+    typed: bool = False,
+    usecols: Iterable[str] | None = None,
+    max_workers: int | None = None,
+    backend: str = "pandas",
+    materialize: bool = False,
 ) -> Mapping[str, pd.DataFrame]:
     """Load CSV files from ``zip_path``.
 
     Parameters
     ----------
     zip_path:
-        Path to a zip archive containing one or more CSV files.
+        Path to a zip archive containing one or more CSV files, or to a
+        store directory written by :func:`~inventory.store.build_store`.
+        Stores are opened with :func:`~inventory.store.open_store` and yield
+        :class:`~inventory.store.MappedTable` views instead of DataFrames
+        (unless ``materialize`` is set); ``files`` and ``usecols`` apply, the
+        other options are ignored.
     files:
         Optional iterable of file names to load from the archive.  If ``None``
         all CSV files are loaded.  Names are matched against the base name of
         each file inside the archive (e.g. ``"sales.csv"``).
+    cache_dir:
+        Directory for the on-disk cache of parsed members.  Defaults to the
+        ``INVENTORY_CACHE_DIR`` environment variable; when neither is set no
+        cache is used.  Entries are invalidated automatically when the
+        archive or member changes.
+    typed:
+        Apply the built-in :mod:`~inventory.schemas` to the known dataset
+        files: only the documented columns are read, repeated strings become
+        ``category``, numbers are downcast, vendor names are stripped and
+        dates are parsed.  Other files are read as usual.
+    usecols:
+        Optional subset of columns to read from each file.  Columns missing
+        from a file are ignored.
+    max_workers:
+        Number of threads loading members concurrently.  Decompression and
+        the pandas CSV parser release the GIL for most of their work, so
+        members are parsed in parallel.  Defaults to one thread per member up
+        to the number of CPUs; ``1`` loads members one after another.
+    backend:
+        CSV parser: ``"pandas"`` (default), or ``"pyarrow"`` / ``"polars"``,
+        whose parsers use several threads per member (see
+        :mod:`~inventory.backends`).  The frames returned are pandas frames
+        with the same columns and dtypes either way.
+    materialize:
+        Decode the tables of a store directory into DataFrames, for callers
+        that need pandas frames rather than mapped views.
 
     Returns
     -------
@@ -38,23 +219,178 @@ def load_datasets(
         Mapping of file stem (e.g. ``"sales"``) to its corresponding
         :class:`~pandas.DataFrame`.
     """
+    check_backend(backend)
     path = Path(zip_path)
+    if path.is_dir():
+        from .store import open_store
+
+        tables = open_store(path, files=files, usecols=usecols)
+        if materialize:
+            return {name: table.to_pandas() for name, table in tables.items()}
+        return tables
     if not path.is_file():  # pragma: no cover - sanity check
         raise FileNotFoundError(f"{zip_path!r} does not exist")
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_ENV_VAR) or None
+    archive = path.resolve()
+    stat = archive.stat()
+    if usecols is not None:
+        usecols = sorted(set(usecols))
+    options = {"typed": typed, "usecols": usecols}
+
+    with zipfile.ZipFile(path) as zf:
+        members = [info for info in zf.infolist() if info.filename.lower().endswith('.csv')]
+    if files is not None:
+        wanted = {Path(f).name for f in files}
+        members = [m for m in members if Path(m.filename).name in wanted]
+
+    def load(info: zipfile.ZipInfo) -> pd.DataFrame:
+        entry = source = None
+        if cache_dir is not None:
+            entry, source = _cache_location(Path(cache_dir), archive, stat, info, options)
+            df = _read_cache(entry)
+            if df is not None:
+                return df
+        kwargs, finalize = read_csv_options(info.filename, typed=typed, usecols=usecols)
+        # Each call opens its own handle: ZipFile objects are not safe to
+        # share between threads.
+        with zipfile.ZipFile(path) as zf, zf.open(info) as fp:
+            if backend == "pandas":
+                df = finalize(pd.read_csv(fp, **kwargs))
+            else:
+                df = finalize(read_csv(fp.read(), backend=backend, **kwargs))
+        if entry is not None:
+            _write_cache(entry, df, source)
+        return df
+
+    if max_workers is None:
+        max_workers = min(len(members), os.cpu_count() or 1)
+    if max_workers <= 1 or len(members) <= 1:
+        frames = [load(info) for info in members]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(load, members))
+    return {Path(info.filename).stem: df for info, df in zip(members, frames)}
+
+
+def iter_dataset(
+    zip_path: str | Path,
+    member: str,
+    *,
+    chunksize: int = 100_000,
+    usecols: Iterable[str] | None = None,
+    typed: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Stream a CSV member of ``zip_path`` in chunks.
+
+    Only one chunk is held in memory at a time, which allows aggregating
+    files that do not fit in memory as a whole.
+
+    Parameters
+    ----------
+    zip_path:
+        Path to a zip archive containing the CSV file.
+    member:
+        Name of the CSV file, matched against the base name of each file in
+        the archive like the ``files`` argument of :func:`load_datasets`.
+    chunksize:
+        Number of rows per chunk.
+    usecols:
+        Optional subset of columns to parse.
+    typed:
+        Apply the member's built-in schema, see :func:`load_datasets`.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks of the member.  The row index continues across
+        chunks, as if the file had been read in one go.
+    """
+    path = Path(zip_path)
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    if path.is_dir():
+        yield from _iter_store(path, member, chunksize, usecols)
+        return
+    if not path.is_file():  # pragma: no cover - sanity check
+        raise FileNotFoundError(f"{zip_path!r} does not exist")
+
+    with zipfile.ZipFile(path) as zf:
+        matches = [name for name in zf.namelist() if Path(name).name == Path(member).name]
+        if not matches:
+            raise FileNotFoundError(f"{member!r} not found in {zip_path!r}")
+        if usecols is not None:
+            usecols = list(usecols)
+            with zf.open(matches[0]) as fp:
+                header = pd.read_csv(fp, nrows=0).columns
+            for col in usecols:
+                if col not in header:
+                    raise KeyError(f"{col!r} not in {member!r}")
+        kwargs, finalize = read_csv_options(matches[0], typed=typed, usecols=usecols)
+        with zf.open(matches[0]) as fp:
+            for chunk in pd.read_csv(fp, chunksize=chunksize, **kwargs):
+                yield finalize(chunk)
+
+
+def _iter_store(
+    directory: Path,
+    member: str,
+    chunksize: int,
+    usecols: Iterable[str] | None,
+) -> Iterator[pd.DataFrame]:
+    """Decode the table of ``member`` in a store ``chunksize`` rows at a time."""
+    from .store import open_store
+
+    tables = list(open_store(directory, files=[member]).values())
+    if not tables:
+        raise FileNotFoundError(f"{member!r} not found in {str(directory)!r}")
+    table = tables[0]
+    columns = list(table.columns) if usecols is None else list(usecols)
+    for col in columns:
+        if col not in table.columns:
+            raise KeyError(f"{col!r} not in {member!r}")
+    for start in range(0, len(table), chunksize):
+        yield table.to_pandas(columns, slice(start, min(start + chunksize, len(table))))
+
+
+def dataset_members(zip_path: str | Path, names: Iterable[str]) -> list[tuple[str, str]]:
+    """Members of an archive or store holding the datasets ``names``.
+
+    Returns ``(schema name, member)`` pairs for the CSV members recognised
+    by :func:`~inventory.schemas.schema_for`, in archive order.
+    """
+    path = Path(zip_path)
+    if path.is_dir():
+        from .store import open_store
+
+        members = [table.member for table in open_store(path).values()]
+    else:
+        with zipfile.ZipFile(path) as zf:
+            members = [name for name in zf.namelist() if name.lower().endswith(".csv")]
+    wanted = set(names)
+    return [
+        (schema.name, member)
+        for member in members
+        if (schema := schema_for(member)) is not None and schema.name in wanted
+    ]
+
+
+def member_columns(zip_path: str | Path, member: str) -> list[str]:
+    """Column names of ``member`` in an archive or store, without parsing rows."""
+    path = Path(zip_path)
+    if path.is_dir():
+        from .store import open_store
 
+        tables = list(open_store(path, files=[member]).values())
+        if not tables:
+            raise FileNotFoundError(f"{member!r} not found in {str(path)!r}")
+        return list(tables[0].columns)
     with zipfile.ZipFile(path) as zf:
-        members = [name for name in zf.namelist() if name.lower().endswith('.csv')]
-        if files is not None:
-            wanted = {Path(f).name for f in files}
-            members = [m for m in members if Path(m).name in wanted]
-
-        data: dict[str, pd.DataFrame] = {}
-        for member in members:
-            with zf.open(member) as fp:
-                df = pd.read_csv(fp)
-            data[Path(member).stem] = df
-
-    return data
+        matches = [name for name in zf.namelist() if Path(name).name == Path(member).name]
+        if not matches:
+            raise FileNotFoundError(f"{member!r} not found in {zip_path!r}")
+        with zf.open(matches[0]) as fp:
+            return list(pd.read_csv(fp, nrows=0).columns)
 
 
 def load_sample_datasets(zip_path: str | Path) -> Mapping[str, pd.DataFrame]:
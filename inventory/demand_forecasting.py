@@ -6,12 +6,151 @@ exponential smoothing.  The function expects a ``pandas.Series`` indexed by
 """
 from __future__ import annotations
 
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
 import pandas as pd
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
-from pathlib import Path
+from .cube import SalesCube
+from .datasets import iter_dataset, load_datasets
+from .store import MappedTable
+
+
+#: Smoothing parameters searched by :func:`holt_winters_forecast` when a
+#: parameter is not fixed by the caller.
+ALPHA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETA_GRID = (0.0, 0.01, 0.05, 0.1, 0.2)
+GAMMA_GRID = (0.0, 0.05, 0.1, 0.3, 0.5)
+
+ENGINES = ("statsmodels", "numpy", "auto")
+
+
+def _holt_winters_fit(
+    values: np.ndarray,
+    periods: int,
+    seasonal_periods: int | None,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    gamma: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run additive Holt-Winters recursions for every row and parameter set.
+
+    ``values`` is a ``(series, time)`` array where leading ``NaN`` entries
+    mark periods before a series starts.  ``alpha``, ``beta`` and ``gamma``
+    hold the ``P`` candidate parameter sets, or ``(series, 1)`` columns of
+    per-series parameters.  The level is initialised with the first
+    observation while trend and seasonal indices start at zero, which
+    avoids extrapolating the first jump of an intermittent series.  Returns
+    the ``(series, P, periods)`` forecasts and the ``(series, P)`` sum of
+    squared one-step errors.
+    """
+    n_series, n_obs = values.shape
+    m = seasonal_periods or 0
+    shape = np.broadcast_shapes((n_series, 1), np.shape(alpha), np.shape(beta), np.shape(gamma))
+    level = np.full(shape, np.nan)
+    trend = np.zeros(shape)
+    season = np.zeros((m, *shape)) if m else None
+    seen = np.zeros((n_series, 1), dtype=np.int64)
+    sse = np.zeros(shape)
+
+    for t in range(n_obs):
+        obs = values[:, t : t + 1]
+        valid = ~np.isnan(obs)
+        first = valid & (seen == 0)
+        update = valid & (seen > 0)
+        seasonal = season[t % m] if m else 0.0
+
+        error = np.where(update, obs - (level + trend + seasonal), 0.0)
+        sse += error**2
+        level = np.where(first, obs, level + np.where(update, trend + alpha * error, 0.0))
+        trend = trend + alpha * beta * error
+        if m:
+            season[t % m] = seasonal + gamma * error
+        seen += valid
 
-from .datasets import load_datasets
+    steps = np.arange(1, periods + 1)
+    forecast = level[..., None] + trend[..., None] * steps
+    if m:
+        forecast += np.moveaxis(season[(n_obs - 1 + steps) % m], 0, -1)
+    return forecast, sse
+
+
+def holt_winters_forecast(
+    values: np.ndarray,
+    periods: int,
+    *,
+    seasonal_periods: int | None = None,
+    alpha: float | None = None,
+    beta: float | None = None,
+    gamma: float | None = None,
+    batch_size: int = 2_000_000,
+) -> np.ndarray:
+    """Forecast many series at once with additive Holt-Winters smoothing.
+
+    The smoothing recursions run over a ``(series, time)`` array so thousands
+    of short series are fitted together instead of one optimiser call per
+    series.  Parameters that are not fixed are chosen per series by grid
+    search over :data:`ALPHA_GRID`, :data:`BETA_GRID` and :data:`GAMMA_GRID`
+    minimising the in-sample one-step squared error.
+
+    Parameters
+    ----------
+    values:
+        Array of shape ``(series, time)`` (or a single 1-D series).  Series of
+        different lengths are right aligned with leading ``NaN`` padding.
+    periods:
+        Number of future periods to forecast.
+    seasonal_periods:
+        Length of the seasonal cycle.  If ``None`` no seasonality is
+        modelled.
+    alpha, beta, gamma:
+        Fixed smoothing parameters for level, trend and seasonality.
+    batch_size:
+        Upper bound on ``series * parameter sets`` evaluated at once, which
+        bounds the memory used by the grid search.
+
+    Returns
+    -------
+    numpy.ndarray
+        Forecasts of shape ``(series, periods)`` (or ``(periods,)`` for 1-D
+        input).  Series without observations are forecast as ``NaN``.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim not in (1, 2):
+        raise ValueError("values must be a 1-D or 2-D array")
+    if periods <= 0:
+        raise ValueError("periods must be positive")
+    if seasonal_periods is not None and seasonal_periods < 2:
+        raise ValueError("seasonal_periods must be at least 2")
+    for name, value in (("alpha", alpha), ("beta", beta), ("gamma", gamma)):
+        if value is not None and not 0 <= value <= 1:
+            raise ValueError(f"{name} must be between 0 and 1")
+
+    grid = np.array(
+        np.meshgrid(
+            ALPHA_GRID if alpha is None else [alpha],
+            BETA_GRID if beta is None else [beta],
+            (GAMMA_GRID if gamma is None else [gamma]) if seasonal_periods else [0.0],
+            indexing="ij",
+        )
+    ).reshape(3, -1)
+    rows = values.reshape(-1, values.shape[-1])
+    step = max(1, batch_size // grid.shape[1])
+    forecasts = np.empty((len(rows), periods))
+    for lo in range(0, len(rows), step):
+        forecast, sse = _holt_winters_fit(
+            rows[lo : lo + step], periods, seasonal_periods, *grid
+        )
+        best = sse.argmin(axis=1)
+        forecasts[lo : lo + step] = forecast[np.arange(len(best)), best]
+    return forecasts.reshape(*values.shape[:-1], periods)
 
 
 def forecast_demand(
@@ -19,6 +158,7 @@ def forecast_demand(
     periods: int,
     *,
     seasonal_periods: int | None = None,
+    engine: str = "statsmodels",
 ) -> pd.Series:
     """Forecast future demand.
 
@@ -31,6 +171,12 @@ def forecast_demand(
     seasonal_periods:
         Length of the seasonal cycle.  If ``None`` no seasonality is
         modelled.
+    engine:
+        ``"statsmodels"`` fits :class:`ExponentialSmoothing` with optimised
+        parameters; ``"numpy"`` uses :func:`holt_winters_forecast`, which is
+        much cheaper for short or sparse series; ``"auto"`` backtests the
+        candidate models of :mod:`inventory.model_selection` and forecasts
+        with the most accurate one.
 
     Returns
     -------
@@ -41,6 +187,30 @@ def forecast_demand(
         raise TypeError("series must be indexed by a DatetimeIndex")
     if series.empty:
         raise ValueError("series must contain at least one observation")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+
+    if engine in ("numpy", "auto"):
+        freq = series.index.freq or pd.infer_freq(series.index)
+        if freq is None:
+            raise ValueError("series index must have a regular frequency")
+        offset = pd.tseries.frequencies.to_offset(freq)
+        index = pd.date_range(series.index[-1] + offset, periods=periods, freq=offset)
+        if engine == "auto":
+            _, values = _select_models(
+                [series.to_numpy(dtype=float)], periods, seasonal_periods
+            )
+            return pd.Series(values[0], index=index)
+        values = holt_winters_forecast(
+            series.to_numpy(dtype=float),
+            periods,
+            seasonal_periods=seasonal_periods,
+        )
+        return pd.Series(values, index=index)
+
+    # Imported here: statsmodels and scipy take about a second to import and
+    # are only needed by this engine.
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
     model = ExponentialSmoothing(
         series,
@@ -52,6 +222,281 @@ def forecast_demand(
     return forecast
 
 
+def _select_models(
+    series: Sequence[np.ndarray],
+    periods: int,
+    seasonal_periods: int | None,
+) -> tuple[list[str], np.ndarray]:
+    """Chosen model names and forecasts of the ``"auto"`` engine."""
+    # Imported here: model_selection builds on this module's recursions.
+    from .model_selection import MODELS, SEASONAL_MODELS, _select_chunk
+
+    models = [m for m in MODELS if seasonal_periods or m not in SEASONAL_MODELS]
+    names, _, _, forecasts = _select_chunk(
+        series, periods, seasonal_periods, models, folds=3, horizon=periods
+    )
+    return names, forecasts
+
+
+def _check_series(values: np.ndarray, seasonal_periods: int | None) -> None:
+    """Raise :class:`ValueError` if the array engines cannot fit ``values``.
+
+    The recursions accept any array, so the checks of the ``"statsmodels"``
+    engine are repeated here: finite values and, with seasonality, at least
+    two full seasonal cycles.
+    """
+    if not np.isfinite(values).all():
+        raise ValueError("series contains non-finite values")
+    if seasonal_periods and len(values) < 2 * seasonal_periods:
+        raise ValueError(
+            f"{len(values)} observations are fewer than two seasonal cycles "
+            f"of {seasonal_periods} periods"
+        )
+
+
+def _forecast_chunk(
+    chunk: Sequence[tuple[tuple, np.ndarray, np.ndarray]],
+    periods: int,
+    seasonal_periods: int | None,
+    freq: str,
+    engine: str = "statsmodels",
+) -> list[tuple[tuple, pd.DatetimeIndex, np.ndarray, str, str, float]]:
+    """Fit one model per series in ``chunk``.
+
+    This runs inside worker processes, so it receives plain arrays rather
+    than pandas objects to keep pickling cheap.  Failures are reported per
+    series instead of aborting the whole chunk.  With the ``"numpy"`` and
+    ``"auto"`` engines the series that pass :func:`_check_series` are
+    fitted as one array and the elapsed time is shared evenly between them;
+    ``"auto"`` reports the selected model as the message.
+    """
+    results = []
+    offset = pd.tseries.frequencies.to_offset(freq)
+    resampled = []
+    for key, dates, values in chunk:
+        series = pd.Series(values, index=pd.DatetimeIndex(dates))
+        resampled.append((key, series.asfreq(freq, fill_value=0)))
+
+    if engine in ("auto", "numpy"):
+        rows, failures = [], {}
+        for position, (_, series) in enumerate(resampled):
+            values = series.to_numpy(dtype=float)
+            try:
+                _check_series(values, seasonal_periods)
+            except ValueError as exc:
+                failures[position] = f"{type(exc).__name__}: {exc}"
+            else:
+                rows.append(values)
+        start = time.perf_counter()
+        names, forecasts = [], []
+        if rows and engine == "auto":
+            names, forecasts = _select_models(rows, periods, seasonal_periods)
+        elif rows:
+            width = max(len(values) for values in rows)
+            matrix = np.full((len(rows), width), np.nan)
+            for row, values in zip(matrix, rows):
+                row[width - len(values) :] = values
+            forecasts = holt_winters_forecast(
+                matrix, periods, seasonal_periods=seasonal_periods
+            )
+            names = [""] * len(rows)
+        elapsed = (time.perf_counter() - start) / max(len(rows), 1)
+        fitted = zip(names, forecasts)
+        for position, (key, series) in enumerate(resampled):
+            index = pd.date_range(series.index[-1] + offset, periods=periods, freq=freq)
+            if position in failures:
+                failed = np.full(periods, np.nan)
+                results.append((key, index, failed, "failed", failures[position], 0.0))
+            else:
+                name, forecast = next(fitted)
+                results.append((key, index, forecast, "ok", name, elapsed))
+        return results
+
+    for key, series in resampled:
+        index = pd.date_range(series.index[-1] + offset, periods=periods, freq=freq)
+        start = time.perf_counter()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            try:
+                forecast = forecast_demand(
+                    series,
+                    periods,
+                    seasonal_periods=seasonal_periods,
+                ).to_numpy(dtype=float)
+            except Exception as exc:  # noqa: BLE001 - reported per series
+                forecast = np.full(periods, np.nan)
+                status, message = "failed", f"{type(exc).__name__}: {exc}"
+            else:
+                if caught:
+                    status, message = "warning", str(caught[0].message)
+                else:
+                    status, message = "ok", ""
+        elapsed = time.perf_counter() - start
+        results.append((key, index, forecast, status, message, elapsed))
+    return results
+
+
+def _split_series(
+    df: pd.DataFrame,
+    key_cols: list[str],
+    date_col: str,
+    quantity_col: str,
+) -> list[tuple[tuple, np.ndarray, np.ndarray]]:
+    """Split transactions into ``(key, dates, values)`` per series.
+
+    Rows are summed per key and date in a single grouping pass; dates are
+    sorted within every series.
+    """
+    working = df[[*key_cols, quantity_col]].assign(
+        **{date_col: pd.to_datetime(df[date_col])}
+    )
+    daily = (
+        working.groupby([*key_cols, date_col], sort=True, observed=True)[quantity_col]
+        .sum()
+        .reset_index()
+    )
+    group_ids = daily.groupby(key_cols, sort=False, observed=True).ngroup().to_numpy()
+    bounds = np.flatnonzero(np.diff(group_ids)) + 1
+    starts = np.concatenate(([0], bounds))
+    stops = np.concatenate((bounds, [len(daily)]))
+    keys = list(daily[key_cols].iloc[starts].itertuples(index=False, name=None))
+    dates = daily[date_col].to_numpy()
+    values = daily[quantity_col].to_numpy(dtype=float)
+    return [
+        (key, dates[lo:hi], values[lo:hi]) for key, lo, hi in zip(keys, starts, stops)
+    ]
+
+
+def forecast_demand_many(
+    df: pd.DataFrame,
+    key_cols: str | Iterable[str],
+    date_col: str,
+    quantity_col: str,
+    periods: int,
+    *,
+    seasonal_periods: int | None = None,
+    freq: str = "D",
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    engine: str = "statsmodels",
+) -> pd.DataFrame:
+    """Forecast demand for every series identified by ``key_cols``.
+
+    Rows are aggregated per key and ``date_col`` in a single grouping pass,
+    each series is resampled to ``freq`` (missing periods count as zero
+    demand) and the series are fitted in chunks on a process pool.
+
+    Parameters
+    ----------
+    df:
+        Transaction level data, e.g. one row per sale.
+    key_cols:
+        Column or columns identifying a series (e.g. ``"InventoryId"`` or
+        ``["Store", "Brand"]``).
+    date_col, quantity_col:
+        Columns representing the sale date and quantity sold.
+    periods:
+        Number of future periods to forecast for every series.
+    seasonal_periods:
+        Length of the seasonal cycle.  If ``None`` no seasonality is modelled.
+    freq:
+        Frequency each series is resampled to before fitting.
+    max_workers:
+        Number of worker processes.  ``None`` uses :func:`os.cpu_count`; ``1``
+        fits every series in the calling process.
+    chunksize:
+        Number of series sent to a worker at a time.  By default the series
+        are split into roughly four chunks per worker.
+    engine:
+        Forecasting engine, see :func:`forecast_demand`.  The ``"numpy"``
+        and ``"auto"`` engines fit each chunk as a single array.  For
+        cross-validation scores and a cache of selected models use
+        :func:`~inventory.model_selection.select_forecast_models`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Long format forecasts with one row per series and period.  Besides
+        ``key_cols``, ``date_col`` and ``forecast`` the frame holds the fit
+        ``status`` (``"ok"``, ``"warning"`` or ``"failed"``), a ``message``
+        describing warnings or errors (the selected model with
+        ``engine="auto"``) and the ``fit_seconds`` spent on the series.
+        Failed series have ``NaN`` forecasts.
+    """
+    key_cols = [key_cols] if isinstance(key_cols, str) else list(key_cols)
+    for col in (*key_cols, date_col, quantity_col):
+        if col not in df.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+    if periods <= 0:
+        raise ValueError("periods must be positive")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+
+    columns = [*key_cols, date_col, "forecast", "status", "message", "fit_seconds"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    series = _split_series(df, key_cols, date_col, quantity_col)
+    workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(series) / (workers * 4)))
+    chunks = [series[i : i + chunksize] for i in range(0, len(series), chunksize)]
+    fit = partial(
+        _forecast_chunk,
+        periods=periods,
+        seasonal_periods=seasonal_periods,
+        freq=freq,
+        engine=engine,
+    )
+    if workers == 1 or len(chunks) == 1:
+        results = [fit(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fit, chunks))
+
+    fitted = [row for chunk in results for row in chunk]
+    out = pd.DataFrame(
+        [key for key, *_ in fitted for _ in range(periods)],
+        columns=key_cols,
+    )
+    out[date_col] = np.concatenate([index.to_numpy() for _, index, *_ in fitted])
+    out["forecast"] = np.concatenate([forecast for _, _, forecast, *_ in fitted])
+    out["status"] = np.repeat([row[3] for row in fitted], periods)
+    out["message"] = np.repeat([row[4] for row in fitted], periods)
+    out["fit_seconds"] = np.repeat([row[5] for row in fitted], periods)
+    return out
+
+
+def daily_demand_from_chunks(
+    chunks: Iterable[pd.DataFrame],
+    date_col: str,
+    quantity_col: str,
+) -> pd.Series:
+    """Aggregate streamed sales chunks into a daily demand series.
+
+    Each chunk is summed per day and merged into a running per-day total, so
+    memory depends on the number of distinct days rather than rows.
+
+    Returns
+    -------
+    pandas.Series
+        Total ``quantity_col`` per day with missing days filled with zero,
+        as used by :func:`forecast_from_zip`.
+    """
+    totals: pd.Series | None = None
+    for chunk in chunks:
+        for col in (date_col, quantity_col):
+            if col not in chunk.columns:
+                raise KeyError(f"{col!r} not in sales data")
+        partial = chunk.groupby(pd.to_datetime(chunk[date_col]))[quantity_col].sum()
+        if totals is not None:
+            partial = pd.concat([totals, partial]).groupby(level=0, observed=True).sum()
+        totals = partial
+    if totals is None:
+        raise ValueError("sales data contains no rows")
+    return totals.sort_index().asfreq("D", fill_value=0)
+
+
 def forecast_from_zip(
     zip_path: str | Path,
     sales_file: str,
@@ -60,12 +505,18 @@ def forecast_from_zip(
     periods: int,
     *,
     seasonal_periods: int | None = None,
+    engine: str = "statsmodels",
+    chunksize: int | None = None,
+    cube: SalesCube | str | Path | None = None,
 ) -> pd.Series:
     """Load sales data from a zip archive and forecast future demand.
 
     The CSV file is read using :func:`load_datasets`.  The resulting DataFrame
     is aggregated by ``date_col`` and the specified ``quantity_col`` is used as
-    the demand series.
+    the demand series.  When ``chunksize`` is given the file is streamed and
+    aggregated with :func:`daily_demand_from_chunks` instead.  When ``cube``
+    is given the daily series is read from its precomputed rollups and the
+    archive is not opened.
 
     Parameters
     ----------
@@ -79,6 +530,13 @@ def forecast_from_zip(
         Number of future periods to forecast.
     seasonal_periods:
         Length of the seasonal cycle.  If ``None`` no seasonality is modelled.
+    engine:
+        Forecasting engine, see :func:`forecast_demand`.
+    chunksize:
+        Optional number of rows to stream at a time.
+    cube:
+        :class:`~inventory.cube.SalesCube` built from ``sales_file`` (or the
+        path of a saved one) with ``quantity_col`` as a measure.
 
     Returns
     -------
@@ -86,20 +544,44 @@ def forecast_from_zip(
         Forecasted demand for the next ``periods`` periods.
     """
 
-    datasets = load_datasets(zip_path, files=[sales_file])
-    key = Path(sales_file).stem
-    if key not in datasets:
-        raise FileNotFoundError(f"{sales_file!r} not found in {zip_path!r}")
-    df = datasets[key]
-    for col in (date_col, quantity_col):
-        if col not in df.columns:
-            raise KeyError(f"{col!r} not in sales data")
-
-    df[date_col] = pd.to_datetime(df[date_col])
-    series = df.groupby(df[date_col])[quantity_col].sum().sort_index()
-    series = series.asfreq("D", fill_value=0)
+    if cube is not None:
+        if not isinstance(cube, SalesCube):
+            cube = SalesCube.load(cube)
+        series = cube.daily_series(quantity_col)
+        return forecast_demand(
+            series,
+            periods,
+            seasonal_periods=seasonal_periods,
+            engine=engine,
+        )
+    if chunksize is not None:
+        chunks = iter_dataset(
+            zip_path,
+            sales_file,
+            chunksize=chunksize,
+            usecols=[date_col, quantity_col],
+            typed=True,
+        )
+    else:
+        datasets = load_datasets(
+            zip_path, files=[sales_file], typed=True, usecols=[date_col, quantity_col]
+        )
+        key = Path(sales_file).stem
+        if key not in datasets:
+            raise FileNotFoundError(f"{sales_file!r} not found in {zip_path!r}")
+        if isinstance(datasets[key], MappedTable):
+            for col in (date_col, quantity_col):
+                if col not in datasets[key].columns:
+                    raise KeyError(f"{col!r} not in sales data")
+            chunks = None
+            series = datasets[key].daily_sum(date_col, quantity_col)
+        else:
+            chunks = [datasets[key]]
+    if chunks is not None:
+        series = daily_demand_from_chunks(chunks, date_col, quantity_col)
     return forecast_demand(
         series,
         periods,
         seasonal_periods=seasonal_periods,
+        engine=engine,
     )
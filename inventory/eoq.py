@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import math
+from enum import IntFlag
+from typing import Any
 
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from .backends import column_names, to_pandas
 from .datasets import load_datasets
 
 
@@ -36,12 +40,94 @@ def calculate_eoq(demand: float, order_cost: float, holding_cost: float) -> floa
     return math.sqrt(2 * demand * order_cost / holding_cost)
 
 
+class EOQError(IntFlag):
+    """Per-row error codes reported by :func:`calculate_eoqs`.
+
+    Codes are bit flags, so a row with several invalid inputs carries the
+    combination of the corresponding flags.  ``0`` marks a valid row.
+    ``MISSING`` marks a row with a ``NaN`` input; it is only reported, never
+    raised, and the EOQ of such a row is ``NaN``.
+    """
+
+    DEMAND = 1
+    ORDER_COST = 2
+    HOLDING_COST = 4
+    MISSING = 8
+
+
+_EOQ_MESSAGES = {
+    EOQError.DEMAND: "demand must be positive",
+    EOQError.ORDER_COST: "order_cost must be positive",
+    EOQError.HOLDING_COST: "holding_cost must be positive",
+}
+
+
+def calculate_eoqs(
+    demand: Any,
+    order_cost: Any,
+    holding_cost: Any,
+    *,
+    errors: str = "raise",
+) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+    """Array-native EOQ calculation.
+
+    All inputs are validated with masked column checks and the EOQ of every
+    row is computed in a single NumPy expression.
+
+    Parameters
+    ----------
+    demand, order_cost, holding_cost:
+        NumPy arrays, pandas Series, Arrow arrays or scalars, broadcast
+        against each other.
+    errors:
+        ``"raise"`` raises :class:`ValueError` for the first invalid row.
+        ``"codes"`` returns the :class:`EOQError` flags of every row instead
+        and sets the EOQ of invalid rows to ``NaN``.
+
+    Returns
+    -------
+    numpy.ndarray or tuple of numpy.ndarray
+        EOQ per row, and with ``errors="codes"`` the per-row error codes.
+    """
+    if errors not in ("raise", "codes"):
+        raise ValueError(f"errors must be 'raise' or 'codes', got {errors!r}")
+    # Arrow arrays implement the NumPy array protocol, with nulls as NaN.
+    demand, order_cost, holding_cost = np.broadcast_arrays(
+        np.asarray(demand, dtype=float),
+        np.asarray(order_cost, dtype=float),
+        np.asarray(holding_cost, dtype=float),
+    )
+
+    codes = (
+        (demand <= 0) * EOQError.DEMAND.value
+        | (order_cost <= 0) * EOQError.ORDER_COST.value
+        | (holding_cost <= 0) * EOQError.HOLDING_COST.value
+        | np.isnan(demand + order_cost + holding_cost) * EOQError.MISSING.value
+    ).astype(np.int8)
+    invalid = codes != 0
+    raised = (codes & ~EOQError.MISSING.value) != 0
+    if errors == "raise" and raised.any():
+        row = int(np.flatnonzero(raised.ravel())[0])
+        code = int(codes.ravel()[row])
+        first = next(flag for flag in EOQError if code & flag)
+        raise ValueError(f"{_EOQ_MESSAGES[first]} (row {row})")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eoq = np.sqrt(2 * demand * order_cost / holding_cost)
+    if errors == "codes":
+        eoq[invalid] = np.nan
+        return eoq, codes
+    return eoq
+
+
 def calculate_eoq_from_df(
     df: pd.DataFrame,
     demand_col: str,
     order_cost_col: str,
     holding_cost_col: str,
-) -> pd.Series:
+    *,
+    errors: str = "raise",
+) -> pd.Series | pd.DataFrame:
     """Vectorised EOQ calculation for data frames.
 
     Parameters
@@ -50,20 +136,30 @@ def calculate_eoq_from_df(
         Data containing demand, order cost and holding cost columns.
     demand_col, order_cost_col, holding_cost_col:
         Column names corresponding to the EOQ parameters.
+    errors:
+        ``"raise"`` (default) or ``"codes"``, see :func:`calculate_eoqs`.
 
     Returns
     -------
-    pandas.Series
-        EOQ for each row of ``df``.
+    pandas.Series or pandas.DataFrame
+        EOQ for each row of ``df``.  With ``errors="codes"`` a frame with
+        ``eoq`` and ``error_code`` columns is returned instead.  ``df`` may
+        also be a :class:`pyarrow.Table` or a Polars frame; only the named
+        columns are converted and the result is indexed from zero.
     """
 
-    for col in (demand_col, order_cost_col, holding_cost_col):
-        if col not in df.columns:
+    columns = [demand_col, order_cost_col, holding_cost_col]
+    for col in columns:
+        if col not in column_names(df):
             raise KeyError(f"{col!r} not in DataFrame")
-    return df.apply(
-        lambda r: calculate_eoq(r[demand_col], r[order_cost_col], r[holding_cost_col]),
-        axis=1,
+    df = to_pandas(df, columns)
+    result = calculate_eoqs(
+        df[demand_col], df[order_cost_col], df[holding_cost_col], errors=errors
     )
+    if errors == "codes":
+        eoq, codes = result
+        return pd.DataFrame({"eoq": eoq, "error_code": codes}, index=df.index)
+    return pd.Series(result, index=df.index)
 
 
 def calculate_eoq_from_zip(
@@ -75,7 +171,13 @@ def calculate_eoq_from_zip(
 ) -> pd.Series:
     """Load EOQ parameters from ``zip_path`` and compute EOQ values."""
 
-    datasets = load_datasets(zip_path, files=[file_name])
+    datasets = load_datasets(
+        zip_path,
+        files=[file_name],
+        typed=True,
+        usecols=[demand_col, order_cost_col, holding_cost_col],
+        materialize=True,
+    )
     key = Path(file_name).stem
     if key not in datasets:
         raise FileNotFoundError(f"{file_name!r} not found in {zip_path!r}")
@@ -85,3 +187,153 @@ def calculate_eoq_from_zip(
         order_cost_col,
         holding_cost_col,
     )
+
+
+def calculate_discount_eoqs(
+    demand: Any,
+    order_cost: Any,
+    holding_rate: Any,
+    breaks: Any,
+    prices: Any,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """EOQ under all-units quantity discounts.
+
+    Every order is charged the unit price of the highest price break its
+    quantity reaches, and holding cost is ``holding_rate`` times that price.
+    For each tier the EOQ at the tier's price is raised to the tier's
+    minimum quantity; tiers whose EOQ reaches the next break are dominated
+    by that cheaper tier.  The tier with the lowest annual purchase, order
+    and holding cost wins.  All rows and tiers are evaluated as one array.
+
+    Parameters
+    ----------
+    demand, order_cost, holding_rate:
+        Annual demand, cost per order and annual holding cost as a fraction
+        of the unit price, per row.
+    breaks, prices:
+        Minimum order quantity and unit price of each tier, shaped
+        ``(rows, tiers)`` or ``(tiers,)`` for tiers shared by every row.
+        Rows with fewer tiers pad with ``NaN``.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Order quantity, unit price and annual cost per row; ``NaN`` for rows
+        without a tier.
+    """
+    demand, order_cost, holding_rate = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(demand, dtype=float)),
+        np.asarray(order_cost, dtype=float),
+        np.asarray(holding_rate, dtype=float),
+    )
+    for name, values in (
+        ("demand", demand),
+        ("order_cost", order_cost),
+        ("holding_rate", holding_rate),
+    ):
+        if not (values > 0).all():
+            raise ValueError(f"{name} must be positive")
+    rows = len(demand)
+    breaks, prices = (
+        np.broadcast_to(np.asarray(values, dtype=float), (rows, np.shape(values)[-1]))
+        for values in (breaks, prices)
+    )
+    if breaks.shape != prices.shape:
+        raise ValueError("breaks and prices must have the same shape")
+    tiered = ~(np.isnan(breaks) | np.isnan(prices))
+    if (breaks[tiered] < 0).any() or (prices[tiered] <= 0).any():
+        raise ValueError("breaks cannot be negative and prices must be positive")
+
+    order = np.argsort(np.where(tiered, breaks, np.inf), axis=1, kind="stable")
+    breaks = np.take_along_axis(np.where(tiered, breaks, np.nan), order, axis=1)
+    prices = np.take_along_axis(np.where(tiered, prices, np.nan), order, axis=1)
+    next_break = np.concatenate([breaks[:, 1:], np.full((rows, 1), np.nan)], axis=1)
+    next_break = np.where(np.isnan(next_break), np.inf, next_break)
+
+    d, s, i = demand[:, None], order_cost[:, None], holding_rate[:, None]
+    quantity = np.maximum(np.sqrt(2 * d * s / (i * prices)), breaks)
+    with np.errstate(invalid="ignore"):
+        cost = d * prices + d * s / quantity + i * prices * quantity / 2
+    cost = np.where(np.isnan(cost) | (quantity >= next_break), np.inf, cost)
+
+    best = np.argmin(cost, axis=1)[:, None]
+    found = np.isfinite(np.take_along_axis(cost, best, axis=1))[:, 0]
+    result = []
+    for values in (quantity, prices, cost):
+        chosen = np.take_along_axis(values, best, axis=1)[:, 0]
+        result.append(np.where(found, chosen, np.nan))
+    return result[0], result[1], result[2]
+
+
+def calculate_discount_eoq_from_df(
+    df: pd.DataFrame,
+    tiers: pd.DataFrame,
+    key_col: str,
+    demand_col: str,
+    order_cost_col: str,
+    *,
+    holding_rate: float = 0.25,
+    break_col: str = "min_quantity",
+    price_col: str = "unit_price",
+) -> pd.DataFrame:
+    """Quantity-discount EOQ for every row of ``df``.
+
+    Parameters
+    ----------
+    df:
+        Items with demand and order cost columns.
+    tiers:
+        Price breaks in long format: one row per ``key_col`` and tier with
+        its minimum quantity and unit price.
+    key_col:
+        Column of both frames identifying the item (e.g. ``"Brand"``).
+    demand_col, order_cost_col:
+        Annual demand and cost per order columns of ``df``.
+    holding_rate:
+        Annual holding cost as a fraction of the unit price.
+    break_col, price_col:
+        Tier columns of ``tiers``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``order_quantity``, ``unit_price`` and ``annual_cost`` indexed like
+        ``df``, see :func:`calculate_discount_eoqs`.  Items without tiers are
+        ``NaN``.  Both frames may also be :class:`pyarrow.Table` or Polars
+        frames, in which case the result is indexed from zero.
+    """
+    item_columns = [key_col, demand_col, order_cost_col]
+    tier_columns = [key_col, break_col, price_col]
+    for frame, columns in ((df, item_columns), (tiers, tier_columns)):
+        for col in columns:
+            if col not in column_names(frame):
+                raise KeyError(f"{col!r} not in DataFrame")
+    df = to_pandas(df, item_columns)
+    tiers = to_pandas(tiers, tier_columns)
+
+    keys = pd.Index(pd.unique(tiers[key_col]))
+    codes = keys.get_indexer(tiers[key_col])
+    position = tiers.groupby(codes).cumcount().to_numpy()
+    width = int(position.max()) + 1 if len(tiers) else 1
+    breaks = np.full((len(keys), width), np.nan)
+    prices = np.full((len(keys), width), np.nan)
+    breaks[codes, position] = tiers[break_col].to_numpy(dtype=float)
+    prices[codes, position] = tiers[price_col].to_numpy(dtype=float)
+
+    rows = keys.get_indexer(df[key_col])
+    known = rows >= 0
+    result = pd.DataFrame(
+        np.nan, index=df.index, columns=["order_quantity", "unit_price", "annual_cost"]
+    )
+    if known.any():
+        quantity, price, cost = calculate_discount_eoqs(
+            df[demand_col].to_numpy(dtype=float)[known],
+            df[order_cost_col].to_numpy(dtype=float)[known],
+            holding_rate,
+            breaks[rows[known]],
+            prices[rows[known]],
+        )
+        result.loc[known, "order_quantity"] = quantity
+        result.loc[known, "unit_price"] = price
+        result.loc[known, "annual_cost"] = cost
+    return result
@@ -1,31 +1,123 @@
 """Lead time analysis."""
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from pathlib import Path
+from typing import Any, Iterable, Sequence
 
-from .datasets import load_datasets
+from .backends import check_backend, column_names, to_arrow, to_pandas, to_polars
+from .datasets import iter_dataset, load_datasets
+from .store import MappedTable
+
+
+def _arrow_seconds(column: Any) -> Any:
+    """Seconds since the epoch of an Arrow date column."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not pa.types.is_temporal(column.type):
+        # Text dates are parsed by pandas, once per distinct value.
+        encoded = pc.dictionary_encode(column).combine_chunks()
+        parsed = pd.to_datetime(encoded.dictionary.to_pandas())
+        column = pc.take(pa.array(parsed, type=pa.timestamp("s")), encoded.indices)
+    column = pc.cast(column, pa.timestamp("s"), safe=False)
+    return pc.cast(column, pa.int64())
+
+
+def _lead_times_arrow(
+    df: Any, order_date_col: str, receipt_date_col: str, group_col: str | None
+) -> pd.Series:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = [order_date_col, receipt_date_col, *([group_col] if group_col else [])]
+    table = to_arrow(df, columns)
+    seconds = pc.subtract(
+        _arrow_seconds(table.column(receipt_date_col)),
+        _arrow_seconds(table.column(order_date_col)),
+    )
+    # Floor like Timedelta.days.
+    days = pc.cast(pc.floor(pc.divide(pc.cast(seconds, pa.float64()), 86_400)), pa.int64())
+    if not group_col:
+        index = df.index if isinstance(df, pd.DataFrame) else None
+        return pd.Series(days.to_pandas().to_numpy(), index=index)
+
+    groups = table.column(group_col)
+    if pa.types.is_dictionary(groups.type):
+        groups = groups.cast(groups.type.value_type)
+    means = pa.table({group_col: groups, "days": days}).group_by(group_col).aggregate(
+        [("days", "mean")]
+    )
+    means = means.filter(pc.is_valid(means.column(group_col))).sort_by(group_col)
+    return pd.Series(
+        means.column("days_mean").to_pandas().to_numpy(),
+        index=pd.Index(means.column(group_col).to_pandas(), name=group_col),
+    )
+
+
+def _lead_times_polars(
+    df: Any, order_date_col: str, receipt_date_col: str, group_col: str | None
+) -> pd.Series:
+    import polars as pl
+
+    columns = [order_date_col, receipt_date_col, *([group_col] if group_col else [])]
+    frame = to_polars(df, columns)
+    schema = frame.collect_schema()
+
+    def dates(col: str) -> Any:
+        expr = pl.col(col)
+        if schema[col] in (pl.Categorical, pl.String):
+            expr = expr.cast(pl.String).str.to_datetime()
+        return expr.cast(pl.Datetime("us"))
+
+    days = (dates(receipt_date_col) - dates(order_date_col)).dt.total_days().alias("days")
+    if not group_col:
+        result = frame.select(days).collect().to_series().to_pandas()
+        index = df.index if isinstance(df, pd.DataFrame) else None
+        return pd.Series(result.to_numpy(), index=index)
+
+    means = (
+        frame.with_columns(pl.col(pl.Categorical).cast(pl.String))
+        .drop_nulls(group_col)
+        .group_by(group_col)
+        .agg(days.mean())
+        .sort(group_col)
+        .collect()
+    )
+    return pd.Series(
+        means["days"].to_numpy(),
+        index=pd.Index(means[group_col].to_numpy(), name=group_col),
+    )
 
 
 def compute_lead_times(
-    df: pd.DataFrame,
+    df: pd.DataFrame | MappedTable,
     order_date_col: str,
     receipt_date_col: str,
     *,
     group_col: str | None = None,
+    backend: str = "pandas",
 ) -> pd.Series:
     """Compute lead times in days.
 
     Parameters
     ----------
     df:
-        Data containing order and receipt dates.
+        Data containing order and receipt dates.  A
+        :class:`~inventory.store.MappedTable` is processed on its mapped
+        day numbers.
     order_date_col, receipt_date_col:
         Column names for order placement and receipt dates.
     group_col:
         Optional column to group by (e.g. supplier) to obtain average lead
         times per group.
+    backend:
+        ``"pandas"`` (default), ``"pyarrow"`` or ``"polars"`` to compute with
+        that library, see :mod:`~inventory.backends`.  ``df`` may also be a
+        :class:`pyarrow.Table` or a Polars frame.  Mapped tables are always
+        processed on their day numbers.
 
     Returns
     -------
@@ -33,21 +125,324 @@ def compute_lead_times(
         Lead times in days.  If ``group_col`` is provided the index will be the
         groups and the values the average lead time for each group.
     """
-    if order_date_col not in df.columns or receipt_date_col not in df.columns:
+    check_backend(backend)
+    columns = df.columns if isinstance(df, MappedTable) else column_names(df)
+    if order_date_col not in columns or receipt_date_col not in columns:
         raise KeyError("order or receipt date column missing")
+    if group_col and group_col not in columns:
+        raise KeyError(f"{group_col!r} not in DataFrame")
+    if isinstance(df, MappedTable):
+        return df.lead_times(order_date_col, receipt_date_col, group_col=group_col)
+    if backend == "pyarrow":
+        return _lead_times_arrow(df, order_date_col, receipt_date_col, group_col)
+    if backend == "polars":
+        return _lead_times_polars(df, order_date_col, receipt_date_col, group_col)
+    df = to_pandas(df)
 
     order_dates = pd.to_datetime(df[order_date_col])
     receipt_dates = pd.to_datetime(df[receipt_date_col])
     lead_times = (receipt_dates - order_dates).dt.days
 
     if group_col:
-        if group_col not in df.columns:
-            raise KeyError(f"{group_col!r} not in DataFrame")
-        return lead_times.groupby(df[group_col]).mean()
+        return lead_times.groupby(df[group_col], observed=True).mean()
 
     return lead_times
 
 
+def compute_lead_times_from_chunks(
+    chunks: Iterable[pd.DataFrame],
+    order_date_col: str,
+    receipt_date_col: str,
+    *,
+    group_col: str | None = None,
+) -> pd.Series:
+    """Streaming variant of :func:`compute_lead_times`.
+
+    With ``group_col`` only a running sum and count of lead times per group
+    is kept, so memory depends on the number of groups rather than rows.
+    Without it the per-row lead times of all chunks are concatenated.
+
+    Returns
+    -------
+    pandas.Series
+        Same result as :func:`compute_lead_times` on the concatenated chunks.
+    """
+    parts: list[pd.Series] = []
+    totals: pd.DataFrame | None = None
+    for chunk in chunks:
+        lead_times = compute_lead_times(chunk, order_date_col, receipt_date_col)
+        if not group_col:
+            parts.append(lead_times)
+            continue
+        if group_col not in chunk.columns:
+            raise KeyError(f"{group_col!r} not in DataFrame")
+        partial = lead_times.groupby(chunk[group_col], observed=True).agg(["sum", "count"])
+        if totals is not None:
+            partial = pd.concat([totals, partial]).groupby(level=0, observed=True).sum()
+        totals = partial
+
+    if not group_col:
+        return pd.concat(parts) if parts else pd.Series(dtype="int64")
+    if totals is None:
+        return pd.Series(dtype=float, index=pd.Index([], name=group_col))
+    return (totals["sum"] / totals["count"]).rename(None)
+
+
+#: Quantiles reported by :func:`lead_time_profile` by default.
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _bucket_values(days: np.ndarray, relative_accuracy: float) -> np.ndarray:
+    """Representative value of the sketch bucket holding each lead time.
+
+    Buckets grow geometrically like in DDSketch, so every value is
+    represented within ``relative_accuracy`` of its true magnitude.
+    """
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    magnitude = np.abs(days)
+    with np.errstate(divide="ignore"):
+        index = np.ceil(np.log(magnitude) / np.log(gamma))
+    values = np.sign(days) * 2 * gamma**index / (gamma + 1)
+    return np.where(magnitude == 0, 0.0, values)
+
+
+class LeadTimeProfiler:
+    """Mergeable lead time statistics per group.
+
+    The profiler keeps, per group, the count, sum and sum of squares of the
+    lead times plus a histogram of their values.  In the default sketch mode
+    values are first mapped to logarithmic buckets with bounded relative
+    error, so memory depends on the number of groups and the spread of lead
+    times rather than on the number of rows.  With ``exact=True`` the
+    histogram holds the exact day values, which gives exact quantiles and is
+    still compact for whole-day lead times.
+
+    Profilers fed with different chunks (or in different processes) are
+    combined with :meth:`merge`; the result equals a single profiler fed
+    with all rows.
+
+    Parameters
+    ----------
+    order_date_col, receipt_date_col:
+        Column names for order placement and receipt dates.
+    by:
+        Column or columns identifying a group, e.g. ``"VendorNumber"`` or
+        ``["VendorNumber", "Store"]``.
+    exact:
+        Keep exact values instead of sketch buckets.
+    relative_accuracy:
+        Relative error bound of the sketch quantiles.
+    """
+
+    def __init__(
+        self,
+        order_date_col: str,
+        receipt_date_col: str,
+        *,
+        by: str | Sequence[str] = "VendorNumber",
+        exact: bool = False,
+        relative_accuracy: float = 0.01,
+    ) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.order_date_col = order_date_col
+        self.receipt_date_col = receipt_date_col
+        self.by = [by] if isinstance(by, str) else list(by)
+        if not self.by:
+            raise ValueError("by must name at least one column")
+        self.exact = exact
+        self.relative_accuracy = relative_accuracy
+        self._counts: pd.Series | None = None
+        self._moments: pd.DataFrame | None = None
+
+    def _combine(self, counts: pd.Series, moments: pd.DataFrame) -> None:
+        if self._counts is not None:
+            levels = list(range(counts.index.nlevels))
+            counts = pd.concat([self._counts, counts]).groupby(level=levels).sum()
+            levels = list(range(moments.index.nlevels))
+            moments = pd.concat([self._moments, moments]).groupby(level=levels).sum()
+        self._counts, self._moments = counts, moments
+
+    def update(self, df: pd.DataFrame) -> "LeadTimeProfiler":
+        """Add the rows of ``df``.  Rows with missing dates are ignored."""
+        for col in self.by:
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        days = compute_lead_times(df, self.order_date_col, self.receipt_date_col)
+        days = days.to_numpy(dtype=float)
+        valid = ~np.isnan(days)
+        days = days[valid]
+        keys = {col: np.asarray(df[col])[valid] for col in self.by}
+        values = days if self.exact else _bucket_values(days, self.relative_accuracy)
+
+        counts = (
+            pd.DataFrame({**keys, "lead_time": values})
+            .groupby([*self.by, "lead_time"])
+            .size()
+        )
+        moments = (
+            pd.DataFrame({**keys, "count": 1, "sum": days, "sum_sq": days**2})
+            .groupby(self.by)
+            .sum()
+        )
+        self._combine(counts, moments)
+        return self
+
+    def merge(self, other: "LeadTimeProfiler") -> "LeadTimeProfiler":
+        """Add the statistics collected by ``other`` to this profiler."""
+        if (other.by, other.exact) != (self.by, self.exact) or (
+            not self.exact and other.relative_accuracy != self.relative_accuracy
+        ):
+            raise ValueError("profilers must use the same groups and accuracy")
+        if other._counts is not None:
+            self._combine(other._counts, other._moments)
+        return self
+
+    def result(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        """Lead time statistics per group.
+
+        Quantiles are interpolated linearly between the closest ranks, like
+        :meth:`pandas.Series.quantile`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Indexed by the ``by`` columns with ``count``, ``mean``, ``std``
+            (sample standard deviation, ``NaN`` for single observations) and
+            one ``p<q>`` column per quantile, e.g. ``p95``.
+        """
+        quantiles = list(quantiles)
+        for q in quantiles:
+            if not 0 <= q <= 1:
+                raise ValueError("quantiles must be between 0 and 1")
+        names = [f"p{q * 100:g}" for q in quantiles]
+        if self._counts is None or self._counts.empty:
+            if len(self.by) > 1:
+                index = pd.MultiIndex.from_tuples([], names=self.by)
+            else:
+                index = pd.Index([], name=self.by[0])
+            return pd.DataFrame(
+                columns=["count", "mean", "std", *names], index=index, dtype=float
+            )
+
+        moments = self._moments
+        n = moments["count"].to_numpy(dtype=float)
+        mean = moments["sum"].to_numpy() / n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (moments["sum_sq"].to_numpy() - n * mean**2) / (n - 1)
+        result = pd.DataFrame(
+            {
+                "count": moments["count"].to_numpy(),
+                "mean": mean,
+                "std": np.sqrt(np.maximum(variance, 0.0)),
+            },
+            index=moments.index,
+        )
+
+        # Counts are sorted by group and value, so each group's histogram is
+        # a contiguous run and a rank maps to a row through the running
+        # total of counts.
+        counts = self._counts.sort_index()
+        codes, groups = counts.index.droplevel("lead_time").factorize()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        values = counts.index.get_level_values("lead_time").to_numpy(dtype=float)
+        cumulative = np.cumsum(counts.to_numpy())
+        base = np.r_[0, cumulative][starts]
+        size = np.diff(np.r_[base, cumulative[-1]])
+        for name, q in zip(names, quantiles):
+            rank = (size - 1) * q
+            lower = np.floor(rank)
+            upper = np.minimum(lower + 1, size - 1)
+            low = values[np.searchsorted(cumulative, base + lower, side="right")]
+            high = values[np.searchsorted(cumulative, base + upper, side="right")]
+            estimate = pd.Series(low + (rank - lower) * (high - low), index=groups)
+            result[name] = estimate.reindex(result.index).to_numpy()
+        return result
+
+
+def lead_time_profile(
+    df: pd.DataFrame,
+    order_date_col: str,
+    receipt_date_col: str,
+    *,
+    by: str | Sequence[str] = "VendorNumber",
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+    exact: bool = False,
+    relative_accuracy: float = 0.01,
+) -> pd.DataFrame:
+    """Lead time count, mean, standard deviation and quantiles per group.
+
+    Parameters
+    ----------
+    df:
+        Data containing order and receipt dates.
+    order_date_col, receipt_date_col:
+        Column names for order placement and receipt dates.
+    by:
+        Column or columns to group by, e.g. ``["VendorNumber", "Store"]``.
+    quantiles:
+        Quantiles to report, as fractions.
+    exact:
+        Compute exact quantiles instead of sketch estimates.
+    relative_accuracy:
+        Relative error bound of the sketch quantiles.
+
+    Returns
+    -------
+    pandas.DataFrame
+        See :meth:`LeadTimeProfiler.result`.
+    """
+    profiler = LeadTimeProfiler(
+        order_date_col,
+        receipt_date_col,
+        by=by,
+        exact=exact,
+        relative_accuracy=relative_accuracy,
+    )
+    return profiler.update(df).result(quantiles)
+
+
+def lead_time_profile_from_zip(
+    zip_path: str | Path,
+    purchases_file: str,
+    order_date_col: str,
+    receipt_date_col: str,
+    *,
+    by: str | Sequence[str] = "VendorNumber",
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+    exact: bool = False,
+    relative_accuracy: float = 0.01,
+    chunksize: int | None = None,
+) -> pd.DataFrame:
+    """Load purchase data from ``zip_path`` and profile lead times.
+
+    When ``chunksize`` is given the file is streamed chunk by chunk into a
+    single :class:`LeadTimeProfiler` instead of being loaded in full.
+    """
+
+    profiler = LeadTimeProfiler(
+        order_date_col,
+        receipt_date_col,
+        by=by,
+        exact=exact,
+        relative_accuracy=relative_accuracy,
+    )
+    usecols = [order_date_col, receipt_date_col, *profiler.by]
+    if chunksize is not None:
+        for chunk in iter_dataset(
+            zip_path, purchases_file, chunksize=chunksize, usecols=usecols, typed=True
+        ):
+            profiler.update(chunk)
+        return profiler.result(quantiles)
+    datasets = load_datasets(
+        zip_path, files=[purchases_file], typed=True, usecols=usecols, materialize=True
+    )
+    key = Path(purchases_file).stem
+    if key not in datasets:
+        raise FileNotFoundError(f"{purchases_file!r} not found in {zip_path!r}")
+    return profiler.update(datasets[key]).result(quantiles)
+
+
 def compute_lead_times_from_zip(
     zip_path: str | Path,
     purchases_file: str,
@@ -55,10 +450,24 @@ def compute_lead_times_from_zip(
     receipt_date_col: str,
     *,
     group_col: str | None = None,
+    chunksize: int | None = None,
 ) -> pd.Series:
-    """Load purchase data from ``zip_path`` and compute lead times."""
+    """Load purchase data from ``zip_path`` and compute lead times.
+
+    When ``chunksize`` is given the file is streamed through
+    :func:`compute_lead_times_from_chunks` instead of being loaded in full.
+    """
 
-    datasets = load_datasets(zip_path, files=[purchases_file])
+    if chunksize is not None:
+        usecols = [order_date_col, receipt_date_col] + ([group_col] if group_col else [])
+        chunks = iter_dataset(
+            zip_path, purchases_file, chunksize=chunksize, usecols=usecols, typed=True
+        )
+        return compute_lead_times_from_chunks(
+            chunks, order_date_col, receipt_date_col, group_col=group_col
+        )
+    usecols = [order_date_col, receipt_date_col] + ([group_col] if group_col else [])
+    datasets = load_datasets(zip_path, files=[purchases_file], typed=True, usecols=usecols)
     key = Path(purchases_file).stem
     if key not in datasets:
         raise FileNotFoundError(f"{purchases_file!r} not found in {zip_path!r}")
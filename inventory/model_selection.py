@@ -0,0 +1,522 @@
+"""Forecast model selection by rolling-origin cross-validation.
+
+Every candidate model is fitted to each series with its smoothing
+parameters chosen by grid search on the in-sample one-step error, as in
+:func:`~inventory.demand_forecasting.holt_winters_forecast`.  The model
+with the lowest root mean squared error over the last ``folds`` windows of
+``horizon`` periods (each forecast from the history before it) is refitted
+on the full series.  Squared rather than absolute errors are scored because
+the absolute error of an intermittent series is smallest when forecasting
+zero.  All recursions run over a ``(series, time)`` array,
+so a chunk of series is fitted at once.
+
+Selected models and parameters can be kept in a cache keyed by a hash of
+the series and the selection settings: series whose history did not change
+are forecast with their stored parameters without cross-validating or
+grid-searching again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable, MutableMapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .demand_forecasting import (
+    ALPHA_GRID,
+    BETA_GRID,
+    GAMMA_GRID,
+    _holt_winters_fit,
+    _split_series,
+)
+
+
+#: Candidate models in order of preference when cross-validation errors tie.
+MODELS = (
+    "ses",
+    "holt",
+    "holt_winters_add",
+    "holt_winters_mul",
+    "croston",
+    "sba",
+    "seasonal_naive",
+)
+
+#: Models that need ``seasonal_periods``; they are skipped without it.
+SEASONAL_MODELS = ("holt_winters_add", "holt_winters_mul")
+
+#: Smoothing parameters of every model, in the order they are cached.
+MODEL_PARAMS = {
+    "ses": ("alpha",),
+    "holt": ("alpha", "beta"),
+    "holt_winters_add": ("alpha", "beta", "gamma"),
+    "holt_winters_mul": ("alpha", "beta", "gamma"),
+    "croston": ("alpha",),
+    "sba": ("alpha",),
+    "seasonal_naive": (),
+}
+
+_GRIDS = {"alpha": ALPHA_GRID, "beta": BETA_GRID, "gamma": GAMMA_GRID}
+
+#: Smallest seasonal index of the multiplicative model.
+_MIN_SEASON = 1e-3
+
+
+def _multiplicative_fit(
+    values: np.ndarray,
+    periods: int,
+    m: int,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    gamma: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Holt-Winters recursions with additive trend and multiplicative season.
+
+    Mirrors :func:`~inventory.demand_forecasting._holt_winters_fit` with
+    seasonal indices starting at one.  The model is only defined for
+    positive demand: series with a zero or negative observation are not
+    fitted and get an infinite error and a ``NaN`` forecast, as do series
+    whose recursion diverges.
+    """
+    n_series = len(values)
+    shape = np.broadcast_shapes((n_series, 1), np.shape(alpha), np.shape(beta), np.shape(gamma))
+    forecast = np.full((*shape, periods), np.nan)
+    sse = np.full(shape, np.inf)
+    with np.errstate(invalid="ignore"):
+        positive = ~(values <= 0).any(axis=1)
+    if positive.any():
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            fitted, error = _multiplicative_recursion(
+                values[positive], periods, m, alpha, beta, gamma
+            )
+        forecast[positive] = fitted
+        sse[positive] = np.where(np.isfinite(error), error, np.inf)
+    return forecast, sse
+
+
+def _multiplicative_recursion(
+    values: np.ndarray,
+    periods: int,
+    m: int,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    gamma: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    n_series, n_obs = values.shape
+    shape = np.broadcast_shapes((n_series, 1), np.shape(alpha), np.shape(beta), np.shape(gamma))
+    level = np.full(shape, np.nan)
+    trend = np.zeros(shape)
+    season = np.ones((m, *shape))
+    seen = np.zeros((n_series, 1), dtype=np.int64)
+    sse = np.zeros(shape)
+
+    for t in range(n_obs):
+        obs = values[:, t : t + 1]
+        valid = ~np.isnan(obs)
+        first = valid & (seen == 0)
+        update = valid & (seen > 0)
+        base = level + trend
+        seasonal = season[t % m]
+
+        error = np.where(update, obs - base * seasonal, 0.0)
+        sse += error**2
+        level = np.where(first, obs, np.where(update, base + alpha * error / seasonal, level))
+        trend = trend + alpha * beta * error / seasonal
+        step = np.where(update & (base > 0), gamma * error / base, 0.0)
+        season[t % m] = np.maximum(seasonal + step, _MIN_SEASON)
+        seen += valid
+
+    steps = np.arange(1, periods + 1)
+    forecast = (level[..., None] + trend[..., None] * steps) * np.moveaxis(
+        season[(n_obs - 1 + steps) % m], 0, -1
+    )
+    return forecast, sse
+
+
+def _croston_fit(
+    values: np.ndarray,
+    periods: int,
+    alpha: np.ndarray,
+    factor: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Croston's method for intermittent demand.
+
+    Demand sizes and the intervals between demands are smoothed separately
+    and only updated in periods with demand; the forecast is their ratio
+    times ``factor`` (``1 - alpha / 2`` for the Syntetos-Boylan
+    approximation).  Periods before the first demand are forecast as zero.
+    """
+    n_series, n_obs = values.shape
+    shape = np.broadcast_shapes((n_series, 1), np.shape(alpha))
+    size = np.full(shape, np.nan)
+    interval = np.full(shape, np.nan)
+    waited = np.zeros((n_series, 1))
+    sse = np.zeros(shape)
+
+    for t in range(n_obs):
+        obs = values[:, t : t + 1]
+        valid = ~np.isnan(obs)
+        fitted = np.nan_to_num(factor * size / interval)
+        sse += np.where(valid, obs - fitted, 0.0) ** 2
+        waited += valid
+        demand = valid & (obs > 0)
+        first = demand & np.isnan(size)
+        size = np.where(first, obs, np.where(demand, size + alpha * (obs - size), size))
+        interval = np.where(
+            first, waited, np.where(demand, interval + alpha * (waited - interval), interval)
+        )
+        waited = np.where(demand, 0.0, waited)
+
+    level = np.nan_to_num(factor * size / interval)
+    level = np.where(np.isnan(values).all(axis=1, keepdims=True), np.nan, level)
+    return np.repeat(level[..., None], periods, axis=-1), sse
+
+
+def _seasonal_naive_fit(
+    values: np.ndarray, periods: int, m: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Repeat the last ``m`` observations (the last one without a season)."""
+    n_obs = values.shape[1]
+    if n_obs > m:
+        errors = values[:, m:] - values[:, :-m]
+        sse = np.nansum(errors**2, axis=1, keepdims=True)
+    else:
+        sse = np.zeros((len(values), 1))
+    steps = np.arange(periods)
+    columns = n_obs - m + steps % m
+    forecast = np.full((len(values), periods), np.nan)
+    inside = columns >= 0
+    forecast[:, inside] = values[:, columns[inside]]
+    return forecast[:, None, :], sse
+
+
+def _run(
+    model: str,
+    values: np.ndarray,
+    periods: int,
+    seasonal_periods: int | None,
+    params: Sequence[np.ndarray],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Forecasts ``(series, P, periods)`` and errors ``(series, P)`` of ``model``."""
+    if model == "ses":
+        return _holt_winters_fit(values, periods, None, params[0], 0.0, 0.0)
+    if model == "holt":
+        return _holt_winters_fit(values, periods, None, params[0], params[1], 0.0)
+    if model == "holt_winters_add":
+        return _holt_winters_fit(values, periods, seasonal_periods, *params)
+    if model == "holt_winters_mul":
+        return _multiplicative_fit(values, periods, seasonal_periods, *params)
+    if model == "croston":
+        return _croston_fit(values, periods, params[0], 1.0)
+    if model == "sba":
+        return _croston_fit(values, periods, params[0], 1 - np.asarray(params[0]) / 2)
+    return _seasonal_naive_fit(values, periods, seasonal_periods or 1)
+
+
+def _fit(
+    model: str,
+    values: np.ndarray,
+    periods: int,
+    seasonal_periods: int | None,
+    batch_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Grid-search ``model`` per series.
+
+    Returns the ``(series, periods)`` forecasts and ``(series, k)``
+    parameters with the lowest in-sample error.  Series the model cannot
+    fit are forecast as ``NaN``.
+    """
+    names = MODEL_PARAMS[model]
+    if names:
+        grid = np.array(np.meshgrid(*(_GRIDS[name] for name in names), indexing="ij"))
+        grid = grid.reshape(len(names), -1)
+    else:
+        grid = np.empty((0, 1))
+    width = max(grid.shape[1], 1) * (seasonal_periods or 1)
+    step = max(1, batch_size // width)
+    forecasts = np.empty((len(values), periods))
+    params = np.empty((len(values), len(names)))
+    for lo in range(0, len(values), step):
+        forecast, sse = _run(model, values[lo : lo + step], periods, seasonal_periods, grid)
+        best = sse.argmin(axis=1)
+        rows = np.arange(len(best))
+        chosen = forecast[rows, best]
+        chosen[~np.isfinite(sse[rows, best])] = np.nan
+        forecasts[lo : lo + step] = chosen
+        params[lo : lo + step] = grid[:, best].T
+    return forecasts, params
+
+
+def _forecast_fixed(
+    model: str,
+    values: np.ndarray,
+    periods: int,
+    seasonal_periods: int | None,
+    params: np.ndarray,
+) -> np.ndarray:
+    """Forecast every series with its own ``(series, k)`` parameters."""
+    forecast, _ = _run(model, values, periods, seasonal_periods, list(params.T[..., None]))
+    return forecast[:, 0]
+
+
+def _align(series: Sequence[np.ndarray]) -> np.ndarray:
+    """Right-align 1-D series into a ``NaN``-padded ``(series, time)`` array."""
+    width = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    for row, values in zip(matrix, series):
+        row[width - len(values) :] = values
+    return matrix
+
+
+def _select_chunk(
+    chunk: Sequence[np.ndarray],
+    periods: int,
+    seasonal_periods: int | None,
+    models: Sequence[str],
+    folds: int,
+    horizon: int,
+    batch_size: int = 2_000_000,
+) -> tuple[list[str], list[np.ndarray], np.ndarray, np.ndarray]:
+    """Cross-validate ``models`` on every series of ``chunk`` and forecast.
+
+    Runs inside worker processes on plain arrays.  Returns the chosen model
+    and parameters, the cross-validated RMSE and the ``(series, periods)``
+    forecasts.  Series too short for any fold fall back to the first model.
+    """
+    values = _align(chunk)
+    n_obs = values.shape[1]
+    origins = [n_obs - horizon * (folds - fold) for fold in range(folds)]
+    origins = [origin for origin in origins if origin >= 2]
+    errors = np.full((len(values), len(models)), np.inf)
+    for j, model in enumerate(models):
+        total = np.zeros(len(values))
+        count = np.zeros(len(values))
+        failed = np.zeros(len(values), dtype=bool)
+        for origin in origins:
+            actual = values[:, origin : origin + horizon]
+            observed = ~np.isnan(actual)
+            scored = observed.any(axis=1)
+            forecast, _ = _fit(model, values[:, :origin], horizon, seasonal_periods, batch_size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mse = np.where(observed, (forecast - actual) ** 2, 0.0).sum(axis=1)
+                mse /= observed.sum(axis=1)
+            # A model that cannot forecast a scored fold is never chosen.
+            failed |= scored & ~np.isfinite(mse)
+            total += np.where(scored, mse, 0.0)
+            count += scored
+        usable = (count > 0) & ~failed
+        errors[usable, j] = np.sqrt(total[usable] / count[usable])
+
+    choice = errors.argmin(axis=1)
+    cv_rmse = errors[np.arange(len(values)), choice]
+    forecasts = np.full((len(values), periods), np.nan)
+    params: list[np.ndarray] = [np.empty(0)] * len(values)
+    for j, model in enumerate(models):
+        rows = np.flatnonzero(choice == j)
+        if not len(rows):
+            continue
+        forecast, fitted = _fit(model, values[rows], periods, seasonal_periods, batch_size)
+        forecasts[rows] = forecast
+        for row, row_params in zip(rows, fitted):
+            params[row] = row_params
+    return [models[j] for j in choice], params, cv_rmse, forecasts
+
+
+def _series_hash(values: np.ndarray, settings: str) -> str:
+    """Cache key of a resampled series under the selection ``settings``."""
+    digest = hashlib.blake2b(settings.encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _load_cache(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _save_cache(path: Path, entries: dict[str, dict[str, Any]]) -> None:
+    # Written to a temporary file first so an interrupted run keeps the old cache.
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(entries, fh)
+    os.replace(tmp, path)
+
+
+def select_forecast_models(
+    df: pd.DataFrame,
+    key_cols: str | Iterable[str],
+    date_col: str,
+    quantity_col: str,
+    periods: int,
+    *,
+    seasonal_periods: int | None = None,
+    models: Sequence[str] = MODELS,
+    folds: int = 3,
+    horizon: int | None = None,
+    freq: str = "D",
+    cache: str | Path | MutableMapping[str, dict[str, Any]] | None = None,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+) -> pd.DataFrame:
+    """Pick the best forecasting model per series and forecast with it.
+
+    Series are built as in
+    :func:`~inventory.demand_forecasting.forecast_demand_many` (summed per
+    key and date, resampled to ``freq`` with missing periods as zero).
+    Every candidate in ``models`` is backtested with rolling origins: for
+    each of the last ``folds`` windows of ``horizon`` periods the model is
+    fitted on the history before the window, and the model with the lowest
+    root mean squared error over the windows is refitted on the whole
+    series.
+    Chunks of series are selected on a process pool.
+
+    Parameters
+    ----------
+    df:
+        Transaction level data, e.g. one row per sale.
+    key_cols:
+        Column or columns identifying a series.
+    date_col, quantity_col:
+        Columns representing the sale date and quantity sold.
+    periods:
+        Number of future periods to forecast for every series.
+    seasonal_periods:
+        Length of the seasonal cycle used by the Holt-Winters and seasonal
+        naive models.  Without it the Holt-Winters models are skipped and
+        ``"seasonal_naive"`` repeats the last observation.
+    models:
+        Candidates out of :data:`MODELS`.  Ties go to the earlier model, and
+        series too short to backtest use the first one.
+    folds, horizon:
+        Number of backtest windows and their length (``periods`` by
+        default).
+    freq:
+        Frequency each series is resampled to before fitting.
+    cache:
+        Mapping from series hash to the selected model, or the path of a
+        JSON file holding one.  Series whose resampled history and settings
+        hash to a cached entry are forecast with the stored parameters
+        without backtesting.  A file cache is rewritten with the entries of
+        this run only, so series that changed or disappeared drop out of it.
+    max_workers, chunksize:
+        Worker processes and series per task, as in
+        :func:`~inventory.demand_forecasting.forecast_demand_many`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Long format forecasts with one row per series and period:
+        ``key_cols``, ``date_col`` and ``forecast`` plus the chosen
+        ``model``, its cross-validated ``cv_rmse`` (``inf`` when the series
+        was too short to backtest) and whether it came from the ``cache``.
+    """
+    key_cols = [key_cols] if isinstance(key_cols, str) else list(key_cols)
+    for col in (*key_cols, date_col, quantity_col):
+        if col not in df.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+    if periods <= 0:
+        raise ValueError("periods must be positive")
+    if folds <= 0:
+        raise ValueError("folds must be positive")
+    horizon = periods if horizon is None else horizon
+    if horizon <= 0:
+        raise ValueError("horizon must be positive")
+    if seasonal_periods is not None and seasonal_periods < 2:
+        raise ValueError("seasonal_periods must be at least 2")
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        raise ValueError(f"unknown models {sorted(unknown)}; expected some of {MODELS}")
+    models = tuple(
+        model for model in models if seasonal_periods or model not in SEASONAL_MODELS
+    )
+    if not models:
+        raise ValueError("no candidate models left")
+
+    columns = [*key_cols, date_col, "forecast", "model", "cv_rmse", "cached"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    offset = pd.tseries.frequencies.to_offset(freq)
+    keys, indexes, series = [], [], []
+    for key, dates, values in _split_series(df, key_cols, date_col, quantity_col):
+        resampled = pd.Series(values, index=pd.DatetimeIndex(dates)).asfreq(freq, fill_value=0)
+        keys.append(key)
+        indexes.append(
+            pd.date_range(resampled.index[-1] + offset, periods=periods, freq=offset)
+        )
+        series.append(resampled.to_numpy(dtype=float))
+
+    path = Path(cache) if isinstance(cache, (str, Path)) else None
+    entries = _load_cache(path) if path is not None else cache
+    settings = json.dumps([list(models), folds, horizon, seasonal_periods, freq])
+    hashes = [_series_hash(values, settings) for values in series]
+    hits = [i for i, digest in enumerate(hashes) if entries is not None and digest in entries]
+    misses = [i for i, digest in enumerate(hashes) if entries is None or digest not in entries]
+
+    chosen: list[str] = [""] * len(series)
+    cv_rmse = np.full(len(series), np.inf)
+    forecasts = np.full((len(series), periods), np.nan)
+    for model in models:
+        rows = [i for i in hits if entries[hashes[i]]["model"] == model]
+        if not rows:
+            continue
+        params = np.array([entries[hashes[i]]["params"] for i in rows], dtype=float)
+        params = params.reshape(len(rows), len(MODEL_PARAMS[model]))
+        forecasts[rows] = _forecast_fixed(
+            model, _align([series[i] for i in rows]), periods, seasonal_periods, params
+        )
+        for i in rows:
+            chosen[i] = model
+            cv_rmse[i] = entries[hashes[i]]["cv_rmse"]
+
+    if misses:
+        workers = max_workers or os.cpu_count() or 1
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(misses) / (workers * 4)))
+        chunks = [misses[i : i + chunksize] for i in range(0, len(misses), chunksize)]
+        select = partial(
+            _select_chunk,
+            periods=periods,
+            seasonal_periods=seasonal_periods,
+            models=models,
+            folds=folds,
+            horizon=horizon,
+        )
+        arrays = [[series[i] for i in chunk] for chunk in chunks]
+        if workers == 1 or len(chunks) == 1:
+            results = [select(chunk) for chunk in arrays]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(select, arrays))
+        for chunk, (names, params, errors, forecast) in zip(chunks, results):
+            forecasts[chunk] = forecast
+            cv_rmse[chunk] = errors
+            for i, name, row_params, error in zip(chunk, names, params, errors):
+                chosen[i] = name
+                if entries is not None:
+                    entries[hashes[i]] = {
+                        "model": name,
+                        "params": [float(value) for value in row_params],
+                        "cv_rmse": float(error),
+                    }
+    if path is not None:
+        _save_cache(path, {digest: entries[digest] for digest in hashes})
+
+    cached = np.zeros(len(series), dtype=bool)
+    cached[hits] = True
+    out = pd.DataFrame([key for key in keys for _ in range(periods)], columns=key_cols)
+    out[date_col] = np.concatenate([index.to_numpy() for index in indexes])
+    out["forecast"] = forecasts.ravel()
+    out["model"] = np.repeat(chosen, periods)
+    out["cv_rmse"] = np.repeat(cv_rmse, periods)
+    out["cached"] = np.repeat(cached, periods)
+    return out
@@ -0,0 +1,368 @@
+"""Daily on-hand stock reconstructed from receipts and sales.
+
+The archive only holds two stock counts, at the start (BegInv) and end
+(EndInv) of the year.  :func:`reconstruct_on_hand` replays every receipt
+(``ReceivingDate``/``Quantity`` of Purchases) and sale
+(``SalesDate``/``SalesQuantity`` of Sales) as a signed event on top of the
+beginning count: events are coded as ``sku * periods + day``, sorted once,
+summed per SKU and day and cumulatively summed within each SKU.
+
+The result is kept compressed: a SKU's stock only changes on days with
+events, so :class:`OnHandHistory` stores the level after each change in a
+CSR-like layout (``indptr``, ``days``, ``levels``) rather than a dense
+SKUs × days matrix.  Turnover, days of supply and stockout days are
+computed from those runs directly.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_members, iter_dataset
+from .store import NAT_DAY, MappedTable, iter_blocks
+from .utils import KeyCodes, as_dates, find_dataset
+
+#: Event columns of each dataset: date column, quantity column and sign.
+EVENTS = {
+    "beginning_inventory": ("startDate", "onHand", 1),
+    "purchases": ("ReceivingDate", "Quantity", 1),
+    "sales": ("SalesDate", "SalesQuantity", -1),
+}
+
+#: Datasets replayed by :func:`reconstruct_on_hand`, by schema name.
+ON_HAND_DATASETS = tuple(EVENTS)
+
+
+class OnHandHistory:
+    """Compressed daily on-hand stock per SKU.
+
+    The stock of SKU ``i`` is ``levels[indptr[i] + k]`` from day
+    ``days[indptr[i] + k]`` (counted from ``start``) up to the next change,
+    and zero before its first event.  Levels are end-of-day stock and may
+    be negative where recorded sales exceed the recorded stock.
+
+    Parameters
+    ----------
+    skus:
+        SKU keys, one per row.
+    start:
+        Date of day ``0``.
+    periods:
+        Number of days covered.
+    indptr, days, levels:
+        Change points of every SKU, ``indptr`` holding ``len(skus) + 1``
+        offsets into ``days`` and ``levels``.
+    sold:
+        Units sold per SKU within the window.
+    """
+
+    def __init__(
+        self,
+        skus: pd.Index,
+        start: pd.Timestamp,
+        periods: int,
+        indptr: np.ndarray,
+        days: np.ndarray,
+        levels: np.ndarray,
+        sold: np.ndarray,
+    ) -> None:
+        self.skus = skus
+        self.start = pd.Timestamp(start)
+        self.periods = periods
+        self.indptr = indptr
+        self.days = days
+        self.levels = levels
+        self.sold = sold
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def __repr__(self) -> str:
+        return (
+            f"OnHandHistory(skus={len(self)}, start={self.start.date()}, "
+            f"periods={self.periods}, changes={len(self.days)})"
+        )
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        """The days covered, ``start`` onwards."""
+        return pd.date_range(self.start, periods=self.periods, freq="D")
+
+    def _rows(self, skus: Iterable[Any] | None) -> np.ndarray:
+        if skus is None:
+            return np.arange(len(self))
+        skus = list(skus)
+        rows = self.skus.get_indexer(skus)
+        if (rows < 0).any():
+            raise KeyError(f"{skus[int(np.argmin(rows))]!r} not in history")
+        return rows
+
+    def to_dense(self, skus: Iterable[Any] | None = None) -> np.ndarray:
+        """Daily stock as a ``(skus, periods)`` array.
+
+        A full-year matrix of every SKU is large; pass ``skus`` to expand
+        only some of them.
+        """
+        rows = self._rows(skus)
+        counts = self.indptr[rows + 1] - self.indptr[rows]
+        position = np.repeat(np.arange(len(rows)), counts)
+        changes = np.repeat(self.indptr[rows] - (np.cumsum(counts) - counts), counts)
+        changes += np.arange(len(changes))
+        # Each change adds its step to the days from its own day onwards.
+        previous = np.r_[0, self.levels[:-1]]
+        previous[self.indptr[:-1][np.diff(self.indptr) > 0]] = 0
+        dense = np.zeros((len(rows), self.periods), dtype=self.levels.dtype)
+        steps = (self.levels - previous)[changes]
+        np.add.at(dense, (position, self.days[changes]), steps)
+        return np.cumsum(dense, axis=1)
+
+    def to_frame(self, skus: Iterable[Any]) -> pd.DataFrame:
+        """Daily stock of ``skus``, one column per SKU."""
+        skus = list(skus)
+        return pd.DataFrame(self.to_dense(skus).T, index=self.dates, columns=skus)
+
+    def metrics(self) -> pd.DataFrame:
+        """Stock performance per SKU over the window.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per SKU with ``avg_on_hand`` (mean end-of-day stock,
+            negative levels counted as zero), ``end_on_hand``, ``units_sold``,
+            ``turnover`` (units sold / average stock, ``NaN`` without any
+            stock), ``days_of_supply`` (ending stock / average daily sales,
+            ``inf`` without sales) and ``stockout_days``
+            (days with nothing on hand, including days before the SKU's
+            first receipt).
+        """
+        counts = np.diff(self.indptr)
+        owner = np.repeat(np.arange(len(self)), counts)
+        following = np.r_[self.days[1:], 0]
+        last = np.zeros(len(self.days), dtype=bool)
+        last[self.indptr[1:][counts > 0] - 1] = True
+        duration = np.where(last, self.periods, following) - self.days
+
+        held = np.maximum(self.levels, 0) * duration
+        avg_on_hand = np.bincount(owner, weights=held, minlength=len(self)) / self.periods
+        empty = np.bincount(
+            owner, weights=np.where(self.levels <= 0, duration, 0), minlength=len(self)
+        )
+        first_day = np.full(len(self), self.periods)
+        first_day[counts > 0] = self.days[self.indptr[:-1][counts > 0]]
+        end_on_hand = np.zeros(len(self), dtype=self.levels.dtype)
+        end_on_hand[counts > 0] = self.levels[self.indptr[1:][counts > 0] - 1]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            turnover = self.sold / avg_on_hand
+            days_of_supply = np.maximum(end_on_hand, 0) / (self.sold / self.periods)
+        return pd.DataFrame(
+            {
+                self.skus.name or "sku": self.skus.to_numpy(),
+                "avg_on_hand": avg_on_hand,
+                "end_on_hand": end_on_hand,
+                "units_sold": self.sold,
+                "turnover": np.where(avg_on_hand > 0, turnover, np.nan),
+                "days_of_supply": np.where(self.sold > 0, days_of_supply, np.inf),
+                "stockout_days": (empty + first_day).astype(np.int64),
+            }
+        )
+
+
+class _EventLog:
+    """Signed stock events collected chunk by chunk."""
+
+    def __init__(self, key_col: str) -> None:
+        self.keys = KeyCodes(key_col)
+        self.skus: list[np.ndarray] = []
+        self.days: list[np.ndarray] = []
+        self.quantities: list[np.ndarray] = []
+        self.sales: list[np.ndarray] = []
+
+    def _add(self, dataset: str, codes: np.ndarray, days: np.ndarray, quantity: Any) -> None:
+        _, _, sign = EVENTS[dataset]
+        quantity = np.asarray(quantity)
+        valid = (codes >= 0) & (days != NAT_DAY)
+        if quantity.dtype.kind == "f":
+            valid &= ~np.isnan(quantity)
+        self.skus.append(codes[valid].astype(np.int64))
+        self.days.append(days[valid].astype(np.int64))
+        self.quantities.append(sign * quantity[valid].astype(np.int64))
+        self.sales.append(np.full(int(valid.sum()), dataset == "sales"))
+
+    def update(self, dataset: str, df: pd.DataFrame | MappedTable) -> None:
+        """Add the events of one of :data:`ON_HAND_DATASETS`."""
+        key_col = self.keys.index.name
+        date_col, quantity_col, _ = EVENTS[dataset]
+        for col in (key_col, date_col, quantity_col):
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        if isinstance(df, MappedTable):
+            dictionary = df.dictionary(key_col)
+            keys, dates, quantity = (df.array(col) for col in (key_col, date_col, quantity_col))
+            for rows in iter_blocks(len(df)):
+                codes = self.keys.encode(dictionary, np.asarray(keys[rows]))
+                self._add(dataset, codes, np.asarray(dates[rows]), quantity[rows])
+            return
+        dates = as_dates(df[date_col]).to_numpy(dtype="datetime64[D]")
+        days = np.where(np.isnat(dates), NAT_DAY, dates.astype(np.int64))
+        self._add(dataset, self.keys.encode(df[key_col]), days, df[quantity_col].to_numpy())
+
+    def history(self, start: Any = None, end: Any = None) -> OnHandHistory:
+        """Replay the events between ``start`` and ``end`` (inclusive).
+
+        Events before ``start`` are netted per SKU into an opening balance on
+        day ``0``; events after ``end`` are ignored.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        sku = np.concatenate([empty, *self.skus])
+        day = np.concatenate([empty, *self.days])
+        quantity = np.concatenate([empty, *self.quantities])
+        sale = np.concatenate([np.empty(0, dtype=bool), *self.sales])
+        if (start is None or end is None) and not len(day):
+            raise ValueError("no stock events to replay")
+        first = int(day.min()) if start is None else _day_number(start)
+        last = int(day.max()) if end is None else _day_number(end)
+        if last < first:
+            raise ValueError("end must not be before start")
+        periods = last - first + 1
+
+        n_skus = len(self.keys)
+        before = day < first
+        opening = np.bincount(sku[before], weights=quantity[before], minlength=n_skus)
+        carried = np.flatnonzero(opening)
+        inside = (day >= first) & (day <= last)
+        sku = np.r_[carried, sku[inside]]
+        day = np.r_[np.zeros(len(carried), dtype=np.int64), day[inside] - first]
+        quantity = np.r_[opening[carried].astype(np.int64), quantity[inside]]
+        sale = np.r_[np.zeros(len(carried), dtype=bool), sale[inside]]
+        sold = np.bincount(sku[sale], weights=-quantity[sale], minlength=n_skus).astype(np.int64)
+
+        # Sort once by SKU and day, then net the events of each SKU-day.
+        flat = sku * periods + day
+        order = np.argsort(flat, kind="stable")
+        flat = flat[order]
+        starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]][: len(flat)])
+        net = np.add.reduceat(quantity[order], starts) if len(starts) else empty
+        flat = flat[starts]
+        owner = flat // periods
+
+        # Running stock within each SKU: the global running total minus the
+        # total of the SKUs before it.
+        running = np.cumsum(net)
+        first_change = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]][: len(owner)])
+        lengths = np.diff(np.r_[first_change, len(owner)])
+        levels = running - np.repeat(running[first_change] - net[first_change], lengths)
+        indptr = np.zeros(n_skus + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=n_skus), out=indptr[1:])
+        return OnHandHistory(
+            self.keys.index,
+            pd.Timestamp(np.datetime64(first, "D")),
+            periods,
+            indptr,
+            (flat % periods).astype(np.int32),
+            levels,
+            sold,
+        )
+
+
+def _day_number(value: Any) -> int:
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def reconstruct_on_hand(
+    datasets: Mapping[str, pd.DataFrame | MappedTable],
+    *,
+    start: Any = None,
+    end: Any = None,
+    key_col: str = "InventoryId",
+) -> OnHandHistory:
+    """Daily on-hand stock of every SKU from loaded datasets.
+
+    Parameters
+    ----------
+    datasets:
+        Mapping as returned by :func:`~inventory.datasets.load_datasets`
+        (including a store directory) with the BegInv, Purchases and Sales
+        datasets.  EndInv, when present, sets the default ``end``.
+    start, end:
+        First and last day replayed.  By default the window runs from the
+        earliest event (normally the BegInv ``startDate``) to the EndInv
+        ``endDate``, or to the last event without EndInv.  Events before
+        ``start`` are carried in as each SKU's opening stock.
+    key_col:
+        Column identifying a SKU.
+
+    Returns
+    -------
+    OnHandHistory
+        Compressed daily stock; :meth:`OnHandHistory.metrics` gives
+        turnover, days of supply and stockout days per SKU.
+    """
+    log = _EventLog(key_col)
+    for name in ON_HAND_DATASETS:
+        log.update(name, find_dataset(datasets, name))
+    if end is None:
+        try:
+            counts = find_dataset(datasets, "ending_inventory")
+        except KeyError:
+            counts = None
+        if counts is not None and "endDate" in counts.columns:
+            end = _last_date(counts)
+    return log.history(start, end)
+
+
+def _last_date(df: pd.DataFrame | MappedTable) -> Any:
+    if isinstance(df, MappedTable):
+        days = np.asarray(df.array("endDate"))
+        days = days[days != NAT_DAY]
+        return np.datetime64(int(days.max()), "D") if len(days) else None
+    return as_dates(df["endDate"]).max() if len(df) else None
+
+
+def reconstruct_on_hand_from_zip(
+    zip_path: str | Path,
+    *,
+    start: Any = None,
+    end: Any = None,
+    chunksize: int = 500_000,
+    key_col: str = "InventoryId",
+) -> OnHandHistory:
+    """Stream the BegInv, Purchases and Sales members of ``zip_path``.
+
+    Only the key, date and quantity columns are parsed, ``chunksize`` rows
+    at a time; the events are kept as compact integer arrays.  See
+    :func:`reconstruct_on_hand` for the window and result.
+    """
+    members: dict[str, list[str]] = {}
+    for dataset, name in dataset_members(zip_path, (*ON_HAND_DATASETS, "ending_inventory")):
+        members.setdefault(dataset, []).append(name)
+    for dataset in ON_HAND_DATASETS:
+        if dataset not in members:
+            raise FileNotFoundError(f"no {dataset!r} member in {zip_path!r}")
+
+    log = _EventLog(key_col)
+    for dataset in ON_HAND_DATASETS:
+        date_col, quantity_col, _ = EVENTS[dataset]
+        for member in members[dataset]:
+            for chunk in iter_dataset(
+                zip_path,
+                member,
+                chunksize=chunksize,
+                usecols=[key_col, date_col, quantity_col],
+                typed=True,
+            ):
+                log.update(dataset, chunk)
+    if end is None:
+        ends = [
+            _last_date(chunk)
+            for member in members.get("ending_inventory", [])
+            for chunk in iter_dataset(
+                zip_path, member, chunksize=chunksize, usecols=["endDate"], typed=True
+            )
+        ]
+        ends = [value for value in ends if value is not None and not pd.isna(value)]
+        end = max(ends) if ends else None
+    return log.history(start, end)
@@ -0,0 +1,294 @@
+"""End-to-end inventory policy computation.
+
+:class:`InventoryPolicyEngine` derives a complete replenishment policy per
+SKU (``InventoryId``) from the Sales, Purchases, PurchasePrices and EndInv
+datasets: annual demand and its daily variability, per-vendor lead time
+statistics, EOQ, service-level safety stock, reorder point and ABC class.
+The archive is read once and every dataset is mapped onto a shared SKU key
+index, so all measures are computed with array aggregations and a single
+final table instead of separate loads and hand-made joins.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .abc_analysis import classify_inventory
+from .datasets import dataset_members, load_datasets
+from .eoq import calculate_eoqs
+from .reorder_point import calculate_reorder_points, calculate_safety_stock
+from .utils import as_dates, find_dataset
+
+#: Datasets required by the engine, by schema name.
+REQUIRED_DATASETS = ("sales", "purchases", "purchase_prices", "ending_inventory")
+
+
+class InventoryPolicyEngine:
+    """Compute ABC class, EOQ, safety stock and reorder point per SKU.
+
+    Parameters
+    ----------
+    datasets:
+        Mapping of dataset name to frame as returned by
+        :func:`~inventory.datasets.load_datasets`.  Frames are identified by
+        their file name, e.g. ``"SalesFINAL12312016"``.
+    order_cost:
+        Cost of placing one order, used for EOQ.
+    holding_rate:
+        Annual holding cost as a fraction of the unit purchase cost.
+    service_level:
+        Target cycle service level for safety stock.
+    a_threshold, b_threshold:
+        Cumulative value cut-offs for the ABC classes.
+    days_per_year:
+        Days used to annualise demand observed in the sales window.
+    """
+
+    def __init__(
+        self,
+        datasets: Mapping[str, pd.DataFrame],
+        *,
+        order_cost: float = 50.0,
+        holding_rate: float = 0.25,
+        service_level: float = 0.95,
+        a_threshold: float = 0.8,
+        b_threshold: float = 0.95,
+        days_per_year: int = 365,
+    ) -> None:
+        if order_cost <= 0:
+            raise ValueError("order_cost must be positive")
+        if holding_rate <= 0:
+            raise ValueError("holding_rate must be positive")
+        if not 0 < service_level < 1:
+            raise ValueError("service_level must be between 0 and 1")
+
+        self.sales = find_dataset(datasets, "sales")
+        self.purchases = find_dataset(datasets, "purchases")
+        self.prices = find_dataset(datasets, "purchase_prices")
+        self.inventory = find_dataset(datasets, "ending_inventory")
+        self.order_cost = order_cost
+        self.holding_rate = holding_rate
+        self.service_level = service_level
+        self.a_threshold = a_threshold
+        self.b_threshold = b_threshold
+        self.days_per_year = days_per_year
+
+        self.skus = pd.Index(
+            pd.unique(
+                np.concatenate(
+                    [
+                        np.asarray(df["InventoryId"], dtype=object)
+                        for df in (self.sales, self.purchases, self.inventory)
+                    ]
+                )
+            ),
+            name="InventoryId",
+        )
+
+    @classmethod
+    def from_zip(cls, zip_path: str | Path, **kwargs: Any) -> "InventoryPolicyEngine":
+        """Load the required members of ``zip_path`` once and build an engine.
+
+        Members are recognised by their file name and loaded with the typed
+        schemas of :mod:`inventory.schemas`.  Keyword arguments are passed to
+        the constructor.
+        """
+        members = [member for _, member in dataset_members(zip_path, REQUIRED_DATASETS)]
+        return cls(
+            load_datasets(zip_path, files=members, typed=True, materialize=True), **kwargs
+        )
+
+    def _codes(self, column: pd.Series) -> np.ndarray:
+        """Positions of ``column`` values in the shared SKU index."""
+        return self.skus.get_indexer(np.asarray(column, dtype=object))
+
+    def _daily_demand(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Units sold per SKU and day of the sales window.
+
+        Returns the SKU codes, the day offsets from the first sales date and
+        the summed quantities, one entry per SKU and day with sales.  Rows
+        without a sales date or a known SKU are skipped.
+        """
+        dates = as_dates(self.sales["SalesDate"])
+        codes = self._codes(self.sales["InventoryId"])
+        valid = dates.notna().to_numpy() & (codes >= 0)
+        days = (dates - dates.min()).dt.days.to_numpy()[valid].astype(np.int64)
+        quantity = self.sales["SalesQuantity"].to_numpy(dtype=float)[valid]
+        daily = pd.Series(quantity).groupby([codes[valid], days]).sum()
+        return (
+            daily.index.get_level_values(0).to_numpy(),
+            daily.index.get_level_values(1).to_numpy(),
+            daily.to_numpy(),
+        )
+
+    def _demand(self) -> tuple[np.ndarray, np.ndarray]:
+        """Mean and standard deviation of daily demand per SKU.
+
+        Days without sales inside the observed sales window count as zero
+        demand.
+        """
+        sku, days, sums = self._daily_demand()
+        n_days = int(days.max()) + 1 if len(days) else 1
+        size = len(self.skus)
+        total = np.bincount(sku, weights=sums, minlength=size)
+        squares = np.bincount(sku, weights=sums**2, minlength=size)
+        mean = total / n_days
+        variance = np.maximum(squares / n_days - mean**2, 0.0)
+        return mean, np.sqrt(variance)
+
+    def demand_history(self, dtype: Any = np.float32) -> np.ndarray:
+        """Daily demand per SKU over the observed sales window.
+
+        Returns
+        -------
+        numpy.ndarray
+            Matrix with one row per SKU (in the order of :attr:`skus`) and
+            one column per day, zero on days without sales.
+        """
+        sku, days, sums = self._daily_demand()
+        n_days = int(days.max()) + 1 if len(days) else 1
+        history = np.zeros((len(self.skus), n_days), dtype=dtype)
+        history[sku, days] = sums
+        return history
+
+    def vendor_lead_times(self) -> dict[int, np.ndarray]:
+        """Observed lead times in days of every vendor's purchase lines."""
+        purchases = self.purchases
+        lead_times = (
+            as_dates(purchases["ReceivingDate"]) - as_dates(purchases["PODate"])
+        ).dt.days
+        valid = lead_times.notna().to_numpy()
+        grouped = pd.Series(lead_times.to_numpy()[valid]).groupby(
+            purchases["VendorNumber"].to_numpy()[valid]
+        )
+        return {int(vendor): days.to_numpy(dtype=np.int64) for vendor, days in grouped}
+
+    def _vendors(self) -> pd.DataFrame:
+        """Vendor and its lead time statistics for every SKU.
+
+        Each SKU uses the vendor of its most recent purchase order; vendor
+        lead times are measured from ``PODate`` to ``ReceivingDate``.
+        """
+        purchases = self.purchases
+        lead_times = (
+            as_dates(purchases["ReceivingDate"]) - as_dates(purchases["PODate"])
+        ).dt.days
+        stats = lead_times.groupby(purchases["VendorNumber"].to_numpy()).agg(["mean", "std"])
+        stats["std"] = stats["std"].fillna(0.0)
+
+        order = np.argsort(as_dates(purchases["PODate"]).to_numpy(), kind="stable")
+        latest = pd.DataFrame(
+            {
+                "sku": self._codes(purchases["InventoryId"])[order],
+                "vendor": purchases["VendorNumber"].to_numpy()[order],
+            }
+        ).drop_duplicates("sku", keep="last")
+
+        vendors = np.full(len(self.skus), np.nan)
+        vendors[latest["sku"].to_numpy()] = latest["vendor"].to_numpy()
+        if "VendorNo" in self.sales.columns:
+            sales_vendor = np.full(len(self.skus), np.nan)
+            codes = self._codes(self.sales["InventoryId"])
+            sales_vendor[codes] = self.sales["VendorNo"].to_numpy(dtype=float)
+            vendors = np.where(np.isnan(vendors), sales_vendor, vendors)
+
+        result = pd.DataFrame({"VendorNumber": vendors})
+        result["lead_time_days"] = stats["mean"].reindex(vendors).to_numpy()
+        result["lead_time_std"] = stats["std"].reindex(vendors).to_numpy()
+        result["VendorNumber"] = result["VendorNumber"].astype("Int64")
+        return result
+
+    def _brands(self) -> np.ndarray:
+        brands = np.full(len(self.skus), np.nan)
+        for df in (self.sales, self.purchases, self.inventory):
+            brands[self._codes(df["InventoryId"])] = df["Brand"].to_numpy(dtype=float)
+        return brands
+
+    def _unit_costs(self, brands: np.ndarray) -> np.ndarray:
+        """Unit purchase cost from the price list, else from purchase lines."""
+        price_list = self.prices.groupby("Brand")["PurchasePrice"].mean().astype(float)
+        costs = price_list.reindex(brands).to_numpy()
+        codes = self._codes(self.purchases["InventoryId"])
+        paid = np.bincount(
+            codes,
+            weights=self.purchases["PurchasePrice"].to_numpy(dtype=float),
+            minlength=len(self.skus),
+        )
+        lines = np.bincount(codes, minlength=len(self.skus))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fallback = np.where(lines > 0, paid / lines, np.nan)
+        return np.where(np.isnan(costs), fallback, costs)
+
+    def run(self) -> pd.DataFrame:
+        """Compute the policy table.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per ``InventoryId`` with ``Brand``, ``VendorNumber``,
+            ``on_hand``, ``daily_demand``, ``daily_demand_std``,
+            ``annual_demand``, ``lead_time_days``, ``lead_time_std``,
+            ``unit_cost``, ``holding_cost``, ``eoq``, ``safety_stock``,
+            ``reorder_point``, ``annual_value`` and ``abc_class``.  Measures
+            that cannot be derived (e.g. EOQ of an item without sales) are
+            ``NaN``.
+        """
+        daily_demand, daily_std = self._demand()
+        vendors = self._vendors()
+        brands = self._brands()
+        unit_cost = self._unit_costs(brands)
+        holding_cost = self.holding_rate * unit_cost
+        annual_demand = daily_demand * self.days_per_year
+
+        on_hand = np.zeros(len(self.skus))
+        on_hand[self._codes(self.inventory["InventoryId"])] = self.inventory["onHand"]
+
+        eoq, _ = calculate_eoqs(annual_demand, self.order_cost, holding_cost, errors="codes")
+        # Without a lead time neither safety stock nor reorder point is defined.
+        safety_stock = calculate_safety_stock(
+            daily_std,
+            vendors["lead_time_days"].to_numpy(dtype=float),
+            service_level=self.service_level,
+            daily_demand=daily_demand,
+            lead_time_std=np.nan_to_num(vendors["lead_time_std"].to_numpy()),
+        )
+        reorder_point, _ = calculate_reorder_points(
+            daily_demand,
+            vendors["lead_time_days"].to_numpy(dtype=float),
+            safety_stock=safety_stock,
+            errors="codes",
+        )
+
+        policy = pd.DataFrame(
+            {
+                "InventoryId": self.skus,
+                "Brand": pd.array(brands, dtype="Int64"),
+                "VendorNumber": vendors["VendorNumber"].array,
+                "on_hand": on_hand,
+                "daily_demand": daily_demand,
+                "daily_demand_std": daily_std,
+                "annual_demand": annual_demand,
+                "lead_time_days": vendors["lead_time_days"].to_numpy(),
+                "lead_time_std": vendors["lead_time_std"].to_numpy(),
+                "unit_cost": unit_cost,
+                "holding_cost": holding_cost,
+                "eoq": eoq,
+                "safety_stock": safety_stock,
+                "reorder_point": reorder_point,
+                "annual_value": np.nan_to_num(annual_demand * unit_cost),
+            }
+        )
+        policy["abc_class"] = "C"
+        valued = policy["annual_value"] > 0
+        if valued.any():
+            classified = classify_inventory(
+                policy.loc[valued, ["annual_value"]],
+                "annual_value",
+                a_threshold=self.a_threshold,
+                b_threshold=self.b_threshold,
+            )
+            policy.loc[classified.index, "abc_class"] = classified["category"]
+        return policy
@@ -0,0 +1,237 @@
+"""Reconciliation of inventory movements against the stock counts.
+
+For every SKU (``InventoryId``) the stock expected at the end of the period
+is the beginning count plus the units received minus the units sold.
+:class:`InventoryReconciler` compares it with the ending count and reports
+the discrepancy (negative for shrinkage) in units and dollars.
+
+The reconciler is an accumulator: the BegInv, Purchases, Sales and EndInv
+rows can be fed in chunks of any size and in any order.  SKU keys are
+mapped to dense integer codes once per chunk (on the distinct values only),
+and every measure is summed with :func:`numpy.bincount` into arrays indexed
+by those codes, so memory depends on the number of SKUs rather than rows.
+:func:`reconcile_inventory_from_zip` streams the archive members this way.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_members, iter_dataset, member_columns
+from .store import MappedTable, iter_blocks
+from .utils import KeyCodes, find_dataset
+
+#: Datasets read by the reconciliation, by schema name.
+RECONCILIATION_DATASETS = ("beginning_inventory", "purchases", "sales", "ending_inventory")
+
+#: Columns summed per SKU for each dataset, mapped to the accumulated measure.
+MEASURES = {
+    "beginning_inventory": {"onHand": "begin_on_hand"},
+    "purchases": {"Quantity": "received", "Dollars": "received_dollars"},
+    "sales": {"SalesQuantity": "sold"},
+    "ending_inventory": {"onHand": "end_on_hand"},
+}
+
+#: Optional shelf price of the stock counts, used to value SKUs never received.
+_PRICES = {"beginning_inventory": "begin_price", "ending_inventory": "end_price"}
+
+
+class InventoryReconciler:
+    """Accumulate inventory movements and counts per SKU.
+
+    Parameters
+    ----------
+    key_col:
+        Column identifying a SKU in every dataset.
+    """
+
+    def __init__(self, key_col: str = "InventoryId") -> None:
+        self.key_col = key_col
+        self._keys = KeyCodes(key_col)
+        names = [name for measures in MEASURES.values() for name in measures.values()]
+        self._totals = {name: np.zeros(0) for name in names}
+        self._prices = {name: np.full(0, np.nan) for name in _PRICES.values()}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _grow(self) -> None:
+        size = len(self._keys)
+        for arrays, fill in ((self._totals, 0.0), (self._prices, np.nan)):
+            for name, values in arrays.items():
+                if len(values) < size:
+                    arrays[name] = np.concatenate([values, np.full(size - len(values), fill)])
+
+    def _add(self, dataset: str, codes: np.ndarray, columns: Mapping[str, np.ndarray]) -> None:
+        self._grow()
+        present = codes >= 0
+        codes = codes[present]
+        for col, name in MEASURES[dataset].items():
+            weights = np.asarray(columns[col], dtype=float)[present]
+            # Blank quantities count as zero, as in a pandas group sum.
+            weights = np.where(np.isnan(weights), 0.0, weights)
+            self._totals[name] += np.bincount(codes, weights=weights, minlength=len(self))
+        price = _PRICES.get(dataset)
+        if price is not None and "Price" in columns:
+            prices = np.asarray(columns["Price"], dtype=float)[present]
+            known = ~np.isnan(prices)
+            self._prices[price][codes[known]] = prices[known]
+
+    def update(self, dataset: str, df: pd.DataFrame | MappedTable) -> "InventoryReconciler":
+        """Add the rows of one of :data:`RECONCILIATION_DATASETS`.
+
+        ``df`` may be a chunk of the dataset or a whole
+        :class:`~inventory.store.MappedTable`, which is read block by block.
+        """
+        if dataset not in MEASURES:
+            raise ValueError(f"dataset must be one of {RECONCILIATION_DATASETS}, got {dataset!r}")
+        for col in (self.key_col, *MEASURES[dataset]):
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        wanted = [*MEASURES[dataset], *(["Price"] if dataset in _PRICES else [])]
+        wanted = [col for col in wanted if col in df.columns]
+
+        if isinstance(df, MappedTable):
+            dictionary = df.dictionary(self.key_col)
+            keys = df.array(self.key_col)
+            arrays = {col: df.array(col) for col in wanted}
+            for rows in iter_blocks(len(df)):
+                codes = self._keys.encode(dictionary, np.asarray(keys[rows]))
+                self._add(dataset, codes, {col: arrays[col][rows] for col in wanted})
+            return self
+
+        codes = self._keys.encode(df[self.key_col])
+        self._add(dataset, codes, {col: df[col].to_numpy() for col in wanted})
+        return self
+
+    def merge(self, other: "InventoryReconciler") -> "InventoryReconciler":
+        """Add the totals collected by ``other`` to this reconciler."""
+        if other.key_col != self.key_col:
+            raise ValueError("reconcilers must use the same key column")
+        codes = self._keys.encode(other._keys.index)
+        self._grow()
+        for name, values in other._totals.items():
+            self._totals[name][codes] += values
+        for name, values in other._prices.items():
+            known = ~np.isnan(values)
+            self._prices[name][codes[known]] = values[known]
+        return self
+
+    def result(self) -> pd.DataFrame:
+        """Expected and counted ending stock per SKU.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per SKU seen in any dataset with ``begin_on_hand``,
+            ``received``, ``sold``, ``expected_on_hand`` (begin + received -
+            sold), ``end_on_hand``, ``discrepancy`` (counted - expected, so
+            shrinkage is negative), ``unit_cost`` and
+            ``discrepancy_dollars``.  The unit cost is the average purchase
+            cost of the SKU's receipts; SKUs never received are valued at
+            the shelf ``Price`` of the stock counts, or ``NaN`` without one.
+        """
+        totals = {
+            name: values.astype(np.int64)
+            for name, values in self._totals.items()
+            if name != "received_dollars"
+        }
+        expected = totals["begin_on_hand"] + totals["received"] - totals["sold"]
+        discrepancy = totals["end_on_hand"] - expected
+        with np.errstate(invalid="ignore", divide="ignore"):
+            unit_cost = self._totals["received_dollars"] / self._totals["received"]
+        shelf = np.where(
+            np.isnan(self._prices["end_price"]),
+            self._prices["begin_price"],
+            self._prices["end_price"],
+        )
+        unit_cost = np.where(self._totals["received"] > 0, unit_cost, shelf)
+        return pd.DataFrame(
+            {
+                self.key_col: self._keys.index.to_numpy(),
+                "begin_on_hand": totals["begin_on_hand"],
+                "received": totals["received"],
+                "sold": totals["sold"],
+                "expected_on_hand": expected,
+                "end_on_hand": totals["end_on_hand"],
+                "discrepancy": discrepancy,
+                "unit_cost": unit_cost,
+                "discrepancy_dollars": discrepancy * unit_cost,
+            }
+        )
+
+
+def reconcile_inventory(
+    datasets: Mapping[str, pd.DataFrame | MappedTable],
+    *,
+    key_col: str = "InventoryId",
+) -> pd.DataFrame:
+    """Reconcile loaded BegInv, Purchases, Sales and EndInv datasets.
+
+    ``datasets`` is a mapping as returned by
+    :func:`~inventory.datasets.load_datasets`, including a store directory.
+    See :meth:`InventoryReconciler.result` for the columns.
+    """
+    reconciler = InventoryReconciler(key_col)
+    for name in RECONCILIATION_DATASETS:
+        reconciler.update(name, find_dataset(datasets, name))
+    return reconciler.result()
+
+
+def _reconcile_member(
+    task: tuple[str, str],
+    zip_path: str | Path,
+    chunksize: int,
+    key_col: str,
+) -> InventoryReconciler:
+    """Stream one archive member into a fresh reconciler (runs in workers)."""
+    dataset, member = task
+    header = member_columns(zip_path, member)
+    usecols = [key_col, *MEASURES[dataset]]
+    if dataset in _PRICES and "Price" in header:
+        usecols.append("Price")
+    reconciler = InventoryReconciler(key_col)
+    for chunk in iter_dataset(zip_path, member, chunksize=chunksize, usecols=usecols, typed=True):
+        reconciler.update(dataset, chunk)
+    return reconciler
+
+
+def reconcile_inventory_from_zip(
+    zip_path: str | Path,
+    *,
+    chunksize: int = 500_000,
+    key_col: str = "InventoryId",
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Stream the members of ``zip_path`` through :class:`InventoryReconciler`.
+
+    Only the key, quantity, dollar and price columns are parsed, ``chunksize``
+    rows at a time, so the full-year Sales and Purchases files are never
+    held in memory.  Members are recognised by their file name and read in
+    parallel on ``max_workers`` processes (``None`` uses
+    :func:`os.cpu_count`, ``1`` reads them in the calling process); the
+    partial reconcilers are combined with :meth:`InventoryReconciler.merge`.
+    """
+    tasks = dataset_members(zip_path, MEASURES)
+    found = {dataset for dataset, _ in tasks}
+    for dataset in RECONCILIATION_DATASETS:
+        if dataset not in found:
+            raise FileNotFoundError(f"no {dataset!r} member in {zip_path!r}")
+
+    read = partial(_reconcile_member, zip_path=zip_path, chunksize=chunksize, key_col=key_col)
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        parts = [read(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            parts = list(pool.map(read, tasks))
+    reconciler = InventoryReconciler(key_col)
+    for part in parts:
+        reconciler.merge(part)
+    return reconciler.result()
@@ -1,11 +1,18 @@
 """Reorder point calculations."""
 from __future__ import annotations
 
+from enum import IntFlag
 from pathlib import Path
+from statistics import NormalDist
+from typing import Any
+
+import numpy as np
 import pandas as pd
 
+from .backends import column_names, to_pandas
 from .datasets import load_datasets
 
+
 def calculate_reorder_point(
     daily_demand: float,
     lead_time_days: float,
@@ -38,26 +45,193 @@ def calculate_reorder_point(
     return daily_demand * lead_time_days + safety_stock
 
 
+def calculate_safety_stock(
+    daily_demand_std: Any,
+    lead_time_days: Any,
+    *,
+    service_level: float = 0.95,
+    daily_demand: Any = 0.0,
+    lead_time_std: Any = 0.0,
+) -> float | np.ndarray:
+    """Safety stock covering demand and lead-time variability.
+
+    Uses ``z * sqrt(L * sigma_d**2 + d**2 * sigma_L**2)`` where ``z`` is the
+    standard normal quantile of the target cycle ``service_level``.
+
+    Parameters
+    ----------
+    daily_demand_std:
+        Standard deviation of daily demand.
+    lead_time_days:
+        Average lead time in days.
+    service_level:
+        Probability of not stocking out during a replenishment cycle.
+    daily_demand:
+        Average daily demand, only needed when ``lead_time_std`` is non-zero.
+    lead_time_std:
+        Standard deviation of the lead time in days.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Safety stock, with the shape of the broadcast inputs.
+    """
+    if not 0 < service_level < 1:
+        raise ValueError("service_level must be between 0 and 1")
+    daily_demand_std, lead_time_days, daily_demand, lead_time_std = (
+        np.asarray(values, dtype=float)
+        for values in (daily_demand_std, lead_time_days, daily_demand, lead_time_std)
+    )
+    for name, values in (
+        ("daily_demand_std", daily_demand_std),
+        ("lead_time_days", lead_time_days),
+        ("daily_demand", daily_demand),
+        ("lead_time_std", lead_time_std),
+    ):
+        if (values < 0).any():
+            raise ValueError(f"{name} cannot be negative")
+
+    z = NormalDist().inv_cdf(service_level)
+    variance = lead_time_days * daily_demand_std**2 + daily_demand**2 * lead_time_std**2
+    safety_stock = z * np.sqrt(variance)
+    return float(safety_stock) if safety_stock.ndim == 0 else safety_stock
+
+
+class ReorderPointError(IntFlag):
+    """Per-row error codes reported by :func:`calculate_reorder_points`.
+
+    Codes are bit flags; ``0`` marks a valid row.  ``MISSING`` marks a row
+    with a ``NaN`` input; it is only reported, never raised, and the reorder
+    point of such a row is ``NaN``.
+    """
+
+    DAILY_DEMAND = 1
+    LEAD_TIME = 2
+    SAFETY_STOCK = 4
+    MISSING = 8
+
+
+_ROP_MESSAGES = {
+    ReorderPointError.DAILY_DEMAND: "daily_demand cannot be negative",
+    ReorderPointError.LEAD_TIME: "lead_time_days cannot be negative",
+    ReorderPointError.SAFETY_STOCK: "safety_stock cannot be negative",
+}
+
+
+def calculate_reorder_points(
+    daily_demand: Any,
+    lead_time_days: Any,
+    *,
+    safety_stock: Any = 0.0,
+    errors: str = "raise",
+) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+    """Array-native reorder point calculation.
+
+    Parameters
+    ----------
+    daily_demand, lead_time_days, safety_stock:
+        NumPy arrays, pandas Series, Arrow arrays or scalars, broadcast
+        against each other.
+    errors:
+        ``"raise"`` raises :class:`ValueError` for the first invalid row.
+        ``"codes"`` returns the :class:`ReorderPointError` flags of every row
+        instead and sets the reorder point of invalid rows to ``NaN``.
+
+    Returns
+    -------
+    numpy.ndarray or tuple of numpy.ndarray
+        Reorder point per row, and with ``errors="codes"`` the per-row error
+        codes.
+    """
+    if errors not in ("raise", "codes"):
+        raise ValueError(f"errors must be 'raise' or 'codes', got {errors!r}")
+    # Arrow arrays implement the NumPy array protocol, with nulls as NaN.
+    daily_demand, lead_time_days, safety_stock = np.broadcast_arrays(
+        np.asarray(daily_demand, dtype=float),
+        np.asarray(lead_time_days, dtype=float),
+        np.asarray(safety_stock, dtype=float),
+    )
+
+    codes = (
+        (daily_demand < 0) * ReorderPointError.DAILY_DEMAND.value
+        | (lead_time_days < 0) * ReorderPointError.LEAD_TIME.value
+        | (safety_stock < 0) * ReorderPointError.SAFETY_STOCK.value
+        | np.isnan(daily_demand + lead_time_days + safety_stock)
+        * ReorderPointError.MISSING.value
+    ).astype(np.int8)
+    invalid = codes != 0
+    raised = (codes & ~ReorderPointError.MISSING.value) != 0
+    if errors == "raise" and raised.any():
+        row = int(np.flatnonzero(raised.ravel())[0])
+        code = int(codes.ravel()[row])
+        first = next(flag for flag in ReorderPointError if code & flag)
+        raise ValueError(f"{_ROP_MESSAGES[first]} (row {row})")
+
+    reorder_points = daily_demand * lead_time_days + safety_stock
+    if errors == "codes":
+        reorder_points[invalid] = np.nan
+        return reorder_points, codes
+    return reorder_points
+
+
 def calculate_reorder_points_from_df(
     df: pd.DataFrame,
     daily_demand_col: str,
     lead_time_col: str,
     *,
     safety_stock_col: str | None = None,
-) -> pd.Series:
-    """Vectorised reorder point calculation for data frames."""
+    daily_demand_std_col: str | None = None,
+    lead_time_std_col: str | None = None,
+    service_level: float = 0.95,
+    errors: str = "raise",
+) -> pd.Series | pd.DataFrame:
+    """Vectorised reorder point calculation for data frames.
 
-    for col in (daily_demand_col, lead_time_col):
-        if col not in df.columns:
-            raise KeyError(f"{col!r} not in DataFrame")
-    if safety_stock_col and safety_stock_col not in df.columns:
-        raise KeyError(f"{safety_stock_col!r} not in DataFrame")
+    Safety stock is read from ``safety_stock_col`` or, with
+    ``daily_demand_std_col`` (and optionally ``lead_time_std_col``), derived
+    for ``service_level`` with :func:`calculate_safety_stock`.  To choose
+    service levels per SKU see :func:`optimize_service_levels`.
+
+    With ``errors="codes"`` a frame with ``reorder_point`` and ``error_code``
+    columns is returned instead of raising, see
+    :func:`calculate_reorder_points`.
 
-    def _calc(row: pd.Series) -> float:
-        safety = row[safety_stock_col] if safety_stock_col else 0.0
-        return calculate_reorder_point(row[daily_demand_col], row[lead_time_col], safety_stock=safety)
+    ``df`` may also be a :class:`pyarrow.Table` or a Polars frame; only the
+    named columns are converted and the result is indexed from zero.
+    """
+
+    optional = (safety_stock_col, daily_demand_std_col, lead_time_std_col)
+    columns = [daily_demand_col, lead_time_col, *filter(None, optional)]
+    for col in columns:
+        if col not in column_names(df):
+            raise KeyError(f"{col!r} not in DataFrame")
+    if safety_stock_col and daily_demand_std_col:
+        raise ValueError("pass either safety_stock_col or daily_demand_std_col")
+    if lead_time_std_col and not daily_demand_std_col:
+        raise ValueError("lead_time_std_col requires daily_demand_std_col")
+    df = to_pandas(df, columns)
 
-    return df.apply(_calc, axis=1)
+    safety_stock: Any = df[safety_stock_col] if safety_stock_col else 0.0
+    if daily_demand_std_col:
+        safety_stock = calculate_safety_stock(
+            df[daily_demand_std_col],
+            df[lead_time_col].clip(lower=0),
+            service_level=service_level,
+            daily_demand=df[daily_demand_col].clip(lower=0),
+            lead_time_std=df[lead_time_std_col] if lead_time_std_col else 0.0,
+        )
+    result = calculate_reorder_points(
+        df[daily_demand_col],
+        df[lead_time_col],
+        safety_stock=safety_stock,
+        errors=errors,
+    )
+    if errors == "codes":
+        reorder_points, codes = result
+        return pd.DataFrame(
+            {"reorder_point": reorder_points, "error_code": codes}, index=df.index
+        )
+    return pd.Series(result, index=df.index)
 
 
 def calculate_reorder_points_from_zip(
@@ -70,7 +244,10 @@ def calculate_reorder_points_from_zip(
 ) -> pd.Series:
     """Load reorder point parameters from ``zip_path`` and compute values."""
 
-    datasets = load_datasets(zip_path, files=[file_name])
+    usecols = [daily_demand_col, lead_time_col] + ([safety_stock_col] if safety_stock_col else [])
+    datasets = load_datasets(
+        zip_path, files=[file_name], typed=True, usecols=usecols, materialize=True
+    )
     key = Path(file_name).stem
     if key not in datasets:
         raise FileNotFoundError(f"{file_name!r} not found in {zip_path!r}")
@@ -80,3 +257,215 @@ def calculate_reorder_points_from_zip(
         lead_time_col,
         safety_stock_col=safety_stock_col,
     )
+
+
+def _normal_loss(z: np.ndarray) -> np.ndarray:
+    """Standard normal loss ``G(z) = phi(z) - z * (1 - Phi(z))``."""
+    normal = NormalDist()
+    return np.array([normal.pdf(value) - value * (1 - normal.cdf(value)) for value in z])
+
+
+def optimize_service_levels(
+    df: pd.DataFrame,
+    *,
+    fill_rate: float | None = None,
+    budget: float | None = None,
+    daily_demand_col: str = "daily_demand",
+    daily_demand_std_col: str = "daily_demand_std",
+    lead_time_col: str = "lead_time_days",
+    lead_time_std_col: str = "lead_time_std",
+    order_quantity_col: str = "eoq",
+    holding_cost_col: str = "holding_cost",
+    unit_cost_col: str = "unit_cost",
+    days_per_year: int = 365,
+    min_service_level: float = 0.5,
+    max_service_level: float = 0.9999,
+    grid_size: int = 64,
+) -> pd.DataFrame:
+    """Choose a service level per SKU for the whole assortment.
+
+    Safety stock of every SKU is ``z * sigma`` with ``sigma`` the standard
+    deviation of lead-time demand (see :func:`calculate_safety_stock`); the
+    expected units short per year are ``D / Q * sigma * G(z)`` with ``G`` the
+    standard normal loss function, capped at the annual demand ``D``.  ``z``
+    is restricted to ``grid_size`` steps between the quantiles of
+    ``min_service_level`` and ``max_service_level``.
+
+    With ``fill_rate`` the total safety stock holding cost is minimised while
+    the demand-weighted fill rate of the assortment reaches the target; with
+    ``budget`` the units short are minimised while the safety stock valued
+    at unit cost stays within the budget.  Both are solved by marginal
+    analysis: raising a SKU by one grid step buys a reduction in shortage at
+    a cost, and steps are taken in decreasing order of benefit per cost.
+    Because that ratio factors into a per-SKU weight times a per-step
+    factor, the greedy order is found by bisecting on the ratio threshold
+    with a vectorised count of the steps above it per SKU, without
+    materialising the ``SKUs x grid`` increments.  A SKU whose shortage is
+    capped gains nothing from its first steps; it takes them together, as
+    one step to the level with the best average gain, and single steps
+    after that.
+
+    Parameters
+    ----------
+    df:
+        One row per SKU, e.g. the table of
+        :class:`~inventory.policy.InventoryPolicyEngine`.
+    fill_rate:
+        Target aggregate fill rate (share of annual demand served).
+    budget:
+        Maximum value of all safety stock at ``unit_cost_col``.  Exactly one
+        of ``fill_rate`` and ``budget`` must be given.
+    daily_demand_col, daily_demand_std_col, lead_time_col, lead_time_std_col:
+        Demand and lead time statistics in days.
+    order_quantity_col:
+        Order quantity, which sets the number of replenishment cycles a year.
+    holding_cost_col:
+        Annual holding cost per unit.
+    unit_cost_col:
+        Unit cost, only used with ``budget``.
+    days_per_year:
+        Days used to annualise demand.
+    min_service_level, max_service_level:
+        Range of cycle service levels considered.
+    grid_size:
+        Number of ``z`` values in that range.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed like ``df`` with ``service_level``, ``z``, ``safety_stock``,
+        ``reorder_point``, ``fill_rate``, ``expected_shortage`` (units per
+        year), ``holding_cost`` of the safety stock per year and, with
+        ``budget``, its ``inventory_value``.  Rows with missing or invalid
+        inputs are ``NaN`` and left out of the aggregate.
+    """
+    if (fill_rate is None) == (budget is None):
+        raise ValueError("pass exactly one of fill_rate and budget")
+    if fill_rate is not None and not 0 < fill_rate < 1:
+        raise ValueError("fill_rate must be between 0 and 1")
+    if budget is not None and budget < 0:
+        raise ValueError("budget cannot be negative")
+    if not 0 < min_service_level < max_service_level < 1:
+        raise ValueError("service levels must satisfy 0 < min < max < 1")
+    if grid_size < 2:
+        raise ValueError("grid_size must be at least 2")
+    columns = [
+        daily_demand_col,
+        daily_demand_std_col,
+        lead_time_col,
+        lead_time_std_col,
+        order_quantity_col,
+        holding_cost_col,
+    ] + ([unit_cost_col] if budget is not None else [])
+    for col in columns:
+        if col not in df.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+
+    values = {col: df[col].to_numpy(dtype=float, na_value=np.nan) for col in columns}
+    demand, demand_std = values[daily_demand_col], values[daily_demand_std_col]
+    lead_time, lead_time_std = values[lead_time_col], values[lead_time_std_col]
+    quantity, holding = values[order_quantity_col], values[holding_cost_col]
+    weight = values[unit_cost_col] if budget is not None else holding
+    valid = (
+        np.isfinite(np.column_stack([values[col] for col in columns])).all(axis=1)
+        & (demand >= 0)
+        & (demand_std >= 0)
+        & (lead_time >= 0)
+        & (lead_time_std >= 0)
+        & (quantity > 0)
+        & (weight > 0)
+    )
+
+    normal = NormalDist()
+    z = np.linspace(normal.inv_cdf(min_service_level), normal.inv_cdf(max_service_level), grid_size)
+    loss = _normal_loss(z)
+    # Shortage reduction per unit of z of each step; decreasing because the
+    # loss function is convex.
+    step_gain = -np.diff(loss) / np.diff(z)
+
+    sigma = np.sqrt(lead_time * demand_std**2 + demand**2 * lead_time_std**2)[valid]
+    cycles = (demand * days_per_year / quantity)[valid]
+    annual_demand = demand[valid] * days_per_year
+    # Benefit per cost of a step is ``cycles / weight * step_gain``; sigma
+    # scales both and cancels.
+    ratio_weight = np.where(sigma > 0, cycles / weight[valid], 0.0)
+    # In the same units the cap on the loss is ``Q / sigma``.  Where it
+    # binds at the lowest level, the first steps are replaced by a jump to
+    # ``first``, the level with the best average gain from the lowest one:
+    # the first level whose next step gains less than that average.  The
+    # levels where that holds are a suffix of the grid because ``loss`` is
+    # convex, so ``first`` is found by bisection too.
+    with np.errstate(divide="ignore"):
+        cap = np.where(sigma > 0, quantity[valid] / sigma, np.inf)
+    tangent = loss[:-1] + step_gain * (z[:-1] - z[0])
+    first = np.searchsorted(-tangent, -cap, side="left")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first_gain = (cap - loss[first]) / (z[first] - z[0])
+
+    def steps(threshold: float) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            bound = np.where(ratio_weight > 0, threshold / ratio_weight, np.inf)
+        count = np.searchsorted(-step_gain, -bound, side="right")
+        jump = np.where(first_gain >= bound, np.maximum(count, first), 0)
+        return np.where(first > 0, jump, count)
+
+    def short(levels: np.ndarray) -> np.ndarray:
+        # The normal approximation can exceed demand when sigma is large
+        # relative to it; a SKU cannot be short more than it sells.
+        return np.minimum(cycles * sigma * loss[levels], annual_demand)
+
+    def shortage(levels: np.ndarray) -> float:
+        return float(short(levels).sum())
+
+    def spent(levels: np.ndarray) -> float:
+        return float((weight[valid] * sigma * z[levels]).sum())
+
+    def feasible(levels: np.ndarray) -> bool:
+        if fill_rate is not None:
+            return shortage(levels) <= (1 - fill_rate) * annual_demand.sum()
+        return spent(levels) <= budget
+
+    zero = np.zeros(len(sigma), dtype=np.int64)
+    positive = ratio_weight[ratio_weight > 0]
+    if budget is not None and not feasible(zero):
+        raise ValueError("budget does not cover safety stock at min_service_level")
+    if positive.size == 0 or (fill_rate is not None and feasible(zero)):
+        levels = zero
+    else:
+        high = float(positive.max() * step_gain[0]) * 2
+        low = float(positive.min() * step_gain[-1]) / 2
+        if fill_rate is not None and not feasible(steps(low)):
+            raise ValueError(f"fill_rate {fill_rate} cannot be reached below max_service_level")
+        # Lower thresholds take more steps: they reach a fill rate target but
+        # may exceed a budget.  Keep ``low`` on the side that takes more steps.
+        while high / low > 1 + 1e-12:
+            middle = float(np.sqrt(low * high))
+            if feasible(steps(middle)) == (fill_rate is not None):
+                low = middle
+            else:
+                high = middle
+        levels = steps(low if fill_rate is not None else high)
+
+    chosen = {
+        "service_level": np.array([normal.cdf(value) for value in z])[levels],
+        "z": z[levels],
+        "safety_stock": z[levels] * sigma,
+    }
+    chosen["reorder_point"] = (demand * lead_time)[valid] + chosen["safety_stock"]
+    chosen["expected_shortage"] = short(levels)
+    served = annual_demand - chosen["expected_shortage"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        chosen["fill_rate"] = np.where(annual_demand > 0, served / annual_demand, 1.0)
+    chosen["holding_cost"] = holding[valid] * chosen["safety_stock"]
+    if budget is not None:
+        chosen["inventory_value"] = weight[valid] * chosen["safety_stock"]
+
+    names = ["service_level", "z", "safety_stock", "reorder_point", "fill_rate"]
+    names += ["expected_shortage", "holding_cost"]
+    names += ["inventory_value"] if budget is not None else []
+    result = pd.DataFrame(index=df.index)
+    for name in names:
+        column = np.full(len(df), np.nan)
+        column[valid] = chosen[name]
+        result[name] = column
+    return result
@@ -0,0 +1,245 @@
+"""Vendor-level joint replenishment.
+
+Items bought from the same vendor share the vendor's fixed cost per order
+(the *major* cost, e.g. freight) while every item included in an order adds
+its own *minor* cost.  :func:`joint_replenishment` picks a base order cycle
+``T`` per vendor and an integer multiplier ``k`` per item, so item ``i`` is
+ordered every ``k * T`` years, minimising
+
+    (S + sum(s_i / k_i)) / T + T / 2 * sum(k_i * h_i * D_i)
+
+with Silver's heuristic followed by the usual alternating refinement of
+``T`` and ``k``.  Vendors are not solved one by one: every step is a single
+array operation over all items, with per-vendor sums taken by
+:func:`numpy.bincount` on the vendor codes.
+"""
+from __future__ import annotations
+
+from numbers import Real
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_members, load_datasets
+from .policy import REQUIRED_DATASETS, InventoryPolicyEngine
+from .utils import find_dataset
+
+
+def vendor_order_costs(
+    invoices: pd.DataFrame,
+    *,
+    vendor_col: str = "VendorNumber",
+    freight_col: str = "Freight",
+    fixed_cost: float = 0.0,
+) -> pd.Series:
+    """Major order cost per vendor from invoice freight.
+
+    Parameters
+    ----------
+    invoices:
+        One row per vendor invoice, e.g. the InvoicePurchases dataset.
+    vendor_col, freight_col:
+        Vendor and freight columns.
+    fixed_cost:
+        Cost added to the average freight of every order, e.g. for
+        processing the purchase order.
+
+    Returns
+    -------
+    pandas.Series
+        Average freight per invoice plus ``fixed_cost``, indexed by vendor.
+    """
+    for col in (vendor_col, freight_col):
+        if col not in invoices.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+    if fixed_cost < 0:
+        raise ValueError("fixed_cost cannot be negative")
+    freight = invoices.groupby(vendor_col, observed=True)[freight_col].mean()
+    return (freight.fillna(0.0) + fixed_cost).rename("major_cost")
+
+
+def _silver(
+    codes: np.ndarray,
+    major: np.ndarray,
+    minor: np.ndarray,
+    usage: np.ndarray,
+    max_iter: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Base cycle and annual cost per vendor and multiplier per item.
+
+    ``usage`` is the annual holding cost of one cycle's worth of demand,
+    ``h * D``, per item.
+    """
+    vendors = len(major)
+    ratio = minor / usage
+    # The item with the smallest minor cost per usage is ordered every cycle.
+    # Without a major cost the base item must carry a minor cost, or the
+    # base cycle would cost nothing and be zero.
+    free = major[codes] + minor <= 0
+    order = np.lexsort((ratio, free, codes))
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    first = order[starts]
+    base_usage = np.zeros(vendors)
+    base_minor = np.zeros(vendors)
+    base_usage[codes[first]] = usage[first]
+    base_minor[codes[first]] = minor[first]
+    scale = base_usage / (major + base_minor)
+    multiplier = np.maximum(np.rint(np.sqrt(ratio * scale[codes])), 1)
+    multiplier[first] = 1
+
+    def evaluate(k: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        fixed = major + np.bincount(codes, weights=minor / k, minlength=vendors)
+        holding = np.bincount(codes, weights=k * usage, minlength=vendors)
+        return np.sqrt(2 * fixed / holding), np.sqrt(2 * fixed * holding)
+
+    cycle, cost = evaluate(multiplier)
+    for _ in range(max_iter):
+        # Best integer multiplier for the current cycle: the smallest k with
+        # 2 * s / (h * D * T**2) <= k * (k + 1).
+        target = 2 * ratio / cycle[codes] ** 2
+        proposed = np.maximum(np.ceil((np.sqrt(1 + 4 * target) - 1) / 2), 1)
+        new_cycle, new_cost = evaluate(proposed)
+        improved = new_cost < cost
+        if not improved.any():
+            break
+        keep = improved[codes]
+        multiplier = np.where(keep, proposed, multiplier)
+        cycle = np.where(improved, new_cycle, cycle)
+        cost = np.where(improved, new_cost, cost)
+    return cycle, cost, multiplier
+
+
+def joint_replenishment(
+    items: pd.DataFrame,
+    major_cost: float | Mapping[Any, float] | pd.Series,
+    *,
+    vendor_col: str = "VendorNumber",
+    demand_col: str = "annual_demand",
+    holding_cost_col: str = "holding_cost",
+    minor_cost: float = 0.0,
+    minor_cost_col: str | None = None,
+    days_per_year: int = 365,
+    max_iter: int = 20,
+) -> pd.DataFrame:
+    """Common order cycle per vendor and order multiplier per item.
+
+    Parameters
+    ----------
+    items:
+        One row per item with vendor, annual demand and annual holding cost
+        per unit, e.g. the :class:`~inventory.policy.InventoryPolicyEngine`
+        table.
+    major_cost:
+        Fixed cost of an order per vendor, as a scalar or a mapping indexed
+        by vendor (see :func:`vendor_order_costs`) that covers every vendor
+        of ``items``.
+    vendor_col, demand_col, holding_cost_col:
+        Item columns.
+    minor_cost, minor_cost_col:
+        Cost of including an item in an order, as a scalar or a column.
+    days_per_year:
+        Days used to express cycles in days.
+    max_iter:
+        Maximum number of refinement rounds after Silver's heuristic.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed like ``items`` with the vendor's ``base_cycle_days``, the
+        item's ``multiplier``, ``order_cycle_days`` and ``order_quantity``,
+        and the vendor's total ``vendor_annual_cost`` of ordering and
+        holding.  Items without a vendor, demand or holding cost are
+        ``NaN``.
+    """
+    columns = [vendor_col, demand_col, holding_cost_col] + (
+        [minor_cost_col] if minor_cost_col else []
+    )
+    for col in columns:
+        if col not in items.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+    if minor_cost < 0:
+        raise ValueError("minor_cost cannot be negative")
+
+    demand = items[demand_col].to_numpy(dtype=float, na_value=np.nan)
+    holding = items[holding_cost_col].to_numpy(dtype=float, na_value=np.nan)
+    if minor_cost_col:
+        minor = items[minor_cost_col].to_numpy(dtype=float, na_value=np.nan)
+    else:
+        minor = np.full(len(items), float(minor_cost))
+    codes, vendors = pd.factorize(items[vendor_col])
+    valid = (codes >= 0) & (demand > 0) & (holding > 0) & (minor >= 0)
+
+    if isinstance(major_cost, Real):
+        major = np.full(len(vendors), float(major_cost))
+    else:
+        major_cost = pd.Series(major_cost, dtype=float)
+        missing = vendors[~vendors.isin(major_cost.index)]
+        if len(missing):
+            raise KeyError(f"no major_cost for vendors {list(missing)}")
+        major = major_cost.reindex(vendors).to_numpy()
+    if (major < 0).any():
+        raise ValueError("major_cost cannot be negative")
+
+    result = pd.DataFrame(
+        np.nan,
+        index=items.index,
+        columns=[
+            "base_cycle_days",
+            "multiplier",
+            "order_cycle_days",
+            "order_quantity",
+            "vendor_annual_cost",
+        ],
+    )
+    # Without any order cost a vendor's items would be ordered continuously.
+    payable = major + np.bincount(codes[valid], weights=minor[valid], minlength=len(vendors))
+    valid &= payable[np.maximum(codes, 0)] > 0
+    if not valid.any():
+        return result
+    # Solve only the vendors with valid items, renumbered densely.
+    used, dense = np.unique(codes[valid], return_inverse=True)
+    cycle, cost, multiplier = _silver(
+        dense, major[used], minor[valid], holding[valid] * demand[valid], max_iter
+    )
+    item_cycle = multiplier * cycle[dense]
+    result.loc[valid, "base_cycle_days"] = cycle[dense] * days_per_year
+    result.loc[valid, "multiplier"] = multiplier
+    result.loc[valid, "order_cycle_days"] = item_cycle * days_per_year
+    result.loc[valid, "order_quantity"] = item_cycle * demand[valid]
+    result.loc[valid, "vendor_annual_cost"] = cost[dense]
+    return result
+
+
+def joint_replenishment_from_zip(
+    zip_path: str | Path,
+    *,
+    minor_cost: float = 0.0,
+    fixed_cost: float = 0.0,
+    max_iter: int = 20,
+    **engine_kwargs: Any,
+) -> pd.DataFrame:
+    """Joint replenishment of every SKU in ``zip_path`` with its vendor.
+
+    Annual demand, holding cost and vendor of each SKU come from
+    :class:`~inventory.policy.InventoryPolicyEngine` (keyword arguments are
+    passed to it); the major order cost of each vendor is its average
+    invoice freight plus ``fixed_cost`` (see :func:`vendor_order_costs`),
+    or just ``fixed_cost`` for vendors without invoices.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``InventoryId`` and ``VendorNumber`` with the columns of
+        :func:`joint_replenishment`.
+    """
+    wanted = (*REQUIRED_DATASETS, "invoice_purchases")
+    members = [member for _, member in dataset_members(zip_path, wanted)]
+    datasets = load_datasets(zip_path, files=members, typed=True, materialize=True)
+    policy = InventoryPolicyEngine(datasets, **engine_kwargs).run()
+    major = vendor_order_costs(find_dataset(datasets, "invoice_purchases"), fixed_cost=fixed_cost)
+    vendors = policy["VendorNumber"].dropna().unique()
+    major = major.reindex(major.index.union(vendors), fill_value=fixed_cost)
+    plan = joint_replenishment(policy, major, minor_cost=minor_cost, max_iter=max_iter)
+    return pd.concat([policy[["InventoryId", "VendorNumber"]], plan], axis=1)
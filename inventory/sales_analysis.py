@@ -2,30 +2,88 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
 import pandas as pd
 
-from .datasets import load_datasets
+from .backends import check_backend, column_names, to_arrow, to_pandas, to_polars
+from .cube import SalesCube
+from .datasets import iter_dataset, load_datasets
+from .store import MappedTable
+from .utils import rank_totals
+
+
+def _top_selling_arrow(df: Any, product_col: str, quantity_col: str, top_n: int) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = to_arrow(df, [product_col, quantity_col])
+    products = table.column(product_col)
+    if pa.types.is_dictionary(products.type):
+        table = table.set_column(0, product_col, products.cast(products.type.value_type))
+    totals = table.group_by(product_col).aggregate(
+        [(quantity_col, "sum", pc.ScalarAggregateOptions(min_count=0))]
+    )
+    totals = totals.filter(pc.is_valid(totals.column(product_col)))
+    # Like the pandas path: ties go to the product that sorts first.
+    top = totals.sort_by(
+        [(f"{quantity_col}_sum", "descending"), (product_col, "ascending")]
+    ).slice(0, top_n)
+    return pd.DataFrame(
+        {
+            product_col: top.column(product_col).to_pandas(),
+            "total_quantity": top.column(f"{quantity_col}_sum").to_pandas(),
+        }
+    )
+
+
+def _top_selling_polars(df: Any, product_col: str, quantity_col: str, top_n: int) -> pd.DataFrame:
+    import polars as pl
+
+    top = (
+        to_polars(df, [product_col, quantity_col])
+        .with_columns(pl.col(pl.Categorical).cast(pl.String))
+        .drop_nulls(product_col)
+        .group_by(product_col)
+        .agg(pl.col(quantity_col).sum().alias("total_quantity"))
+        .sort(["total_quantity", product_col], descending=[True, False])
+        .head(top_n)
+        .collect()
+    )
+    return top.to_pandas()
 
 
 def top_selling_products(
-    df: pd.DataFrame,
+    df: pd.DataFrame | SalesCube | MappedTable,
     product_col: str,
     quantity_col: str,
     *,
     top_n: int = 10,
+    backend: str = "pandas",
 ) -> pd.DataFrame:
     """Return the top ``top_n`` products by quantity sold.
 
     Parameters
     ----------
     df:
-        Sales data containing product and quantity columns.
+        Sales data containing product and quantity columns, or a
+        :class:`~inventory.cube.SalesCube` with ``product_col`` as a
+        dimension and ``quantity_col`` as a measure, which is answered from
+        its precomputed rollups.  A :class:`~inventory.store.MappedTable`
+        is aggregated on its mapped arrays.
     product_col:
         Column identifying the product.
     quantity_col:
         Column representing quantity sold.
     top_n:
         Number of top products to return.
+    backend:
+        ``"pandas"`` (default), ``"pyarrow"`` or ``"polars"`` to aggregate
+        with that library, see :mod:`~inventory.backends`.  ``df`` may also
+        be a :class:`pyarrow.Table` or a Polars frame.  Categorical products
+        are returned as plain values by the other backends.  Cubes and
+        mapped tables are always aggregated by their own methods.
 
     Returns
     -------
@@ -33,21 +91,60 @@ def top_selling_products(
         DataFrame with ``product_col`` and ``total_quantity`` columns
         sorted in descending order of quantity.
     """
+    check_backend(backend)
+    if isinstance(df, SalesCube):
+        return df.top_selling(product_col, quantity_col, top_n=top_n)
+    columns = df.columns if isinstance(df, MappedTable) else column_names(df)
     for col in (product_col, quantity_col):
-        if col not in df.columns:
+        if col not in columns:
             raise KeyError(f"{col!r} not in DataFrame")
     if top_n <= 0:
         raise ValueError("top_n must be positive")
 
-    aggregated = (
-        df.groupby(product_col)[quantity_col]
-        .sum()
-        .sort_values(ascending=False)
-        .head(top_n)
-        .rename("total_quantity")
-        .reset_index()
-    )
-    return aggregated
+    if isinstance(df, MappedTable):
+        return rank_totals(df.group_sum(product_col, quantity_col), top_n)
+    if backend == "pyarrow":
+        return _top_selling_arrow(df, product_col, quantity_col, top_n)
+    if backend == "polars":
+        return _top_selling_polars(df, product_col, quantity_col, top_n)
+    df = to_pandas(df, [product_col, quantity_col])
+    return rank_totals(df.groupby(product_col, observed=True)[quantity_col].sum(), top_n)
+
+
+def top_selling_from_chunks(
+    chunks: Iterable[pd.DataFrame],
+    product_col: str,
+    quantity_col: str,
+    *,
+    top_n: int = 10,
+) -> pd.DataFrame:
+    """Streaming variant of :func:`top_selling_products`.
+
+    Each chunk (e.g. from :func:`~inventory.datasets.iter_dataset`) is
+    reduced to per-product totals which are merged into a running total, so
+    memory grows with the number of distinct products rather than rows.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Same result as :func:`top_selling_products` on the concatenated
+        chunks.
+    """
+    if top_n <= 0:
+        raise ValueError("top_n must be positive")
+
+    totals: pd.Series | None = None
+    for chunk in chunks:
+        for col in (product_col, quantity_col):
+            if col not in chunk.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        partial = chunk.groupby(product_col, observed=True)[quantity_col].sum()
+        if totals is not None:
+            partial = pd.concat([totals, partial]).groupby(level=0, observed=True).sum()
+        totals = partial
+    if totals is None:
+        totals = pd.Series(index=pd.Index([], name=product_col), dtype=float)
+    return rank_totals(totals, top_n)
 
 
 def top_selling_from_zip(
@@ -57,21 +154,35 @@ def top_selling_from_zip(
     product_col: str,
     quantity_col: str,
     top_n: int = 10,
+    chunksize: int | None = None,
 ) -> pd.DataFrame:
     """Load sales data from ``zip_path`` and compute top products.
 
     This is a convenience wrapper around :func:`load_datasets` and
-    :func:`top_selling_products`.
+    :func:`top_selling_products`.  When ``chunksize`` is given the file is
+    streamed through :func:`top_selling_from_chunks` instead of being loaded
+    in full.
     """
-    datasets = load_datasets(zip_path, files=[sales_file])
+    if chunksize is not None:
+        chunks = iter_dataset(
+            zip_path,
+            sales_file,
+            chunksize=chunksize,
+            usecols=[product_col, quantity_col],
+            typed=True,
+        )
+        return top_selling_from_chunks(chunks, product_col, quantity_col, top_n=top_n)
+    datasets = load_datasets(
+        zip_path, files=[sales_file], typed=True, usecols=[product_col, quantity_col]
+    )
     key = Path(sales_file).stem
     if key not in datasets:
         raise FileNotFoundError(f"{sales_file!r} not found in {zip_path!r}")
     return top_selling_products(
         datasets[key],
         product_col,
-       quantity_col,
-       top_n=top_n,
+        quantity_col,
+        top_n=top_n,
     )
 
 
@@ -94,3 +205,143 @@ def top_selling_sample(
         quantity_col="SalesQuantity",
         top_n=top_n,
     )
+
+
+def _group_totals(
+    df: pd.DataFrame,
+    product_col: str,
+    by: Sequence[str],
+    rank_by: str,
+    freq: str | None,
+) -> pd.Series:
+    """Sum ``rank_by`` per partition and product.
+
+    Datetime columns in ``by`` are truncated to periods of ``freq``.
+    """
+    for col in (*by, product_col, rank_by):
+        if col not in df.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+    keys = []
+    for col in by:
+        column = df[col]
+        if freq is not None and pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.to_period(freq)
+        keys.append(column)
+    keys.append(df[product_col])
+    return df[rank_by].groupby(keys, observed=True, sort=False).sum()
+
+
+def _rank_within(totals: pd.Series, top_n: int) -> pd.DataFrame:
+    """Keep the ``top_n`` largest totals of every partition.
+
+    The partitions are all index levels but the last (the product).  Only
+    the aggregated totals are ordered, with a single stable sort on
+    (partition, descending total), so every partition is ranked in one pass
+    and ties keep their order of appearance.
+    """
+    index = totals.index
+    partition = pd.factorize(index.droplevel(-1))[0] if index.nlevels > 1 else None
+    values = totals.to_numpy()
+    if partition is None:
+        order = np.argsort(-values, kind="stable")
+        rank = np.arange(len(order))
+    else:
+        order = np.lexsort((-values, partition))
+        sorted_partition = partition[order]
+        starts = np.flatnonzero(np.r_[True, sorted_partition[1:] != sorted_partition[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    keep = order[rank < top_n]
+    result = totals.iloc[keep].reset_index()
+    result["rank"] = rank[rank < top_n] + 1
+    return result
+
+
+def top_selling_by_group(
+    df: pd.DataFrame,
+    product_col: str,
+    by: str | Sequence[str],
+    *,
+    rank_by: str = "SalesQuantity",
+    top_n: int = 10,
+    freq: str | None = None,
+) -> pd.DataFrame:
+    """Return the top ``top_n`` products within each partition.
+
+    Parameters
+    ----------
+    df:
+        Sales data.
+    product_col:
+        Column identifying the product.
+    by:
+        Column or columns defining the partitions, e.g. ``"Store"`` or
+        ``["VendorName", "SalesDate"]``.
+    rank_by:
+        Column whose total ranks the products, e.g. ``"SalesQuantity"`` or
+        ``"SalesDollars"``.
+    top_n:
+        Number of products kept per partition.
+    freq:
+        Period frequency applied to datetime columns in ``by``, e.g. ``"M"``
+        for the top products per month.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The ``by`` columns, ``product_col``, the ``rank_by`` total and the
+        1-based ``rank`` within the partition, ordered by partition and
+        rank.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if top_n <= 0:
+        raise ValueError("top_n must be positive")
+    return _rank_within(_group_totals(df, product_col, by, rank_by, freq), top_n)
+
+
+def top_selling_by_group_from_zip(
+    zip_path: str | Path,
+    *,
+    sales_file: str,
+    product_col: str,
+    by: str | Sequence[str],
+    rank_by: str = "SalesQuantity",
+    top_n: int = 10,
+    freq: str | None = None,
+    chunksize: int | None = None,
+) -> pd.DataFrame:
+    """Load sales data from ``zip_path`` and rank products per partition.
+
+    When ``chunksize`` is given the file is streamed and only the running
+    totals per partition and product are kept in memory.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if top_n <= 0:
+        raise ValueError("top_n must be positive")
+    usecols = [*by, product_col, rank_by]
+    if chunksize is None:
+        datasets = load_datasets(
+            zip_path, files=[sales_file], typed=True, usecols=usecols, materialize=True
+        )
+        key = Path(sales_file).stem
+        if key not in datasets:
+            raise FileNotFoundError(f"{sales_file!r} not found in {zip_path!r}")
+        return top_selling_by_group(
+            datasets[key], product_col, by, rank_by=rank_by, top_n=top_n, freq=freq
+        )
+
+    totals: pd.Series | None = None
+    levels = list(range(len(by) + 1))
+    for chunk in iter_dataset(
+        zip_path, sales_file, chunksize=chunksize, usecols=usecols, typed=True
+    ):
+        partial = _group_totals(chunk, product_col, by, rank_by, freq)
+        if totals is not None:
+            partial = (
+                pd.concat([totals, partial])
+                .groupby(level=levels, observed=True, sort=False)
+                .sum()
+            )
+        totals = partial
+    if totals is None:
+        return pd.DataFrame(columns=[*by, product_col, rank_by, "rank"])
+    return _rank_within(totals, top_n)
@@ -0,0 +1,245 @@
+"""Column schemas for the known inventory datasets.
+
+The CSV files shipped with the project (and the full-size files they are
+sampled from) contain long, highly repetitive string columns and dates
+stored as text.  A :class:`DatasetSchema` describes how to read one of them
+compactly: repeated strings become ``category``, integers and unit prices are
+downcast, padded vendor names are stripped and dates are parsed once at load
+time.  Integer columns with blank cells are read as ``float64`` instead.
+:func:`schema_for` picks the schema matching an archive member name.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+_CATEGORY = "category"
+
+# Shared column types.  Monetary totals stay float64 so sums over millions of
+# rows do not drift; unit prices and taxes fit float32.
+_INVENTORY_ID = {"InventoryId": _CATEGORY}
+_ITEM = {
+    "Brand": "int32",
+    "Description": _CATEGORY,
+    "Size": _CATEGORY,
+}
+_VENDOR = {"VendorNumber": "int32", "VendorName": _CATEGORY}
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    """How to parse one of the known dataset files.
+
+    Parameters
+    ----------
+    name:
+        Short name of the dataset (e.g. ``"sales"``).
+    pattern:
+        Substring identifying the file, matched against the member name.
+    dtypes:
+        Column name to dtype.  Only these columns are read.  An integer
+        column holding missing values becomes ``float64`` with ``NaN``.
+    dates:
+        Date columns mapped to their ``strftime`` format.
+    strip:
+        String columns whose surrounding whitespace is removed.
+    """
+
+    name: str
+    pattern: str
+    dtypes: Mapping[str, str]
+    dates: Mapping[str, str] = field(default_factory=dict)
+    strip: tuple[str, ...] = ()
+
+    @property
+    def columns(self) -> list[str]:
+        """All columns described by the schema."""
+        return [*self.dtypes, *(col for col in self.dates if col not in self.dtypes)]
+
+    def read_csv_kwargs(self, usecols: Iterable[str] | None = None) -> dict[str, Any]:
+        """Keyword arguments for :func:`pandas.read_csv`.
+
+        Dates are read as ``category`` so :meth:`finalize` only has to parse
+        each distinct date string once.  Integers are read with the nullable
+        pandas dtypes so a blank cell does not fail the parse.
+        """
+        wanted = set(self.columns)
+        if usecols is not None:
+            wanted &= set(usecols)
+        dtypes = {
+            col: dtype.capitalize() if _is_integer(dtype) else dtype
+            for col, dtype in self.dtypes.items()
+            if col in wanted
+        }
+        dtypes.update({col: _CATEGORY for col in self.dates if col in wanted})
+        return {"usecols": lambda col: col in wanted, "dtype": dtypes}
+
+    def finalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Set integer dtypes, strip padded strings and parse date columns."""
+        for col, dtype in self.dtypes.items():
+            if col in df.columns and _is_integer(dtype):
+                df[col] = df[col].astype("float64" if df[col].hasnans else dtype)
+        for col in self.strip:
+            if col in df.columns:
+                df[col] = _strip_categories(df[col])
+        for col, fmt in self.dates.items():
+            if col in df.columns:
+                df[col] = _parse_dates(df[col], fmt)
+        return df
+
+
+def _is_integer(dtype: str) -> bool:
+    return dtype != _CATEGORY and np.dtype(dtype).kind in "iu"
+
+
+def _strip_categories(column: pd.Series) -> pd.Series:
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.str.strip()
+    stripped = column.cat.categories.str.strip()
+    if stripped.is_unique:
+        return column.cat.rename_categories(stripped)
+    return column.astype(object).str.strip().astype(_CATEGORY)
+
+
+def _parse_dates(column: pd.Series, fmt: str) -> pd.Series:
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return pd.to_datetime(column, format=fmt)
+    parsed = pd.DatetimeIndex(pd.to_datetime(column.cat.categories, format=fmt))
+    codes = column.cat.codes.to_numpy()
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(np.asarray(values), index=column.index, name=column.name)
+
+
+SCHEMAS: tuple[DatasetSchema, ...] = (
+    DatasetSchema(
+        name="sales",
+        pattern="SalesFINAL",
+        dtypes={
+            **_INVENTORY_ID,
+            "Store": "int16",
+            **_ITEM,
+            "SalesQuantity": "int32",
+            "SalesDollars": "float64",
+            "SalesPrice": "float32",
+            "Volume": "float32",
+            "Classification": "int8",
+            "ExciseTax": "float32",
+            "VendorNo": "int32",
+            "VendorName": _CATEGORY,
+        },
+        dates={"SalesDate": "%m/%d/%Y"},
+        strip=("VendorName",),
+    ),
+    DatasetSchema(
+        name="purchases",
+        pattern="PurchasesFINAL",
+        dtypes={
+            **_INVENTORY_ID,
+            "Store": "int16",
+            **_ITEM,
+            **_VENDOR,
+            "PONumber": "int32",
+            "PurchasePrice": "float32",
+            "Quantity": "int32",
+            "Dollars": "float64",
+            "Classification": "int8",
+        },
+        dates={
+            "PODate": "%Y-%m-%d",
+            "ReceivingDate": "%Y-%m-%d",
+            "InvoiceDate": "%Y-%m-%d",
+            "PayDate": "%Y-%m-%d",
+        },
+        strip=("VendorName",),
+    ),
+    DatasetSchema(
+        name="invoice_purchases",
+        pattern="InvoicePurchases",
+        dtypes={
+            **_VENDOR,
+            "PONumber": "int32",
+            "Quantity": "int32",
+            "Dollars": "float64",
+            "Freight": "float64",
+            "Approval": _CATEGORY,
+        },
+        dates={
+            "InvoiceDate": "%Y-%m-%d",
+            "PODate": "%Y-%m-%d",
+            "PayDate": "%Y-%m-%d",
+        },
+        strip=("VendorName",),
+    ),
+    DatasetSchema(
+        name="beginning_inventory",
+        pattern="BegInvFINAL",
+        dtypes={
+            **_INVENTORY_ID,
+            "Store": "int16",
+            "City": _CATEGORY,
+            **_ITEM,
+            "onHand": "int32",
+            "Price": "float32",
+        },
+        dates={"startDate": "%Y-%m-%d"},
+    ),
+    DatasetSchema(
+        name="ending_inventory",
+        pattern="EndInvFINAL",
+        dtypes={
+            **_INVENTORY_ID,
+            "Store": "int16",
+            "City": _CATEGORY,
+            **_ITEM,
+            "onHand": "int32",
+            "Price": "float32",
+        },
+        dates={"endDate": "%Y-%m-%d"},
+    ),
+    DatasetSchema(
+        name="purchase_prices",
+        pattern="PurchasePrices",
+        dtypes={
+            **_ITEM,
+            "Price": "float32",
+            "Volume": "float32",
+            "Classification": "int8",
+            "PurchasePrice": "float32",
+            **_VENDOR,
+        },
+        strip=("VendorName",),
+    ),
+)
+
+
+def schema_for(member: str | Path) -> DatasetSchema | None:
+    """Return the schema matching the archive member ``member``, if any."""
+    name = Path(member).name
+    for schema in SCHEMAS:
+        if schema.pattern in name:
+            return schema
+    return None
+
+
+def read_csv_options(
+    member: str | Path,
+    *,
+    typed: bool = False,
+    usecols: Iterable[str] | None = None,
+) -> tuple[dict[str, Any], Callable[[pd.DataFrame], pd.DataFrame]]:
+    """Return :func:`pandas.read_csv` options and a post-processing step.
+
+    Untyped reads only restrict the columns to ``usecols``; typed reads of a
+    known file apply its :class:`DatasetSchema`.
+    """
+    schema = schema_for(member) if typed else None
+    if schema is not None:
+        return schema.read_csv_kwargs(usecols), schema.finalize
+    if usecols is None:
+        return {}, lambda df: df
+    wanted = set(usecols)
+    return {"usecols": lambda col: col in wanted}, lambda df: df
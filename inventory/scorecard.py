@@ -0,0 +1,314 @@
+"""Supplier efficiency scorecard.
+
+:class:`VendorScorecard` rates every vendor on the purchase lines of
+PurchasesFINAL and the invoices of InvoicePurchases:
+
+* lead time (``PODate`` to ``ReceivingDate``), its variability and the
+  share of lines received within ``on_time_days``;
+* invoice lag (``ReceivingDate`` to ``InvoiceDate``) and payment terms
+  (``InvoiceDate`` to ``PayDate``);
+* freight as a percentage of invoiced dollars;
+* fill rate, the units received on purchase lines per unit invoiced.
+
+Like :class:`~inventory.reconciliation.InventoryReconciler` the scorecard
+only keeps sums per vendor (counts, sums and sums of squares, added with
+:func:`numpy.bincount` on integer vendor codes), so it is fed chunk by
+chunk, partial scorecards can be merged and a saved scorecard can be
+updated when the next month's purchase files arrive.  Each date column is
+converted to day numbers once per chunk; typed loads already parse every
+distinct date string only once.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_members, iter_dataset
+from .store import NAT_DAY, MappedTable, archive_source, iter_blocks
+from .utils import KeyCodes, as_dates, digest, find_dataset
+
+#: Columns read from each dataset.
+SCORECARD_COLUMNS = {
+    "purchases": (
+        "VendorNumber", "PODate", "ReceivingDate", "InvoiceDate", "Quantity", "Dollars",
+    ),
+    "invoice_purchases": (
+        "VendorNumber", "InvoiceDate", "PayDate", "Quantity", "Dollars", "Freight",
+    ),
+}
+
+_SUMS = (
+    "lines",
+    "received",
+    "purchase_dollars",
+    "lead_count",
+    "lead_sum",
+    "lead_sum_sq",
+    "on_time",
+    "lag_count",
+    "lag_sum",
+    "invoices",
+    "invoiced",
+    "invoice_dollars",
+    "freight",
+    "pay_count",
+    "pay_sum",
+)
+
+_FORMAT_VERSION = 2
+
+
+def _days(values: Any) -> np.ndarray:
+    """Day numbers of a date column, :data:`~inventory.store.NAT_DAY` if missing."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+        return values.astype(np.int64)
+    dates = as_dates(values).to_numpy(dtype="datetime64[D]")
+    return np.where(np.isnat(dates), NAT_DAY, dates.astype(np.int64))
+
+
+class VendorScorecard:
+    """Mergeable supplier statistics.
+
+    Parameters
+    ----------
+    on_time_days:
+        Lead time in days up to which a purchase line counts as on time.
+    vendor_col:
+        Column identifying the vendor in both datasets.
+    """
+
+    def __init__(self, *, on_time_days: int = 7, vendor_col: str = "VendorNumber") -> None:
+        if on_time_days < 0:
+            raise ValueError("on_time_days cannot be negative")
+        self.on_time_days = on_time_days
+        self.vendor_col = vendor_col
+        self._keys = KeyCodes(vendor_col)
+        self._sums = {name: np.zeros(0) for name in _SUMS}
+        #: Digests of the archives added by :func:`vendor_scorecard_from_zip`.
+        self.archives: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _grow(self) -> None:
+        size = len(self._keys)
+        for name, values in self._sums.items():
+            if len(values) < size:
+                self._sums[name] = np.concatenate([values, np.zeros(size - len(values))])
+
+    def _add(self, codes: np.ndarray, **weights: Any) -> None:
+        self._grow()
+        for name, values in weights.items():
+            if isinstance(values, tuple):
+                mask, values = values
+                keep, values = codes[mask], np.asarray(values, dtype=float)[mask]
+            else:
+                keep, values = codes, np.asarray(values, dtype=float)
+            self._sums[name] += np.bincount(keep, weights=values, minlength=len(self))
+
+    def _purchases(self, codes: np.ndarray, columns: Mapping[str, Any]) -> None:
+        ordered, received, invoiced = (
+            _days(columns[col]) for col in ("PODate", "ReceivingDate", "InvoiceDate")
+        )
+        known = codes >= 0
+        lead = (received - ordered).astype(float)
+        has_lead = known & (ordered != NAT_DAY) & (received != NAT_DAY)
+        lag = (invoiced - received).astype(float)
+        has_lag = known & (received != NAT_DAY) & (invoiced != NAT_DAY)
+        self._add(
+            np.maximum(codes, 0),
+            lines=(known, np.ones(len(codes))),
+            received=(known, columns["Quantity"]),
+            purchase_dollars=(known, columns["Dollars"]),
+            lead_count=(has_lead, np.ones(len(codes))),
+            lead_sum=(has_lead, lead),
+            lead_sum_sq=(has_lead, lead**2),
+            on_time=(has_lead, lead <= self.on_time_days),
+            lag_count=(has_lag, np.ones(len(codes))),
+            lag_sum=(has_lag, lag),
+        )
+
+    def _invoices(self, codes: np.ndarray, columns: Mapping[str, Any]) -> None:
+        invoiced, paid = (_days(columns[col]) for col in ("InvoiceDate", "PayDate"))
+        known = codes >= 0
+        has_pay = known & (invoiced != NAT_DAY) & (paid != NAT_DAY)
+        self._add(
+            np.maximum(codes, 0),
+            invoices=(known, np.ones(len(codes))),
+            invoiced=(known, columns["Quantity"]),
+            invoice_dollars=(known, columns["Dollars"]),
+            freight=(known, columns["Freight"]),
+            pay_count=(has_pay, np.ones(len(codes))),
+            pay_sum=(has_pay, (paid - invoiced).astype(float)),
+        )
+
+    def update(self, dataset: str, df: pd.DataFrame | MappedTable) -> "VendorScorecard":
+        """Add the rows of ``"purchases"`` or ``"invoice_purchases"``.
+
+        ``df`` may be a chunk of the dataset, e.g. one monthly file, or a
+        :class:`~inventory.store.MappedTable`, which is read block by block.
+        """
+        if dataset not in SCORECARD_COLUMNS:
+            raise ValueError(f"dataset must be one of {tuple(SCORECARD_COLUMNS)}, got {dataset!r}")
+        columns = [self.vendor_col, *SCORECARD_COLUMNS[dataset][1:]]
+        for col in columns:
+            if col not in df.columns:
+                raise KeyError(f"{col!r} not in DataFrame")
+        add = self._purchases if dataset == "purchases" else self._invoices
+
+        if isinstance(df, MappedTable):
+            dictionary = df.dictionary(self.vendor_col)
+            arrays = {col: df.array(col) for col in columns}
+            for rows in iter_blocks(len(df)):
+                codes = self._keys.encode(dictionary, np.asarray(arrays[self.vendor_col][rows]))
+                add(codes, {col: np.asarray(arrays[col][rows]) for col in columns[1:]})
+            return self
+
+        codes = self._keys.encode(df[self.vendor_col])
+        add(codes, {col: df[col] for col in columns[1:]})
+        return self
+
+    def merge(self, other: "VendorScorecard") -> "VendorScorecard":
+        """Add the statistics collected by ``other`` to this scorecard."""
+        if (other.vendor_col, other.on_time_days) != (self.vendor_col, self.on_time_days):
+            raise ValueError("scorecards must use the same vendor column and on_time_days")
+        codes = self._keys.encode(other._keys.index)
+        self._grow()
+        for name, values in other._sums.items():
+            self._sums[name][codes] += values
+        self.archives |= other.archives
+        return self
+
+    def save(self, path: str | Path) -> Path:
+        """Write the accumulated sums to ``path`` as an ``.npz`` file."""
+        path = Path(path)
+        meta = {
+            "version": _FORMAT_VERSION,
+            "vendor_col": self.vendor_col,
+            "on_time_days": self.on_time_days,
+        }
+        with open(path, "wb") as fp:
+            np.savez(
+                fp,
+                meta=np.array(json.dumps(meta)),
+                vendors=np.asarray(self._keys.index.tolist()),
+                archives=np.asarray(sorted(self.archives), dtype=str),
+                **self._sums,
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "VendorScorecard":
+        """Read a scorecard written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") not in (1, _FORMAT_VERSION):
+                raise ValueError(f"unsupported scorecard format in {str(path)!r}")
+            scorecard = cls(on_time_days=meta["on_time_days"], vendor_col=meta["vendor_col"])
+            scorecard._keys.encode(data["vendors"].tolist())
+            scorecard._sums = {name: data[name] for name in _SUMS}
+            if "archives" in data:  # not recorded by version 1
+                scorecard.archives = set(data["archives"].tolist())
+        return scorecard
+
+    def result(self) -> pd.DataFrame:
+        """Scorecard indexed by vendor.
+
+        Returns
+        -------
+        pandas.DataFrame
+            ``purchase_lines``, ``purchase_dollars``, ``lead_time_mean``,
+            ``lead_time_std`` (sample standard deviation), ``lead_time_cv``
+            (std / mean), ``on_time_rate``, ``invoice_lag_mean``,
+            ``invoices``, ``payment_days_mean``, ``freight_pct`` (freight
+            per invoiced dollar, in percent) and ``fill_rate`` (units
+            received / units invoiced).  Ratios without data are ``NaN``.
+        """
+        s = self._sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s["lead_sum"] / s["lead_count"]
+            variance = (s["lead_sum_sq"] - s["lead_count"] * mean**2) / (s["lead_count"] - 1)
+            std = np.where(s["lead_count"] > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+            result = pd.DataFrame(
+                {
+                    "purchase_lines": s["lines"].astype(np.int64),
+                    "purchase_dollars": s["purchase_dollars"],
+                    "lead_time_mean": mean,
+                    "lead_time_std": std,
+                    "lead_time_cv": std / mean,
+                    "on_time_rate": s["on_time"] / s["lead_count"],
+                    "invoice_lag_mean": s["lag_sum"] / s["lag_count"],
+                    "invoices": s["invoices"].astype(np.int64),
+                    "payment_days_mean": s["pay_sum"] / s["pay_count"],
+                    "freight_pct": 100 * s["freight"] / s["invoice_dollars"],
+                    "fill_rate": s["received"] / s["invoiced"],
+                },
+                index=self._keys.index,
+            )
+        return result.replace([np.inf, -np.inf], np.nan).sort_index()
+
+
+def vendor_scorecard(
+    datasets: Mapping[str, pd.DataFrame | MappedTable],
+    *,
+    on_time_days: int = 7,
+) -> pd.DataFrame:
+    """Supplier scorecard of loaded Purchases and InvoicePurchases datasets.
+
+    See :meth:`VendorScorecard.result` for the columns.
+    """
+    scorecard = VendorScorecard(on_time_days=on_time_days)
+    for name in SCORECARD_COLUMNS:
+        scorecard.update(name, find_dataset(datasets, name))
+    return scorecard.result()
+
+
+def vendor_scorecard_from_zip(
+    zip_path: str | Path,
+    *,
+    on_time_days: int = 7,
+    chunksize: int = 500_000,
+    state: str | Path | None = None,
+) -> pd.DataFrame:
+    """Stream the purchase members of ``zip_path`` into a scorecard.
+
+    Every Purchases and InvoicePurchases member is read ``chunksize`` rows
+    at a time with only the scorecard columns parsed.
+
+    ``state`` is the path of a scorecard saved with
+    :meth:`VendorScorecard.save`.  If it exists, the archive is added to the
+    saved totals, and the updated totals are written back, so a scorecard
+    is kept current by passing each new month's archive.  The state records
+    every archive it has seen (by the names and CRCs of its members, see
+    :func:`~inventory.store.archive_source`), and an archive passed again,
+    or a copy of it, is not counted twice.
+    """
+    if state is not None and Path(state).exists():
+        scorecard = VendorScorecard.load(state)
+        if scorecard.on_time_days != on_time_days:
+            raise ValueError(
+                f"{str(state)!r} was built with on_time_days={scorecard.on_time_days}"
+            )
+    else:
+        scorecard = VendorScorecard(on_time_days=on_time_days)
+
+    members = dataset_members(zip_path, SCORECARD_COLUMNS)
+    if not members:
+        raise FileNotFoundError(f"no purchase members in {zip_path!r}")
+    archive = digest(archive_source(zip_path))
+    if archive in scorecard.archives:
+        return scorecard.result()
+    scorecard.archives.add(archive)
+    for dataset, member in members:
+        usecols = list(SCORECARD_COLUMNS[dataset])
+        for chunk in iter_dataset(
+            zip_path, member, chunksize=chunksize, usecols=usecols, typed=True
+        ):
+            scorecard.update(dataset, chunk)
+    if state is not None:
+        scorecard.save(state)
+    return scorecard.result()
@@ -0,0 +1,602 @@
+"""Long-running HTTP/JSON service answering inventory analyses.
+
+Running every analysis in a fresh process pays for importing pandas and
+statsmodels and for parsing the archive on each call.  :class:`InventoryService`
+loads an archive once (typed, see :mod:`inventory.schemas`) and keeps the
+frames, derived aggregates such as per-product sales totals, and encoded
+query results resident.  :class:`InventoryServer` exposes the service over a
+small asyncio HTTP/1.1 server; analyses run on a thread pool so concurrent
+requests do not block the event loop.  The archive is polled and reloaded
+when its modification time or size changes::
+
+    python -m inventory.server Sample.zip --port 8000
+    curl 'localhost:8000/top-selling?product_col=Description&top_n=5'
+
+Every endpoint answers ``GET`` requests and returns JSON; query parameters
+select columns and options.  ``/metrics`` reports per-endpoint request
+counts and latency percentiles.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Mapping
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .abc_analysis import classify_inventory
+from .datasets import load_datasets
+from .demand_forecasting import forecast_demand
+from .eoq import calculate_eoq
+from .lead_time import compute_lead_times, lead_time_profile
+from .policy import InventoryPolicyEngine
+from .reorder_point import calculate_reorder_point
+from .schemas import schema_for
+from .utils import rank_totals
+
+#: Number of latencies kept per endpoint for the percentiles of ``/metrics``.
+LATENCY_WINDOW = 1024
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class UnknownEndpoint(LookupError):
+    """Raised by :meth:`InventoryService.query` for a path it does not serve."""
+
+
+class _Snapshot:
+    """Frames loaded from one version of the archive and what was derived."""
+
+    def __init__(self, datasets: Mapping[str, pd.DataFrame], stamp: tuple[int, int]) -> None:
+        self.datasets = dict(datasets)
+        self.stamp = stamp
+        self.loaded_at = time.time()
+        self.derived: dict[Any, Any] = {}
+        self.results: OrderedDict[Any, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+        self._building: dict[Any, threading.Lock] = {}
+
+    def dataset(self, name: str) -> pd.DataFrame:
+        """Frame for a schema name (``"sales"``) or file stem."""
+        if name in self.datasets:
+            return self.datasets[name]
+        for key, df in self.datasets.items():
+            schema = schema_for(key)
+            if schema is not None and schema.name == name:
+                return df
+        raise KeyError(f"no {name!r} dataset loaded")
+
+    def derive(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, building it on first use.
+
+        Concurrent callers asking for the same ``key`` wait for one build.
+        If it raises, nothing is cached and the next caller builds again.
+        """
+        with self.lock:
+            if key in self.derived:
+                return self.derived[key]
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self.lock:
+                if key in self.derived:
+                    return self.derived[key]
+            try:
+                value = build()
+                with self.lock:
+                    self.derived[key] = value
+            finally:
+                with self.lock:
+                    if self._building.get(key) is building:
+                        del self._building[key]
+            return value
+
+
+class _Params:
+    """Typed access to query string parameters."""
+
+    def __init__(self, query: Mapping[str, list[str]]) -> None:
+        self.query = query
+
+    def get(self, name: str, default: Any = None, type: Callable[[str], Any] = str) -> Any:
+        values = self.query.get(name)
+        if not values:
+            if default is None:
+                raise ValueError(f"missing parameter {name!r}")
+            return default
+        try:
+            return type(values[-1])
+        except ValueError:
+            raise ValueError(f"invalid value for {name!r}: {values[-1]!r}") from None
+
+    def optional(self, name: str, type: Callable[[str], Any] = str) -> Any:
+        values = self.query.get(name)
+        return self.get(name, type=type) if values else None
+
+    def list(self, name: str, default: list[str]) -> list[str]:
+        values = self.query.get(name)
+        if not values:
+            return default
+        return [item for value in values for item in value.split(",") if item]
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=_json_default, allow_nan=False).encode()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """JSON-ready records of ``df``; missing values become ``null``."""
+    df = df.reset_index() if not isinstance(df.index, pd.RangeIndex) else df
+    columns = {}
+    for col in df.columns:
+        column = df[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.strftime("%Y-%m-%dT%H:%M:%S")
+        values = column.astype(object).where(column.notna(), None)
+        columns[str(col)] = [v.item() if isinstance(v, np.generic) else v for v in values]
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+class InventoryService:
+    """Answer inventory analyses from an archive held in memory.
+
+    Parameters
+    ----------
+    zip_path:
+        Archive with the dataset CSV files.
+    cache_size:
+        Number of encoded query results kept per archive version.
+
+    Notes
+    -----
+    :meth:`query` is thread safe.  A reload swaps in a new snapshot
+    atomically; queries already running finish on the previous one, and the
+    result and aggregate caches start empty for the new data.
+    """
+
+    def __init__(self, zip_path: str | Path, *, cache_size: int = 256) -> None:
+        self.zip_path = Path(zip_path)
+        self.cache_size = cache_size
+        self.reloads = 0
+        self._snapshot: _Snapshot | None = None
+        self._metrics: dict[str, dict[str, Any]] = {}
+        self._metrics_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.endpoints: dict[str, Callable[[_Snapshot, _Params], Any]] = {
+            "/datasets": self._datasets,
+            "/top-selling": self._top_selling,
+            "/abc": self._abc,
+            "/lead-times": self._lead_times,
+            "/lead-time-profile": self._lead_time_profile,
+            "/forecast": self._forecast,
+            "/policy": self._policy,
+            "/eoq": self._eoq,
+            "/reorder-point": self._reorder_point,
+        }
+
+    # -- loading ----------------------------------------------------------------
+
+    def _stamp(self) -> tuple[int, int]:
+        stat = self.zip_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def snapshot(self) -> _Snapshot:
+        if self._snapshot is None:
+            with self._reload_lock:
+                # Concurrent first requests load the archive only once.
+                if self._snapshot is None:
+                    self._load()
+        return self._snapshot
+
+    def load(self) -> None:
+        """(Re)load the archive and reset every cache."""
+        with self._reload_lock:
+            self._load()
+
+    def _load(self) -> None:
+        stamp = self._stamp()
+        datasets = load_datasets(self.zip_path, typed=True, materialize=True)
+        snapshot = _Snapshot(datasets, stamp)
+        if self._snapshot is not None:
+            self.reloads += 1
+        self._snapshot = snapshot
+
+    def changed(self) -> bool:
+        """Whether the archive differs from the loaded version."""
+        try:
+            stamp = self._stamp()
+        except OSError:  # being replaced; check again later
+            return False
+        return self._snapshot is None or stamp != self._snapshot.stamp
+
+    def reload_if_changed(self) -> bool:
+        """Reload the archive if it changed and report whether it did."""
+        if not self.changed():
+            return False
+        self.load()
+        return True
+
+    # -- queries ----------------------------------------------------------------
+
+    def query(self, path: str, query: Mapping[str, list[str]] | None = None) -> bytes:
+        """Answer ``path`` with the given query parameters as JSON bytes.
+
+        Raises
+        ------
+        UnknownEndpoint
+            For an unknown endpoint.
+        KeyError, ValueError, TypeError
+            For invalid parameters or missing columns.
+        """
+        query = query or {}
+        if path == "/metrics":
+            return _encode(self.metrics())
+        if path == "/health":
+            return _encode({"status": "ok"})
+        handler = self.endpoints.get(path)
+        if handler is None:
+            raise UnknownEndpoint(path)
+        snapshot = self.snapshot
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        with snapshot.lock:
+            cached = snapshot.results.get(key)
+            if cached is not None:
+                snapshot.results.move_to_end(key)
+                return cached
+        body = _encode({"data": handler(snapshot, _Params(query))})
+        with snapshot.lock:
+            snapshot.results[key] = body
+            while len(snapshot.results) > self.cache_size:
+                snapshot.results.popitem(last=False)
+        return body
+
+    def _datasets(self, snapshot: _Snapshot, params: _Params) -> Any:
+        return [
+            {
+                "name": name,
+                "schema": getattr(schema_for(name), "name", None),
+                "rows": len(df),
+                "columns": list(map(str, df.columns)),
+            }
+            for name, df in snapshot.datasets.items()
+        ]
+
+    def _top_selling(self, snapshot: _Snapshot, params: _Params) -> Any:
+        dataset = params.get("dataset", "sales")
+        product_col = params.get("product_col", "Description")
+        quantity_col = params.get("quantity_col", "SalesQuantity")
+        top_n = params.get("top_n", 10, int)
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+
+        def totals() -> pd.Series:
+            df = snapshot.dataset(dataset)
+            for col in (product_col, quantity_col):
+                if col not in df.columns:
+                    raise KeyError(f"{col!r} not in DataFrame")
+            totals = df.groupby(product_col, observed=True)[quantity_col].sum()
+            return totals.sort_values(ascending=False)
+
+        ranked = snapshot.derive(("totals", dataset, product_col, quantity_col), totals)
+        return _records(rank_totals(ranked, top_n))
+
+    def _abc(self, snapshot: _Snapshot, params: _Params) -> Any:
+        dataset = params.get("dataset", "ending_inventory")
+        value_col = params.get("value_col", "Price")
+        result = classify_inventory(
+            snapshot.dataset(dataset),
+            value_col,
+            a_threshold=params.get("a_threshold", 0.8, float),
+            b_threshold=params.get("b_threshold", 0.95, float),
+        )
+        columns = params.list("columns", list(map(str, result.columns)))
+        limit = params.get("limit", 1000, int)
+        return _records(result[columns].head(limit).reset_index(drop=True))
+
+    def _lead_times(self, snapshot: _Snapshot, params: _Params) -> Any:
+        group_col = params.get("group_col", "VendorNumber")
+        lead_times = compute_lead_times(
+            snapshot.dataset(params.get("dataset", "purchases")),
+            params.get("order_date_col", "PODate"),
+            params.get("receipt_date_col", "ReceivingDate"),
+            group_col=group_col,
+        )
+        return _records(lead_times.rename("lead_time_days").to_frame())
+
+    def _lead_time_profile(self, snapshot: _Snapshot, params: _Params) -> Any:
+        profile = lead_time_profile(
+            snapshot.dataset(params.get("dataset", "purchases")),
+            params.get("order_date_col", "PODate"),
+            params.get("receipt_date_col", "ReceivingDate"),
+            by=params.list("by", ["VendorNumber"]),
+            exact=params.get("exact", "false").lower() in ("1", "true", "yes"),
+        )
+        return _records(profile)
+
+    def _forecast(self, snapshot: _Snapshot, params: _Params) -> Any:
+        dataset = params.get("dataset", "sales")
+        date_col = params.get("date_col", "SalesDate")
+        quantity_col = params.get("quantity_col", "SalesQuantity")
+
+        def daily() -> pd.Series:
+            df = snapshot.dataset(dataset)
+            dates = pd.to_datetime(df[date_col])
+            return df[quantity_col].groupby(dates).sum().asfreq("D", fill_value=0)
+
+        series = snapshot.derive(("daily", dataset, date_col, quantity_col), daily)
+        forecast = forecast_demand(
+            series,
+            params.get("periods", 30, int),
+            seasonal_periods=params.optional("seasonal_periods", int),
+            engine=params.get("engine", "numpy"),
+        )
+        return [
+            {"date": date.strftime("%Y-%m-%d"), "forecast": float(value)}
+            for date, value in forecast.items()
+        ]
+
+    def _policy(self, snapshot: _Snapshot, params: _Params) -> Any:
+        policy = snapshot.derive(
+            "policy",
+            lambda: InventoryPolicyEngine(snapshot.datasets).run().set_index("InventoryId"),
+        )
+        inventory_ids = params.list("inventory_id", [])
+        if inventory_ids:
+            policy = policy.loc[policy.index.intersection(inventory_ids)]
+        abc_class = params.optional("abc_class")
+        if abc_class:
+            policy = policy[policy["abc_class"] == abc_class]
+        return _records(policy.head(params.get("limit", 1000, int)))
+
+    def _eoq(self, snapshot: _Snapshot, params: _Params) -> Any:
+        return {
+            "eoq": calculate_eoq(
+                params.get("demand", type=float),
+                params.get("order_cost", type=float),
+                params.get("holding_cost", type=float),
+            )
+        }
+
+    def _reorder_point(self, snapshot: _Snapshot, params: _Params) -> Any:
+        return {
+            "reorder_point": calculate_reorder_point(
+                params.get("daily_demand", type=float),
+                params.get("lead_time_days", type=float),
+                safety_stock=params.get("safety_stock", 0.0, float),
+            )
+        }
+
+    # -- metrics ----------------------------------------------------------------
+
+    def record(self, path: str, seconds: float, *, error: bool = False) -> None:
+        """Record the latency of one request to ``path``."""
+        with self._metrics_lock:
+            entry = self._metrics.setdefault(
+                path, {"count": 0, "errors": 0, "latencies": deque(maxlen=LATENCY_WINDOW)}
+            )
+            entry["count"] += 1
+            entry["errors"] += error
+            entry["latencies"].append(seconds)
+
+    def metrics(self) -> dict[str, Any]:
+        """Request counts and latency percentiles (milliseconds) per endpoint."""
+        with self._metrics_lock:
+            endpoints = {}
+            for path, entry in sorted(self._metrics.items()):
+                latencies = np.asarray(entry["latencies"]) * 1000
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                endpoints[path] = {
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "mean_ms": float(latencies.mean()),
+                    "p50_ms": float(p50),
+                    "p95_ms": float(p95),
+                    "p99_ms": float(p99),
+                    "max_ms": float(latencies.max()),
+                }
+        snapshot = self._snapshot
+        return {
+            "archive": str(self.zip_path),
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "reloads": self.reloads,
+            "cached_results": len(snapshot.results) if snapshot else 0,
+            "endpoints": endpoints,
+        }
+
+
+class InventoryServer:
+    """Serve an :class:`InventoryService` over HTTP/1.1 with asyncio.
+
+    Parameters
+    ----------
+    service:
+        The service answering queries.
+    host, port:
+        Address to listen on; port ``0`` picks a free port (see
+        :attr:`port` after :meth:`start`).
+    max_workers:
+        Threads running analyses.  Defaults to the number of CPUs.
+    poll_interval:
+        Seconds between checks of the archive for changes; ``None``
+        disables hot reload.
+    """
+
+    def __init__(
+        self,
+        service: InventoryService,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_workers: int | None = None,
+        poll_interval: float | None = 2.0,
+    ) -> None:
+        self.service = service
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+        self._server: asyncio.base_events.Server | None = None
+        self._watcher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Load the archive and start listening."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, lambda: self.service.snapshot)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.poll_interval is not None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await loop.run_in_executor(self._executor, self.service.reload_if_changed)
+            except Exception:  # keep serving the previous version
+                logger.exception("reloading %s failed", self.service.zip_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, _encode({"error": "malformed request"}), False)
+                    break
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                )
+                url = urlsplit(target)
+                start = time.perf_counter()
+                if method != "GET":
+                    status, body = 400, _encode({"error": f"unsupported method {method}"})
+                else:
+                    try:
+                        body = await loop.run_in_executor(
+                            self._executor, self.service.query, url.path, parse_qs(url.query)
+                        )
+                        status = 200
+                    except UnknownEndpoint:
+                        status, body = 404, _encode({"error": f"unknown endpoint {url.path}"})
+                    except (KeyError, ValueError, TypeError) as exc:
+                        message = exc.args[0] if exc.args else str(exc)
+                        status, body = 400, _encode({"error": str(message)})
+                    except Exception as exc:
+                        status, body = 500, _encode({"error": f"{type(exc).__name__}: {exc}"})
+                if url.path != "/metrics":
+                    self.service.record(
+                        url.path, time.perf_counter() - start, error=status != 200
+                    )
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool
+    ) -> None:
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(
+    zip_path: str | Path,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    max_workers: int | None = None,
+    poll_interval: float | None = 2.0,
+) -> None:
+    """Serve the analyses of ``zip_path`` until cancelled."""
+    server = InventoryServer(
+        InventoryService(zip_path),
+        host=host,
+        port=port,
+        max_workers=max_workers,
+        poll_interval=poll_interval,
+    )
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve inventory analyses over HTTP.")
+    parser.add_argument("archive", nargs="?", default="Sample.zip")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(
+            serve(
+                args.archive,
+                host=args.host,
+                port=args.port,
+                max_workers=args.workers,
+                poll_interval=args.poll_interval or None,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Monte Carlo simulation of reorder point policies.
+
+:func:`calculate_reorder_point` and :class:`~inventory.policy.InventoryPolicyEngine`
+give deterministic policy parameters; :func:`simulate_inventory` measures the
+fill rate, stockout days and average stock a continuous-review ``(R, Q)``
+policy actually achieves when daily demand is resampled from history and
+lead times are drawn from observed purchase orders.
+
+Every day of the horizon is one vectorised step over an array holding all
+SKUs times replications of a shard; shards of SKUs run on a process pool.
+Demand that cannot be served from stock is lost.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_members, load_datasets
+from .policy import REQUIRED_DATASETS, InventoryPolicyEngine
+
+#: Upper bound on the cells (SKUs x replications x state rows) of one shard,
+#: used to size shards when ``chunksize`` is not given.  Shards small enough
+#: to stay in the CPU caches simulate faster than a few large ones.
+SHARD_CELLS = 1 << 19
+
+#: Statistics reported per SKU.
+RESULT_COLUMNS = ("fill_rate", "stockout_days", "avg_on_hand", "orders")
+
+
+def _simulate_shard(
+    shard: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    seed: np.random.SeedSequence,
+    *,
+    pool_values: np.ndarray,
+    pool_offsets: np.ndarray,
+    pool_sizes: np.ndarray,
+    days: int,
+    replications: int,
+) -> np.ndarray:
+    """Simulate one shard of SKUs and return its per-SKU statistics.
+
+    Runs in worker processes.  State arrays are flat with one cell per SKU
+    and replication; orders due on a later day are kept in a ring buffer
+    indexed by arrival day.
+    """
+    reorder_point, order_quantity, on_hand, demand, pools = shard
+    rng = np.random.default_rng(seed)
+    n_skus, history = demand.shape
+    cells = n_skus * replications
+
+    rop = np.repeat(reorder_point, replications)
+    quantity = np.repeat(order_quantity, replications)
+    stock = np.repeat(on_hand, replications).astype(float)
+    row = np.repeat(np.arange(n_skus) * history, replications)
+    flat_demand = demand.ravel()
+    pool = np.repeat(pools, replications)
+    offsets, sizes = pool_offsets[pool], pool_sizes[pool]
+    ring = int(pool_values.max()) + 1
+
+    arrivals = np.zeros((ring, cells))
+    on_order = np.zeros(cells)
+    served = np.zeros(cells)
+    demanded = np.zeros(cells)
+    stockout_days = np.zeros(cells)
+    stock_days = np.zeros(cells)
+    orders = np.zeros(cells)
+
+    for day in range(days):
+        arriving = arrivals[day % ring]
+        stock += arriving
+        on_order -= arriving
+        arriving[:] = 0.0
+
+        wanted = flat_demand[row + rng.integers(0, history, cells)]
+        sold = np.minimum(stock, wanted)
+        stock -= sold
+        served += sold
+        demanded += wanted
+        stockout_days += wanted > sold
+        stock_days += stock
+
+        position = stock + on_order
+        due = np.flatnonzero(position <= rop)
+        if due.size:
+            batches = np.floor((rop[due] - position[due]) / quantity[due]) + 1
+            ordered = batches * quantity[due]
+            draw = (rng.random(due.size) * sizes[due]).astype(np.int64)
+            lead = pool_values[offsets[due] + draw]
+            arrivals[(day + lead) % ring, due] += ordered
+            on_order[due] += ordered
+            orders[due] += 1
+
+    def per_sku(values: np.ndarray) -> np.ndarray:
+        return values.reshape(n_skus, replications).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fill_rate = per_sku(served) / per_sku(demanded)
+    return np.column_stack(
+        [
+            fill_rate,
+            per_sku(stockout_days) / replications,
+            per_sku(stock_days) / (replications * days),
+            per_sku(orders) / replications,
+        ]
+    )
+
+
+def simulate_inventory(
+    reorder_point: Any,
+    order_quantity: Any,
+    demand: np.ndarray,
+    lead_times: Sequence[Any],
+    *,
+    lead_time_pool: Any = None,
+    initial_on_hand: Any = None,
+    days: int = 365,
+    replications: int = 1000,
+    seed: int = 0,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+) -> pd.DataFrame:
+    """Simulate a reorder point policy for many SKUs.
+
+    Every day a demand is drawn per SKU and replication from the SKU's
+    historical days, served from stock (unserved demand is lost), and when
+    the inventory position (stock plus open orders) is at or below the
+    reorder point enough multiples of the order quantity are ordered to
+    lift it above.  Orders arrive after a lead time drawn from the SKU's
+    lead time pool.
+
+    Parameters
+    ----------
+    reorder_point, order_quantity:
+        Policy per SKU, e.g. the ``reorder_point`` and ``eoq`` columns of
+        :class:`~inventory.policy.InventoryPolicyEngine`.  Order quantities
+        must be positive.
+    demand:
+        Historical daily demand, one row per SKU and one column per day.
+    lead_times:
+        Pools of observed lead times in days.  Lead times below one day are
+        treated as one day.
+    lead_time_pool:
+        Pool of every SKU, as positions in ``lead_times``.  Defaults to one
+        pool per SKU, in order.
+    initial_on_hand:
+        Stock per SKU on the first day.  Defaults to the reorder point plus
+        the order quantity.
+    days:
+        Simulated horizon in days.
+    replications:
+        Independent runs per SKU.
+    seed:
+        Seed of the random generator.  Results depend on ``seed`` and
+        ``chunksize`` but not on ``max_workers``.
+    max_workers:
+        Number of worker processes.  ``None`` uses :func:`os.cpu_count`; ``1``
+        simulates every shard in the calling process.
+    chunksize:
+        Number of SKUs per shard.  By default shards hold about
+        :data:`SHARD_CELLS` state cells.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per SKU with ``fill_rate`` (share of demand served),
+        ``stockout_days`` (days with lost demand per replication),
+        ``avg_on_hand`` (end-of-day stock) and ``orders`` (orders placed per
+        replication).
+    """
+    demand = np.asarray(demand)
+    if demand.ndim != 2:
+        raise ValueError("demand must be a two-dimensional array")
+    n_skus = demand.shape[0]
+    reorder_point, order_quantity = (
+        np.broadcast_to(np.asarray(values, dtype=float), (n_skus,))
+        for values in (reorder_point, order_quantity)
+    )
+    if initial_on_hand is None:
+        initial_on_hand = reorder_point + order_quantity
+    initial_on_hand = np.broadcast_to(np.asarray(initial_on_hand, dtype=float), (n_skus,))
+    if lead_time_pool is None:
+        lead_time_pool = np.arange(n_skus)
+    lead_time_pool = np.broadcast_to(np.asarray(lead_time_pool, dtype=np.int64), (n_skus,))
+
+    if days <= 0:
+        raise ValueError("days must be positive")
+    if replications <= 0:
+        raise ValueError("replications must be positive")
+    if n_skus and demand.shape[1] == 0:
+        raise ValueError("demand must hold at least one day")
+    if not np.isfinite(reorder_point).all():
+        raise ValueError("reorder_point must be finite")
+    if not (np.isfinite(order_quantity) & (order_quantity > 0)).all():
+        raise ValueError("order_quantity must be positive")
+    if (initial_on_hand < 0).any() or (demand < 0).any():
+        raise ValueError("initial_on_hand and demand cannot be negative")
+
+    pools = [np.maximum(np.asarray(pool, dtype=np.int64), 1) for pool in lead_times]
+    pool_sizes = np.array([len(pool) for pool in pools], dtype=np.int64)
+    if ((lead_time_pool < 0) | (lead_time_pool >= len(pools))).any():
+        raise ValueError("lead_time_pool refers to a missing lead time pool")
+    if (pool_sizes[np.unique(lead_time_pool)] == 0).any():
+        raise ValueError("lead time pools used by a SKU cannot be empty")
+    pool_offsets = np.concatenate(([0], np.cumsum(pool_sizes)[:-1])).astype(np.int64)
+    pool_values = np.concatenate(pools) if pools else np.zeros(0, dtype=np.int64)
+
+    if n_skus == 0:
+        return pd.DataFrame({col: np.zeros(0) for col in RESULT_COLUMNS})
+    if chunksize is None:
+        per_sku = replications * (int(pool_values.max()) + 9) + demand.shape[1]
+        chunksize = max(1, SHARD_CELLS // per_sku)
+    starts = range(0, n_skus, chunksize)
+    shards = [
+        (
+            reorder_point[lo : lo + chunksize],
+            order_quantity[lo : lo + chunksize],
+            initial_on_hand[lo : lo + chunksize],
+            demand[lo : lo + chunksize],
+            lead_time_pool[lo : lo + chunksize],
+        )
+        for lo in starts
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    run = partial(
+        _simulate_shard,
+        pool_values=pool_values,
+        pool_offsets=pool_offsets,
+        pool_sizes=pool_sizes,
+        days=days,
+        replications=replications,
+    )
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(shards) == 1:
+        results = [run(shard, shard_seed) for shard, shard_seed in zip(shards, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, shards, seeds))
+    return pd.DataFrame(np.concatenate(results), columns=list(RESULT_COLUMNS))
+
+
+def simulate_policy(
+    datasets: Mapping[str, pd.DataFrame],
+    *,
+    policy: pd.DataFrame | None = None,
+    days: int = 365,
+    replications: int = 1000,
+    seed: int = 0,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    **engine_kwargs: Any,
+) -> pd.DataFrame:
+    """Simulate the policy of :class:`~inventory.policy.InventoryPolicyEngine`.
+
+    Daily demand is resampled from each SKU's sales history and lead times
+    from the purchase orders of its vendor.
+
+    Parameters
+    ----------
+    datasets:
+        Frames as accepted by :class:`~inventory.policy.InventoryPolicyEngine`.
+    policy:
+        Policy table to simulate, with ``InventoryId``, ``VendorNumber``,
+        ``reorder_point``, ``eoq`` and ``holding_cost`` columns.  Defaults to
+        the table computed by the engine.
+    days, replications, seed, max_workers, chunksize:
+        See :func:`simulate_inventory`.
+    **engine_kwargs:
+        Passed to :class:`~inventory.policy.InventoryPolicyEngine`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The policy's ``InventoryId``, ``reorder_point`` and ``eoq`` with the
+        simulated ``fill_rate``, ``stockout_days``, ``avg_on_hand`` and
+        ``orders`` and the ``holding_cost_per_year`` of the average stock.
+        SKUs without a valid policy or vendor lead times have ``NaN``
+        results.
+    """
+    engine = InventoryPolicyEngine(datasets, **engine_kwargs)
+    if policy is None:
+        policy = engine.run()
+    for col in ("InventoryId", "VendorNumber", "reorder_point", "eoq", "holding_cost"):
+        if col not in policy.columns:
+            raise KeyError(f"{col!r} not in DataFrame")
+
+    vendor_pools = engine.vendor_lead_times()
+    vendors = pd.Index(list(vendor_pools))
+    pool = vendors.get_indexer(policy["VendorNumber"].to_numpy(dtype=float, na_value=np.nan))
+    reorder_point = policy["reorder_point"].to_numpy(dtype=float)
+    order_quantity = policy["eoq"].to_numpy(dtype=float)
+    valid = (
+        (pool >= 0)
+        & np.isfinite(reorder_point)
+        & np.isfinite(order_quantity)
+        & (order_quantity > 0)
+    )
+    rows = engine.skus.get_indexer(np.asarray(policy["InventoryId"], dtype=object))
+    valid &= rows >= 0
+
+    simulated = simulate_inventory(
+        reorder_point[valid],
+        order_quantity[valid],
+        engine.demand_history()[rows[valid]],
+        list(vendor_pools.values()),
+        lead_time_pool=pool[valid],
+        days=days,
+        replications=replications,
+        seed=seed,
+        max_workers=max_workers,
+        chunksize=chunksize,
+    )
+    result = pd.DataFrame(
+        {
+            "InventoryId": policy["InventoryId"].to_numpy(),
+            "reorder_point": reorder_point,
+            "eoq": order_quantity,
+        },
+        index=policy.index,
+    )
+    for col in RESULT_COLUMNS:
+        values = np.full(len(policy), np.nan)
+        values[valid] = simulated[col].to_numpy()
+        result[col] = values
+    result["holding_cost_per_year"] = (
+        result["avg_on_hand"] * policy["holding_cost"].to_numpy(dtype=float)
+    )
+    return result
+
+
+def simulate_policy_from_zip(zip_path: str | Path, **kwargs: Any) -> pd.DataFrame:
+    """Load the datasets required by :func:`simulate_policy` from ``zip_path``.
+
+    Keyword arguments are passed to :func:`simulate_policy`.
+    """
+    members = [member for _, member in dataset_members(zip_path, REQUIRED_DATASETS)]
+    datasets = load_datasets(zip_path, files=members, typed=True, materialize=True)
+    return simulate_policy(datasets, **kwargs)
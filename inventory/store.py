@@ -0,0 +1,497 @@
+"""Memory-mapped columnar store for datasets larger than memory.
+
+:func:`build_store` converts the CSV members of an archive into one binary
+file per column: dimensions (strings and the key columns listed in
+:data:`DIMENSIONS`) become ``int32`` positions into a per-column dictionary,
+dates become ``int32`` day numbers and the remaining numbers are kept as
+``int32`` or floats.  :func:`open_store` (and :func:`load_datasets` given a
+store directory) returns :class:`MappedTable` views whose columns are opened
+with :class:`numpy.memmap`, so only the pages a computation touches are read.
+
+The aggregations used by :func:`~inventory.sales_analysis.top_selling_products`,
+:func:`~inventory.lead_time.compute_lead_times` and
+:func:`~inventory.demand_forecasting.forecast_from_zip` run directly on the
+mapped arrays, block by block, without building pandas object columns.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .schemas import read_csv_options
+
+#: Integer key columns that are dictionary-encoded like strings.
+DIMENSIONS = ("InventoryId", "Store", "Brand", "VendorNumber", "VendorNo")
+
+#: Rows processed at a time by the aggregations.
+BLOCK_ROWS = 1 << 20
+
+#: Day number stored for missing dates.
+NAT_DAY = np.iinfo(np.int32).min
+
+_STORE_VERSION = 1
+_MANIFEST = "store.json"
+
+
+def iter_blocks(rows: int) -> Iterator[slice]:
+    """Slices covering ``rows`` rows in blocks of :data:`BLOCK_ROWS`."""
+    for start in range(0, rows, BLOCK_ROWS):
+        yield slice(start, min(start + BLOCK_ROWS, rows))
+
+
+class _ColumnWriter:
+    """Append the chunks of one column to its binary file."""
+
+    def __init__(self, directory: Path, position: int, name: str, column: pd.Series) -> None:
+        self.entry: dict[str, Any] = {"name": name, "file": f"c{position}.bin"}
+        dtype = column.dtype
+        if dtype.kind == "M":
+            self.entry.update(kind="date", dtype="int32")
+        elif (
+            isinstance(dtype, pd.CategoricalDtype)
+            or dtype.kind not in "biuf"
+            or (name in DIMENSIONS and dtype.kind in "iuf")
+        ):
+            self.entry.update(kind="dimension", dtype="int32", dictionary=f"c{position}.dict.npy")
+        elif dtype.kind in "biu":
+            self.entry.update(kind="value", dtype="int32")
+        else:
+            self.entry.update(kind="value", dtype="float32" if dtype == np.float32 else "float64")
+        self.directory = directory
+        self.values: pd.Index | None = None
+        self.fp = open(directory / self.entry["file"], "wb")
+
+    def append(self, column: pd.Series) -> None:
+        kind = self.entry["kind"]
+        if kind == "date":
+            days = column.to_numpy(dtype="datetime64[D]").astype(np.int64)
+            days[pd.isna(column).to_numpy()] = NAT_DAY
+            data = days.astype(np.int32)
+        elif kind == "dimension":
+            codes, uniques = pd.factorize(column)
+            uniques = np.asarray(uniques)
+            if self.values is None:
+                self.values = pd.Index(uniques)
+                positions = np.arange(len(uniques))
+            else:
+                positions = self.values.get_indexer(uniques)
+                new = positions < 0
+                positions[new] = np.arange(len(self.values), len(self.values) + new.sum())
+                self.values = self.values.append(pd.Index(uniques[new]))
+            data = np.where(codes < 0, -1, positions[codes]).astype(np.int32)
+        else:
+            if self.entry["dtype"] == "int32" and column.dtype.kind == "f":
+                self._widen()
+            data = column.to_numpy(dtype=self.entry["dtype"])
+        data.tofile(self.fp)
+
+    def _widen(self) -> None:
+        """Rewrite an integer column as float64 once a chunk holds blanks."""
+        self.fp.close()
+        path = self.directory / self.entry["file"]
+        np.fromfile(path, dtype=np.int32).astype(np.float64).tofile(path)
+        self.entry["dtype"] = "float64"
+        self.fp = open(path, "ab")
+
+    def close(self) -> dict[str, Any]:
+        self.fp.close()
+        if self.entry["kind"] == "dimension":
+            values = np.asarray([]) if self.values is None else self.values.to_numpy()
+            if values.dtype == object and all(isinstance(v, str) for v in values):
+                values = values.astype(str)
+            np.save(self.directory / self.entry["dictionary"], values, allow_pickle=False)
+        return self.entry
+
+
+def _open_writers(directory: Path, chunk: pd.DataFrame) -> list[_ColumnWriter]:
+    """One writer per column of ``chunk``, typed after its dtypes."""
+    return [
+        _ColumnWriter(directory, i, str(name), chunk[name]) for i, name in enumerate(chunk.columns)
+    ]
+
+
+def _header(path: Path, member: str) -> pd.DataFrame:
+    """Empty frame with the typed columns of ``member``, for members without rows."""
+    kwargs, finalize = read_csv_options(member, typed=True)
+    with zipfile.ZipFile(path) as zf, zf.open(member) as fp:
+        return finalize(pd.read_csv(fp, nrows=0, **kwargs))
+
+
+def build_store(
+    zip_path: str | Path,
+    directory: str | Path,
+    *,
+    files: Iterable[str] | None = None,
+    chunksize: int = 500_000,
+) -> Path:
+    """Convert the CSV members of ``zip_path`` into a store in ``directory``.
+
+    Members are streamed with the built-in schemas applied (see
+    :func:`~inventory.datasets.iter_dataset`), so memory depends on
+    ``chunksize`` and the dictionary sizes rather than on the number of rows.
+    An existing store in ``directory`` is replaced; any other non-empty
+    ``directory`` is left alone and :class:`FileExistsError` is raised.
+
+    Parameters
+    ----------
+    zip_path:
+        Archive holding the CSV files.
+    directory:
+        Destination of the store.
+    files:
+        Optional base names of the members to convert, like the ``files``
+        argument of :func:`~inventory.datasets.load_datasets`.  Defaults to
+        every CSV member.
+    chunksize:
+        Number of rows parsed at a time.
+
+    Returns
+    -------
+    pathlib.Path
+        ``directory``.
+
+    Raises
+    ------
+    FileExistsError
+        If ``directory`` exists and is neither empty nor a store.
+    """
+    from .datasets import iter_dataset
+
+    path, directory = Path(zip_path), Path(directory)
+    if not path.is_file():
+        raise FileNotFoundError(f"{zip_path!r} does not exist")
+    if directory.exists() and not is_store(directory):
+        if not directory.is_dir() or any(directory.iterdir()):
+            raise FileExistsError(f"{str(directory)!r} exists and is not an inventory store")
+    with zipfile.ZipFile(path) as zf:
+        members = [name for name in zf.namelist() if name.lower().endswith(".csv")]
+    if files is not None:
+        wanted = {Path(f).name for f in files}
+        members = [name for name in members if Path(name).name in wanted]
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".tmp-"))
+    try:
+        tables: dict[str, Any] = {}
+        for member in members:
+            stem = Path(member).stem
+            (tmp / stem).mkdir()
+            writers: list[_ColumnWriter] = []
+            rows = 0
+            try:
+                for chunk in iter_dataset(path, member, chunksize=chunksize, typed=True):
+                    if not writers:
+                        writers = _open_writers(tmp / stem, chunk)
+                    for writer, name in zip(writers, chunk.columns):
+                        writer.append(chunk[name])
+                    rows += len(chunk)
+                if not writers:
+                    writers = _open_writers(tmp / stem, _header(path, member))
+                columns = [writer.close() for writer in writers]
+            finally:
+                for writer in writers:
+                    writer.fp.close()
+            tables[stem] = {"member": member, "rows": rows, "columns": columns}
+        manifest = {
+            "version": _STORE_VERSION,
+            "source": archive_source(path),
+            "tables": tables,
+        }
+        (tmp / _MANIFEST).write_text(json.dumps(manifest, indent=2))
+        if is_store(directory):
+            shutil.rmtree(directory)
+        elif directory.exists():
+            directory.rmdir()
+        os.rename(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return directory
+
+
+def is_store(path: str | Path) -> bool:
+    """Whether ``path`` is a directory written by :func:`build_store`."""
+    return (Path(path) / _MANIFEST).is_file()
+
+
+def archive_source(path: str | Path) -> dict[str, Any]:
+    """Identify the archive at ``path`` by its contents.
+
+    The name, CRC and size of every member are taken from the zip central
+    directory, like the keys of the dataset cache, so a copy of an archive
+    or the same archive downloaded again is identified alike.  For a store
+    directory the record of the archive it was built from is returned.
+    """
+    path = Path(path)
+    if is_store(path):
+        return json.loads((path / _MANIFEST).read_text())["source"]
+    with zipfile.ZipFile(path) as zf:
+        return {"members": [[info.filename, info.CRC, info.file_size] for info in zf.infolist()]}
+
+
+def open_store(
+    directory: str | Path,
+    *,
+    files: Iterable[str] | None = None,
+    usecols: Iterable[str] | None = None,
+) -> dict[str, "MappedTable"]:
+    """Open the tables of the store in ``directory``.
+
+    ``files`` and ``usecols`` select members and columns like the arguments
+    of :func:`~inventory.datasets.load_datasets`.  No column data is read
+    until it is used.
+
+    Returns
+    -------
+    dict[str, MappedTable]
+        Mapping of member stem to its table.
+    """
+    directory = Path(directory)
+    if not is_store(directory):
+        raise FileNotFoundError(f"{str(directory)!r} is not an inventory store")
+    manifest = json.loads((directory / _MANIFEST).read_text())
+    if manifest.get("version") != _STORE_VERSION:
+        raise ValueError(f"unsupported store version {manifest.get('version')!r}")
+    wanted = None if files is None else {Path(f).name for f in files}
+    keep = None if usecols is None else set(usecols)
+    tables = {}
+    for stem, table in manifest["tables"].items():
+        if wanted is not None and Path(table["member"]).name not in wanted:
+            continue
+        columns = [c for c in table["columns"] if keep is None or c["name"] in keep]
+        tables[stem] = MappedTable(
+            directory / stem, stem, table["rows"], columns, member=table["member"]
+        )
+    return tables
+
+
+class MappedTable:
+    """Read-only view over one table of a store.
+
+    Parameters
+    ----------
+    directory:
+        Folder holding the column files.
+    name:
+        Member stem, used in error messages.
+    rows:
+        Number of rows.
+    columns:
+        Manifest entries of the columns.
+    member:
+        Name of the archive member the table was built from; defaults to
+        ``name``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str,
+        rows: int,
+        columns: Sequence[Mapping[str, Any]],
+        *,
+        member: str | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.name = name
+        self.member = member or name
+        self.rows = rows
+        self._entries = {entry["name"]: dict(entry) for entry in columns}
+        self._dictionaries: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __repr__(self) -> str:
+        return f"MappedTable({self.name!r}, rows={self.rows}, columns={list(self.columns)})"
+
+    @property
+    def columns(self) -> pd.Index:
+        """Column names, in file order."""
+        return pd.Index(list(self._entries))
+
+    def _entry(self, col: str) -> dict[str, Any]:
+        if col not in self._entries:
+            raise KeyError(f"{col!r} not in {self.name!r}")
+        return self._entries[col]
+
+    def kind(self, col: str) -> str:
+        """``"dimension"``, ``"date"`` or ``"value"``."""
+        return self._entry(col)["kind"]
+
+    def array(self, col: str) -> np.ndarray:
+        """Stored values of ``col``: codes, day numbers or numbers."""
+        entry = self._entry(col)
+        if self.rows == 0:
+            return np.empty(0, dtype=entry["dtype"])
+        return np.memmap(
+            self.directory / entry["file"], dtype=entry["dtype"], mode="r", shape=(self.rows,)
+        )
+
+    def dictionary(self, col: str) -> np.ndarray:
+        """Distinct values of the dimension ``col``, indexed by its codes."""
+        entry = self._entry(col)
+        if entry["kind"] != "dimension":
+            raise ValueError(f"{col!r} is not a dimension column")
+        if col not in self._dictionaries:
+            self._dictionaries[col] = np.load(self.directory / entry["dictionary"])
+        return self._dictionaries[col]
+
+    def column(self, col: str, rows: slice | None = None) -> pd.Series:
+        """Decode ``col`` (or its ``rows``) into a pandas column.
+
+        String dimensions become ``category`` with sorted categories, like
+        the typed loads, and dates ``datetime64``.
+        """
+        kind = self.kind(col)
+        values = self.array(col)
+        index = None
+        if rows is not None:
+            values = values[rows]
+            index = pd.RangeIndex(*rows.indices(self.rows))
+        if kind == "date":
+            days = np.asarray(values).astype("datetime64[D]")
+            days[values == NAT_DAY] = np.datetime64("NaT")
+            data: Any = days.astype("datetime64[ns]")
+        elif kind == "dimension":
+            dictionary = self.dictionary(col)
+            if dictionary.dtype.kind in "biuf" and not (values < 0).any():
+                data = dictionary.take(values)
+            else:
+                order = np.argsort(dictionary, kind="stable")
+                rank = np.empty_like(order)
+                rank[order] = np.arange(len(order))
+                codes = np.where(values < 0, -1, rank[np.maximum(values, 0)])
+                data = pd.Categorical.from_codes(codes, dictionary[order].astype(object))
+        else:
+            data = np.asarray(values)
+        return pd.Series(data, index=index, name=col)
+
+    def to_pandas(
+        self,
+        columns: Iterable[str] | None = None,
+        rows: slice | None = None,
+    ) -> pd.DataFrame:
+        """Materialise ``columns`` (default all), optionally only ``rows``."""
+        names = list(self._entries) if columns is None else list(columns)
+        return pd.DataFrame({col: self.column(col, rows) for col in names}, columns=names)
+
+    def _require(self, col: str, kind: str) -> None:
+        if self.kind(col) != kind:
+            raise ValueError(f"{col!r} is not a {kind} column")
+
+    def _dates(self, col: str, rows: slice) -> tuple[np.ndarray, np.ndarray]:
+        days = np.asarray(self.array(col)[rows])
+        return days.astype(np.int64), days != NAT_DAY
+
+    def _total(self, sums: np.ndarray, value_col: str) -> np.ndarray:
+        if self._entry(value_col)["dtype"] == "int32":
+            return sums.astype(np.int64)
+        return sums
+
+    def group_sum(self, by: str, value_col: str) -> pd.Series:
+        """Sum ``value_col`` per value of the dimension ``by``.
+
+        Equivalent to ``df.groupby(by)[value_col].sum()`` on the decoded
+        table, sorted by ``by``.
+        """
+        self._require(by, "dimension")
+        self._require(value_col, "value")
+        dictionary = self.dictionary(by)
+        sums = np.zeros(len(dictionary))
+        counts = np.zeros(len(dictionary), dtype=np.int64)
+        codes, values = self.array(by), self.array(value_col)
+        for rows in iter_blocks(self.rows):
+            block = np.asarray(codes[rows])
+            present = block >= 0
+            block, weights = block[present], np.asarray(values[rows])[present]
+            sums += np.bincount(block, weights=weights, minlength=len(dictionary))
+            counts += np.bincount(block, minlength=len(dictionary))
+        observed = counts > 0
+        index = pd.Index(dictionary[observed], name=by)
+        result = pd.Series(self._total(sums[observed], value_col), index=index, name=value_col)
+        return result.sort_index()
+
+    def daily_sum(self, date_col: str, value_col: str) -> pd.Series:
+        """Sum ``value_col`` per day with missing days filled with zero.
+
+        Same result as :func:`~inventory.demand_forecasting.daily_demand_from_chunks`.
+        """
+        self._require(date_col, "date")
+        self._require(value_col, "value")
+        first, last = None, None
+        for rows in iter_blocks(self.rows):
+            days, valid = self._dates(date_col, rows)
+            if valid.any():
+                low, high = days[valid].min(), days[valid].max()
+                first = low if first is None else min(first, low)
+                last = high if last is None else max(last, high)
+        if first is None:
+            raise ValueError("sales data contains no rows")
+        sums = np.zeros(last - first + 1)
+        values = self.array(value_col)
+        for rows in iter_blocks(self.rows):
+            days, valid = self._dates(date_col, rows)
+            weights = np.asarray(values[rows])[valid]
+            sums += np.bincount(days[valid] - first, weights=weights, minlength=len(sums))
+        index = pd.date_range(
+            np.datetime64(int(first), "D"), periods=len(sums), freq="D", name=date_col
+        )
+        return pd.Series(self._total(sums, value_col), index=index, name=value_col)
+
+    def lead_times(
+        self,
+        order_date_col: str,
+        receipt_date_col: str,
+        *,
+        group_col: str | None = None,
+    ) -> pd.Series:
+        """Lead times in days, optionally averaged per dimension ``group_col``.
+
+        Same result as :func:`~inventory.lead_time.compute_lead_times` on the
+        decoded table.
+        """
+        self._require(order_date_col, "date")
+        self._require(receipt_date_col, "date")
+        if not group_col:
+            parts, missing = [], False
+            for rows in iter_blocks(self.rows):
+                order, order_valid = self._dates(order_date_col, rows)
+                receipt, receipt_valid = self._dates(receipt_date_col, rows)
+                days = (receipt - order).astype(float)
+                valid = order_valid & receipt_valid
+                days[~valid] = np.nan
+                missing = missing or not valid.all()
+                parts.append(days)
+            days = np.concatenate(parts) if parts else np.empty(0)
+            return pd.Series(days if missing else days.astype(np.int64))
+
+        self._require(group_col, "dimension")
+        dictionary = self.dictionary(group_col)
+        sums = np.zeros(len(dictionary))
+        counts = np.zeros(len(dictionary), dtype=np.int64)
+        present = np.zeros(len(dictionary), dtype=bool)
+        codes = self.array(group_col)
+        for rows in iter_blocks(self.rows):
+            block = np.asarray(codes[rows])
+            order, order_valid = self._dates(order_date_col, rows)
+            receipt, receipt_valid = self._dates(receipt_date_col, rows)
+            grouped = block >= 0
+            present[block[grouped]] = True
+            valid = grouped & order_valid & receipt_valid
+            sums += np.bincount(
+                block[valid], weights=receipt[valid] - order[valid], minlength=len(dictionary)
+            )
+            counts += np.bincount(block[valid], minlength=len(dictionary))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums[present] / counts[present]
+        index = pd.Index(dictionary[present], name=group_col)
+        return pd.Series(means, index=index).sort_index()
@@ -0,0 +1,83 @@
+"""Helpers shared by the analysis modules.
+
+They are public so that modules reuse them instead of importing each
+other's private names, but they are not re-exported from :mod:`inventory`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .schemas import schema_for
+
+
+def find_dataset(datasets: Mapping[str, pd.DataFrame], name: str) -> pd.DataFrame:
+    """Return the frame of ``datasets`` whose schema is called ``name``.
+
+    Raises
+    ------
+    KeyError
+        If no frame matches.
+    """
+    for key, df in datasets.items():
+        schema = schema_for(key)
+        if schema is not None and schema.name == name:
+            return df
+    raise KeyError(f"no {name!r} dataset found")
+
+
+def as_dates(column: pd.Series) -> pd.Series:
+    """``column`` as datetimes, parsing it unless it already is."""
+    return column if pd.api.types.is_datetime64_any_dtype(column) else pd.to_datetime(column)
+
+
+def digest(payload: Mapping[str, Any]) -> str:
+    """Short stable hash of a JSON-serialisable mapping, used as a cache key."""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def rank_totals(totals: pd.Series, top_n: int) -> pd.DataFrame:
+    """Turn per-product totals into the ``top_n`` result frame.
+
+    Uses partial selection (:meth:`pandas.Series.nlargest`) instead of
+    sorting every product; ties keep their order of appearance.
+    """
+    return totals.nlargest(top_n, keep="first").rename("total_quantity").reset_index()
+
+
+class KeyCodes:
+    """Growing dictionary from key values to dense integer codes."""
+
+    def __init__(self, name: str) -> None:
+        self.index = pd.Index([], dtype=object, name=name)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def encode(self, values: Any, codes: np.ndarray | None = None) -> np.ndarray:
+        """Codes of a key column, adding unseen keys to the dictionary.
+
+        ``values`` is a column, or the distinct values indexed by ``codes``
+        (categories, a store dictionary).  Only the distinct values are
+        hashed.  Missing keys get ``-1``.
+        """
+        if codes is None:
+            if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+                codes = values.cat.codes.to_numpy()
+                values = values.cat.categories
+            else:
+                codes, values = pd.factorize(np.asarray(values, dtype=object))
+        distinct = np.asarray(values, dtype=object)
+        if not len(distinct):
+            return np.full(len(codes), -1, dtype=np.int64)
+        positions = self.index.get_indexer(distinct)
+        new = positions < 0
+        if new.any():
+            positions[new] = np.arange(len(self.index), len(self.index) + new.sum())
+            self.index = self.index.append(pd.Index(distinct[new], name=self.index.name))
+        codes = np.asarray(codes, dtype=np.int64)
+        return np.where(codes >= 0, positions[np.maximum(codes, 0)], -1)
@@ -0,0 +1,20 @@
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def make_zip():
+    """Function writing a zip archive at ``path`` from a mapping of name->DataFrame."""
+
+    def make(path, files):
+        with zipfile.ZipFile(path, "w") as zf:
+            for name, df in files.items():
+                zf.writestr(f"{name}.csv", df.to_csv(index=False))
+        return path
+
+    return make
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    calculate_eoq_from_df,
+    calculate_reorder_points_from_df,
+    classify_inventory,
+    compute_lead_times,
+    load_datasets,
+    top_selling_products,
+)
+
+BACKENDS = ["pyarrow", "polars"]
+
+
+@pytest.fixture
+def zip_path(tmp_path, make_zip):
+    rng = np.random.default_rng(7)
+    rows = 500
+    sales = pd.DataFrame(
+        {
+            "InventoryId": rng.choice(["1_A_10", "1_A_11", "2_B_10", "3_C_12"], rows),
+            "Store": rng.integers(1, 4, rows),
+            "Brand": rng.integers(10, 20, rows),
+            "SalesQuantity": rng.integers(1, 6, rows),
+            "SalesDollars": rng.random(rows).round(2) * 20,
+            "SalesDate": rng.choice(["1/1/2016", "1/2/2016", "1/15/2016"], rows),
+            "VendorName": rng.choice(["ACME  ", "SUPPLY CO"], rows),
+        }
+    )
+    ordered = pd.Timestamp("2016-01-01") + pd.to_timedelta(rng.integers(0, 30, rows), "D")
+    received = ordered + pd.to_timedelta(rng.integers(0, 15, rows), "D")
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": sales["InventoryId"],
+            "VendorNumber": rng.integers(1, 5, rows),
+            "PODate": ordered.strftime("%Y-%m-%d"),
+            "ReceivingDate": received.strftime("%Y-%m-%d"),
+            "Quantity": rng.integers(1, 50, rows),
+            "Dollars": rng.random(rows).round(2) * 100,
+        }
+    )
+    purchases.loc[3, "PODate"] = None
+    return make_zip(
+        tmp_path / "data.zip",
+        {"SalesFINAL12312016": sales, "PurchasesFINAL12312016": purchases},
+    )
+
+
+def _frame(df, backend):
+    if backend == "pyarrow":
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(df, preserve_index=False)
+    import polars as pl
+
+    return pl.from_pandas(df).lazy()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("typed", [False, True])
+def test_load_datasets_parity(backend, typed, zip_path):
+    pytest.importorskip(backend)
+    pytest.importorskip("pyarrow")
+
+    expected = load_datasets(zip_path, typed=typed, max_workers=1)
+    result = load_datasets(zip_path, typed=typed, max_workers=1, backend=backend)
+    assert list(result) == list(expected)
+    for name, df in expected.items():
+        pd.testing.assert_frame_equal(result[name], df)
+
+    usecols = ["InventoryId", "SalesQuantity"]
+    subset = load_datasets(zip_path, typed=typed, usecols=usecols, backend=backend)
+    for name, df in load_datasets(zip_path, typed=typed, usecols=usecols).items():
+        pd.testing.assert_frame_equal(subset[name], df)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_analysis_parity(backend, zip_path):
+    pytest.importorskip(backend)
+    pytest.importorskip("pyarrow")
+    datasets = load_datasets(zip_path)
+    sales = datasets["SalesFINAL12312016"]
+    purchases = datasets["PurchasesFINAL12312016"]
+
+    for product_col in ("InventoryId", "Brand"):
+        expected = top_selling_products(sales, product_col, "SalesQuantity", top_n=5)
+        for df in (sales, _frame(sales, backend)):
+            result = top_selling_products(
+                df, product_col, "SalesQuantity", top_n=5, backend=backend
+            )
+            pd.testing.assert_frame_equal(result, expected)
+
+    values = sales.assign(value=sales["SalesDollars"] + np.arange(len(sales)) * 1e-6)
+    pd.testing.assert_frame_equal(
+        classify_inventory(values, "value", backend=backend), classify_inventory(values, "value")
+    )
+
+    for group_col in (None, "VendorNumber"):
+        expected = compute_lead_times(purchases, "PODate", "ReceivingDate", group_col=group_col)
+        result = compute_lead_times(
+            purchases, "PODate", "ReceivingDate", group_col=group_col, backend=backend
+        )
+        pd.testing.assert_series_equal(result, expected)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_calculators_accept_backend_frames(backend):
+    pytest.importorskip(backend)
+    pytest.importorskip("pyarrow")
+    params = pd.DataFrame(
+        {"d": [1000.0, 500.0], "o": [50.0, 50.0], "h": [5.0, 2.0], "lt": [4.0, 2.0]}
+    )
+    frame = _frame(params, backend)
+
+    pd.testing.assert_series_equal(
+        calculate_eoq_from_df(frame, "d", "o", "h"), calculate_eoq_from_df(params, "d", "o", "h")
+    )
+    pd.testing.assert_series_equal(
+        calculate_reorder_points_from_df(frame, "d", "lt"),
+        calculate_reorder_points_from_df(params, "d", "lt"),
+    )
+    with pytest.raises(KeyError):
+        calculate_eoq_from_df(frame, "missing", "o", "h")
+
+
+def test_unknown_backend_is_rejected(zip_path):
+    with pytest.raises(ValueError, match="backend must be one of"):
+        top_selling_products(pd.DataFrame({"p": [1], "q": [1]}), "p", "q", backend="dask")
+    with pytest.raises(ValueError, match="backend must be one of"):
+        load_datasets(zip_path, backend="dask")
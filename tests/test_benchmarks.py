@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+
+import inventory
+from inventory import load_datasets
+from inventory.schemas import schema_for
+
+import compare
+import run
+from synthetic import MEMBERS, generate_archive
+
+
+def test_synthetic_archive_matches_schemas(tmp_path):
+    path = generate_archive(tmp_path / "synthetic.zip", 2_000, chunk_rows=700)
+
+    with zipfile.ZipFile(path) as zf:
+        assert sorted(zf.namelist()) == sorted(MEMBERS.values())
+    for name, df in load_datasets(path).items():
+        assert set(df.columns) == set(schema_for(name).columns)
+    datasets = load_datasets(path, typed=True)
+    sales = datasets["SalesFINAL12312016"]
+    assert len(sales) == 2_000
+    assert sales["VendorName"].str.strip().eq(sales["VendorName"]).all()
+    # Purchase lines reference SKUs present in the inventory snapshots.
+    purchases = datasets["PurchasesFINAL12312016"]
+    ending = datasets["EndInvFINAL12312016"]
+    assert set(purchases["InventoryId"]) <= set(ending["InventoryId"])
+
+
+def test_synthetic_archive_is_reproducible(tmp_path):
+    first = generate_archive(tmp_path / "a.zip", 500, seed=3)
+    second = generate_archive(tmp_path / "b.zip", 500, seed=3)
+    with zipfile.ZipFile(first) as a, zipfile.ZipFile(second) as b:
+        for name in MEMBERS.values():
+            assert a.read(name) == b.read(name)
+
+
+def test_every_public_name_is_benchmarked():
+    covered = {run.function_name(name) for name in run.CASES}
+    missing = set(inventory.__all__) - covered - set(run.NOT_BENCHMARKED)
+    assert not missing
+
+
+def test_run_writes_comparable_results(tmp_path):
+    output = tmp_path / "results.json"
+    status = run.main(
+        [
+            "--rows",
+            "2000",
+            "--repeat",
+            "1",
+            "--only",
+            "top_selling",
+            "calculate_eoq",
+            "--output",
+            str(output),
+        ]
+    )
+
+    assert status == 0
+    report = json.loads(output.read_text())
+    assert report["meta"]["rows"] == 2000
+    names = {result["name"] for result in report["results"]}
+    assert {"top_selling_products", "top_selling_sample", "calculate_eoq_from_zip"} <= names
+    for result in report["results"]:
+        assert result["seconds"] > 0
+        assert result["peak_memory_bytes"] >= 0
+
+    rows = compare.compare(compare.load(output), compare.load(output))
+    assert rows and not any(row["regression"] for row in rows)
+
+
+def test_compare_flags_regressions():
+    baseline = {
+        "fast": {"name": "fast", "seconds": 1.0, "peak_memory_bytes": 100},
+        "slow": {"name": "slow", "seconds": 1.0, "peak_memory_bytes": 100},
+        "broken": {"name": "broken", "seconds": 1.0, "peak_memory_bytes": 100},
+    }
+    current = {
+        "fast": {"name": "fast", "seconds": 0.5, "peak_memory_bytes": 100},
+        "slow": {"name": "slow", "seconds": 1.5, "peak_memory_bytes": 100},
+        "broken": {"name": "broken", "error": "ValueError: boom"},
+    }
+
+    rows = {row["name"]: row for row in compare.compare(baseline, current, threshold=0.2)}
+
+    assert not rows["fast"]["regression"]
+    assert rows["slow"]["regression"]
+    assert rows["broken"]["regression"]
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    DatasetCollection,
+    classify_inventory,
+    lead_time_profile,
+    top_selling_products,
+)
+
+
+def _month(month, seed):
+    rng = np.random.default_rng(seed)
+    rows = 60
+    sales = pd.DataFrame(
+        {
+            "InventoryId": rng.choice(["1_A_10", "1_A_11", "2_B_10", "3_C_12"], rows),
+            "SalesQuantity": rng.integers(1, 6, rows),
+            "SalesDollars": rng.integers(100, 2000, rows) / 100,
+            "SalesDate": [f"{month}/{day}/2016" for day in rng.integers(1, 28, rows)],
+        }
+    )
+    ordered = pd.Timestamp(f"2016-{month:02d}-01") + pd.to_timedelta(
+        rng.integers(0, 20, rows), "D"
+    )
+    purchases = pd.DataFrame(
+        {
+            "VendorNumber": rng.integers(1, 4, rows),
+            "PODate": ordered.strftime("%Y-%m-%d"),
+            "ReceivingDate": (
+                ordered + pd.to_timedelta(rng.integers(1, 12, rows), "D")
+            ).strftime("%Y-%m-%d"),
+        }
+    )
+    return sales, purchases
+
+
+def _partitions(make_zip, tmp_path):
+    """January as an archive, February as CSV files, March as Parquet."""
+    months = {month: _month(month, seed=month) for month in (1, 2, 3)}
+    data = tmp_path / "data"
+    (data / "2016-02").mkdir(parents=True)
+    sales, purchases = months[1]
+    make_zip(
+        data / "2016-01.zip",
+        {"SalesFINAL12312016": sales, "PurchasesFINAL12312016": purchases},
+    )
+    sales, purchases = months[2]
+    sales.to_csv(data / "2016-02" / "SalesFINAL_2016_02.csv", index=False)
+    purchases.to_csv(data / "2016-02" / "PurchasesFINAL_2016_02.csv", index=False)
+    (data / "notes.txt").write_text("not a partition")
+    if _has_parquet():
+        sales, purchases = months[3]
+        sales.to_parquet(data / "SalesFINAL_2016_03.parquet")
+        purchases.to_parquet(data / "PurchasesFINAL_2016_03.parquet")
+    else:
+        del months[3]
+    sales = pd.concat([months[m][0] for m in months], ignore_index=True)
+    purchases = pd.concat([months[m][1] for m in months], ignore_index=True)
+    return data, sales, purchases
+
+
+def _has_parquet():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def test_map_reduce_matches_concatenated_data(tmp_path, make_zip):
+    data, sales, purchases = _partitions(make_zip, tmp_path)
+    collection = DatasetCollection(data, max_workers=2, chunksize=25)
+    assert len(collection) == (5 if _has_parquet() else 3)
+    assert all(path.suffix != ".txt" for path in collection.partitions)
+
+    expected = top_selling_products(sales, "InventoryId", "SalesQuantity", top_n=3)
+    result = collection.top_selling(top_n=3)
+    pd.testing.assert_frame_equal(result.astype({"InventoryId": object}), expected)
+
+    totals = sales.groupby("InventoryId")["SalesDollars"].sum().reset_index()
+    expected = classify_inventory(totals, "SalesDollars").reset_index(drop=True)
+    result = collection.abc_classes()
+    pd.testing.assert_frame_equal(result.astype({"InventoryId": object}), expected)
+
+    typed = purchases.astype({"VendorNumber": "int32"})
+    expected = lead_time_profile(typed, "PODate", "ReceivingDate", exact=True)
+    result = collection.lead_time_profile(exact=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    daily = collection.daily_demand()
+    dates = pd.to_datetime(sales["SalesDate"])
+    assert daily.sum() == sales["SalesQuantity"].sum()
+    assert daily.index.min() == dates.min() and daily.index.freq == "D"
+    by_sku = collection.daily_demand(by="InventoryId")
+    assert by_sku.groupby(level="SalesDate").sum().sum() == daily.sum()
+
+
+def test_unchanged_partitions_are_skipped(tmp_path, make_zip):
+    data, sales, _ = _partitions(make_zip, tmp_path)
+    cache = tmp_path / "cache"
+    collection = DatasetCollection(sorted(data.glob("**/*.csv")), cache_dir=cache, max_workers=1)
+    first = collection.top_selling()
+    assert collection.skipped == []
+
+    again = DatasetCollection(str(data / "**" / "*.csv"), cache_dir=cache, max_workers=1)
+    pd.testing.assert_frame_equal(again.top_selling(), first)
+    assert again.skipped == again.partitions
+
+    # A changed partition is read again; the other one still comes from the cache.
+    changed = data / "2016-02" / "SalesFINAL_2016_02.csv"
+    february = pd.read_csv(changed)
+    february.loc[0, "SalesQuantity"] += 1000
+    february.to_csv(changed, index=False)
+    os.utime(changed, ns=(0, 10**18))
+    result = again.top_selling()
+    assert again.skipped == [p for p in again.partitions if p != changed.resolve()]
+    assert result.loc[0, "InventoryId"] == february.loc[0, "InventoryId"]
+    assert result.loc[0, "total_quantity"] == (
+        february.loc[february["InventoryId"] == february.loc[0, "InventoryId"], "SalesQuantity"]
+        .sum()
+    )
+
+    with pytest.raises(FileNotFoundError):
+        DatasetCollection(tmp_path / "missing" / "*.zip")
@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+from inventory import SalesCube, forecast_from_zip, top_selling_products
+from inventory.demand_forecasting import daily_demand_from_chunks
+
+
+def _sales():
+    dates = pd.date_range("2015-12-28", periods=70, freq="D")
+    rows = []
+    for i, date in enumerate(dates):
+        for store in (1, 2):
+            rows.append(
+                {
+                    "Store": store,
+                    "Brand": 100 + (i + store) % 4,
+                    "Classification": 1 + i % 2,
+                    "SalesQuantity": (i * store) % 7 + 1,
+                    "SalesDollars": float((i + store) % 5) + 0.5,
+                    "SalesDate": f"{date.month}/{date.day}/{date.year}",
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_query_matches_pandas_and_uses_coarsest_rollup():
+    sales = _sales()
+    cube = SalesCube.from_frame(sales)
+
+    assert cube.plan(by=["Store"], grain="M") == ("M", ("Store",))
+    assert cube.plan(by=["Store"], grain="M", start="2016-01-05") == ("D", ("Store",))
+    assert cube.plan(by=["Store", "Brand"]) == (None, ("Store", "Brand", "Classification"))
+    with pytest.raises(ValueError):
+        cube.plan(grain="Q")
+    with pytest.raises(KeyError):
+        cube.plan(by=["VendorNo"])
+
+    result = cube.query(
+        "SalesQuantity", by="Store", grain="M", where={"Brand": [101, 102]}, start="2016-01-01"
+    )
+
+    dates = pd.to_datetime(sales["SalesDate"])
+    subset = sales[sales["Brand"].isin([101, 102]) & (dates >= "2016-01-01")]
+    expected = (
+        subset.groupby(["Store", dates[subset.index].dt.to_period("M")])["SalesQuantity"]
+        .sum()
+        .reset_index()
+    )
+    assert result["SalesQuantity"].tolist() == expected["SalesQuantity"].tolist()
+    assert result["Store"].tolist() == expected["Store"].tolist()
+    assert result["SalesDate"].astype(str).tolist() == expected["SalesDate"].astype(str).tolist()
+
+
+def test_cube_roundtrip_and_streaming_build(tmp_path, make_zip):
+    sales = _sales()
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": sales})
+
+    whole = SalesCube.from_zip(zip_path, "SalesFINAL12312016.csv")
+    streamed = SalesCube.from_zip(zip_path, "SalesFINAL12312016.csv", chunksize=17)
+    loaded = SalesCube.load(whole.save(tmp_path / "sales.cube.npz"))
+
+    expected = whole.query(by=["Brand", "Classification"], grain="W")
+    pd.testing.assert_frame_equal(
+        streamed.query(by=["Brand", "Classification"], grain="W"), expected
+    )
+    pd.testing.assert_frame_equal(loaded.query(by=["Brand", "Classification"], grain="W"), expected)
+    with pytest.raises(FileNotFoundError):
+        SalesCube.from_zip(zip_path, "missing.csv")
+
+
+def test_sales_functions_read_from_cube(tmp_path, make_zip):
+    sales = _sales()
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": sales})
+    cube = SalesCube.from_frame(sales)
+    cube_path = cube.save(tmp_path / "sales.cube.npz")
+
+    pd.testing.assert_frame_equal(
+        top_selling_products(cube, "Brand", "SalesQuantity", top_n=3),
+        top_selling_products(sales, "Brand", "SalesQuantity", top_n=3),
+    )
+    series = cube.daily_series("SalesQuantity")
+    expected = daily_demand_from_chunks(
+        [sales.assign(SalesDate=pd.to_datetime(sales["SalesDate"]))],
+        "SalesDate",
+        "SalesQuantity",
+    )
+    pd.testing.assert_series_equal(series, expected, check_dtype=False)
+
+    forecast = forecast_from_zip(
+        zip_path, "SalesFINAL12312016.csv", "SalesDate", "SalesQuantity", periods=3, engine="numpy"
+    )
+    from_cube = forecast_from_zip(
+        zip_path,
+        "SalesFINAL12312016.csv",
+        "SalesDate",
+        "SalesQuantity",
+        periods=3,
+        engine="numpy",
+        cube=cube_path,
+    )
+    pd.testing.assert_series_equal(from_cube, forecast, check_dtype=False)
+
+
+def test_rows_without_a_dimension_value_count_in_other_rollups(tmp_path, make_zip):
+    sales = _sales()
+    sales.loc[::9, "Brand"] = None
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": sales})
+    expected = daily_demand_from_chunks(
+        [sales.assign(SalesDate=pd.to_datetime(sales["SalesDate"]))],
+        "SalesDate",
+        "SalesQuantity",
+    )
+    by_brand = sales.groupby("Brand")["SalesQuantity"].sum()
+
+    for cube in (
+        SalesCube.from_frame(sales),
+        SalesCube.from_zip(zip_path, "SalesFINAL12312016.csv", chunksize=17),
+    ):
+        pd.testing.assert_series_equal(cube.daily_series(), expected, check_dtype=False)
+        assert cube.query("SalesQuantity")["SalesQuantity"].item() == sales["SalesQuantity"].sum()
+        brands = cube.query("SalesQuantity", by="Brand")
+        assert brands.set_index("Brand")["SalesQuantity"].to_dict() == by_brand.to_dict()
@@ -2,11 +2,21 @@ import os
 import sys
 import zipfile
 
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from inventory import load_datasets, load_sample_datasets, classify_inventory
+import pytest
+
+from inventory import (
+    build_store,
+    classify_inventory,
+    classify_inventory_from_zip,
+    iter_dataset,
+    load_datasets,
+    load_sample_datasets,
+)
 
 
 def _make_zip(path, files):
@@ -27,6 +37,17 @@ def test_load_datasets(tmp_path):
     assert loaded["second"].equals(df2)
 
 
+def test_load_datasets_threaded_matches_sequential(tmp_path):
+    frames = {f"part{i}": pd.DataFrame({"a": range(i, i + 50), "b": ["x"] * 50}) for i in range(4)}
+    zip_path = _make_zip(tmp_path / "data.zip", frames)
+
+    sequential = load_datasets(zip_path, max_workers=1)
+    threaded = load_datasets(zip_path, max_workers=4)
+    assert list(threaded) == list(sequential) == list(frames)
+    for name, df in frames.items():
+        assert threaded[name].equals(df)
+
+
 def test_classify_with_loaded_data(tmp_path):
     inv_df = pd.DataFrame({"item": list("ABC"), "value": [100, 50, 10]})
     zip_path = _make_zip(tmp_path / "inv.zip", {"inventory": inv_df})
@@ -43,3 +64,104 @@ def test_load_sample_datasets(tmp_path):
 
     loaded = load_sample_datasets(zip_path)
     assert loaded["first"].equals(df)
+
+
+def test_load_datasets_cache_roundtrip(tmp_path, monkeypatch):
+    df = pd.DataFrame(
+        {"id": ["a", None, "b"], "qty": [1, 2, 3], "price": [1.5, None, 2.0]}
+    )
+    zip_path = _make_zip(tmp_path / "data.zip", {"sales": df})
+    cache_dir = tmp_path / "cache"
+    first = load_datasets(zip_path, cache_dir=cache_dir)["sales"]
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("cached member was parsed again")
+
+    monkeypatch.setattr(pd, "read_csv", _fail)
+    cached = load_datasets(zip_path, cache_dir=cache_dir)["sales"]
+    pd.testing.assert_frame_equal(cached, first)
+    values = cached["qty"].to_numpy()
+    while values.base is not None and not isinstance(values, np.memmap):
+        values = values.base
+    assert isinstance(values, np.memmap)
+    cached.loc[0, "qty"] = 10
+    assert load_datasets(zip_path, cache_dir=cache_dir)["sales"].loc[0, "qty"] == 1
+
+
+def test_load_datasets_cache_invalidated_on_change(tmp_path, monkeypatch):
+    zip_path = _make_zip(tmp_path / "data.zip", {"sales": pd.DataFrame({"a": [1]})})
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("INVENTORY_CACHE_DIR", str(cache_dir))
+    assert load_datasets(zip_path)["sales"]["a"].tolist() == [1]
+    assert any(cache_dir.iterdir())
+
+    _make_zip(zip_path, {"sales": pd.DataFrame({"a": [1, 2]})})
+    assert load_datasets(zip_path)["sales"]["a"].tolist() == [1, 2]
+    (member_dir,) = cache_dir.iterdir()
+    assert len(list(member_dir.iterdir())) == 1
+
+
+def test_iter_dataset_chunks(tmp_path):
+    df = pd.DataFrame({"a": range(5), "b": list("vwxyz")})
+    zip_path = _make_zip(tmp_path / "data.zip", {"first": df})
+
+    chunks = list(iter_dataset(zip_path, "first.csv", chunksize=2, usecols=["a"]))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks).equals(df[["a"]])
+    with pytest.raises(KeyError):
+        list(iter_dataset(zip_path, "first.csv", usecols=["missing"]))
+    with pytest.raises(FileNotFoundError):
+        list(iter_dataset(zip_path, "other.csv"))
+
+
+def test_load_datasets_typed_schema(tmp_path):
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "2_B_11"],
+            "Store": [1, 1, 2],
+            "SalesQuantity": [1, 2, 3],
+            "SalesDate": ["1/25/2016", "1/25/2016", "2/1/2016"],
+            "VendorName": ["ACME   ", "ACME   ", "OTHER "],
+            "Unexpected": [0, 0, 0],
+        }
+    )
+    zip_path = _make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": sales, "other": sales})
+
+    loaded = load_datasets(zip_path, typed=True)
+    typed = loaded["SalesFINAL12312016"]
+    assert "Unexpected" not in typed.columns
+    assert typed["InventoryId"].dtype == "category"
+    assert typed["Store"].dtype == "int16"
+    assert typed["SalesQuantity"].dtype == "int32"
+    assert list(typed["SalesDate"]) == list(pd.to_datetime(["2016-01-25"] * 2 + ["2016-02-01"]))
+    assert list(typed["VendorName"]) == ["ACME", "ACME", "OTHER"]
+    assert loaded["other"].equals(sales)
+
+    subset = load_datasets(zip_path, typed=True, usecols=["Store", "SalesDate"])
+    assert list(subset["SalesFINAL12312016"].columns) == ["Store", "SalesDate"]
+    assert list(subset["other"].columns) == ["Store", "SalesDate"]
+
+
+def test_typed_integers_with_blanks_fall_back_to_float(tmp_path):
+    inventory = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_11", "2_B_11", "2_B_12"],
+            "Store": [1, 1, 2, 2],
+            "onHand": [5, None, 7, 2],
+            "Price": [10.0, 20.0, 5.0, 1.0],
+        }
+    )
+    zip_path = _make_zip(tmp_path / "data.zip", {"EndInvFINAL12312016": inventory})
+
+    typed = load_datasets(zip_path, typed=True)["EndInvFINAL12312016"]
+    assert typed["Store"].dtype == "int16"
+    assert typed["onHand"].dtype == "float64" and typed["onHand"].isna().sum() == 1
+    chunks = list(iter_dataset(zip_path, "EndInvFINAL12312016.csv", chunksize=1, typed=True))
+    assert [chunk["onHand"].dtype for chunk in chunks] == ["int32", "float64", "int32", "int32"]
+
+    classes = classify_inventory_from_zip(zip_path, "EndInvFINAL12312016.csv", "Price")
+    assert list(classes["InventoryId"]) == ["1_A_11", "1_A_10", "2_B_11", "2_B_12"]
+
+    tables = load_datasets(build_store(zip_path, tmp_path / "store", chunksize=1))
+    decoded = tables["EndInvFINAL12312016"].to_pandas()
+    pd.testing.assert_series_equal(decoded["onHand"], typed["onHand"])
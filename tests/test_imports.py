@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+import inventory
+
+#: Budgets for a bare ``import inventory`` in a fresh interpreter.  The time
+#: budget is generous for slow CI machines; importing pandas alone already
+#: exceeds it.
+IMPORT_SECONDS = 0.25
+IMPORT_MODULES = 40
+
+_PROBE = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def _probe(statement):
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def _roots(modules):
+    return {name.split(".")[0] for name in modules}
+
+
+def test_import_inventory_is_cheap():
+    result = _probe("import inventory")
+
+    assert not _roots(result["modules"]) & {"pandas", "numpy", "statsmodels", "scipy"}
+    assert len(result["modules"]) <= IMPORT_MODULES
+    assert result["seconds"] < IMPORT_SECONDS
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from inventory import calculate_eoq",
+        "from inventory import top_selling_products",
+        "from inventory import forecast_demand",
+    ],
+)
+def test_statsmodels_is_loaded_only_when_fitting(statement):
+    result = _probe(statement)
+
+    assert not _roots(result["modules"]) & {"statsmodels", "scipy"}
+
+
+def test_lazy_names_resolve():
+    for name in inventory.__all__:
+        assert getattr(inventory, name) is not None
+    assert set(inventory.__all__) <= set(dir(inventory))
+    with pytest.raises(AttributeError):
+        inventory.not_a_function
@@ -2,24 +2,39 @@ import os
 import sys
 import zipfile
 
+import numpy as np
 import pandas as pd
 import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from inventory import (
+    ABCClassifier,
+    EOQError,
+    ReorderPointError,
+    calculate_discount_eoq_from_df,
+    calculate_discount_eoqs,
     calculate_eoq,
+    calculate_eoqs,
     calculate_eoq_from_df,
     calculate_eoq_from_zip,
     calculate_reorder_point,
+    calculate_reorder_points,
     calculate_reorder_points_from_df,
     calculate_reorder_points_from_zip,
     classify_inventory,
     classify_inventory_from_zip,
     compute_lead_times,
+    compute_lead_times_from_chunks,
     compute_lead_times_from_zip,
+    LeadTimeProfiler,
+    daily_demand_from_chunks,
     forecast_demand,
+    forecast_demand_many,
     forecast_from_zip,
+    holt_winters_forecast,
+    lead_time_profile,
+    lead_time_profile_from_zip,
 )
 
 
@@ -44,6 +59,121 @@ def test_forecast_from_zip(tmp_path):
     assert len(forecast) == 2
 
 
+def test_forecast_demand_numpy_engine():
+    series = pd.Series(
+        np.arange(30, dtype=float), index=pd.date_range("2024-01-01", periods=30, freq="D")
+    )
+    forecast = forecast_demand(series, periods=3, engine="numpy")
+    assert list(forecast.index) == list(pd.date_range("2024-01-31", periods=3, freq="D"))
+    assert list(forecast) == pytest.approx([30, 31, 32], rel=0.05)
+    with pytest.raises(ValueError):
+        forecast_demand(series, periods=3, engine="prophet")
+
+
+def test_holt_winters_forecast_batches_padded_series():
+    rng = np.random.default_rng(0)
+    long = rng.poisson(2, size=30).astype(float)
+    short = rng.poisson(1, size=12).astype(float)
+    matrix = np.full((2, 30), np.nan)
+    matrix[0] = long
+    matrix[1, -12:] = short
+    batched = holt_winters_forecast(matrix, 5, seasonal_periods=7)
+    assert batched.shape == (2, 5)
+    assert batched[0] == pytest.approx(holt_winters_forecast(long, 5, seasonal_periods=7))
+    # Right alignment keeps the seasonal phase of the shorter series intact.
+    assert batched[1] == pytest.approx(
+        holt_winters_forecast(np.r_[np.full(18, np.nan), short], 5, seasonal_periods=7)
+    )
+    fixed = holt_winters_forecast(long, 2, alpha=1.0, beta=0.0)
+    assert fixed == pytest.approx([long[-1], long[-1]])
+
+
+def _many_series_frame():
+    dates = pd.date_range("2024-01-01", periods=10, freq="D").astype(str)
+    return pd.DataFrame(
+        {
+            "store": [1] * 10 + [2] * 10 + [3],
+            "item": ["x"] * 10 + ["y"] * 10 + ["z"],
+            "date": list(dates) * 2 + [dates[0]],
+            "qty": list(range(10)) + [5] * 10 + [1],
+        }
+    )
+
+
+def test_forecast_demand_many_in_process():
+    result = forecast_demand_many(
+        _many_series_frame(), ["store", "item"], "date", "qty", periods=3, max_workers=1
+    )
+    assert len(result) == 9
+    status = result.groupby("item")["status"].first().to_dict()
+    assert status["x"] in {"ok", "warning"}
+    assert status["z"] == "failed"
+    assert result.loc[result["item"] == "z", "forecast"].isna().all()
+    x = result[result["item"] == "x"]
+    assert list(x["date"]) == list(pd.date_range("2024-01-11", periods=3, freq="D"))
+    expected = forecast_demand(
+        pd.Series(range(10), index=pd.date_range("2024-01-01", periods=10, freq="D")),
+        periods=3,
+    )
+    assert list(x["forecast"]) == pytest.approx(list(expected))
+    assert (result["fit_seconds"] >= 0).all()
+
+
+def test_forecast_demand_many_process_pool():
+    df = _many_series_frame()
+    serial = forecast_demand_many(df, "item", "date", "qty", periods=2, max_workers=1)
+    pooled = forecast_demand_many(
+        df, "item", "date", "qty", periods=2, max_workers=2, chunksize=1
+    )
+    pd.testing.assert_frame_equal(
+        serial.drop(columns="fit_seconds"), pooled.drop(columns="fit_seconds")
+    )
+
+
+def test_forecast_demand_many_numpy_engine():
+    result = forecast_demand_many(
+        _many_series_frame(), "item", "date", "qty", periods=2, engine="numpy"
+    )
+    assert set(result["status"]) == {"ok"}
+    y = result[result["item"] == "y"]
+    assert list(y["forecast"]) == pytest.approx([5, 5])
+    z = result[result["item"] == "z"]
+    assert list(z["forecast"]) == pytest.approx([1, 1])
+
+
+@pytest.mark.parametrize("engine", ["numpy", "auto"])
+def test_array_engines_report_unfit_series_as_failed(engine):
+    dates = pd.date_range("2024-01-01", periods=21, freq="D").astype(str)
+    df = pd.DataFrame(
+        {
+            "item": ["long"] * 21 + ["short"] * 3 + ["blank"] * 21,
+            "date": list(dates) + list(dates[:3]) + list(dates),
+            "qty": [float(i % 7) for i in range(21)] + [1.0, 2.0, 3.0] + [1.0] * 20 + [np.inf],
+        }
+    )
+    result = forecast_demand_many(
+        df, "item", "date", "qty", periods=2, seasonal_periods=7, engine=engine
+    )
+    rows = result.groupby("item").first()
+    assert rows["status"].to_dict() == {"blank": "failed", "long": "ok", "short": "failed"}
+    assert "two seasonal cycles" in rows.loc["short", "message"]
+    assert "non-finite" in rows.loc["blank", "message"]
+    assert result.loc[result["item"] != "long", "forecast"].isna().all()
+    assert result.loc[result["item"] == "long", "forecast"].notna().all()
+
+
+def test_forecast_from_zip_streaming(tmp_path):
+    df = pd.DataFrame(
+        {"date": ["2023-01-01", "2023-01-03", "2023-01-01", "2023-01-04"], "qty": [1, 2, 3, 4]}
+    )
+    daily = daily_demand_from_chunks([df.iloc[:1], df.iloc[1:]], "date", "qty")
+    assert list(daily) == [4, 0, 2, 4]
+    zip_path = _make_zip(tmp_path / "sales.zip", {"sales": df})
+    streamed = forecast_from_zip(zip_path, "sales.csv", "date", "qty", periods=2, chunksize=1)
+    full = forecast_from_zip(zip_path, "sales.csv", "date", "qty", periods=2)
+    pd.testing.assert_series_equal(streamed, full)
+
+
 def test_abc_classification():
     df = pd.DataFrame({"item": list("ABCD"), "value": [100, 60, 30, 10]})
     result = classify_inventory(df, "value")
@@ -51,6 +181,28 @@ def test_abc_classification():
     assert categories == {"A": "A", "B": "A", "C": "B", "D": "C"}
 
 
+def test_abc_classifier_matches_bulk_and_updates():
+    df = pd.DataFrame({"item": list("ABCDE"), "value": [100, 60, 30, 8, 2]})
+    clf = ABCClassifier.from_frame(df, "item", "value")
+    bulk = classify_inventory(df, "value").set_index("item")["category"]
+    assert clf.categories().to_dict() == bulk.to_dict()
+
+    changed = clf.update(["D", "F"], [150, 1])
+    assert set(changed["item"]) == {"B", "C", "D", "F"}
+    assert changed.set_index("item").loc["D"].tolist() == ["C", "A"]
+    assert changed.set_index("item").loc["F", "previous_category"] is None
+
+    expected = pd.DataFrame({"item": list("ABCDEF"), "value": [100, 60, 30, 150, 2, 1]})
+    bulk = classify_inventory(expected, "value").set_index("item")["category"]
+    assert clf.categories().to_dict() == bulk.to_dict()
+    assert list(clf.categories().index) == list("DABCEF")
+    assert clf.update(["E"], [2]).empty
+
+    with pytest.raises(ValueError):
+        clf.update(list("ABCDEF"), [0] * 6)
+    assert len(clf) == 6
+
+
 def test_classify_inventory_from_zip(tmp_path):
     inv_df = pd.DataFrame({"item": list("ABC"), "value": [100, 50, 10]})
     zip_path = _make_zip(tmp_path / "inv.zip", {"inventory": inv_df})
@@ -73,6 +225,51 @@ def test_eoq_from_df_and_zip(tmp_path):
     assert pytest.approx(from_zip.iloc[0], rel=1e-3) == 141.4213562373095
 
 
+def test_eoq_arrays_and_error_codes():
+    demand = np.array([1000.0, -1.0, 1000.0])
+    eoq = calculate_eoqs(demand[[0, 2]], 50, np.array([5.0, 20.0]))
+    assert eoq == pytest.approx([141.4213562373095, 70.71067811865476])
+    with pytest.raises(ValueError, match="demand must be positive"):
+        calculate_eoqs(demand, 50, 5)
+
+    values, codes = calculate_eoqs(demand, [50, 50, 0], [5, 0, 5], errors="codes")
+    assert list(codes) == [0, EOQError.DEMAND | EOQError.HOLDING_COST, EOQError.ORDER_COST]
+    assert values[0] == pytest.approx(141.4213562373095)
+    assert np.isnan(values[1:]).all()
+
+    df = pd.DataFrame({"d": demand, "o": 50, "h": 5})
+    result = calculate_eoq_from_df(df, "d", "o", "h", errors="codes")
+    assert list(result.columns) == ["eoq", "error_code"]
+    assert list(result["error_code"]) == [0, EOQError.DEMAND, 0]
+
+
+def test_eoq_accepts_arrow_columns():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"d": [1000, 1000], "o": [50, 50], "h": [5.0, None]})
+    eoq, codes = calculate_eoqs(table["d"], table["o"], table["h"], errors="codes")
+    assert eoq[0] == pytest.approx(141.4213562373095)
+    assert np.isnan(eoq[1]) and list(codes) == [0, EOQError.MISSING]
+    assert np.isnan(calculate_eoqs(table["d"], table["o"], table["h"])[1])
+
+
+def test_discount_eoq_picks_cheapest_tier():
+    # All-units discounts: the 1000-unit break beats ordering the plain EOQ
+    # at full price and the deeper 2000-unit break.
+    breaks, prices = [0, 1000, 2000], [5.0, 4.8, 4.75]
+    quantity, price, cost = calculate_discount_eoqs([5000, 10], 49, 0.2, breaks, prices)
+    assert quantity[0] == pytest.approx(1000)
+    assert price[0] == 4.8
+    assert cost[0] == pytest.approx(24725)
+    assert quantity[1] == pytest.approx(np.sqrt(2 * 10 * 49 / (0.2 * 5.0)))
+    assert price[1] == 5.0
+
+    df = pd.DataFrame({"Brand": [1, 2], "d": [5000, 5000], "o": [49, 49]})
+    tiers = pd.DataFrame({"Brand": [1, 1, 1], "min_quantity": breaks, "unit_price": prices})
+    result = calculate_discount_eoq_from_df(df, tiers, "Brand", "d", "o", holding_rate=0.2)
+    assert result.loc[0, "order_quantity"] == pytest.approx(1000)
+    assert result.loc[1].isna().all()
+
+
 def test_reorder_point():
     rop = calculate_reorder_point(10, 5, safety_stock=20)
     assert rop == 70
@@ -89,6 +286,25 @@ def test_reorder_points_from_df_and_zip(tmp_path):
     assert from_zip.iloc[0] == 70
 
 
+def test_reorder_points_arrays_and_error_codes():
+    rop = calculate_reorder_points(np.array([10, 2]), np.array([5, 3]), safety_stock=20)
+    assert list(rop) == [70, 26]
+    with pytest.raises(ValueError, match=r"lead_time_days cannot be negative \(row 1\)"):
+        calculate_reorder_points([10, 2], [5, -3])
+
+    df = pd.DataFrame({"d": [10, -1], "l": [5, 3], "s": [20, -1]})
+    result = calculate_reorder_points_from_df(df, "d", "l", safety_stock_col="s", errors="codes")
+    assert result["reorder_point"].iloc[0] == 70
+    assert np.isnan(result["reorder_point"].iloc[1])
+    assert result["error_code"].iloc[1] == (
+        ReorderPointError.DAILY_DEMAND | ReorderPointError.SAFETY_STOCK
+    )
+
+    rop, codes = calculate_reorder_points([10, 2], [5, np.nan], errors="codes")
+    assert rop[0] == 50 and np.isnan(rop[1])
+    assert list(codes) == [0, ReorderPointError.MISSING]
+
+
 def test_lead_time():
     df = pd.DataFrame(
         {
@@ -103,6 +319,100 @@ def test_lead_time():
     assert pytest.approx(grouped["X"], rel=1e-3) == 7.5
 
 
+def test_lead_times_streaming(tmp_path):
+    df = pd.DataFrame(
+        {
+            "order": ["2024-01-01", "2024-01-05", "2024-01-02"],
+            "receive": ["2024-01-11", "2024-01-10", "2024-01-04"],
+            "supplier": ["X", "X", "Y"],
+        }
+    )
+    chunks = [df.iloc[:1], df.iloc[1:]]
+    grouped = compute_lead_times_from_chunks(chunks, "order", "receive", group_col="supplier")
+    pd.testing.assert_series_equal(
+        grouped, compute_lead_times(df, "order", "receive", group_col="supplier")
+    )
+    zip_path = _make_zip(tmp_path / "lead.zip", {"purchases": df})
+    res = compute_lead_times_from_zip(
+        zip_path, "purchases.csv", "order", "receive", chunksize=2
+    )
+    assert list(res) == [10, 5, 2]
+
+
+def _purchase_lines(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    po = pd.Timestamp("2016-01-01") + pd.to_timedelta(rng.integers(0, 300, rows), unit="D")
+    days = rng.gamma(2.0, 4.0, rows).astype(int) + 1
+    return pd.DataFrame(
+        {
+            "VendorNumber": rng.integers(0, 12, rows),
+            "Store": rng.integers(1, 4, rows),
+            "PODate": po,
+            "ReceivingDate": po + pd.to_timedelta(days, unit="D"),
+        }
+    )
+
+
+def test_lead_time_profile_exact_matches_pandas():
+    df = _purchase_lines()
+    lead_times = (df["ReceivingDate"] - df["PODate"]).dt.days
+    grouped = lead_times.groupby([df["VendorNumber"], df["Store"]])
+
+    profile = lead_time_profile(
+        df, "PODate", "ReceivingDate", by=["VendorNumber", "Store"], exact=True
+    )
+
+    assert list(profile.columns) == ["count", "mean", "std", "p50", "p90", "p95", "p99"]
+    assert (profile["count"] == grouped.size()).all()
+    np.testing.assert_allclose(profile["mean"], grouped.mean())
+    np.testing.assert_allclose(profile["std"], grouped.std())
+    expected = grouped.quantile([0.5, 0.9, 0.95, 0.99]).unstack()
+    np.testing.assert_allclose(profile[["p50", "p90", "p95", "p99"]], expected)
+
+
+def test_lead_time_profile_sketch_is_within_relative_accuracy():
+    df = _purchase_lines()
+    exact = lead_time_profile(df, "PODate", "ReceivingDate", exact=True)
+    sketch = lead_time_profile(df, "PODate", "ReceivingDate", relative_accuracy=0.02)
+
+    pd.testing.assert_frame_equal(sketch[["count", "mean", "std"]], exact[["count", "mean", "std"]])
+    error = (sketch - exact).abs() / exact
+    assert (error[["p50", "p90", "p95", "p99"]] <= 0.02 + 1e-9).all().all()
+
+
+def test_lead_time_profiler_merge():
+    df = _purchase_lines()
+    first = LeadTimeProfiler("PODate", "ReceivingDate").update(df.iloc[:1000])
+    second = LeadTimeProfiler("PODate", "ReceivingDate").update(df.iloc[1000:])
+
+    merged = first.merge(second).result(quantiles=[0.25, 0.5])
+
+    pd.testing.assert_frame_equal(
+        merged, lead_time_profile(df, "PODate", "ReceivingDate", quantiles=[0.25, 0.5])
+    )
+    with pytest.raises(ValueError):
+        first.merge(LeadTimeProfiler("PODate", "ReceivingDate", exact=True))
+    with pytest.raises(KeyError):
+        first.update(df.drop(columns="VendorNumber"))
+
+
+def test_lead_time_profile_from_zip(tmp_path):
+    df = _purchase_lines(rows=500)
+    zip_path = _make_zip(tmp_path / "lead.zip", {"purchases": df})
+
+    streamed = lead_time_profile_from_zip(
+        zip_path, "purchases.csv", "PODate", "ReceivingDate", exact=True, chunksize=120
+    )
+    loaded = lead_time_profile_from_zip(
+        zip_path, "purchases.csv", "PODate", "ReceivingDate", exact=True
+    )
+
+    pd.testing.assert_frame_equal(streamed, loaded)
+    pd.testing.assert_frame_equal(
+        loaded, lead_time_profile(df, "PODate", "ReceivingDate", exact=True)
+    )
+
+
 def test_lead_times_from_zip(tmp_path):
     df = pd.DataFrame({"order": ["2024-01-01"], "receive": ["2024-01-11"]})
     zip_path = _make_zip(tmp_path / "lead.zip", {"purchases": df})
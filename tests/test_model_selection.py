@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import forecast_demand, select_forecast_models
+
+
+def _sales(**series):
+    rng = np.random.default_rng(0)
+    frames = []
+    for key, values in series.items():
+        dates = pd.date_range("2016-01-01", periods=len(values))
+        noisy = np.asarray(values, dtype=float) + rng.normal(0, 0.1, len(values))
+        frames.append(pd.DataFrame({"sku": key, "date": dates, "qty": noisy}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_selects_model_matching_the_pattern():
+    t = np.arange(84)
+    sales = _sales(
+        flat=np.full(84, 10.0),
+        trend=5 + 0.5 * t,
+        weekly=20 + 8 * np.sin(2 * np.pi * t / 7),
+    )
+    out = select_forecast_models(sales, "sku", "date", "qty", 7, seasonal_periods=7, max_workers=1)
+    chosen = out.groupby("sku")["model"].first()
+
+    assert chosen["flat"] in ("ses", "croston", "sba")
+    assert chosen["trend"] == "holt"
+    assert chosen["weekly"] in ("holt_winters_add", "holt_winters_mul", "seasonal_naive")
+    trend = out[out["sku"] == "trend"]["forecast"].to_numpy()
+    assert trend == pytest.approx(5 + 0.5 * np.arange(84, 91), abs=0.5)
+    assert np.isfinite(out["cv_rmse"]).all() and not out["cached"].any()
+
+
+def test_intermittent_and_short_series():
+    demand = np.zeros(60)
+    demand[::6] = 6.0
+    sales = pd.DataFrame(
+        {
+            "sku": ["slow"] * 60 + ["new"] * 2,
+            "date": list(pd.date_range("2016-01-01", periods=60)) + ["2016-02-28", "2016-02-29"],
+            "qty": list(demand) + [3.0, 5.0],
+        }
+    )
+    out = select_forecast_models(
+        sales, "sku", "date", "qty", 6, models=["croston", "sba"], max_workers=1
+    )
+    slow = out[out["sku"] == "slow"]
+    assert slow["forecast"].to_numpy() == pytest.approx(np.full(6, 1.0), rel=0.15)
+    # Too short to backtest: the first candidate is used without a score.
+    new = out[out["sku"] == "new"]
+    assert set(new["model"]) == {"croston"} and np.isinf(new["cv_rmse"]).all()
+    with pytest.raises(ValueError, match="unknown models"):
+        select_forecast_models(sales, "sku", "date", "qty", 6, models=["arima"])
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_multiplicative_model_skips_series_with_zeros():
+    t = np.arange(365)
+    # Long gaps push the seasonal indices to their floor; dividing by it
+    # used to overflow.
+    sparse = np.zeros(365)
+    sparse[[44, 66, 79, 245, 280, 285, 306, 325, 334]] = [86, 466, 90, 381, 62, 166, 359, 2, 483]
+    sales = _sales(weekly=20 + 8 * np.sin(2 * np.pi * t / 7), sparse=sparse)
+    sales.loc[sales["sku"] == "sparse", "qty"] = sparse
+    out = select_forecast_models(
+        sales,
+        "sku",
+        "date",
+        "qty",
+        7,
+        seasonal_periods=7,
+        models=["holt_winters_mul", "croston"],
+        max_workers=1,
+    )
+    chosen = out.groupby("sku")["model"].first()
+    assert chosen["sparse"] == "croston" and chosen["weekly"] == "holt_winters_mul"
+    assert np.isfinite(out["forecast"]).all()
+
+
+def test_cache_skips_unchanged_series(tmp_path):
+    t = np.arange(56)
+    sales = _sales(a=10 + 0.2 * t, b=np.full(56, 4.0))
+    cache = tmp_path / "models.json"
+    kwargs = dict(seasonal_periods=7, cache=cache, max_workers=1)
+
+    first = select_forecast_models(sales, "sku", "date", "qty", 7, **kwargs)
+    again = select_forecast_models(sales, "sku", "date", "qty", 7, **kwargs)
+    assert again["cached"].all()
+    np.testing.assert_allclose(again["forecast"], first["forecast"])
+    assert list(again["model"]) == list(first["model"])
+
+    # One more day of history for "b" only: "b" is refitted, "a" is not.
+    extra = pd.DataFrame({"sku": ["b"], "date": [pd.Timestamp("2016-02-26")], "qty": [4.0]})
+    nightly = select_forecast_models(pd.concat([sales, extra]), "sku", "date", "qty", 7, **kwargs)
+    assert nightly.groupby("sku")["cached"].all().to_dict() == {"a": True, "b": False}
+
+
+def test_process_pool_and_forecast_demand_auto():
+    t = np.arange(42)
+    sales = _sales(a=3 + 0.3 * t, b=np.full(42, 2.0), c=5 + np.sin(t))
+    local = select_forecast_models(sales, "sku", "date", "qty", 5, max_workers=1)
+    pooled = select_forecast_models(sales, "sku", "date", "qty", 5, max_workers=2, chunksize=1)
+    pd.testing.assert_frame_equal(local, pooled)
+
+    series = sales[sales["sku"] == "a"].set_index("date")["qty"].asfreq("D")
+    auto = forecast_demand(series, 5, engine="auto")
+    np.testing.assert_allclose(auto.to_numpy(), local["forecast"].iloc[:5])
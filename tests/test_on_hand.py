@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    build_store,
+    load_datasets,
+    reconstruct_on_hand,
+    reconstruct_on_hand_from_zip,
+)
+
+
+@pytest.fixture
+def zip_path(tmp_path, make_zip):
+    beg_inv = pd.DataFrame(
+        {"InventoryId": ["1_A_10"], "Brand": [10], "onHand": [3], "startDate": ["2016-01-01"]}
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_11"],
+            "Brand": [10, 11],
+            "Quantity": [5, 4],
+            "ReceivingDate": ["2016-01-05", "2016-01-03"],
+        }
+    )
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_10", "1_A_11"],
+            "Brand": [10, 10, 10, 11],
+            "SalesQuantity": [2, 1, 4, 4],
+            "SalesDate": ["1/2/2016", "1/3/2016", "1/5/2016", "1/8/2016"],
+        }
+    )
+    end_inv = pd.DataFrame(
+        {"InventoryId": ["1_A_10"], "Brand": [10], "onHand": [1], "endDate": ["2016-01-10"]}
+    )
+    return make_zip(
+        tmp_path / "data.zip",
+        {
+            "BegInvFINAL12312016": beg_inv,
+            "PurchasesFINAL12312016": purchases,
+            "SalesFINAL12312016": sales,
+            "EndInvFINAL12312016": end_inv,
+        },
+    )
+
+
+def test_replay_daily_stock(zip_path):
+    history = reconstruct_on_hand_from_zip(zip_path, chunksize=2)
+
+    assert history.start == pd.Timestamp("2016-01-01") and history.periods == 10
+    frame = history.to_frame(["1_A_10", "1_A_11"])
+    assert frame["1_A_10"].tolist() == [3, 1, 0, 0, 1, 1, 1, 1, 1, 1]
+    assert frame["1_A_11"].tolist() == [0, 0, 4, 4, 4, 4, 4, 0, 0, 0]
+
+    metrics = history.metrics().set_index("InventoryId")
+    item = metrics.loc["1_A_10"]
+    assert item["avg_on_hand"] == pytest.approx(1.0)
+    assert item["units_sold"] == 7 and item["end_on_hand"] == 1
+    assert item["turnover"] == pytest.approx(7.0)
+    assert item["days_of_supply"] == pytest.approx(1 / 0.7)
+    assert item["stockout_days"] == 2
+    assert metrics.loc["1_A_11", "stockout_days"] == 5
+
+
+def test_metrics_match_dense_matrix_and_store(tmp_path, zip_path):
+    history = reconstruct_on_hand(load_datasets(zip_path, typed=True), end="2016-01-31")
+    dense = history.to_dense()
+    metrics = history.metrics()
+
+    assert dense.shape == (2, 31)
+    np.testing.assert_allclose(metrics["avg_on_hand"], np.maximum(dense, 0).mean(axis=1))
+    np.testing.assert_array_equal(metrics["stockout_days"], (dense <= 0).sum(axis=1))
+    np.testing.assert_array_equal(metrics["end_on_hand"], dense[:, -1])
+
+    mapped = reconstruct_on_hand(load_datasets(build_store(zip_path, tmp_path / "store")))
+    assert mapped.periods == 10
+    np.testing.assert_array_equal(
+        mapped.to_dense(["1_A_10", "1_A_11"]), history.to_dense(["1_A_10", "1_A_11"])[:, :10]
+    )
+    with pytest.raises(KeyError):
+        history.to_dense(["missing"])
+
+
+def test_events_before_start_open_the_window(zip_path):
+    history = reconstruct_on_hand_from_zip(zip_path, start="2016-01-04", end="2016-01-09")
+
+    assert history.periods == 6
+    frame = history.to_frame(["1_A_10", "1_A_11"])
+    assert frame["1_A_10"].tolist() == [0, 1, 1, 1, 1, 1]
+    assert frame["1_A_11"].tolist() == [4, 4, 4, 4, 0, 0]
+    metrics = history.metrics().set_index("InventoryId")
+    assert metrics.loc["1_A_11", "stockout_days"] == 2
+    assert metrics.loc["1_A_10", "units_sold"] == 4
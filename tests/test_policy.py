@@ -0,0 +1,263 @@
+import itertools
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    InventoryPolicyEngine,
+    build_store,
+    calculate_reorder_points_from_df,
+    calculate_safety_stock,
+    load_datasets,
+    optimize_service_levels,
+)
+
+
+@pytest.fixture
+def zip_path(tmp_path, make_zip):
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_11"],
+            "Brand": [10, 10, 11],
+            "SalesQuantity": [2, 2, 1],
+            "SalesDate": ["1/1/2016", "1/3/2016", "1/4/2016"],
+            "VendorNo": [1, 1, 2],
+        }
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_11"],
+            "Brand": [10, 10, 11],
+            "VendorNumber": [1, 1, 2],
+            "PODate": ["2016-01-01", "2016-01-02", "2016-01-01"],
+            "ReceivingDate": ["2016-01-05", "2016-01-08", "2016-01-04"],
+            "PurchasePrice": [4.0, 4.0, 8.0],
+            "Quantity": [10, 10, 5],
+        }
+    )
+    prices = pd.DataFrame({"Brand": [10, 11], "PurchasePrice": [4.0, 8.0], "VendorNumber": [1, 2]})
+    end_inv = pd.DataFrame(
+        {"InventoryId": ["1_A_10", "1_A_11"], "Brand": [10, 11], "onHand": [5, 3]}
+    )
+    return make_zip(
+        tmp_path / "data.zip",
+        {
+            "SalesFINAL12312016": sales,
+            "PurchasesFINAL12312016": purchases,
+            "2017PurchasePricesDec": prices,
+            "EndInvFINAL12312016": end_inv,
+        },
+    )
+
+
+def test_safety_stock():
+    z = 1.6448536269514722
+    assert calculate_safety_stock(2, 4, service_level=0.95) == pytest.approx(z * 4)
+    combined = calculate_safety_stock([1, 0], 5, daily_demand=[1, 2], lead_time_std=1.5)
+    assert list(combined) == pytest.approx([z * math.sqrt(5 + 2.25), z * 3])
+    with pytest.raises(ValueError):
+        calculate_safety_stock(1, 1, service_level=1.0)
+
+
+def test_policy_engine(tmp_path, zip_path):
+    policy = InventoryPolicyEngine.from_zip(zip_path).run().set_index("InventoryId")
+    item = policy.loc["1_A_10"]
+    assert item["daily_demand"] == pytest.approx(1.0)
+    assert item["daily_demand_std"] == pytest.approx(1.0)
+    assert item["annual_demand"] == pytest.approx(365)
+    assert item["lead_time_days"] == pytest.approx(5)
+    assert item["lead_time_std"] == pytest.approx(math.sqrt(2))
+    assert item["eoq"] == pytest.approx(math.sqrt(2 * 365 * 50 / 1.0))
+    safety = 1.6448536269514722 * math.sqrt(5 * 1 + 1 * 2)
+    assert item["safety_stock"] == pytest.approx(safety)
+    assert item["reorder_point"] == pytest.approx(5 + safety)
+    assert item["on_hand"] == 5
+    assert item["VendorNumber"] == 1
+    assert policy["abc_class"].to_dict() == {"1_A_10": "A", "1_A_11": "C"}
+
+    engine = InventoryPolicyEngine.from_zip(zip_path)
+    history = engine.demand_history()
+    assert history.tolist() == [[2, 0, 2, 0], [0, 0, 0, 1]]
+
+    store = build_store(zip_path, tmp_path / "store")
+    mapped = InventoryPolicyEngine.from_zip(store).run().set_index("InventoryId")
+    pd.testing.assert_frame_equal(mapped, policy, check_dtype=False)
+
+
+def test_policy_without_lead_time_leaves_safety_stock_undefined(zip_path):
+    datasets = load_datasets(zip_path, typed=True)
+    end_inv = datasets["EndInvFINAL12312016"]
+    datasets["EndInvFINAL12312016"] = pd.concat(
+        [end_inv, pd.DataFrame({"InventoryId": ["9_Z_99"], "Brand": [99], "onHand": [4]})],
+        ignore_index=True,
+    )
+
+    policy = InventoryPolicyEngine(datasets).run().set_index("InventoryId")
+    unknown = policy.loc["9_Z_99"]
+    assert np.isnan(unknown["lead_time_days"])
+    assert np.isnan(unknown["safety_stock"]) and np.isnan(unknown["reorder_point"])
+    assert policy.loc["1_A_10", "safety_stock"] > 0
+
+
+def test_demand_history_skips_blank_sales_dates(zip_path):
+    datasets = load_datasets(zip_path)
+    sales = datasets["SalesFINAL12312016"]
+    datasets["SalesFINAL12312016"] = pd.concat(
+        [sales, sales.iloc[[0]].assign(SalesDate=None)], ignore_index=True
+    )
+
+    engine = InventoryPolicyEngine(datasets)
+    assert engine.demand_history().tolist() == [[2, 0, 2, 0], [0, 0, 0, 1]]
+    assert engine.run().set_index("InventoryId").loc["1_A_10", "daily_demand"] == pytest.approx(1.0)
+
+
+def test_policy_engine_requires_datasets():
+    with pytest.raises(KeyError):
+        InventoryPolicyEngine({"other": pd.DataFrame()})
+
+
+def _assortment(rows=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "daily_demand": rng.uniform(0.1, 5, rows),
+            "daily_demand_std": rng.uniform(0.1, 3, rows),
+            "lead_time_days": rng.uniform(1, 10, rows),
+            "lead_time_std": rng.uniform(0, 2, rows),
+            "eoq": rng.uniform(5, 100, rows),
+            "holding_cost": rng.uniform(0.5, 5, rows),
+            "unit_cost": rng.uniform(2, 20, rows),
+        }
+    )
+
+
+def test_reorder_points_from_df_with_service_level():
+    df = _assortment(5)
+    result = calculate_reorder_points_from_df(
+        df,
+        "daily_demand",
+        "lead_time_days",
+        daily_demand_std_col="daily_demand_std",
+        lead_time_std_col="lead_time_std",
+        service_level=0.9,
+    )
+    safety = calculate_safety_stock(
+        df["daily_demand_std"],
+        df["lead_time_days"],
+        service_level=0.9,
+        daily_demand=df["daily_demand"],
+        lead_time_std=df["lead_time_std"],
+    )
+    expected = df["daily_demand"] * df["lead_time_days"] + safety
+    assert list(result) == pytest.approx(list(expected))
+    with pytest.raises(ValueError):
+        calculate_reorder_points_from_df(
+            df.assign(ss=1.0),
+            "daily_demand",
+            "lead_time_days",
+            safety_stock_col="ss",
+            daily_demand_std_col="daily_demand_std",
+        )
+
+
+def test_optimize_service_levels_matches_greedy_marginal_analysis():
+    df = _assortment()
+    result = optimize_service_levels(df, fill_rate=0.995, grid_size=16)
+
+    # Reference: take grid steps one at a time in decreasing order of
+    # shortage reduction per unit of holding cost until the target is met.
+    normal = NormalDist()
+    z = np.linspace(0, normal.inv_cdf(0.9999), 16)
+    loss = np.array([normal.pdf(v) - v * (1 - normal.cdf(v)) for v in z])
+    sigma = np.sqrt(
+        df["lead_time_days"] * df["daily_demand_std"] ** 2
+        + df["daily_demand"] ** 2 * df["lead_time_std"] ** 2
+    ).to_numpy()
+    cycles = (df["daily_demand"] * 365 / df["eoq"]).to_numpy()
+    holding = df["holding_cost"].to_numpy()
+    steps = sorted(
+        (
+            (cycles[i] * (loss[k] - loss[k + 1]) / (holding[i] * (z[k + 1] - z[k])), i)
+            for i in range(len(df))
+            for k in range(len(z) - 1)
+        ),
+        reverse=True,
+    )
+    levels = np.zeros(len(df), dtype=int)
+    allowed = 0.005 * df["daily_demand"].sum() * 365
+    for _, i in steps:
+        if (cycles * sigma * loss[levels]).sum() <= allowed:
+            break
+        levels[i] += 1
+
+    assert result["z"].to_numpy() == pytest.approx(z[levels])
+    assert result["holding_cost"].sum() == pytest.approx((holding * sigma * z[levels]).sum())
+    achieved = 1 - result["expected_shortage"].sum() / (df["daily_demand"].sum() * 365)
+    assert achieved >= 0.995
+    assert result["reorder_point"].to_numpy() == pytest.approx(
+        (df["daily_demand"] * df["lead_time_days"]).to_numpy() + result["safety_stock"].to_numpy()
+    )
+
+
+def test_optimize_service_levels_budget_and_invalid_rows():
+    df = _assortment()
+    df.loc[3, "eoq"] = np.nan
+
+    small = optimize_service_levels(df, budget=200.0)
+    large = optimize_service_levels(df, budget=2_000.0)
+
+    assert small["inventory_value"].sum() <= 200.0
+    assert large["inventory_value"].sum() <= 2_000.0
+    assert large["expected_shortage"].sum() < small["expected_shortage"].sum()
+    assert small.loc[3].isna().all()
+    with pytest.raises(ValueError):
+        optimize_service_levels(df)
+    with pytest.raises(ValueError):
+        optimize_service_levels(df, fill_rate=0.9999999)
+    with pytest.raises(KeyError):
+        optimize_service_levels(df.drop(columns="unit_cost"), budget=10.0)
+
+
+def test_optimize_service_levels_caps_shortage_at_demand():
+    df = _assortment()
+    # Small orders and erratic demand: the loss formula exceeds annual demand.
+    df.loc[:4, "eoq"] = 0.01
+    df.loc[:4, "daily_demand_std"] = df.loc[:4, "daily_demand"] * 20
+
+    result = optimize_service_levels(df, budget=50.0)
+    annual_demand = df["daily_demand"] * 365
+    assert (result["expected_shortage"] <= annual_demand + 1e-9).all()
+    assert result["fill_rate"].between(0, 1).all()
+
+
+def test_optimize_service_levels_ranks_steps_by_capped_shortage():
+    df = _assortment(rows=3, seed=1)
+    # The loss formula exceeds annual demand at the lowest levels of SKU 0.
+    df.loc[0, "eoq"] = 0.5
+    df.loc[0, "daily_demand_std"] = 20.0
+    grid = 12
+    result = optimize_service_levels(df, budget=150.0, grid_size=grid)
+
+    # Greedy marginal analysis is exact at the spend it stops at: no choice
+    # of levels spends as little and is short less.
+    z = np.linspace(0, NormalDist().inv_cdf(0.9999), grid)
+    loss = np.array([NormalDist().pdf(v) - v * (1 - NormalDist().cdf(v)) for v in z])
+    sigma = np.sqrt(
+        df["lead_time_days"] * df["daily_demand_std"] ** 2
+        + df["daily_demand"] ** 2 * df["lead_time_std"] ** 2
+    ).to_numpy()
+    cycles = (df["daily_demand"] * 365 / df["eoq"]).to_numpy()
+    annual_demand = (df["daily_demand"] * 365).to_numpy()
+    spend = df["unit_cost"].to_numpy()[:, None] * sigma[:, None] * z
+    short = np.minimum(cycles[:, None] * sigma[:, None] * loss, annual_demand[:, None])
+    assert short[0, 0] == annual_demand[0]
+    spent = result["inventory_value"].sum()
+    best = min(
+        short[range(3), levels].sum()
+        for levels in itertools.product(range(grid), repeat=3)
+        if spend[range(3), levels].sum() <= spent + 1e-9
+    )
+    assert result["expected_shortage"].sum() == pytest.approx(best)
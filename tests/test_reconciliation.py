@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    InventoryReconciler,
+    build_store,
+    load_datasets,
+    reconcile_inventory,
+    reconcile_inventory_from_zip,
+    schema_for,
+)
+
+
+@pytest.fixture
+def zip_path(tmp_path, make_zip):
+    beg_inv = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_11"],
+            "Brand": [10, 11],
+            "onHand": [5, 2],
+            "Price": [9.0, 3.0],
+        }
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_12"],
+            "Brand": [10, 10, 12],
+            "VendorNumber": [1, 1, 2],
+            "Quantity": [10, 4, 6],
+            "Dollars": [40.0, 16.0, 30.0],
+        }
+    )
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_11", "1_A_12"],
+            "Brand": [10, 10, 11, 12],
+            "SalesQuantity": [3, 4, 2, 1],
+            "SalesDate": ["1/1/2016", "1/3/2016", "1/4/2016", "1/4/2016"],
+        }
+    )
+    end_inv = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_12"],
+            "Brand": [10, 12],
+            "onHand": [10, 5],
+            "Price": [9.0, 7.0],
+        }
+    )
+    return make_zip(
+        tmp_path / "data.zip",
+        {
+            "BegInvFINAL12312016": beg_inv,
+            "PurchasesFINAL12312016": purchases,
+            "SalesFINAL12312016": sales,
+            "EndInvFINAL12312016": end_inv,
+        },
+    )
+
+
+def test_reconcile_inventory_from_zip(zip_path):
+    result = reconcile_inventory_from_zip(zip_path, chunksize=2, max_workers=1)
+    result = result.set_index("InventoryId")
+
+    item = result.loc["1_A_10"]
+    # 5 + 14 received - 7 sold = 12 expected, 10 counted: two units short at $4.
+    assert item["expected_on_hand"] == 12 and item["discrepancy"] == -2
+    assert item["discrepancy_dollars"] == pytest.approx(-8.0)
+    assert result.loc["1_A_11", "discrepancy"] == 0
+    new = result.loc["1_A_12", ["begin_on_hand", "end_on_hand", "discrepancy"]]
+    assert new.tolist() == [0, 5, 0]
+    assert result["discrepancy"].sum() == -2
+
+
+def test_reconciler_chunks_merge_and_store_agree(tmp_path, zip_path):
+    datasets = load_datasets(zip_path, typed=True)
+    expected = reconcile_inventory(datasets).set_index("InventoryId").sort_index()
+
+    # Chunks and partial reconcilers fed in any order give the same totals.
+    first, second = InventoryReconciler(), InventoryReconciler()
+    for key, df in reversed(list(datasets.items())):
+        for part, target in ((df.iloc[::2], first), (df.iloc[1::2], second)):
+            target.update(schema_for(key).name, part)
+    merged = first.merge(second).result().set_index("InventoryId").sort_index()
+    pd.testing.assert_frame_equal(merged, expected)
+
+    store = build_store(zip_path, tmp_path / "store")
+    mapped = reconcile_inventory(load_datasets(store)).set_index("InventoryId").sort_index()
+    np.testing.assert_array_equal(mapped.index, expected.index)
+    pd.testing.assert_frame_equal(mapped.reset_index(drop=True), expected.reset_index(drop=True))
+    streamed = reconcile_inventory_from_zip(store, chunksize=2, max_workers=1)
+    pd.testing.assert_frame_equal(streamed, mapped.reset_index(), check_dtype=False)
+
+    with pytest.raises(ValueError):
+        first.update("invoice_purchases", datasets["SalesFINAL12312016"])
+    with pytest.raises(KeyError):
+        first.update("sales", datasets["PurchasesFINAL12312016"])
+
+
+def test_blank_quantities_count_as_zero():
+    reconciler = InventoryReconciler()
+    reconciler.update(
+        "purchases",
+        pd.DataFrame(
+            {"InventoryId": ["a", "a", "b"], "Quantity": [4, None, 2], "Dollars": [8.0, 1.0, None]}
+        ),
+    )
+    reconciler.update("ending_inventory", pd.DataFrame({"InventoryId": ["a"], "onHand": [3]}))
+    result = reconciler.result().set_index("InventoryId")
+
+    assert result["received"].tolist() == [4, 2]
+    assert result["expected_on_hand"].tolist() == [4, 2]
+    assert result["discrepancy"].tolist() == [-1, -2]
+    assert result.loc["a", "unit_cost"] == pytest.approx(9.0 / 4)
+
+
+def test_chunk_without_keys_is_skipped():
+    reconciler = InventoryReconciler()
+    reconciler.update(
+        "sales",
+        pd.DataFrame(
+            {"InventoryId": [None, None], "SalesQuantity": [1, 2], "SalesDollars": [1.0, 2.0]}
+        ),
+    )
+    assert len(reconciler) == 0
+    reconciler.update("ending_inventory", pd.DataFrame({"InventoryId": ["a"], "onHand": [3]}))
+    assert reconciler.result()["InventoryId"].tolist() == ["a"]
@@ -0,0 +1,125 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import joint_replenishment, joint_replenishment_from_zip, vendor_order_costs
+
+
+def _annual_cost(major, minor, usage, multiplier):
+    return np.sqrt(2 * (major + (minor / multiplier).sum()) * (multiplier * usage).sum())
+
+
+def test_joint_replenishment_beats_independent_orders():
+    items = pd.DataFrame(
+        {
+            "VendorNumber": [1, 1, 1, 2, 2, 3],
+            "annual_demand": [1000.0, 200.0, 20.0, 500.0, 50.0, 0.0],
+            "holding_cost": [2.0, 1.0, 0.5, 4.0, 1.0, 1.0],
+            "minor": [5.0, 10.0, 10.0, 5.0, 20.0, 5.0],
+        }
+    )
+    major = {1: 100.0, 2: 60.0, 3: 10.0}
+    plan = joint_replenishment(items, major, minor_cost_col="minor")
+
+    assert plan.loc[5].isna().all()
+    for vendor, rows in ((1, [0, 1, 2]), (2, [3, 4])):
+        group, result = items.loc[rows], plan.loc[rows]
+        usage = (group["annual_demand"] * group["holding_cost"]).to_numpy()
+        minor = group["minor"].to_numpy()
+        multiplier = result["multiplier"].to_numpy()
+        assert multiplier.min() == 1
+        cost = result["vendor_annual_cost"].iloc[0]
+        assert cost == pytest.approx(_annual_cost(major[vendor], minor, usage, multiplier))
+        # Ordering every item on its own pays the major cost each time.
+        assert cost <= np.sqrt(2 * (major[vendor] + minor) * usage).sum()
+        best = min(
+            _annual_cost(major[vendor], minor, usage, np.array(k))
+            for k in itertools.product(range(1, 7), repeat=len(rows))
+        )
+        assert cost == pytest.approx(best, rel=0.02)
+        np.testing.assert_allclose(
+            result["order_quantity"],
+            result["order_cycle_days"] / 365 * group["annual_demand"],
+        )
+
+
+def test_items_without_order_cost_do_not_set_the_cycle():
+    items = pd.DataFrame(
+        {
+            "VendorNumber": [1, 1],
+            "annual_demand": [100.0, 400.0],
+            "holding_cost": [2.0, 1.0],
+            "minor": [0.0, 5.0],
+        }
+    )
+    with np.errstate(all="raise"):
+        result = joint_replenishment(items, 0.0, minor_cost_col="minor")
+    assert result.notna().all().all()
+    assert result["multiplier"].tolist() == [1.0, 1.0]
+    # Both items ride on the orders of the only item with an order cost.
+    cycle = np.sqrt(2 * 5.0 / (200.0 + 400.0))
+    assert result["base_cycle_days"].tolist() == pytest.approx([cycle * 365] * 2)
+    assert result["vendor_annual_cost"].iloc[0] == pytest.approx(np.sqrt(2 * 5.0 * 600.0))
+
+
+def test_vendor_order_costs_and_errors():
+    invoices = pd.DataFrame({"VendorNumber": [1, 1, 2], "Freight": [10.0, 30.0, 5.0]})
+    costs = vendor_order_costs(invoices, fixed_cost=2.0)
+    assert costs.to_dict() == {1: 22.0, 2: 7.0}
+    with pytest.raises(KeyError):
+        vendor_order_costs(invoices, freight_col="Dollars")
+    with pytest.raises(ValueError):
+        joint_replenishment(invoices.assign(annual_demand=1.0, holding_cost=1.0), -1.0)
+    items = invoices.assign(annual_demand=100.0, holding_cost=1.0)
+    with pytest.raises(KeyError, match="major_cost"):
+        joint_replenishment(items, {1: 10.0})
+    scalar = joint_replenishment(items, np.int64(10))
+    pd.testing.assert_frame_equal(scalar, joint_replenishment(items, {1: 10.0, 2: 10.0}))
+
+
+def test_joint_replenishment_from_zip(tmp_path, make_zip):
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_11", "1_A_12"],
+            "Brand": [10, 10, 11, 12],
+            "SalesQuantity": [20, 30, 2, 5],
+            "SalesDate": ["1/1/2016", "1/3/2016", "1/4/2016", "1/4/2016"],
+        }
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_11", "1_A_12"],
+            "Brand": [10, 11, 12],
+            "VendorNumber": [1, 1, 2],
+            "PODate": ["2016-01-01", "2016-01-02", "2016-01-01"],
+            "ReceivingDate": ["2016-01-05", "2016-01-08", "2016-01-04"],
+            "PurchasePrice": [4.0, 4.0, 8.0],
+            "Quantity": [10, 10, 5],
+        }
+    )
+    prices = pd.DataFrame(
+        {"Brand": [10, 11, 12], "PurchasePrice": [4.0, 4.0, 8.0], "VendorNumber": [1, 1, 2]}
+    )
+    end_inv = pd.DataFrame({"InventoryId": ["1_A_10"], "Brand": [10], "onHand": [5]})
+    invoices = pd.DataFrame({"VendorNumber": [1, 1], "Freight": [40.0, 60.0]})
+    zip_path = make_zip(
+        tmp_path / "data.zip",
+        {
+            "SalesFINAL12312016": sales,
+            "PurchasesFINAL12312016": purchases,
+            "2017PurchasePricesDec": prices,
+            "EndInvFINAL12312016": end_inv,
+            "InvoicePurchases12312016": invoices,
+        },
+    )
+
+    plan = joint_replenishment_from_zip(zip_path, minor_cost=5.0).set_index("InventoryId")
+
+    fast, slow = plan.loc["1_A_10"], plan.loc["1_A_11"]
+    assert fast["multiplier"] == 1 and slow["multiplier"] >= 1
+    assert fast["base_cycle_days"] == slow["base_cycle_days"]
+    assert fast["vendor_annual_cost"] == slow["vendor_annual_cost"]
+    # Vendor 2 has no invoices, so only the minor cost applies to its orders.
+    assert plan.loc["1_A_12", "multiplier"] == 1
@@ -7,7 +7,14 @@ import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from inventory import top_selling_products, top_selling_from_zip, top_selling_sample
+from inventory import (
+    top_selling_by_group,
+    top_selling_by_group_from_zip,
+    top_selling_from_chunks,
+    top_selling_from_zip,
+    top_selling_products,
+    top_selling_sample,
+)
 
 
 def _make_zip(path, files):
@@ -38,9 +45,96 @@ def test_top_selling_from_zip(tmp_path):
     assert result.iloc[0]["total_quantity"] == 13
 
 
+def test_top_selling_streaming(tmp_path):
+    df = pd.DataFrame({"product": list("ABACBD"), "qty": [10, 5, 3, 20, 1, 2]})
+    chunks = [df.iloc[:2], df.iloc[2:5], df.iloc[5:]]
+    streamed = top_selling_from_chunks(chunks, "product", "qty", top_n=3)
+    assert streamed.equals(top_selling_products(df, "product", "qty", top_n=3))
+
+    zip_path = _make_zip(tmp_path / "sales.zip", {"sales": df})
+    from_zip = top_selling_from_zip(
+        zip_path,
+        sales_file="sales.csv",
+        product_col="product",
+        quantity_col="qty",
+        top_n=3,
+        chunksize=2,
+    )
+    assert from_zip.equals(streamed)
+
+
 def test_top_selling_sample(tmp_path):
     df = pd.DataFrame({"Description": ["A", "B", "A"], "SalesQuantity": [10, 5, 3]})
     zip_path = _make_zip(tmp_path / "Sample.zip", {"SalesFINAL12312016_sample": df})
     result = top_selling_sample(zip_path=zip_path, top_n=1)
     assert result.iloc[0]["Description"] == "A"
     assert result.iloc[0]["total_quantity"] == 13
+
+
+def _store_sales():
+    return pd.DataFrame(
+        {
+            "Store": [1, 1, 1, 2, 2, 2, 1],
+            "product": ["A", "B", "C", "A", "B", "C", "B"],
+            "qty": [5, 3, 1, 1, 4, 4, 3],
+            "dollars": [10.0, 30.0, 50.0, 2.0, 8.0, 40.0, 30.0],
+            "date": pd.to_datetime(
+                ["2016-01-03", "2016-01-09", "2016-02-01", "2016-01-05",
+                 "2016-02-07", "2016-02-08", "2016-02-10"]
+            ),
+        }
+    )
+
+
+def test_top_selling_by_group():
+    df = _store_sales()
+
+    by_qty = top_selling_by_group(df, "product", "Store", rank_by="qty", top_n=2)
+    assert list(by_qty.columns) == ["Store", "product", "qty", "rank"]
+    assert by_qty.values.tolist() == [
+        [1, "B", 6, 1],
+        [1, "A", 5, 2],
+        [2, "B", 4, 1],
+        [2, "C", 4, 2],
+    ]
+
+    by_dollars = top_selling_by_group(df, "product", "Store", rank_by="dollars", top_n=1)
+    assert by_dollars[["Store", "product"]].values.tolist() == [[1, "B"], [2, "C"]]
+
+
+def test_top_selling_by_group_per_month():
+    df = _store_sales()
+
+    result = top_selling_by_group(df, "product", ["Store", "date"], rank_by="qty", top_n=1, freq="M")
+
+    expected = {
+        (1, "2016-01"): "A",
+        (1, "2016-02"): "B",
+        (2, "2016-01"): "A",
+        (2, "2016-02"): "B",
+    }
+    got = {(row.Store, str(row.date)): row.product for row in result.itertuples()}
+    assert got == expected
+    assert (result["rank"] == 1).all()
+
+
+def test_top_selling_by_group_from_zip(tmp_path):
+    df = _store_sales()
+    zip_path = _make_zip(tmp_path / "sales.zip", {"sales": df})
+
+    loaded = top_selling_by_group_from_zip(
+        zip_path, sales_file="sales.csv", product_col="product", by="Store", rank_by="qty", top_n=2
+    )
+    streamed = top_selling_by_group_from_zip(
+        zip_path,
+        sales_file="sales.csv",
+        product_col="product",
+        by="Store",
+        rank_by="qty",
+        top_n=2,
+        chunksize=3,
+    )
+
+    expected = top_selling_by_group(df, "product", "Store", rank_by="qty", top_n=2)
+    pd.testing.assert_frame_equal(loaded, expected)
+    pd.testing.assert_frame_equal(streamed, expected)
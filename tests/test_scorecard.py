@@ -0,0 +1,103 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import (
+    VendorScorecard,
+    build_store,
+    load_datasets,
+    schema_for,
+    vendor_scorecard,
+    vendor_scorecard_from_zip,
+)
+
+
+def _archive(make_zip, path, vendor_two_lead=4):
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_11", "1_A_12"],
+            "VendorNumber": [1, 1, 1, 2],
+            "PODate": ["2016-01-01", "2016-01-02", "2016-01-03", "2016-01-01"],
+            "ReceivingDate": [
+                "2016-01-05",
+                "2016-01-10",
+                "2016-01-09",
+                f"2016-01-{1 + vendor_two_lead:02d}",
+            ],
+            "InvoiceDate": ["2016-01-07", "2016-01-12", "2016-01-11", ""],
+            "Quantity": [10, 20, 10, 5],
+            "Dollars": [100.0, 200.0, 100.0, 50.0],
+        }
+    )
+    invoices = pd.DataFrame(
+        {
+            "VendorNumber": [1, 2],
+            "InvoiceDate": ["2016-01-12", "2016-01-05"],
+            "PODate": ["2016-01-01", "2016-01-01"],
+            "PayDate": ["2016-02-11", "2016-01-15"],
+            "Quantity": [50, 5],
+            "Dollars": [400.0, 50.0],
+            "Freight": [8.0, 1.0],
+        }
+    )
+    return make_zip(
+        path, {"PurchasesFINAL12312016": purchases, "InvoicePurchases12312016": invoices}
+    )
+
+
+def test_vendor_scorecard_statistics(tmp_path, make_zip):
+    scorecard = vendor_scorecard_from_zip(_archive(make_zip, tmp_path / "data.zip"), chunksize=2)
+
+    one = scorecard.loc[1]
+    assert one["purchase_lines"] == 3 and one["invoices"] == 1
+    assert one["lead_time_mean"] == pytest.approx(np.mean([4, 8, 6]))
+    assert one["lead_time_std"] == pytest.approx(np.std([4, 8, 6], ddof=1))
+    assert one["lead_time_cv"] == pytest.approx(2 / 6)
+    assert one["on_time_rate"] == pytest.approx(2 / 3)
+    assert one["invoice_lag_mean"] == pytest.approx(2.0)
+    assert one["payment_days_mean"] == pytest.approx(30.0)
+    assert one["freight_pct"] == pytest.approx(2.0)
+    assert one["fill_rate"] == pytest.approx(40 / 50)
+
+    two = scorecard.loc[2]
+    assert two["lead_time_mean"] == pytest.approx(4.0)
+    assert np.isnan(two["lead_time_std"]) and np.isnan(two["invoice_lag_mean"])
+    assert two["fill_rate"] == pytest.approx(1.0)
+
+    datasets = load_datasets(build_store(tmp_path / "data.zip", tmp_path / "store"))
+    pd.testing.assert_frame_equal(vendor_scorecard(datasets), scorecard)
+
+
+def test_scorecard_is_updated_incrementally(tmp_path, make_zip):
+    january = _archive(make_zip, tmp_path / "january.zip")
+    february = _archive(make_zip, tmp_path / "february.zip", vendor_two_lead=10)
+    state = tmp_path / "scorecard.npz"
+
+    vendor_scorecard_from_zip(january, state=state)
+    updated = vendor_scorecard_from_zip(february, state=state)
+
+    both = VendorScorecard()
+    for path in (january, february):
+        part = VendorScorecard()
+        for name, df in load_datasets(path, typed=True).items():
+            part.update(schema_for(name).name, df)
+        both.merge(part)
+    pd.testing.assert_frame_equal(updated, both.result())
+    assert updated.loc[2, "lead_time_mean"] == pytest.approx(7.0)
+    assert updated.loc[1, "purchase_lines"] == 6
+
+    # Passing an archive again, a copy of it or the store built from it adds
+    # nothing.
+    pd.testing.assert_frame_equal(vendor_scorecard_from_zip(february, state=state), updated)
+    copy = shutil.copy(february, tmp_path / "february-copy.zip")
+    pd.testing.assert_frame_equal(vendor_scorecard_from_zip(copy, state=state), updated)
+    store = build_store(january, tmp_path / "store")
+    pd.testing.assert_frame_equal(vendor_scorecard_from_zip(store, state=state), updated)
+    assert len(VendorScorecard.load(state).archives) == 2
+
+    with pytest.raises(ValueError):
+        vendor_scorecard_from_zip(february, state=state, on_time_days=3)
+    with pytest.raises(KeyError):
+        VendorScorecard().update("purchases", pd.DataFrame({"VendorNumber": [1]}))
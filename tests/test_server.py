@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from inventory import top_selling_products
+from inventory.server import InventoryServer, InventoryService, UnknownEndpoint
+
+
+def _sales(quantities):
+    return pd.DataFrame(
+        {
+            "InventoryId": [f"1_A_{i}" for i in range(len(quantities))],
+            "Description": [f"item {i}" for i in range(len(quantities))],
+            "SalesQuantity": quantities,
+            "SalesDate": [f"1/{i + 1}/2016" for i in range(len(quantities))],
+        }
+    )
+
+
+async def _get(port, *targets):
+    """Send ``targets`` over one keep-alive connection, return (status, json)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    try:
+        for target in targets:
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            responses.append((status, json.loads(await reader.readexactly(length))))
+    finally:
+        writer.close()
+    return responses
+
+
+def test_service_answers_from_memory(tmp_path, make_zip):
+    sales = _sales([5, 1, 9, 3])
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": sales})
+    service = InventoryService(zip_path)
+
+    body = json.loads(service.query("/top-selling", {"top_n": ["2"]}))
+
+    expected = top_selling_products(sales, "Description", "SalesQuantity", top_n=2)
+    assert body["data"] == expected.to_dict(orient="records")
+    assert service.query("/top-selling", {"top_n": ["2"]}) is service.query(
+        "/top-selling", {"top_n": ["2"]}
+    )
+    eoq = json.loads(
+        service.query("/eoq", {"demand": ["2497"], "order_cost": ["50"], "holding_cost": ["2"]})
+    )
+    assert eoq["data"]["eoq"] == pytest.approx(353.34, rel=1e-3)
+    with pytest.raises(KeyError):
+        service.query("/top-selling", {"product_col": ["missing"]})
+    with pytest.raises(ValueError):
+        service.query("/eoq", {"demand": ["10"]})
+
+
+def test_service_reloads_changed_archive(tmp_path, make_zip):
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": _sales([5, 1])})
+    service = InventoryService(zip_path)
+    first = json.loads(service.query("/top-selling", {"top_n": ["1"]}))["data"]
+    assert not service.reload_if_changed()
+
+    make_zip(zip_path, {"SalesFINAL12312016": _sales([1, 2, 30])})
+    stat = zip_path.stat()
+    os.utime(zip_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert service.reload_if_changed()
+    second = json.loads(service.query("/top-selling", {"top_n": ["1"]}))["data"]
+    assert first == [{"Description": "item 0", "total_quantity": 5}]
+    assert second == [{"Description": "item 2", "total_quantity": 30}]
+    assert service.metrics()["reloads"] == 1
+
+
+def test_server_handles_concurrent_requests(tmp_path, make_zip):
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": _sales([5, 1, 9, 3])})
+
+    async def scenario():
+        server = InventoryServer(
+            InventoryService(zip_path), port=0, max_workers=2, poll_interval=None
+        )
+        await server.start()
+        try:
+            results = await asyncio.gather(
+                *(
+                    _get(server.port, f"/top-selling?top_n={n}", "/forecast?periods=2")
+                    for n in (1, 2, 3)
+                )
+            )
+            errors = await _get(server.port, "/nope", "/top-selling?top_n=x", "/metrics")
+        finally:
+            await server.close()
+        return results, errors
+
+    results, errors = asyncio.run(scenario())
+
+    for n, ((status, top), (forecast_status, forecast)) in zip((1, 2, 3), results):
+        assert status == 200 and len(top["data"]) == n
+        assert forecast_status == 200 and len(forecast["data"]) == 2
+    (missing, _), (bad, body), (_, metrics) = errors
+    assert missing == 404
+    assert bad == 400 and "top_n" in body["error"]
+    endpoint = metrics["endpoints"]["/top-selling"]
+    assert endpoint["count"] == 4 and endpoint["errors"] == 1
+    assert endpoint["p99_ms"] >= endpoint["p50_ms"] >= 0
+
+
+def test_failed_derive_is_retried(tmp_path, make_zip):
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": _sales([5, 1])})
+    snapshot = InventoryService(zip_path).snapshot
+
+    def failing():
+        raise ValueError("bad column")
+
+    with pytest.raises(ValueError):
+        snapshot.derive("totals", failing)
+    assert snapshot._building == {} and "totals" not in snapshot.derived
+    assert snapshot.derive("totals", lambda: 42) == 42
+
+
+def test_handler_lookup_errors_are_server_errors(tmp_path, make_zip):
+    zip_path = make_zip(tmp_path / "data.zip", {"SalesFINAL12312016": _sales([5, 1])})
+    service = InventoryService(zip_path)
+
+    def broken(snapshot, params):
+        return [][0]
+
+    service.endpoints["/broken"] = broken
+    with pytest.raises(UnknownEndpoint):
+        service.query("/nope")
+
+    async def scenario():
+        server = InventoryServer(service, port=0, max_workers=1, poll_interval=None)
+        await server.start()
+        try:
+            return await _get(server.port, "/broken", "/nope")
+        finally:
+            await server.close()
+
+    (broken_status, _), (missing, _) = asyncio.run(scenario())
+    assert broken_status == 500
+    assert missing == 404
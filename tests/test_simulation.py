@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import simulate_inventory, simulate_policy_from_zip
+
+
+def test_deterministic_policies():
+    # One unit a day, orders of ten arriving two days later: a reorder point
+    # covering the lead time never runs out, a reorder point of zero loses the
+    # demand of the day before every delivery.
+    result = simulate_inventory(
+        [2, 0], [10, 10], np.ones((2, 5)), [[2]], lead_time_pool=[0, 0], days=100, replications=3
+    )
+
+    covered, short = result.to_dict(orient="records")
+    assert covered == {"fill_rate": 1.0, "stockout_days": 0.0, "avg_on_hand": 5.6, "orders": 10.0}
+    assert short["stockout_days"] == 9.0
+    assert short["fill_rate"] == pytest.approx(91 / 100)
+
+
+def test_results_do_not_depend_on_workers():
+    rng = np.random.default_rng(1)
+    demand = rng.poisson(2.0, (12, 60))
+    kwargs = dict(
+        lead_time_pool=rng.integers(0, 2, 12),
+        days=60,
+        replications=20,
+        seed=5,
+        chunksize=5,
+    )
+    lead_times = [[1, 3, 4], [2, 7]]
+
+    serial = simulate_inventory(6.0, 15.0, demand, lead_times, max_workers=1, **kwargs)
+    parallel = simulate_inventory(6.0, 15.0, demand, lead_times, max_workers=2, **kwargs)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial["fill_rate"].between(0, 1).all()
+    with pytest.raises(ValueError):
+        simulate_inventory(6.0, 0.0, demand, lead_times, **kwargs)
+    with pytest.raises(ValueError):
+        simulate_inventory(6.0, 15.0, demand, [[], []], **kwargs)
+
+
+def test_simulate_policy_from_zip(tmp_path, make_zip):
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10"] * 4 + ["1_A_11"],
+            "Brand": [10, 10, 10, 10, 11],
+            "SalesQuantity": [2, 1, 3, 2, 1],
+            "SalesDate": ["1/1/2016", "1/2/2016", "1/3/2016", "1/5/2016", "1/4/2016"],
+        }
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_10", "1_A_10", "1_A_12"],
+            "Brand": [10, 10, 12],
+            "VendorNumber": [1, 1, 2],
+            "PODate": ["2016-01-01", "2016-01-02", "2016-01-01"],
+            "ReceivingDate": ["2016-01-05", "2016-01-08", "2016-01-04"],
+            "PurchasePrice": [4.0, 4.0, 8.0],
+            "Quantity": [10, 10, 5],
+        }
+    )
+    prices = pd.DataFrame({"Brand": [10, 12], "PurchasePrice": [4.0, 8.0], "VendorNumber": [1, 2]})
+    end_inv = pd.DataFrame({"InventoryId": ["1_A_10"], "Brand": [10], "onHand": [5]})
+    zip_path = make_zip(
+        tmp_path / "data.zip",
+        {
+            "SalesFINAL12312016": sales,
+            "PurchasesFINAL12312016": purchases,
+            "2017PurchasePricesDec": prices,
+            "EndInvFINAL12312016": end_inv,
+        },
+    )
+
+    result = simulate_policy_from_zip(zip_path, replications=50).set_index("InventoryId")
+
+    item = result.loc["1_A_10"]
+    assert 0.5 < item["fill_rate"] <= 1.0
+    assert item["orders"] >= 1
+    assert item["holding_cost_per_year"] == pytest.approx(item["avg_on_hand"] * 0.25 * 4.0)
+    # No vendor lead times for 1_A_11 and no demand for 1_A_12.
+    assert result.loc[["1_A_11", "1_A_12"], "fill_rate"].isna().all()
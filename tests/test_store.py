@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import inventory.store as store
+from inventory import (
+    MappedTable,
+    build_store,
+    calculate_reorder_points_from_zip,
+    classify_inventory_from_zip,
+    compute_lead_times,
+    forecast_from_zip,
+    iter_dataset,
+    lead_time_profile_from_zip,
+    load_datasets,
+    open_store,
+    top_selling_by_group_from_zip,
+    top_selling_products,
+)
+
+
+@pytest.fixture
+def zip_path(tmp_path, make_zip):
+    sales = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_1", "1_A_2", "2_B_1", "1_A_1", "2_B_1", "1_A_3"],
+            "Store": [1, 1, 2, 1, 2, 1],
+            "Brand": [10, 20, 10, 10, 10, 30],
+            "SalesQuantity": [3, 5, 2, 4, 1, 5],
+            "SalesDollars": [30.0, 55.5, 20.0, 40.0, 10.0, 12.5],
+            "SalesDate": ["1/1/2016", "1/1/2016", "1/2/2016", "1/4/2016", "1/4/2016", "1/5/2016"],
+        }
+    )
+    purchases = pd.DataFrame(
+        {
+            "InventoryId": ["1_A_1", "1_A_2", "2_B_1", "1_A_3"],
+            "VendorNumber": [7, 9, 7, 9],
+            "VendorName": ["ACME  ", "GLOBEX", "ACME  ", "GLOBEX"],
+            "Quantity": [10, 20, 30, 40],
+            "PODate": ["2016-01-01", "2016-01-03", "2016-01-02", "2016-01-05"],
+            "ReceivingDate": ["2016-01-08", "2016-01-05", "2016-01-12", None],
+        }
+    )
+    return make_zip(
+        tmp_path / "data.zip",
+        {"SalesFINAL12312016": sales, "PurchasesFINAL12312016": purchases},
+    )
+
+
+def test_store_roundtrips_typed_columns(tmp_path, monkeypatch, zip_path):
+    monkeypatch.setattr(store, "BLOCK_ROWS", 2)
+
+    directory = build_store(zip_path, tmp_path / "store", chunksize=4)
+    tables = load_datasets(directory)
+    typed = load_datasets(zip_path, typed=True)
+
+    assert isinstance(tables["SalesFINAL12312016"], MappedTable)
+    for name, df in typed.items():
+        table = tables[name]
+        assert len(table) == len(df)
+        assert list(table.columns) == list(df.columns)
+        decoded = table.to_pandas()
+        for col in df.columns:
+            pd.testing.assert_series_equal(decoded[col], df[col], check_dtype=False)
+    sales = tables["SalesFINAL12312016"]
+    assert sales.kind("Store") == "dimension" and sales.kind("SalesDate") == "date"
+    assert sales.array("InventoryId").dtype == np.int32
+    assert isinstance(sales.array("SalesQuantity"), np.memmap)
+
+    only = open_store(directory, files=["SalesFINAL12312016.csv"], usecols=["Brand"])
+    assert list(only) == ["SalesFINAL12312016"]
+    assert list(only["SalesFINAL12312016"].columns) == ["Brand"]
+    with pytest.raises(KeyError):
+        sales.array("missing")
+    with pytest.raises(FileNotFoundError):
+        open_store(tmp_path)
+
+
+def test_aggregations_run_on_mapped_tables(tmp_path, monkeypatch, zip_path):
+    monkeypatch.setattr(store, "BLOCK_ROWS", 2)
+    directory = build_store(zip_path, tmp_path / "store")
+    tables = load_datasets(directory)
+    typed = load_datasets(zip_path, typed=True)
+    sales, purchases = tables["SalesFINAL12312016"], tables["PurchasesFINAL12312016"]
+
+    for col in ("InventoryId", "Brand"):
+        top = top_selling_products(typed["SalesFINAL12312016"], col, "SalesQuantity", top_n=2)
+        pd.testing.assert_frame_equal(
+            top_selling_products(sales, col, "SalesQuantity", top_n=2),
+            top.astype({col: object}) if col == "InventoryId" else top,
+            check_dtype=False,
+        )
+    expected = typed["PurchasesFINAL12312016"]
+    pd.testing.assert_series_equal(
+        compute_lead_times(purchases, "PODate", "ReceivingDate"),
+        compute_lead_times(expected, "PODate", "ReceivingDate"),
+    )
+    pd.testing.assert_series_equal(
+        compute_lead_times(purchases, "PODate", "ReceivingDate", group_col="VendorNumber"),
+        compute_lead_times(expected, "PODate", "ReceivingDate", group_col="VendorNumber"),
+    )
+    pd.testing.assert_series_equal(
+        forecast_from_zip(
+            directory, "SalesFINAL12312016.csv", "SalesDate", "SalesQuantity", 3, engine="numpy"
+        ),
+        forecast_from_zip(
+            zip_path, "SalesFINAL12312016.csv", "SalesDate", "SalesQuantity", 3, engine="numpy"
+        ),
+    )
+    with pytest.raises(KeyError):
+        top_selling_products(sales, "missing", "SalesQuantity")
+    with pytest.raises(ValueError):
+        sales.group_sum("SalesQuantity", "SalesQuantity")
+
+
+def test_build_store_only_replaces_stores(tmp_path, zip_path):
+    directory = build_store(zip_path, tmp_path / "store")
+    assert build_store(zip_path, directory) == directory
+
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "notes.txt").write_text("keep me")
+    with pytest.raises(FileExistsError):
+        build_store(zip_path, other)
+    assert (other / "notes.txt").read_text() == "keep me"
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".tmp-")] == []
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    assert len(open_store(build_store(zip_path, empty))) == 2
+
+
+def test_build_store_closes_writers_on_failure(tmp_path, monkeypatch, zip_path):
+    opened = []
+
+    class FailingWriter(store._ColumnWriter):
+        def __init__(self, *args):
+            super().__init__(*args)
+            opened.append(self)
+
+        def append(self, column):
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "_ColumnWriter", FailingWriter)
+    with pytest.raises(RuntimeError):
+        build_store(zip_path, tmp_path / "store")
+    assert opened and all(writer.fp.closed for writer in opened)
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".tmp-")] == []
+
+
+def test_member_without_rows_keeps_its_columns(tmp_path, monkeypatch, make_zip):
+    sales = pd.DataFrame(columns=["InventoryId", "SalesQuantity", "SalesDate"])
+    archive = make_zip(tmp_path / "empty.zip", {"SalesFINAL12312016": sales})
+    # Some pandas versions yield no chunk at all for a header-only CSV.
+    monkeypatch.setattr("inventory.datasets.iter_dataset", lambda *args, **kwargs: iter(()))
+
+    table = open_store(build_store(archive, tmp_path / "store"))["SalesFINAL12312016"]
+    assert len(table) == 0
+    assert list(table.columns) == ["InventoryId", "SalesQuantity", "SalesDate"]
+    assert table.to_pandas()["SalesDate"].dtype.kind == "M"
+
+
+def test_zip_helpers_accept_store_directories(tmp_path, zip_path):
+    directory = build_store(zip_path, tmp_path / "store")
+    sales, purchases = "SalesFINAL12312016.csv", "PurchasesFINAL12312016.csv"
+
+    tables = load_datasets(directory, materialize=True)
+    assert all(isinstance(df, pd.DataFrame) for df in tables.values())
+    chunks = list(iter_dataset(directory, sales, chunksize=4, usecols=["Store"]))
+    assert [len(chunk) for chunk in chunks] == [4, 2] and chunks[1].index[0] == 4
+
+    helpers = [
+        lambda path: classify_inventory_from_zip(path, sales, "SalesDollars"),
+        lambda path: calculate_reorder_points_from_zip(path, sales, "SalesQuantity", "Store"),
+        lambda path: lead_time_profile_from_zip(path, purchases, "PODate", "ReceivingDate"),
+        lambda path: top_selling_by_group_from_zip(
+            path, sales_file=sales, product_col="InventoryId", by="Store", top_n=1
+        ),
+        lambda path: top_selling_by_group_from_zip(
+            path, sales_file=sales, product_col="InventoryId", by="Store", chunksize=4
+        ),
+    ]
+    for helper in helpers:
+        expected, result = helper(zip_path), helper(directory)
+        if isinstance(expected, pd.Series):
+            pd.testing.assert_series_equal(result, expected, check_dtype=False)
+        else:
+            pd.testing.assert_frame_equal(
+                result, expected, check_dtype=False, check_categorical=False
+            )